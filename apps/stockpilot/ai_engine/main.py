@@ -583,6 +583,10 @@ class StockPilotAIEngine:
             if self.cache_manager:
                 await self.cache_manager.cleanup_expired()
             
+            # 사용량 쓰기 버퍼에 남은 기록 저장
+            if self.usage_tracker:
+                await self.usage_tracker.shutdown()
+            
             # 추가 정리 작업들...
             
             self.initialized = False
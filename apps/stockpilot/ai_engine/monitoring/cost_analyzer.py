@@ -151,52 +151,31 @@ class CostAnalyzer:
     async def analyze_model_efficiency(self) -> Dict[str, Any]:
         """모델 효율성 분석"""
         try:
-            # 최근 30일 데이터 조회
-            records = await self.usage_tracker.db.get_usage_records(
-                start_date=datetime.now() - timedelta(days=30),
-                limit=10000
+            # 최근 30일 모델별 롤업 조회
+            rows = await self.usage_tracker.get_rollups(
+                "hour",
+                start=datetime.now() - timedelta(days=30),
+                group_by=("model_name",)
             )
             
-            if not records:
+            if not rows:
                 return {"error": "No usage data available"}
             
             # 모델별 효율성 메트릭
-            model_metrics = defaultdict(lambda: {
-                "total_requests": 0,
-                "total_cost": 0.0,
-                "total_tokens": 0,
-                "avg_response_time": 0.0,
-                "success_rate": 0.0,
-                "cache_hit_rate": 0.0,
-                "cost_per_token": 0.0,
-                "cost_per_success": 0.0
-            })
-            
-            for record in records:
-                metrics = model_metrics[record.model_name]
-                metrics["total_requests"] += 1
-                metrics["total_cost"] += record.cost
-                metrics["total_tokens"] += record.total_tokens
-                metrics["avg_response_time"] += record.response_time_ms
-                
-                if record.success:
-                    metrics["success_rate"] += 1
-                if record.cache_hit:
-                    metrics["cache_hit_rate"] += 1
-            
-            # 평균값 계산
-            for model, metrics in model_metrics.items():
-                if metrics["total_requests"] > 0:
-                    metrics["avg_response_time"] /= metrics["total_requests"]
-                    metrics["success_rate"] /= metrics["total_requests"]
-                    metrics["cache_hit_rate"] /= metrics["total_requests"]
-                    
-                    if metrics["total_tokens"] > 0:
-                        metrics["cost_per_token"] = metrics["total_cost"] / metrics["total_tokens"]
-                    
-                    successful_requests = metrics["success_rate"] * metrics["total_requests"]
-                    if successful_requests > 0:
-                        metrics["cost_per_success"] = metrics["total_cost"] / successful_requests
+            model_metrics = {}
+            for row in rows:
+                requests = row["requests"]
+                metrics = {
+                    "total_requests": requests,
+                    "total_cost": row["cost"],
+                    "total_tokens": row["total_tokens"],
+                    "avg_response_time": row["response_time_ms_sum"] / requests,
+                    "success_rate": row["successes"] / requests,
+                    "cache_hit_rate": row["cache_hits"] / requests,
+                    "cost_per_token": row["cost"] / row["total_tokens"] if row["total_tokens"] > 0 else 0.0,
+                    "cost_per_success": row["cost"] / row["successes"] if row["successes"] > 0 else 0.0
+                }
+                model_metrics[row["model_name"]] = metrics
             
             # 효율성 점수 계산
             efficiency_scores = {}
@@ -274,7 +253,7 @@ class CostAnalyzer:
             
             # 비싼 쿼리 확인
             expensive_threshold = self.alert_thresholds[AlertType.EXPENSIVE_QUERY]
-            recent_records = await self.usage_tracker.db.get_usage_records(
+            recent_records = await self.usage_tracker.get_usage_records(
                 start_date=datetime.now() - timedelta(hours=1),
                 limit=100
             )
@@ -624,16 +603,14 @@ class CostAnalyzer:
     async def _get_recent_hourly_costs(self, hours: int) -> List[float]:
         """최근 시간별 비용 조회"""
         try:
-            records = await self.usage_tracker.db.get_usage_records(
-                start_date=datetime.now() - timedelta(hours=hours),
-                limit=10000
+            rows = await self.usage_tracker.get_rollups(
+                "hour",
+                start=datetime.now() - timedelta(hours=hours),
+                group_by=("bucket_start",)
             )
             
             # 시간별 비용 집계
-            hourly_costs = defaultdict(float)
-            for record in records:
-                hour_key = record.timestamp.replace(minute=0, second=0, microsecond=0)
-                hourly_costs[hour_key] += record.cost
+            hourly_costs = {row["bucket_start"]: row["cost"] for row in rows}
             
             # 시간순 정렬하여 리스트로 반환
             sorted_hours = sorted(hourly_costs.keys())
@@ -645,16 +622,14 @@ class CostAnalyzer:
     async def _get_overall_cache_hit_rate(self) -> float:
         """전체 캐시 히트율 조회"""
         try:
-            records = await self.usage_tracker.db.get_usage_records(
-                start_date=datetime.now() - timedelta(days=7),
-                limit=5000
-            )
+            totals = (await self.usage_tracker.get_rollups(
+                "hour", start=datetime.now() - timedelta(days=7)
+            ))[0]
             
-            if not records:
+            if not totals["requests"]:
                 return 0.0
             
-            cache_hits = sum(1 for r in records if r.cache_hit)
-            return cache_hits / len(records)
+            return totals["cache_hits"] / totals["requests"]
             
         except Exception:
             return 0.0
@@ -663,12 +638,11 @@ class CostAnalyzer:
         """캐시 개선으로 인한 예상 절약액"""
         try:
             # 최근 7일 비용 조회
-            records = await self.usage_tracker.db.get_usage_records(
-                start_date=datetime.now() - timedelta(days=7),
-                limit=5000
-            )
+            totals = (await self.usage_tracker.get_rollups(
+                "hour", start=datetime.now() - timedelta(days=7)
+            ))[0]
             
-            total_cost = sum(r.cost for r in records if not r.cache_hit)
+            total_cost = totals["cost"] - totals["cached_cost"]
             
             # 캐시 히트율을 80%로 개선했을 때의 절약액 추정
             target_hit_rate = 0.8
@@ -684,7 +658,7 @@ class CostAnalyzer:
     async def _identify_high_token_usage_patterns(self) -> List[Dict[str, Any]]:
         """높은 토큰 사용 패턴 식별"""
         try:
-            records = await self.usage_tracker.db.get_usage_records(
+            records = await self.usage_tracker.get_usage_records(
                 start_date=datetime.now() - timedelta(days=7),
                 limit=5000
             )
@@ -725,20 +699,17 @@ class CostAnalyzer:
     async def _analyze_tier_optimization_opportunities(self) -> Dict[str, Any]:
         """티어 최적화 기회 분석"""
         try:
-            records = await self.usage_tracker.db.get_usage_records(
-                start_date=datetime.now() - timedelta(days=7),
-                limit=5000
+            rows = await self.usage_tracker.get_rollups(
+                "hour",
+                start=datetime.now() - timedelta(days=7),
+                group_by=("model_tier",)
             )
             
             # 티어별 성공률과 비용 분석
-            tier_analysis = defaultdict(lambda: {"requests": 0, "cost": 0, "success": 0})
-            
-            for record in records:
-                tier = record.model_tier.value
-                tier_analysis[tier]["requests"] += 1
-                tier_analysis[tier]["cost"] += record.cost
-                if record.success:
-                    tier_analysis[tier]["success"] += 1
+            tier_analysis = {
+                row["model_tier"]: {"requests": row["requests"], "cost": row["cost"], "success": row["successes"]}
+                for row in rows
+            }
             
             # 높은 티어에서 단순한 작업 수행하는 케이스 식별
             potential_savings = 0.0
@@ -0,0 +1,179 @@
+"""
+슬라이딩 윈도우 메트릭 - 고정 메모리, O(1) 조회의 실시간 집계
+"""
+
+import math
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class LogHistogram:
+    """로그 스케일 고정 구간 히스토그램 (HDR 방식 근사 백분위수)"""
+
+    def __init__(self, min_value: float = 0.01, max_value: float = 1e7, precision: float = 0.02):
+        self.min_value = min_value
+        self.max_value = max_value
+        self._log_base = math.log1p(precision)
+        self._log_min = math.log(min_value)
+        # 0번 구간은 min_value 미만(0 포함) 값 전용
+        self.num_bins = int(math.ceil((math.log(max_value) - self._log_min) / self._log_base)) + 2
+
+    def bin_index(self, value: float) -> int:
+        """값이 속한 구간 번호"""
+        if value < self.min_value:
+            return 0
+        index = int((math.log(value) - self._log_min) / self._log_base) + 1
+        return min(index, self.num_bins - 1)
+
+    def bin_value(self, index: int) -> float:
+        """구간 대표값 (구간 중앙값)"""
+        if index == 0:
+            return 0.0
+        return math.exp(self._log_min + (index - 0.5) * self._log_base)
+
+
+class _Bucket:
+    """윈도우를 구성하는 고정 폭 시간 구간"""
+
+    __slots__ = ("seq", "count", "total", "histogram")
+
+    def __init__(self):
+        self.seq = -1
+        self.count = 0
+        self.total = 0.0
+        self.histogram: Dict[int, int] = {}
+
+    def reset(self, seq: int):
+        self.seq = seq
+        self.count = 0
+        self.total = 0.0
+        self.histogram = {}
+
+
+class SlidingWindowMetric:
+    """링 버퍼 기반 슬라이딩 윈도우 집계기
+
+    - 합계/개수: 만료 구간만큼 차감하는 누적값 유지
+    - 최소/최대: 구간당 최대 1개 항목만 유지하는 단조 덱
+    - 백분위수: 윈도우 전체 로그 히스토그램 (구간 만료 시 차감)
+    메모리는 구간 수 × 히스토그램 구간 수로 고정된다.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float = 3600.0,
+        bucket_seconds: float = 10.0,
+        histogram: Optional[LogHistogram] = None,
+        clock: Callable[[], float] = time.time
+    ):
+        self.window_seconds = window_seconds
+        self.bucket_seconds = bucket_seconds
+        self.num_buckets = max(1, int(math.ceil(window_seconds / bucket_seconds)))
+        self.histogram = histogram or LogHistogram()
+        self.clock = clock
+
+        self._buckets: List[_Bucket] = [_Bucket() for _ in range(self.num_buckets)]
+        self._window_histogram = np.zeros(self.histogram.num_bins, dtype=np.int64)
+        self._count = 0
+        self._total = 0.0
+        self._min_deque: Deque[Tuple[int, float]] = deque()
+        self._max_deque: Deque[Tuple[int, float]] = deque()
+        self._head_seq: Optional[int] = None
+        self._last_value: Optional[float] = None
+
+    def _current_seq(self) -> int:
+        return int(self.clock() // self.bucket_seconds)
+
+    def _advance(self, seq: int):
+        """현재 구간까지 윈도우 이동 - 만료된 구간 차감"""
+        if self._head_seq is not None and seq <= self._head_seq:
+            return
+
+        oldest_live = seq - self.num_buckets + 1
+        start = oldest_live if self._head_seq is None else max(self._head_seq + 1, oldest_live)
+        for new_seq in range(start, seq + 1):
+            bucket = self._buckets[new_seq % self.num_buckets]
+            if bucket.count:
+                self._count -= bucket.count
+                self._total -= bucket.total
+                for index, count in bucket.histogram.items():
+                    self._window_histogram[index] -= count
+            bucket.reset(new_seq)
+        self._head_seq = seq
+
+        while self._min_deque and self._min_deque[0][0] < oldest_live:
+            self._min_deque.popleft()
+        while self._max_deque and self._max_deque[0][0] < oldest_live:
+            self._max_deque.popleft()
+
+        if self._count == 0:
+            self._total = 0.0  # 부동소수 누적 오차 제거
+
+    def add(self, value: float):
+        """값 추가 - O(1) (단조 덱은 분할 상환 O(1))"""
+        seq = self._current_seq()
+        self._advance(seq)
+
+        bucket = self._buckets[seq % self.num_buckets]
+        bucket.count += 1
+        bucket.total += value
+        index = self.histogram.bin_index(value)
+        bucket.histogram[index] = bucket.histogram.get(index, 0) + 1
+        self._window_histogram[index] += 1
+
+        self._count += 1
+        self._total += value
+        self._last_value = value
+
+        while self._min_deque and self._min_deque[-1][1] >= value:
+            self._min_deque.pop()
+        if not self._min_deque or self._min_deque[-1][0] != seq:
+            self._min_deque.append((seq, value))
+
+        while self._max_deque and self._max_deque[-1][1] <= value:
+            self._max_deque.pop()
+        if not self._max_deque or self._max_deque[-1][0] != seq:
+            self._max_deque.append((seq, value))
+
+    @property
+    def count(self) -> int:
+        self._advance(self._current_seq())
+        return self._count
+
+    def percentiles(self, quantiles: Tuple[float, ...] = (0.5, 0.95, 0.99)) -> Dict[str, float]:
+        """근사 백분위수 (히스토그램 구간 수에 비례하는 고정 비용)"""
+        self._advance(self._current_seq())
+        if self._count == 0:
+            return {f"p{int(q * 100)}": 0.0 for q in quantiles}
+
+        cumulative = np.cumsum(self._window_histogram)
+        result = {}
+        for q in quantiles:
+            rank = max(1, int(math.ceil(q * self._count)))
+            index = int(np.searchsorted(cumulative, rank))
+            value = self.histogram.bin_value(index)
+            # 관측 범위를 벗어나지 않도록 보정
+            value = min(max(value, self._min_deque[0][1]), self._max_deque[0][1])
+            result[f"p{int(q * 100)}"] = value
+        return result
+
+    def snapshot(self, include_percentiles: bool = True) -> Dict[str, float]:
+        """윈도우 통계 조회"""
+        self._advance(self._current_seq())
+        if self._count == 0:
+            return {}
+
+        stats = {
+            "current": self._last_value,
+            "avg": self._total / self._count,
+            "min": self._min_deque[0][1],
+            "max": self._max_deque[0][1],
+            "sum": self._total,
+            "count": self._count
+        }
+        if include_percentiles:
+            stats.update(self.percentiles())
+        return stats
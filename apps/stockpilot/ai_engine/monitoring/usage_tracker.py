@@ -16,9 +16,19 @@ import numpy as np
 
 from ..config.model_policy import ModelTier
 from ..routing.model_router import ModelRequest, ModelResponse
+from .sliding_window import SlidingWindowMetric
 
 logger = logging.getLogger(__name__)
 
+# 롤업 집계 단위별 버킷 포맷 (SQLite strftime과 동일한 포맷 사용)
+ROLLUP_BUCKET_FORMATS = {
+    "minute": "%Y-%m-%d %H:%M:00",
+    "hour": "%Y-%m-%d %H:00:00",
+    "day": "%Y-%m-%d"
+}
+
+ROLLUP_DIMENSIONS = ("model_name", "model_tier", "task_type", "user_id")
+
 class MetricType(Enum):
     """메트릭 타입"""
     REQUEST_COUNT = "request_count"
@@ -80,6 +90,8 @@ class UsageDatabase:
     async def initialize(self):
         """데이터베이스 초기화"""
         async with aiosqlite.connect(self.db_path) as db:
+            # WAL 모드: 배치 쓰기 중에도 조회가 블로킹되지 않도록
+            await db.execute('PRAGMA journal_mode=WAL')
             await db.execute('''
                 CREATE TABLE IF NOT EXISTS usage_records (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -132,6 +144,28 @@ class UsageDatabase:
                 )
             ''')
             
+            # 분/시간/일 단위 사전 집계 테이블 (INSERT 시 증분 갱신)
+            await db.execute('''
+                CREATE TABLE IF NOT EXISTS usage_rollups (
+                    granularity TEXT NOT NULL,
+                    bucket_start TEXT NOT NULL,
+                    model_name TEXT NOT NULL,
+                    model_tier TEXT NOT NULL,
+                    task_type TEXT NOT NULL,
+                    user_id TEXT NOT NULL DEFAULT '',
+                    requests INTEGER NOT NULL DEFAULT 0,
+                    successes INTEGER NOT NULL DEFAULT 0,
+                    cache_hits INTEGER NOT NULL DEFAULT 0,
+                    input_tokens INTEGER NOT NULL DEFAULT 0,
+                    output_tokens INTEGER NOT NULL DEFAULT 0,
+                    total_tokens INTEGER NOT NULL DEFAULT 0,
+                    cost REAL NOT NULL DEFAULT 0,
+                    cached_cost REAL NOT NULL DEFAULT 0,
+                    response_time_ms_sum REAL NOT NULL DEFAULT 0,
+                    PRIMARY KEY (granularity, bucket_start, model_name, model_tier, task_type, user_id)
+                )
+            ''')
+            
             # 인덱스 생성
             await db.execute('CREATE INDEX IF NOT EXISTS idx_usage_timestamp ON usage_records(timestamp)')
             await db.execute('CREATE INDEX IF NOT EXISTS idx_usage_model ON usage_records(model_name)')
@@ -141,48 +175,233 @@ class UsageDatabase:
             await db.commit()
             logger.info("Usage database initialized")
     
+    @staticmethod
+    def _usage_record_row(record: ModelUsageRecord) -> Tuple:
+        """사용량 기록을 INSERT 파라미터로 변환"""
+        return (
+            record.request_id,
+            record.model_name,
+            record.model_tier.value,
+            record.task_type,
+            record.input_tokens,
+            record.output_tokens,
+            record.total_tokens,
+            record.cost,
+            record.response_time_ms,
+            record.timestamp,
+            record.success,
+            record.error_message,
+            record.cache_hit,
+            record.user_id,
+            json.dumps(record.metadata)
+        )
+    
+    @staticmethod
+    def _metric_row(metric: UsageMetric) -> Tuple:
+        """메트릭을 INSERT 파라미터로 변환"""
+        return (
+            metric.metric_type.value,
+            metric.value,
+            metric.unit,
+            metric.timestamp,
+            json.dumps(metric.dimensions),
+            json.dumps(metric.metadata)
+        )
+    
     async def save_usage_record(self, record: ModelUsageRecord):
         """사용량 기록 저장"""
         async with aiosqlite.connect(self.db_path) as db:
-            await db.execute('''
+            await self.write_batch(db, [record], [])
+    
+    async def save_metric(self, metric: UsageMetric):
+        """메트릭 저장"""
+        async with aiosqlite.connect(self.db_path) as db:
+            await self.write_batch(db, [], [metric])
+    
+    async def write_batch(
+        self,
+        db: aiosqlite.Connection,
+        records: List[ModelUsageRecord],
+        metrics: List[UsageMetric]
+    ):
+        """사용량 기록/메트릭 배치 저장 (단일 트랜잭션)"""
+        if records:
+            await db.executemany('''
                 INSERT INTO usage_records 
                 (request_id, model_name, model_tier, task_type, input_tokens, 
                  output_tokens, total_tokens, cost, response_time_ms, timestamp, 
                  success, error_message, cache_hit, user_id, metadata)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                record.request_id,
-                record.model_name,
-                record.model_tier.value,
-                record.task_type,
-                record.input_tokens,
-                record.output_tokens,
-                record.total_tokens,
-                record.cost,
-                record.response_time_ms,
-                record.timestamp,
-                record.success,
-                record.error_message,
-                record.cache_hit,
-                record.user_id,
-                json.dumps(record.metadata)
-            ))
+            ''', [self._usage_record_row(r) for r in records])
+        
+        if metrics:
+            await db.executemany('''
+                INSERT INTO metrics (metric_type, value, unit, timestamp, dimensions, metadata)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', [self._metric_row(m) for m in metrics])
+        
+        if records:
+            await self._upsert_rollups(db, records)
+        
+        await db.commit()
+    
+    @staticmethod
+    def _aggregate_rollups(records: List[ModelUsageRecord]) -> List[Tuple]:
+        """배치 내 기록을 롤업 키별로 미리 합산"""
+        buckets: Dict[Tuple, List[float]] = {}
+        for record in records:
+            dims = (record.model_name, record.model_tier.value, record.task_type, record.user_id or "")
+            for granularity, fmt in ROLLUP_BUCKET_FORMATS.items():
+                key = (granularity, record.timestamp.strftime(fmt)) + dims
+                acc = buckets.get(key)
+                if acc is None:
+                    acc = buckets[key] = [0, 0, 0, 0, 0, 0, 0.0, 0.0, 0.0]
+                acc[0] += 1
+                acc[1] += 1 if record.success else 0
+                acc[2] += 1 if record.cache_hit else 0
+                acc[3] += record.input_tokens
+                acc[4] += record.output_tokens
+                acc[5] += record.total_tokens
+                acc[6] += record.cost
+                acc[7] += record.cost if record.cache_hit else 0.0
+                acc[8] += record.response_time_ms
+        return [key + tuple(acc) for key, acc in buckets.items()]
+    
+    async def _upsert_rollups(self, db: aiosqlite.Connection, records: List[ModelUsageRecord]):
+        """롤업 테이블 증분 갱신"""
+        await db.executemany('''
+            INSERT INTO usage_rollups
+            (granularity, bucket_start, model_name, model_tier, task_type, user_id,
+             requests, successes, cache_hits, input_tokens, output_tokens, total_tokens,
+             cost, cached_cost, response_time_ms_sum)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (granularity, bucket_start, model_name, model_tier, task_type, user_id)
+            DO UPDATE SET
+                requests = requests + excluded.requests,
+                successes = successes + excluded.successes,
+                cache_hits = cache_hits + excluded.cache_hits,
+                input_tokens = input_tokens + excluded.input_tokens,
+                output_tokens = output_tokens + excluded.output_tokens,
+                total_tokens = total_tokens + excluded.total_tokens,
+                cost = cost + excluded.cost,
+                cached_cost = cached_cost + excluded.cached_cost,
+                response_time_ms_sum = response_time_ms_sum + excluded.response_time_ms_sum
+        ''', self._aggregate_rollups(records))
+    
+    async def rebuild_rollups(self) -> int:
+        """원본 기록으로부터 롤업 테이블 재구축 (백필)"""
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.execute('DELETE FROM usage_rollups')
+            for granularity, fmt in ROLLUP_BUCKET_FORMATS.items():
+                await db.execute(f'''
+                    INSERT INTO usage_rollups
+                    (granularity, bucket_start, model_name, model_tier, task_type, user_id,
+                     requests, successes, cache_hits, input_tokens, output_tokens, total_tokens,
+                     cost, cached_cost, response_time_ms_sum)
+                    SELECT ?, strftime('{fmt}', timestamp), model_name, model_tier, task_type,
+                           COALESCE(user_id, ''),
+                           COUNT(*), SUM(success), SUM(cache_hit), SUM(input_tokens),
+                           SUM(output_tokens), SUM(total_tokens), SUM(cost),
+                           SUM(CASE WHEN cache_hit THEN cost ELSE 0 END), SUM(response_time_ms)
+                    FROM usage_records
+                    GROUP BY 2, 3, 4, 5, 6
+                ''', (granularity,))
             await db.commit()
+            
+            async with db.execute('SELECT COUNT(*) FROM usage_rollups') as cursor:
+                row = await cursor.fetchone()
+        
+        logger.info(f"Rebuilt usage rollups: {row[0]} rows")
+        return row[0]
     
-    async def save_metric(self, metric: UsageMetric):
-        """메트릭 저장"""
+    async def get_rollups(
+        self,
+        granularity: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        group_by: Tuple[str, ...] = ()
+    ) -> List[Dict[str, Any]]:
+        """롤업 조회 - group_by 차원(및 bucket_start)별 합계 반환"""
+        if granularity not in ROLLUP_BUCKET_FORMATS:
+            raise ValueError(f"Unknown rollup granularity: {granularity}")
+        for column in group_by:
+            if column not in ROLLUP_DIMENSIONS + ("bucket_start",):
+                raise ValueError(f"Unknown rollup dimension: {column}")
+        
+        fmt = ROLLUP_BUCKET_FORMATS[granularity]
+        query_columns = ", ".join(group_by) + ", " if group_by else ""
+        query = f'''
+            SELECT {query_columns}
+                   COALESCE(SUM(requests), 0), COALESCE(SUM(successes), 0),
+                   COALESCE(SUM(cache_hits), 0), COALESCE(SUM(input_tokens), 0),
+                   COALESCE(SUM(output_tokens), 0), COALESCE(SUM(total_tokens), 0),
+                   COALESCE(SUM(cost), 0), COALESCE(SUM(cached_cost), 0),
+                   COALESCE(SUM(response_time_ms_sum), 0)
+            FROM usage_rollups
+            WHERE granularity = ?
+        '''
+        params: List[Any] = [granularity]
+        
+        if start:
+            query += " AND bucket_start >= ?"
+            params.append(start.strftime(fmt))
+        if end:
+            query += " AND bucket_start <= ?"
+            params.append(end.strftime(fmt))
+        if group_by:
+            query += f" GROUP BY {', '.join(group_by)} ORDER BY {', '.join(group_by)}"
+        
+        metric_names = (
+            "requests", "successes", "cache_hits", "input_tokens", "output_tokens",
+            "total_tokens", "cost", "cached_cost", "response_time_ms_sum"
+        )
+        rows = []
         async with aiosqlite.connect(self.db_path) as db:
-            await db.execute('''
-                INSERT INTO metrics (metric_type, value, unit, timestamp, dimensions, metadata)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
-                metric.metric_type.value,
-                metric.value,
-                metric.unit,
-                metric.timestamp,
-                json.dumps(metric.dimensions),
-                json.dumps(metric.metadata)
-            ))
+            async with db.execute(query, params) as cursor:
+                async for row in cursor:
+                    item = dict(zip(group_by, row[:len(group_by)]))
+                    item.update(zip(metric_names, row[len(group_by):]))
+                    rows.append(item)
+        
+        return rows
+    
+    async def get_top_cost_records(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """기간 내 비용 상위 요청 조회"""
+        query = '''
+            SELECT request_id, model_name, cost, total_tokens, timestamp
+            FROM usage_records
+            WHERE timestamp >= ? AND timestamp <= ?
+            ORDER BY cost DESC
+            LIMIT ?
+        '''
+        async with aiosqlite.connect(self.db_path) as db:
+            async with db.execute(query, (start_date, end_date, limit)) as cursor:
+                return [
+                    {
+                        "request_id": row[0],
+                        "model_name": row[1],
+                        "cost": row[2],
+                        "tokens": row[3],
+                        "timestamp": datetime.fromisoformat(row[4]).isoformat()
+                    }
+                    async for row in cursor
+                ]
+    
+    async def prune_rollups(self, minute_retention_days: int = 2, hour_retention_days: int = 90):
+        """오래된 분/시간 단위 롤업 정리 (일 단위는 유지)"""
+        now = datetime.now()
+        async with aiosqlite.connect(self.db_path) as db:
+            for granularity, days in (("minute", minute_retention_days), ("hour", hour_retention_days)):
+                cutoff = (now - timedelta(days=days)).strftime(ROLLUP_BUCKET_FORMATS[granularity])
+                await db.execute(
+                    'DELETE FROM usage_rollups WHERE granularity = ? AND bucket_start < ?',
+                    (granularity, cutoff)
+                )
             await db.commit()
     
     async def get_usage_records(
@@ -257,31 +476,212 @@ class UsageDatabase:
             ))
             await db.commit()
 
+class UsageWriteBuffer:
+    """사용량 쓰기 버퍼 - 기록을 큐에 모아 배치 단위로 저장 (write-behind)"""
+
+    def __init__(
+        self,
+        db: UsageDatabase,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_queue_size: int = 10000,
+        max_write_retries: int = 3
+    ):
+        self.db = db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_write_retries = max_write_retries  # 연속 저장 실패 허용 횟수 (초과 시 해당 배치 폐기)
+        self._failed_attempts = 0
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._batch_ready = asyncio.Event()
+        self._write_lock = asyncio.Lock()
+        self._connection: Optional[aiosqlite.Connection] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._closing = False
+
+        self.stats = {
+            "enqueued": 0,
+            "written": 0,
+            "batches": 0,
+            "requeued": 0,
+            "failed": 0,
+            "backpressure_waits": 0
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._writer_task is not None and not self._writer_task.done()
+
+    async def start(self):
+        """쓰기 태스크 시작"""
+        if self.running:
+            return
+        self._closing = False
+        self._connection = await aiosqlite.connect(self.db.db_path)
+        await self._connection.execute('PRAGMA journal_mode=WAL')
+        await self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._writer_task = asyncio.create_task(self._writer_loop())
+
+    async def put(self, item: Union[ModelUsageRecord, UsageMetric]):
+        """기록 추가 - 큐가 가득 찬 경우에만 대기 (백프레셔)"""
+        if not self.running:
+            # 버퍼 미가동 시 기존처럼 즉시 저장
+            if isinstance(item, ModelUsageRecord):
+                await self.db.save_usage_record(item)
+            else:
+                await self.db.save_metric(item)
+            return
+
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.stats["backpressure_waits"] += 1
+            self._batch_ready.set()
+            await self._queue.put(item)
+
+        self.stats["enqueued"] += 1
+        if self._queue.qsize() >= self.batch_size:
+            self._batch_ready.set()
+
+    async def flush(self):
+        """큐에 쌓인 기록을 모두 저장 (저장 실패 시 중단, 다음 주기에 재시도)"""
+        while not self._queue.empty():
+            if not await self._write_pending():
+                break
+        # 쓰기 태스크가 이미 꺼내 간 배치의 저장이 끝날 때까지 대기
+        async with self._write_lock:
+            pass
+
+    async def close(self):
+        """남은 기록을 저장하고 쓰기 태스크 종료"""
+        if self._writer_task is None:
+            return
+        self._closing = True
+        self._batch_ready.set()
+        await self._writer_task
+        self._writer_task = None
+
+        # 종료 시에는 재시도 한도까지 반복 (한도 초과 배치는 폐기되므로 반드시 끝남)
+        while not self._queue.empty():
+            await self._write_pending()
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """버퍼 통계"""
+        return {**self.stats, "queue_size": self._queue.qsize(), "running": self.running}
+
+    async def _writer_loop(self):
+        """크기 또는 시간 기준으로 배치 저장"""
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_ready.clear()
+
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Usage write buffer flush failed: {e}")
+
+    async def _write_pending(self) -> bool:
+        """큐에서 최대 batch_size 만큼 꺼내 한 트랜잭션으로 저장
+        
+        저장에 실패하면 꺼낸 기록을 큐에 되돌리고, 연속 실패가 max_write_retries를
+        넘으면 해당 배치를 폐기하고 건수를 기록합니다. 저장 성공 여부를 반환합니다.
+        """
+        async with self._write_lock:
+            records: List[ModelUsageRecord] = []
+            metrics: List[UsageMetric] = []
+            while len(records) + len(metrics) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if isinstance(item, ModelUsageRecord):
+                    records.append(item)
+                else:
+                    metrics.append(item)
+
+            if not records and not metrics:
+                return True
+
+            try:
+                if self._connection is not None:
+                    await self.db.write_batch(self._connection, records, metrics)
+                else:
+                    async with aiosqlite.connect(self.db.db_path) as db:
+                        await self.db.write_batch(db, records, metrics)
+            except Exception as e:
+                if self._connection is not None:
+                    # 일부만 실행된 트랜잭션이 다음 커밋에 섞이지 않도록 되돌림
+                    try:
+                        await self._connection.rollback()
+                    except Exception:
+                        pass
+                self._failed_attempts += 1
+                rows = records + metrics
+                if self._failed_attempts > self.max_write_retries:
+                    self._failed_attempts = 0
+                    self.stats["failed"] += len(rows)
+                    logger.error(f"Dropped usage batch after {self.max_write_retries} retries "
+                                 f"({len(rows)} rows lost): {e}")
+                    return False
+
+                # 큐에 되돌림 (그 사이 큐가 가득 찼다면 넘치는 기록만 폐기)
+                lost = 0
+                for item in rows:
+                    try:
+                        self._queue.put_nowait(item)
+                    except asyncio.QueueFull:
+                        lost += 1
+                self.stats["requeued"] += len(rows) - lost
+                self.stats["failed"] += lost
+                logger.warning(f"Failed to write usage batch ({len(rows)} rows, attempt "
+                               f"{self._failed_attempts}/{self.max_write_retries}), re-queued "
+                               f"{len(rows) - lost}, lost {lost}: {e}")
+                return False
+
+            self._failed_attempts = 0
+            self.stats["written"] += len(records) + len(metrics)
+            self.stats["batches"] += 1
+            return True
+
 class UsageTracker:
     """사용량 추적기"""
     
-    def __init__(self, db_path: Optional[str] = None):
+    def __init__(self, db_path: Optional[str] = None, write_buffer_size: int = 500):
         self.db = UsageDatabase(db_path or "usage_tracking.db")
+        self.write_buffer = UsageWriteBuffer(self.db, batch_size=write_buffer_size)
         self.real_time_metrics = defaultdict(deque)
-        self.metric_windows = {
-            MetricType.REQUEST_COUNT: deque(maxlen=1000),
-            MetricType.TOKEN_USAGE: deque(maxlen=1000),
-            MetricType.COST: deque(maxlen=1000),
-            MetricType.RESPONSE_TIME: deque(maxlen=1000),
-            MetricType.ERROR_RATE: deque(maxlen=1000)
+        # 1시간 슬라이딩 윈도우 (10초 구간 링 버퍼, 고정 메모리)
+        self.metric_windows: Dict[MetricType, SlidingWindowMetric] = {
+            metric_type: SlidingWindowMetric() for metric_type in MetricType
         }
+        self.model_latency_windows: Dict[str, SlidingWindowMetric] = defaultdict(SlidingWindowMetric)
         
         # 일일 집계용 임시 저장소
         self.daily_aggregator = defaultdict(list)
         self.last_summary_date = None
+        self._summary_task: Optional[asyncio.Task] = None
     
     async def initialize(self):
         """추적기 초기화"""
         await self.db.initialize()
+        await self.write_buffer.start()
         self.last_summary_date = date.today() - timedelta(days=1)
         
         # 백그라운드 태스크 시작
-        asyncio.create_task(self._periodic_summary_task())
+        self._summary_task = asyncio.create_task(self._periodic_summary_task())
+    
+    async def shutdown(self):
+        """추적기 종료 - 버퍼에 남은 기록 저장"""
+        if self._summary_task is not None:
+            self._summary_task.cancel()
+            self._summary_task = None
+        await self.write_buffer.close()
     
     async def track_model_usage(
         self,
@@ -313,8 +713,8 @@ class UsageTracker:
                 }
             )
             
-            # 데이터베이스에 저장
-            await self.db.save_usage_record(record)
+            # 쓰기 버퍼에 추가 (배치 저장)
+            await self.write_buffer.put(record)
             
             # 실시간 메트릭 업데이트
             await self._update_real_time_metrics(record)
@@ -353,7 +753,7 @@ class UsageTracker:
                 metadata={"content_type": request.content_type.value, "priority": request.priority}
             )
             
-            await self.db.save_usage_record(record)
+            await self.write_buffer.put(record)
             
             # 오류율 메트릭 업데이트
             await self._update_error_metrics(record)
@@ -381,36 +781,75 @@ class UsageTracker:
             metadata=metadata or {}
         )
         
-        await self.db.save_metric(metric)
+        await self.write_buffer.put(metric)
         
         # 실시간 메트릭에 추가
-        self.metric_windows[metric_type].append((datetime.now(), value))
+        self.metric_windows[metric_type].add(value)
     
     async def get_real_time_stats(self) -> Dict[str, Any]:
-        """실시간 통계 조회"""
+        """실시간 통계 조회 (최근 1시간, 누적값 기반 O(1))"""
         stats = {}
         
-        for metric_type, values in self.metric_windows.items():
-            if values:
-                recent_values = [v for t, v in values if (datetime.now() - t).total_seconds() < 3600]
-                
-                if recent_values:
-                    stats[metric_type.value] = {
-                        "current": recent_values[-1] if recent_values else 0,
-                        "avg_1h": np.mean(recent_values),
-                        "min_1h": np.min(recent_values),
-                        "max_1h": np.max(recent_values),
-                        "count_1h": len(recent_values)
-                    }
+        for metric_type, window in self.metric_windows.items():
+            snapshot = window.snapshot(include_percentiles=metric_type == MetricType.RESPONSE_TIME)
+            if snapshot:
+                stats[metric_type.value] = {
+                    "current": snapshot["current"],
+                    "avg_1h": snapshot["avg"],
+                    "min_1h": snapshot["min"],
+                    "max_1h": snapshot["max"],
+                    "count_1h": snapshot["count"]
+                }
+                if metric_type == MetricType.RESPONSE_TIME:
+                    stats[metric_type.value].update(
+                        p50_1h=snapshot["p50"], p95_1h=snapshot["p95"], p99_1h=snapshot["p99"]
+                    )
+        
+        # 모델별 응답 시간 백분위수
+        model_latency = {}
+        for model_name, window in self.model_latency_windows.items():
+            snapshot = window.snapshot()
+            if snapshot:
+                model_latency[model_name] = {
+                    "count_1h": snapshot["count"],
+                    "avg_1h": snapshot["avg"],
+                    "p50_1h": snapshot["p50"],
+                    "p95_1h": snapshot["p95"],
+                    "p99_1h": snapshot["p99"]
+                }
+        if model_latency:
+            stats["model_latency"] = model_latency
         
         return stats
     
+    async def get_rollups(
+        self,
+        granularity: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        group_by: Tuple[str, ...] = ()
+    ) -> List[Dict[str, Any]]:
+        """롤업 조회 (버퍼에 쌓인 기록을 먼저 저장)"""
+        await self.write_buffer.flush()
+        return await self.db.get_rollups(granularity, start, end, group_by)
+    
+    async def get_usage_records(
+        self,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        model_name: Optional[str] = None,
+        limit: int = 1000
+    ) -> List[ModelUsageRecord]:
+        """사용량 기록 조회 (버퍼에 쌓인 기록을 먼저 저장)"""
+        await self.write_buffer.flush()
+        return await self.db.get_usage_records(start_date, end_date, model_name, limit)
+    
     async def get_usage_summary(
         self,
         start_date: Optional[date] = None,
         end_date: Optional[date] = None
     ) -> Dict[str, Any]:
-        """사용량 요약 조회"""
+        """사용량 요약 조회 (일/시간 단위 롤업 기반)"""
         if start_date is None:
             start_date = date.today() - timedelta(days=7)
         if end_date is None:
@@ -419,13 +858,11 @@ class UsageTracker:
         start_datetime = datetime.combine(start_date, datetime.min.time())
         end_datetime = datetime.combine(end_date, datetime.max.time())
         
-        records = await self.db.get_usage_records(
-            start_date=start_datetime,
-            end_date=end_datetime,
-            limit=10000
-        )
+        await self.write_buffer.flush()
+        totals = (await self.db.get_rollups("day", start_datetime, end_datetime))[0]
+        total_requests = totals["requests"]
         
-        if not records:
+        if not total_requests:
             return {
                 "period": f"{start_date} to {end_date}",
                 "total_requests": 0,
@@ -433,114 +870,95 @@ class UsageTracker:
                 "total_tokens": 0
             }
         
-        # 집계 계산
-        total_requests = len(records)
-        total_cost = sum(r.cost for r in records)
-        total_tokens = sum(r.total_tokens for r in records)
-        successful_requests = sum(1 for r in records if r.success)
-        cached_requests = sum(1 for r in records if r.cache_hit)
+        total_cost = totals["cost"]
+        total_tokens = totals["total_tokens"]
         
         # 모델별 집계
-        model_stats = defaultdict(lambda: {"requests": 0, "cost": 0.0, "tokens": 0})
-        for record in records:
-            model_stats[record.model_name]["requests"] += 1
-            model_stats[record.model_name]["cost"] += record.cost
-            model_stats[record.model_name]["tokens"] += record.total_tokens
+        model_stats = {
+            row["model_name"]: {"requests": row["requests"], "cost": row["cost"], "tokens": row["total_tokens"]}
+            for row in await self.db.get_rollups("day", start_datetime, end_datetime, ("model_name",))
+        }
         
         # 태스크 타입별 집계
-        task_stats = defaultdict(int)
-        for record in records:
-            task_stats[record.task_type] += 1
+        task_stats = {
+            row["task_type"]: row["requests"]
+            for row in await self.db.get_rollups("day", start_datetime, end_datetime, ("task_type",))
+        }
         
         # 시간대별 집계
         hourly_stats = defaultdict(int)
-        for record in records:
-            hour = record.timestamp.hour
-            hourly_stats[hour] += 1
+        for row in await self.db.get_rollups("hour", start_datetime, end_datetime, ("bucket_start",)):
+            hourly_stats[int(row["bucket_start"][11:13])] += row["requests"]
         
         return {
             "period": f"{start_date} to {end_date}",
             "total_requests": total_requests,
             "total_cost": total_cost,
             "total_tokens": total_tokens,
-            "success_rate": successful_requests / total_requests if total_requests > 0 else 0,
-            "cache_hit_rate": cached_requests / total_requests if total_requests > 0 else 0,
-            "avg_cost_per_request": total_cost / total_requests if total_requests > 0 else 0,
-            "avg_tokens_per_request": total_tokens / total_requests if total_requests > 0 else 0,
-            "model_breakdown": dict(model_stats),
-            "task_type_breakdown": dict(task_stats),
+            "success_rate": totals["successes"] / total_requests,
+            "cache_hit_rate": totals["cache_hits"] / total_requests,
+            "avg_cost_per_request": total_cost / total_requests,
+            "avg_tokens_per_request": total_tokens / total_requests,
+            "model_breakdown": model_stats,
+            "task_type_breakdown": task_stats,
             "hourly_distribution": dict(hourly_stats)
         }
     
     async def get_cost_analysis(self, days: int = 30) -> Dict[str, Any]:
-        """비용 분석 조회"""
+        """비용 분석 조회 (일 단위 롤업 기반)"""
         end_date = date.today()
         start_date = end_date - timedelta(days=days)
+        start_datetime = datetime.combine(start_date, datetime.min.time())
+        end_datetime = datetime.combine(end_date, datetime.max.time())
         
-        records = await self.db.get_usage_records(
-            start_date=datetime.combine(start_date, datetime.min.time()),
-            end_date=datetime.combine(end_date, datetime.max.time()),
-            limit=50000
-        )
+        await self.write_buffer.flush()
+        daily_rows = await self.db.get_rollups("day", start_datetime, end_datetime, ("bucket_start",))
         
-        if not records:
+        if not daily_rows:
             return {"period": f"Last {days} days", "total_cost": 0.0}
         
         # 일별 비용 추이
-        daily_costs = defaultdict(float)
-        for record in records:
-            record_date = record.timestamp.date()
-            daily_costs[record_date] += record.cost
+        daily_costs = {date.fromisoformat(row["bucket_start"]): row["cost"] for row in daily_rows}
         
         # 모델 티어별 비용
-        tier_costs = defaultdict(float)
-        for record in records:
-            tier_costs[record.model_tier.value] += record.cost
+        tier_costs = {
+            row["model_tier"]: row["cost"]
+            for row in await self.db.get_rollups("day", start_datetime, end_datetime, ("model_tier",))
+        }
         
         # 가장 비싼 요청들
-        expensive_requests = sorted(records, key=lambda r: r.cost, reverse=True)[:10]
+        expensive_requests = await self.db.get_top_cost_records(start_datetime, end_datetime, limit=10)
         
-        total_cost = sum(r.cost for r in records)
+        total_cost = sum(daily_costs.values())
         
         return {
             "period": f"Last {days} days",
             "total_cost": total_cost,
             "daily_average": total_cost / days,
-            "daily_costs": dict(daily_costs),
-            "tier_breakdown": dict(tier_costs),
-            "expensive_requests": [
-                {
-                    "request_id": r.request_id,
-                    "model_name": r.model_name,
-                    "cost": r.cost,
-                    "tokens": r.total_tokens,
-                    "timestamp": r.timestamp.isoformat()
-                }
-                for r in expensive_requests
-            ],
+            "daily_costs": daily_costs,
+            "tier_breakdown": tier_costs,
+            "expensive_requests": expensive_requests,
             "cost_trends": self._calculate_cost_trends(daily_costs, days)
         }
     
     async def _update_real_time_metrics(self, record: ModelUsageRecord):
         """실시간 메트릭 업데이트"""
-        now = datetime.now()
-        
         # 요청 수 메트릭
-        self.metric_windows[MetricType.REQUEST_COUNT].append((now, 1))
+        self.metric_windows[MetricType.REQUEST_COUNT].add(1)
         
         # 토큰 사용량 메트릭
-        self.metric_windows[MetricType.TOKEN_USAGE].append((now, record.total_tokens))
+        self.metric_windows[MetricType.TOKEN_USAGE].add(record.total_tokens)
         
         # 비용 메트릭
-        self.metric_windows[MetricType.COST].append((now, record.cost))
+        self.metric_windows[MetricType.COST].add(record.cost)
         
-        # 응답 시간 메트릭
-        self.metric_windows[MetricType.RESPONSE_TIME].append((now, record.response_time_ms))
+        # 응답 시간 메트릭 (전체 + 모델별)
+        self.metric_windows[MetricType.RESPONSE_TIME].add(record.response_time_ms)
+        self.model_latency_windows[record.model_name].add(record.response_time_ms)
     
     async def _update_error_metrics(self, record: ModelUsageRecord):
         """오류 메트릭 업데이트"""
-        now = datetime.now()
-        self.metric_windows[MetricType.ERROR_RATE].append((now, 1))
+        self.metric_windows[MetricType.ERROR_RATE].add(1)
     
     def _calculate_cost_trends(self, daily_costs: Dict[date, float], days: int) -> Dict[str, Any]:
         """비용 트렌드 계산"""
@@ -585,6 +1003,8 @@ class UsageTracker:
                     await self._generate_daily_summary(yesterday)
                     self.last_summary_date = yesterday
                 
+                await self.db.prune_rollups()
+                
             except Exception as e:
                 logger.error(f"Periodic summary task failed: {e}")
     
@@ -594,6 +1014,7 @@ class UsageTracker:
             start_datetime = datetime.combine(target_date, datetime.min.time())
             end_datetime = datetime.combine(target_date, datetime.max.time())
             
+            await self.write_buffer.flush()
             records = await self.db.get_usage_records(
                 start_date=start_datetime,
                 end_date=end_datetime,
@@ -663,6 +1084,12 @@ async def initialize_usage_tracking(db_path: Optional[str] = None):
     usage_tracker = UsageTracker(db_path)
     await usage_tracker.initialize()
     logger.info("Usage tracking system initialized")
+    return usage_tracker
+
+async def shutdown_usage_tracking():
+    """사용량 추적 시스템 종료 (버퍼 플러시)"""
+    await usage_tracker.shutdown()
+    logger.info("Usage tracking system shut down")
 
 async def track_model_request(
     request: ModelRequest,
@@ -693,4 +1120,22 @@ async def get_real_time_metrics() -> Dict[str, Any]:
 
 async def get_cost_analysis_report(days: int = 30) -> Dict[str, Any]:
     """비용 분석 리포트 조회"""
-    return await usage_tracker.get_cost_analysis(days)
\ No newline at end of file
+    return await usage_tracker.get_cost_analysis(days)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="사용량 추적 DB 관리")
+    parser.add_argument("--db", default="usage_tracking.db", help="사용량 DB 경로")
+    parser.add_argument("--rebuild-rollups", action="store_true", help="원본 기록으로 롤업 테이블 재구축")
+    args = parser.parse_args()
+
+    if args.rebuild_rollups:
+        async def _rebuild():
+            database = UsageDatabase(args.db)
+            await database.initialize()
+            return await database.rebuild_rollups()
+
+        print(f"Rebuilt {asyncio.run(_rebuild())} rollup rows in {args.db}")
+    else:
+        parser.print_help()
@@ -17,7 +17,7 @@ from openai import AsyncOpenAI
 from ..config.model_policy import ModelTier, TaskComplexity, ContentType, model_policy
 from ..rag.context_builder import ContextBuilder
 from ..rag.retriever import SearchQuery, DocumentRetriever
-from ..routing.model_router import ModelRouter
+from ..routing.model_router import ModelRequest, SmartModelRouter
 
 logger = logging.getLogger(__name__)
 
@@ -69,7 +69,7 @@ class AnalysisResult:
 class SentimentAnalyzer:
     """감성 분석기"""
     
-    def __init__(self, model_router: ModelRouter):
+    def __init__(self, model_router: SmartModelRouter):
         self.model_router = model_router
         
     async def analyze_sentiment(
@@ -139,19 +139,16 @@ class SentimentAnalyzer:
 }}
 """
             
-            # 모델 선택 및 분석 실행
-            model_tier = model_policy.get_model_for_task(
-                "sentiment_analysis",
-                TaskComplexity.MODERATE,
-                ContentType.NEWS_ANALYSIS
-            )
-            
-            response = await self.model_router.route_request(
-                prompt=sentiment_prompt,
-                model_tier=model_tier,
+            # 모델 선택 및 분석 실행 (라우터가 모델 선택, 지연/성공 여부를 로드밸런서에 보고)
+            response = await self.model_router.complete(ModelRequest(
+                task_id=f"sentiment_{symbol}_{datetime.now().strftime('%Y%m%d%H%M%S')}",
+                task_type="sentiment_analysis",
+                content=sentiment_prompt,
+                content_type=ContentType.NEWS_ANALYSIS,
+                complexity=TaskComplexity.MODERATE,
                 temperature=0.3,
                 max_tokens=1000
-            )
+            ))
             
             # 응답 파싱
             try:
@@ -318,7 +315,7 @@ class SentimentAnalyzer:
 class TechnicalAnalyzer:
     """기술적 분석기"""
     
-    def __init__(self, model_router: ModelRouter):
+    def __init__(self, model_router: SmartModelRouter):
         self.model_router = model_router
     
     async def analyze_technical(
@@ -390,19 +387,16 @@ class TechnicalAnalyzer:
 }}
 """
             
-            # AI 분석 실행
-            model_tier = model_policy.get_model_for_task(
-                "technical_analysis",
-                TaskComplexity.COMPLEX,
-                ContentType.TECHNICAL_ANALYSIS
-            )
-            
-            response = await self.model_router.route_request(
-                prompt=analysis_prompt,
-                model_tier=model_tier,
+            # AI 분석 실행 (라우터가 모델 선택, 지연/성공 여부를 로드밸런서에 보고)
+            response = await self.model_router.complete(ModelRequest(
+                task_id=f"technical_{symbol}_{datetime.now().strftime('%Y%m%d%H%M%S')}",
+                task_type="technical_analysis",
+                content=analysis_prompt,
+                content_type=ContentType.TECHNICAL_ANALYSIS,
+                complexity=TaskComplexity.COMPLEX,
                 temperature=0.2,
                 max_tokens=1500
-            )
+            ))
             
             # 결과 파싱
             try:
@@ -678,7 +672,7 @@ class AnalysisEngine:
     
     def __init__(
         self,
-        model_router: ModelRouter,
+        model_router: SmartModelRouter,
         document_retriever: DocumentRetriever,
         context_builder: ContextBuilder
     ):
@@ -0,0 +1,284 @@
+"""
+문서 중복 제거 모듈 - 임베딩 전에 동일/유사 문서를 걸러 비용과 인덱스 크기 절감
+정규화 텍스트 해시(완전 중복)와 MinHash + LSH 밴딩(유사 중복)을 최근 윈도우 범위에서 적용
+"""
+
+import hashlib
+import logging
+import re
+import time
+import unicodedata
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_NON_WORD_PATTERN = re.compile(r'[^\w가-힣]+')
+
+
+def normalize_text(text: str) -> str:
+    """비교용 텍스트 정규화 (유니코드 정규화, 소문자, 구두점/공백 통일)"""
+    text = unicodedata.normalize("NFKC", text).lower()
+    return _NON_WORD_PATTERN.sub(' ', text).strip()
+
+
+def content_hash(normalized_text: str) -> str:
+    """정규화 텍스트의 완전 일치 해시"""
+    return hashlib.sha1(normalized_text.encode("utf-8")).hexdigest()
+
+
+def _mix64(values: np.ndarray) -> np.ndarray:
+    """splitmix64 비트 혼합 (벡터화)"""
+    with np.errstate(over="ignore"):
+        z = values + np.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return z ^ (z >> np.uint64(31))
+
+
+def shingle_hashes(normalized_text: str, shingle_size: int = 4) -> np.ndarray:
+    """문자 n-gram 해시 집합 (벡터화 다항 해시)"""
+    codepoints = np.frombuffer(normalized_text.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    if len(codepoints) == 0:
+        return np.zeros(0, dtype=np.uint64)
+    shingle_size = min(shingle_size, len(codepoints))
+
+    # uint64 오버플로는 mod 2^64로 동작
+    count = len(codepoints) - shingle_size + 1
+    shingles = np.zeros(count, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for offset in range(shingle_size):
+            shingles = shingles * np.uint64(1000003) + codepoints[offset:offset + count]
+    return np.unique(_mix64(shingles))
+
+
+def minhash_signature(hashes: np.ndarray, seeds: np.ndarray) -> np.ndarray:
+    """MinHash 서명 (시드별 해시 순열의 최솟값)"""
+    if len(hashes) == 0:
+        return np.zeros(len(seeds), dtype=np.uint64)
+    return _mix64(hashes[None, :] ^ seeds[:, None]).min(axis=1)
+
+
+@dataclass
+class DuplicateMatch:
+    """중복 판정 결과"""
+    canonical_id: str
+    match_type: str      # 'exact', 'near'
+    similarity: float = 1.0  # 추정 Jaccard 유사도
+
+
+@dataclass
+class _Fingerprint:
+    """윈도우에 보관된 대표 문서 지문"""
+    doc_id: str
+    exact_hash: str
+    signature: Optional[np.ndarray]
+    metadata: Dict[str, Any]
+    added_at: float
+    merged: Dict[str, int] = field(default_factory=dict)  # 병합된 중복 수 (판정 유형별)
+
+
+class DocumentDeduplicator:
+    """최근 윈도우 내 완전/유사 중복 문서 탐지기
+
+    - 완전 중복: 정규화 텍스트 해시 일치
+    - 유사 중복: 문자 n-gram MinHash 서명을 밴드로 나눠 버킷팅 (LSH) 후
+      서명 일치율(추정 Jaccard)이 similarity_threshold 이상인 후보만 중복 판정
+    중복 문서는 대표 문서 메타데이터의 'duplicates' 항목으로 병합된다.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float = 86400.0,
+        max_entries: int = 50000,
+        num_perm: int = 128,
+        num_bands: int = 32,
+        similarity_threshold: float = 0.7,
+        near_duplicate_types: Optional[Set[str]] = None,
+        min_near_duplicate_length: int = 100,
+        max_merged_duplicates: int = 50,
+        clock: Callable[[], float] = time.time
+    ):
+        if num_perm % num_bands != 0:
+            raise ValueError("num_perm은 num_bands의 배수여야 합니다")
+
+        self.window_seconds = window_seconds
+        self.max_entries = max_entries
+        self.num_bands = num_bands
+        self.rows_per_band = num_perm // num_bands
+        self.similarity_threshold = similarity_threshold
+        self._seeds = _mix64(np.arange(1, num_perm + 1, dtype=np.uint64))
+        self.near_duplicate_types = near_duplicate_types or {"news", "social_media"}
+        self.min_near_duplicate_length = min_near_duplicate_length
+        self.max_merged_duplicates = max_merged_duplicates
+        self.clock = clock
+
+        # 삽입 순서 = 시간 순서이므로 앞쪽부터 만료
+        self._entries: "OrderedDict[str, _Fingerprint]" = OrderedDict()
+        self._exact_index: Dict[str, str] = {}
+        self._band_index: Dict[Tuple[int, bytes], Set[str]] = defaultdict(set)
+
+        self.stats = {
+            'checked': 0,
+            'exact_duplicates': 0,
+            'near_duplicates': 0,
+            'evicted': 0,
+            'forgotten': 0,
+            'discarded_duplicates': 0
+        }
+
+    def _bands(self, signature: np.ndarray) -> List[Tuple[int, bytes]]:
+        rows = self.rows_per_band
+        return [
+            (band, signature[band * rows:(band + 1) * rows].tobytes())
+            for band in range(self.num_bands)
+        ]
+
+    def _evict_expired(self):
+        """윈도우/용량 초과 항목 제거"""
+        cutoff = self.clock() - self.window_seconds
+        while self._entries:
+            doc_id, entry = next(iter(self._entries.items()))
+            if entry.added_at >= cutoff and len(self._entries) <= self.max_entries:
+                break
+            self._remove(doc_id)
+            self.stats['evicted'] += 1
+
+    def _remove(self, doc_id: str) -> _Fingerprint:
+        """대표 문서 지문과 해시/밴드 인덱스 항목 제거"""
+        entry = self._entries.pop(doc_id)
+        if self._exact_index.get(entry.exact_hash) == doc_id:
+            del self._exact_index[entry.exact_hash]
+        if entry.signature is not None:
+            for key in self._bands(entry.signature):
+                bucket = self._band_index.get(key)
+                if bucket is not None:
+                    bucket.discard(doc_id)
+                    if not bucket:
+                        del self._band_index[key]
+        return entry
+
+    def _find_near_duplicate(self, signature: np.ndarray, doc_id: str) -> Optional[DuplicateMatch]:
+        candidates: Set[str] = set()
+        for key in self._bands(signature):
+            candidates.update(self._band_index.get(key, ()))
+        candidates.discard(doc_id)  # 같은 ID의 이전 버전은 중복이 아니라 교체 대상
+
+        best: Optional[DuplicateMatch] = None
+        for candidate_id in candidates:
+            similarity = float(np.mean(self._entries[candidate_id].signature == signature))
+            if similarity >= self.similarity_threshold and (best is None or similarity > best.similarity):
+                best = DuplicateMatch(candidate_id, "near", similarity)
+        return best
+
+    def _merge_duplicate(
+        self,
+        match: DuplicateMatch,
+        doc_id: str,
+        source_id: Optional[str],
+        metadata: Optional[Dict[str, Any]]
+    ):
+        """중복 문서 정보를 대표 문서 메타데이터에 병합"""
+        canonical = self._entries[match.canonical_id]
+        canonical.merged[match.match_type] = canonical.merged.get(match.match_type, 0) + 1
+        canonical_metadata = canonical.metadata
+        canonical_metadata['duplicate_count'] = canonical_metadata.get('duplicate_count', 0) + 1
+
+        duplicates = canonical_metadata.setdefault('duplicates', [])
+        if len(duplicates) < self.max_merged_duplicates:
+            duplicates.append({
+                'doc_id': doc_id,
+                'source_id': source_id,
+                'match_type': match.match_type,
+                'similarity': round(match.similarity, 3),
+                'url': (metadata or {}).get('url')
+            })
+
+        sources = canonical_metadata.setdefault('duplicate_sources', [])
+        if source_id and source_id not in sources:
+            sources.append(source_id)
+
+    def check(
+        self,
+        doc_id: str,
+        text: str,
+        document_type: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        source_id: Optional[str] = None
+    ) -> Optional[DuplicateMatch]:
+        """중복 여부 확인. 새 문서는 대표 문서로 등록하고 None 반환
+
+        metadata는 대표 문서로 등록될 때 참조로 보관되며, 이후 중복 정보가 여기에 병합된다.
+        """
+        self._evict_expired()
+        self.stats['checked'] += 1
+
+        normalized = normalize_text(text)
+        exact_hash = content_hash(normalized)
+
+        canonical_id = self._exact_index.get(exact_hash)
+        if canonical_id == doc_id:
+            # 같은 문서의 재수집 - 자기 자신과의 중복이 아니므로 지문만 갱신
+            self._entries[doc_id].added_at = self.clock()
+            self._entries.move_to_end(doc_id)
+            return None
+        match = DuplicateMatch(canonical_id, "exact") if canonical_id else None
+
+        signature = None
+        if (
+            match is None
+            and document_type in self.near_duplicate_types
+            and len(normalized) >= self.min_near_duplicate_length
+        ):
+            signature = minhash_signature(shingle_hashes(normalized), self._seeds)
+            match = self._find_near_duplicate(signature, doc_id)
+
+        if match is not None:
+            self.stats[f'{match.match_type}_duplicates'] += 1
+            self._merge_duplicate(match, doc_id, source_id, metadata)
+            return match
+
+        if doc_id in self._entries:
+            # 같은 ID로 내용이 바뀐 문서 - 이전 지문 교체
+            self._remove(doc_id)
+
+        self._entries[doc_id] = _Fingerprint(
+            doc_id=doc_id,
+            exact_hash=exact_hash,
+            signature=signature,
+            metadata=metadata if metadata is not None else {},
+            added_at=self.clock()
+        )
+        self._exact_index[exact_hash] = doc_id
+        if signature is not None:
+            for key in self._bands(signature):
+                self._band_index[key].add(doc_id)
+        return None
+
+    def forget(self, doc_id: str) -> bool:
+        """대표 문서 등록 취소 (임베딩/인덱싱에 실패한 문서용)
+
+        이후 같은 내용이 다시 들어오면 새 대표 문서로 등록된다. 이 문서에 병합된 중복은
+        임베딩을 절감한 것이 아니라 유실된 것이므로 'discarded_duplicates'로 옮긴다.
+        """
+        if doc_id not in self._entries:
+            return False
+        entry = self._remove(doc_id)
+        for match_type, count in entry.merged.items():
+            self.stats[f'{match_type}_duplicates'] -= count
+            self.stats['discarded_duplicates'] += count
+        self.stats['forgotten'] += 1
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """중복 제거 통계 (절감된 임베딩 호출 수 포함)"""
+        duplicates = self.stats['exact_duplicates'] + self.stats['near_duplicates']
+        return {
+            **self.stats,
+            'embeddings_saved': duplicates,
+            'duplicate_rate': duplicates / self.stats['checked'] if self.stats['checked'] else 0.0,
+            'window_size': len(self._entries)
+        }
@@ -2,12 +2,16 @@
 데이터 수집 및 전처리 모듈
 다양한 소스에서 데이터를 수집하고 AI 분석을 위한 형태로 전처리
 실시간 스트리밍, 배치 처리, 데이터 검증 및 정규화 기능 포함
+단계별 크기 제한 큐(fetch → clean → embed → index)로 백프레셔 적용
 """
 
 import asyncio
 import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Any, Union, AsyncGenerator
+from typing import List, Dict, Optional, Any, Union, AsyncGenerator, Awaitable, Callable
 from dataclasses import dataclass, asdict
 from abc import ABC, abstractmethod
 import json
@@ -15,6 +19,8 @@ from pathlib import Path
 
 from ..rag.indexer import IndexedDocument
 from ..rag.embedder import TextEmbedder, EmbeddingRequest
+from ..monitoring.sliding_window import SlidingWindowMetric
+from .dedup import DocumentDeduplicator
 
 logger = logging.getLogger(__name__)
 
@@ -443,12 +449,90 @@ class DataProcessor:
             return [data_type]
 
 
+# 프로세스 풀 워커별 전처리기 (워커 초기화 시 생성)
+_worker_processor: Optional[DataProcessor] = None
+
+
+def _init_worker_processor(quality_rules: Dict[str, Any]):
+    """프로세스 풀 워커 초기화"""
+    global _worker_processor
+    _worker_processor = DataProcessor()
+    _worker_processor.quality_rules = quality_rules
+
+
+def _process_raw_chunk(raw_chunk: List[RawDataPoint]) -> List[Optional[ProcessedDocument]]:
+    """프로세스 풀 워커에서 원시 데이터 묶음 전처리"""
+    processor = _worker_processor or DataProcessor()
+    return [processor.process_raw_data(raw_data) for raw_data in raw_chunk]
+
+
+class StageMetrics:
+    """파이프라인 단계별 처리량/지연 통계 (최근 윈도우 기준)"""
+
+    def __init__(
+        self,
+        name: str,
+        queue: Optional[asyncio.Queue],
+        concurrency: int,
+        window_seconds: float = 60.0
+    ):
+        self.name = name
+        self.queue = queue
+        self.concurrency = concurrency
+        self.window_seconds = window_seconds
+        self.processed = 0
+        self.failed = 0
+        self.in_flight = 0
+        self.completed_window = SlidingWindowMetric(window_seconds=window_seconds, bucket_seconds=1)
+        self.lag_window = SlidingWindowMetric(window_seconds=window_seconds, bucket_seconds=1)
+
+    def record_dequeue(self, enqueued_at: float):
+        """큐 대기 시간(지연) 기록"""
+        self.lag_window.add((time.monotonic() - enqueued_at) * 1000)
+
+    def record_completed(self, count: int):
+        """처리 완료 건수 기록"""
+        self.processed += count
+        self.completed_window.add(count)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """단계 통계 조회"""
+        completed = self.completed_window.snapshot(include_percentiles=False)
+        lag = self.lag_window.snapshot()
+        return {
+            "concurrency": self.concurrency,
+            "processed": self.processed,
+            "failed": self.failed,
+            "in_flight": self.in_flight,
+            "queue_size": self.queue.qsize() if self.queue is not None else 0,
+            "queue_capacity": self.queue.maxsize if self.queue is not None else 0,
+            "throughput_per_sec": completed.get("sum", 0) / self.window_seconds,
+            "lag_ms_avg": lag.get("avg", 0.0),
+            "lag_ms_p95": lag.get("p95", 0.0)
+        }
+
+
 class DataIngestionPipeline:
-    """데이터 수집 파이프라인 메인 클래스"""
-    
-    def __init__(self, embedder: TextEmbedder):
+    """데이터 수집 파이프라인 메인 클래스
+
+    fetch → clean → embed → index 단계를 크기 제한 큐로 연결한다.
+    하류 단계가 밀리면 큐가 가득 차 상류 단계가 대기하므로 메모리 사용량이 고정된다.
+    clean 단계 끝에서 중복 문서를 걸러 임베딩 호출을 줄인다.
+    """
+
+    DEFAULT_STAGE_CONCURRENCY = {"clean": 2, "embed": 4, "index": 1}
+
+    def __init__(
+        self,
+        embedder: TextEmbedder,
+        max_queue_size: int = 1000,
+        stage_concurrency: Optional[Dict[str, int]] = None,
+        use_process_pool: bool = True,
+        deduplicator: Optional[DocumentDeduplicator] = None
+    ):
         self.embedder = embedder
         self.processor = DataProcessor()
+        self.deduplicator = deduplicator or DocumentDeduplicator()
         
         # 데이터 소스 관리
         self.data_sources: Dict[str, DataSource] = {}
@@ -457,12 +541,31 @@ class DataIngestionPipeline:
         # 파이프라인 상태
         self.is_running = False
         self.batch_size = 50
-        self.processing_queue = asyncio.Queue()
+        self.clean_chunk_size = 20
+        self.embed_batch_size = 16
+        self.stage_concurrency = {**self.DEFAULT_STAGE_CONCURRENCY, **(stage_concurrency or {})}
+        self.use_process_pool = use_process_pool
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._embed_semaphore = asyncio.Semaphore(getattr(embedder, "max_concurrent", 10))
+        self._tasks: List[asyncio.Task] = []
+        
+        # 단계별 크기 제한 큐 (항목: (enqueue 시각, 데이터))
+        self.processing_queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self.embed_queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self.index_queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        
+        self.stage_metrics: Dict[str, StageMetrics] = {
+            "fetch": StageMetrics("fetch", None, 0),
+            "clean": StageMetrics("clean", self.processing_queue, self.stage_concurrency["clean"]),
+            "embed": StageMetrics("embed", self.embed_queue, self.stage_concurrency["embed"]),
+            "index": StageMetrics("index", self.index_queue, self.stage_concurrency["index"])
+        }
         
         # 통계 정보
         self.stats = {
             'processed_documents': 0,
             'failed_documents': 0,
+            'duplicate_documents': 0,
             'start_time': None,
             'last_batch_time': None
         }
@@ -489,12 +592,27 @@ class DataIngestionPipeline:
             logger.error(f"데이터 소스 등록 실패: {str(e)}")
             return False
     
+    def _start_process_pool(self):
+        """전처리용 프로세스 풀 생성 (실패시 스레드 실행으로 대체)"""
+        if not self.use_process_pool or self._executor is not None:
+            return
+        try:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.stage_concurrency["clean"],
+                initializer=_init_worker_processor,
+                initargs=(self.processor.quality_rules,)
+            )
+        except Exception as e:
+            logger.warning(f"프로세스 풀 생성 실패, 스레드에서 전처리: {str(e)}")
+            self._executor = None
+    
     async def start_pipeline(self):
         """파이프라인 시작"""
         try:
             logger.info("데이터 수집 파이프라인 시작")
             self.is_running = True
             self.stats['start_time'] = datetime.utcnow()
+            self._start_process_pool()
             
             # 모든 커넥터 연결
             for source_id, connector in self.connectors.items():
@@ -502,15 +620,27 @@ class DataIngestionPipeline:
                 if not success:
                     logger.error(f"커넥터 연결 실패: {source_id}")
             
-            # 배치 처리와 스트림 처리를 동시 실행
+            # 수집/스트림 처리와 단계별 워커를 동시 실행
             tasks = [
                 asyncio.create_task(self._run_batch_processing()),
-                asyncio.create_task(self._run_stream_processing()),
-                asyncio.create_task(self._run_document_processing())
+                asyncio.create_task(self._run_stream_processing())
             ]
+            stage_workers = {
+                "clean": (self.processing_queue, self.clean_chunk_size, self._handle_clean_batch),
+                "embed": (self.embed_queue, self.embed_batch_size, self._handle_embed_batch),
+                "index": (self.index_queue, self.batch_size, self._handle_index_batch)
+            }
+            for stage_name, (queue, max_items, handler) in stage_workers.items():
+                for _ in range(self.stage_concurrency[stage_name]):
+                    tasks.append(asyncio.create_task(
+                        self._run_stage_worker(stage_name, queue, max_items, handler)
+                    ))
+            self._tasks = tasks
             
             await asyncio.gather(*tasks)
             
+        except asyncio.CancelledError:
+            pass
         except Exception as e:
             logger.error(f"파이프라인 시작 실패: {str(e)}")
             self.is_running = False
@@ -521,43 +651,81 @@ class DataIngestionPipeline:
             logger.info("데이터 수집 파이프라인 중지")
             self.is_running = False
             
+            # 대기 중인 수집/스트림 태스크 정리
+            for task in self._tasks:
+                if not task.done():
+                    task.cancel()
+            self._tasks = []
+            
             # 모든 커넥터 연결 해제
             for connector in self.connectors.values():
                 await connector.disconnect()
+            
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
                 
         except Exception as e:
             logger.error(f"파이프라인 중지 실패: {str(e)}")
     
+    async def wait_until_drained(self):
+        """큐에 들어간 모든 항목이 인덱스 단계까지 처리될 때까지 대기"""
+        await self.processing_queue.join()
+        await self.embed_queue.join()
+        await self.index_queue.join()
+    
+    async def _enqueue_raw(self, data_point: RawDataPoint):
+        """전처리 큐에 추가 (가득 차면 대기)"""
+        await self.processing_queue.put((time.monotonic(), data_point))
+    
     async def _run_batch_processing(self):
-        """배치 처리 실행"""
+        """소스별 수집 태스크 실행 (각 소스의 refresh_interval 주기로 동시 수집)"""
+        fetchers = [
+            asyncio.create_task(self._run_source_fetcher(source_id))
+            for source_id in self.data_sources
+            if source_id in self.connectors
+        ]
+        self.stage_metrics["fetch"].concurrency = len(fetchers)
+        try:
+            if fetchers:
+                await asyncio.gather(*fetchers)
+        finally:
+            for fetcher in fetchers:
+                fetcher.cancel()
+    
+    async def _run_source_fetcher(self, source_id: str):
+        """개별 소스 주기 수집"""
+        source = self.data_sources[source_id]
+        connector = self.connectors[source_id]
+        stage = self.stage_metrics["fetch"]
+        
         while self.is_running:
             try:
-                for source_id, source in self.data_sources.items():
-                    if not source.is_active:
-                        continue
-                    
-                    connector = self.connectors.get(source_id)
-                    if not connector:
-                        continue
-                    
+                if source.is_active:
                     # 마지막 업데이트 이후 데이터 가져오기
                     params = self._build_fetch_params(source)
-                    raw_data_points = await connector.fetch_data(params)
+                    stage.in_flight += 1
+                    try:
+                        raw_data_points = await connector.fetch_data(params)
+                    finally:
+                        stage.in_flight -= 1
                     
-                    # 처리 큐에 추가
+                    # 처리 큐에 추가 (하류가 밀리면 여기서 대기)
                     for data_point in raw_data_points:
-                        await self.processing_queue.put(data_point)
+                        await self._enqueue_raw(data_point)
+                    stage.record_completed(len(raw_data_points))
                     
                     # 소스 업데이트 시간 갱신
                     source.last_updated = datetime.utcnow()
+                    self.stats['last_batch_time'] = source.last_updated
                 
-                self.stats['last_batch_time'] = datetime.utcnow()
-                
-                # 배치 간격 대기
-                await asyncio.sleep(60)  # 1분 간격
+                await asyncio.sleep(source.refresh_interval)
                 
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
-                logger.error(f"배치 처리 오류: {str(e)}")
+                logger.error(f"배치 처리 오류 ({source_id}): {str(e)}")
+                stage.failed += 1
                 await asyncio.sleep(10)  # 오류시 10초 대기
     
     async def _run_stream_processing(self):
@@ -581,6 +749,8 @@ class DataIngestionPipeline:
                 else:
                     await asyncio.sleep(5)
                     
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 logger.error(f"스트림 처리 오류: {str(e)}")
                 await asyncio.sleep(5)
@@ -592,88 +762,181 @@ class DataIngestionPipeline:
                 if not self.is_running:
                     break
                     
-                await self.processing_queue.put(data_point)
+                await self._enqueue_raw(data_point)
+                self.stage_metrics["fetch"].record_completed(1)
                 
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             logger.error(f"스트림 처리 오류: {str(e)}")
     
-    async def _run_document_processing(self):
-        """문서 처리 실행"""
+    async def _collect_batch(
+        self,
+        queue: asyncio.Queue,
+        max_items: int,
+        stage: StageMetrics,
+        timeout: float = 1.0
+    ) -> List[Any]:
+        """큐에서 최대 max_items개 수집 (첫 항목만 timeout까지 대기)"""
+        try:
+            enqueued_at, item = await asyncio.wait_for(queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return []
+        
+        stage.record_dequeue(enqueued_at)
+        items = [item]
+        while len(items) < max_items:
+            try:
+                enqueued_at, item = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            stage.record_dequeue(enqueued_at)
+            items.append(item)
+        return items
+    
+    async def _run_stage_worker(
+        self,
+        stage_name: str,
+        queue: asyncio.Queue,
+        max_items: int,
+        handler: Callable[[List[Any]], Awaitable[None]]
+    ):
+        """단계 워커 - 큐에서 묶음을 꺼내 처리 후 다음 단계 큐로 전달"""
+        stage = self.stage_metrics[stage_name]
+        
         while self.is_running:
+            batch = await self._collect_batch(queue, max_items, stage)
+            if not batch:
+                continue
+            
+            stage.in_flight += len(batch)
             try:
-                # 배치 단위로 문서 처리
-                batch = []
-                
-                # 큐에서 데이터 수집
-                try:
-                    while len(batch) < self.batch_size:
-                        data_point = await asyncio.wait_for(
-                            self.processing_queue.get(), 
-                            timeout=5.0
-                        )
-                        batch.append(data_point)
-                except asyncio.TimeoutError:
-                    # 타임아웃시 현재 배치 처리
-                    pass
-                
-                if not batch:
-                    continue
-                
-                # 배치 처리
-                await self._process_batch(batch)
-                
+                await handler(batch)
+                stage.record_completed(len(batch))
             except Exception as e:
-                logger.error(f"문서 처리 오류: {str(e)}")
-                await asyncio.sleep(1)
+                logger.error(f"{stage_name} 단계 처리 오류: {str(e)}")
+                stage.failed += len(batch)
+                self.stats['failed_documents'] += len(batch)
+            finally:
+                stage.in_flight -= len(batch)
+                for _ in batch:
+                    queue.task_done()
+    
+    async def _handle_clean_batch(self, raw_data_batch: List[RawDataPoint]):
+        """전처리 단계: 중복을 제외한 문서를 임베딩 큐로 전달"""
+        processed_docs = await self._clean_batch(raw_data_batch)
+        self.stage_metrics["clean"].failed += sum(1 for doc in processed_docs if doc is None)
+        for doc in self._deduplicate(processed_docs):
+            await self.embed_queue.put((time.monotonic(), doc))
+    
+    async def _handle_embed_batch(self, processed_docs: List[ProcessedDocument]):
+        """임베딩 단계: 인덱싱 문서를 인덱스 큐로 전달"""
+        indexed_docs = await self._embed_documents(processed_docs)
+        self.stage_metrics["embed"].failed += len(processed_docs) - len(indexed_docs)
+        for indexed_doc in indexed_docs:
+            await self.index_queue.put((time.monotonic(), indexed_doc))
+    
+    async def _handle_index_batch(self, indexed_docs: List[IndexedDocument]):
+        """인덱스 단계"""
+        await self._add_to_index(indexed_docs)
+        self.stats['processed_documents'] += len(indexed_docs)
+    
+    async def _clean_batch(self, raw_data_batch: List[RawDataPoint]) -> List[Optional[ProcessedDocument]]:
+        """원시 데이터 전처리 (CPU 작업이므로 이벤트 루프 밖에서 실행)"""
+        if self._executor is not None:
+            loop = asyncio.get_running_loop()
+            try:
+                processed_docs = await loop.run_in_executor(
+                    self._executor, _process_raw_chunk, raw_data_batch
+                )
+            except BrokenProcessPool as e:
+                logger.warning(f"프로세스 풀 중단, 스레드에서 전처리: {str(e)}")
+                self._executor = None
+            else:
+                failed = sum(1 for doc in processed_docs if doc is None)
+                self.stats['failed_documents'] += failed
+                return processed_docs
+        
+        processed_docs = await asyncio.to_thread(
+            lambda: [self.processor.process_raw_data(raw_data) for raw_data in raw_data_batch]
+        )
+        self.stats['failed_documents'] += sum(1 for doc in processed_docs if doc is None)
+        return processed_docs
+    
+    def _deduplicate(self, processed_docs: List[Optional[ProcessedDocument]]) -> List[ProcessedDocument]:
+        """중복 문서 제외 (중복 정보는 대표 문서 메타데이터에 병합)"""
+        unique_docs = []
+        for doc in processed_docs:
+            if doc is None:
+                continue
+            match = self.deduplicator.check(
+                doc.doc_id,
+                f"{doc.title}\n\n{doc.content}",
+                doc.document_type,
+                metadata=doc.metadata,
+                source_id=doc.source_id
+            )
+            if match is None:
+                unique_docs.append(doc)
+            else:
+                self.stats['duplicate_documents'] += 1
+                logger.debug(f"중복 문서 제외: {doc.doc_id} → {match.canonical_id} ({match.match_type})")
+        return unique_docs
+    
+    def _build_embedding_request(self, doc: ProcessedDocument) -> EmbeddingRequest:
+        """문서 임베딩 요청 생성"""
+        return EmbeddingRequest(
+            text=f"{doc.title}\n\n{doc.content}",
+            document_type=doc.document_type,
+            metadata=doc.metadata,
+            priority=self._calculate_embedding_priority(doc)
+        )
+    
+    async def _embed_documents(self, processed_docs: List[ProcessedDocument]) -> List[IndexedDocument]:
+        """문서별 임베딩 생성 후 IndexedDocument 변환 (실패 문서 제외)"""
+        async def embed(doc: ProcessedDocument):
+            async with self._embed_semaphore:
+                return await self.embedder.embed_text(self._build_embedding_request(doc))
+        
+        # 문서와 결과의 순서를 유지하기 위해 문서별로 요청
+        embedding_results = await asyncio.gather(
+            *(embed(doc) for doc in processed_docs), return_exceptions=True
+        )
+        
+        indexed_docs = []
+        for doc, embed_result in zip(processed_docs, embedding_results):
+            if isinstance(embed_result, BaseException) or embed_result is None:
+                self.stats['failed_documents'] += 1
+                # 인덱싱되지 않은 문서가 이후 사본의 대표 문서로 남지 않도록 등록 취소
+                self.deduplicator.forget(doc.doc_id)
+                continue
+            indexed_docs.append(IndexedDocument(
+                doc_id=doc.doc_id,
+                content=doc.content,
+                embedding=embed_result.embedding,
+                document_type=doc.document_type,
+                metadata=doc.metadata,
+                created_at=datetime.utcnow(),
+                updated_at=datetime.utcnow()
+            ))
+        return indexed_docs
     
     async def _process_batch(self, raw_data_batch: List[RawDataPoint]):
-        """배치 단위 문서 처리"""
+        """배치 단위 문서 처리 (큐를 거치지 않는 동기 경로)"""
         try:
             logger.info(f"배치 처리 시작: {len(raw_data_batch)}개 데이터")
             
-            # 1. 전처리
-            processed_docs = []
-            for raw_data in raw_data_batch:
-                processed_doc = self.processor.process_raw_data(raw_data)
-                if processed_doc:
-                    processed_docs.append(processed_doc)
-                else:
-                    self.stats['failed_documents'] += 1
+            # 1. 전처리 및 중복 제거
+            processed_docs = self._deduplicate(await self._clean_batch(raw_data_batch))
             
             if not processed_docs:
                 logger.warning("처리된 문서가 없음")
                 return
             
-            # 2. 임베딩 생성
-            embed_requests = []
-            for doc in processed_docs:
-                request = EmbeddingRequest(
-                    text=f"{doc.title}\n\n{doc.content}",
-                    document_type=doc.document_type,
-                    metadata=doc.metadata,
-                    priority=self._calculate_embedding_priority(doc)
-                )
-                embed_requests.append(request)
-            
-            # 배치 임베딩 생성
-            embedding_results = await self.embedder.embed_batch(embed_requests)
-            
-            # 3. IndexedDocument 생성
-            indexed_docs = []
-            for doc, embed_result in zip(processed_docs, embedding_results):
-                if embed_result:
-                    indexed_doc = IndexedDocument(
-                        doc_id=doc.doc_id,
-                        content=doc.content,
-                        embedding=embed_result.embedding,
-                        document_type=doc.document_type,
-                        metadata=doc.metadata,
-                        created_at=datetime.utcnow(),
-                        updated_at=datetime.utcnow()
-                    )
-                    indexed_docs.append(indexed_doc)
-            
-            # 4. 인덱스 추가 (별도 함수에서 처리)
+            # 2. 임베딩 생성 및 IndexedDocument 변환
+            indexed_docs = await self._embed_documents(processed_docs)
+            
+            # 3. 인덱스 추가 (별도 함수에서 처리)
             await self._add_to_index(indexed_docs)
             
             # 통계 업데이트
@@ -748,6 +1011,7 @@ class DataIngestionPipeline:
             "is_running": self.is_running,
             "processed_documents": self.stats['processed_documents'],
             "failed_documents": self.stats['failed_documents'],
+            "duplicate_documents": self.stats['duplicate_documents'],
             "success_rate": (
                 self.stats['processed_documents'] / 
                 (self.stats['processed_documents'] + self.stats['failed_documents'])
@@ -755,6 +1019,9 @@ class DataIngestionPipeline:
             ),
             "runtime_seconds": runtime,
             "queue_size": self.processing_queue.qsize(),
+            "stages": {name: stage.snapshot() for name, stage in self.stage_metrics.items()},
+            "process_pool": self._executor is not None,
+            "dedup": self.deduplicator.get_stats(),
             "data_sources": len(self.data_sources),
             "active_sources": sum(1 for s in self.data_sources.values() if s.is_active),
             "last_batch_time": self.stats['last_batch_time'].isoformat() if self.stats['last_batch_time'] else None
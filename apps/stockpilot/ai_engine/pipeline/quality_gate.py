@@ -1,19 +1,21 @@
 """
 품질 관문 모듈 - AI 분석 및 신호의 품질을 검증하고 관리
+대량 신호/가격 시계열은 열 단위 배열로 일괄(벡터화) 검증
 """
 
 import logging
+import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple, Union
 from dataclasses import dataclass, field
 from enum import Enum
 import asyncio
 import numpy as np
-from collections import defaultdict, Counter
+from collections import defaultdict, Counter, deque
 import json
 
 from ..config.model_policy import TaskComplexity, ContentType
-from .analysis_module import AnalysisResult, SentimentResult, TechnicalResult
+from .analysis_module import AnalysisResult
 from .signal_module import TradingSignal, SignalStrength, PortfolioSignal
 
 logger = logging.getLogger(__name__)
@@ -53,6 +55,105 @@ class QualityReport:
     processing_time_ms: float
     metadata: Dict[str, Any] = field(default_factory=dict)
 
+@dataclass
+class SignalBatch:
+    """열 단위 신호 배치 (유니버스 단위 일괄 검증용)
+
+    수치 열의 결측값은 NaN, 시각은 epoch 초로 표현한다.
+    """
+    symbols: np.ndarray          # (n,) 종목 코드
+    actions: np.ndarray          # (n,) 'BUY', 'SELL', 'HOLD' ...
+    strength_scores: np.ndarray  # (n,) 0.0 - 1.0
+    confidences: np.ndarray      # (n,) 0.0 - 1.0
+    entry_prices: np.ndarray
+    target_prices: np.ndarray
+    stop_losses: np.ndarray
+    position_sizes: np.ndarray
+    created_at: np.ndarray
+    expires_at: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    @classmethod
+    def from_signals(cls, signals: List[TradingSignal]) -> "SignalBatch":
+        """TradingSignal 목록을 열 단위 배치로 변환"""
+        def column(values) -> np.ndarray:
+            return np.array([np.nan if v is None else float(v) for v in values], dtype=float)
+
+        def epoch(values) -> np.ndarray:
+            return column(v.timestamp() if v else None for v in values)
+
+        return cls(
+            symbols=np.array([s.symbol for s in signals], dtype=str),
+            actions=np.array([s.signal_type.value.upper() for s in signals], dtype=str),
+            # WEAK(1)=0.4 ... VERY_STRONG(4) 이상=1.0
+            strength_scores=np.minimum(1.0, 0.2 + 0.2 * column(s.strength.value for s in signals)),
+            confidences=column(s.confidence for s in signals),
+            entry_prices=column(s.entry_price for s in signals),
+            target_prices=column(s.target_price for s in signals),
+            stop_losses=column(s.stop_loss for s in signals),
+            position_sizes=column(s.position_size for s in signals),
+            created_at=epoch(s.created_at for s in signals),
+            expires_at=epoch(s.expires_at for s in signals)
+        )
+
+@dataclass
+class PriceSeriesBatch:
+    """열 단위 가격 시계열 배치 - (종목 수, 봉 수) 2차원 배열, 결측값은 NaN"""
+    symbols: np.ndarray
+    opens: np.ndarray
+    highs: np.ndarray
+    lows: np.ndarray
+    closes: np.ndarray
+    volumes: np.ndarray
+    timestamps: np.ndarray       # epoch 초
+
+@dataclass
+class BatchValidationResult:
+    """일괄 검증 결과 - 상세 메시지는 통과하지 못한 항목만 생성"""
+    scores: np.ndarray
+    statuses: np.ndarray         # ValidationResult 값 문자열
+    components: Dict[str, np.ndarray]
+    failures: Dict[int, List[str]]
+    processing_time_ms: float
+    symbols: Optional[np.ndarray] = None
+
+    @property
+    def passed(self) -> np.ndarray:
+        return self.statuses == ValidationResult.PASS.value
+
+    def summary(self) -> Dict[str, Any]:
+        """상태별 건수와 평균 점수"""
+        values, counts = np.unique(self.statuses, return_counts=True)
+        return {
+            "total": len(self.scores),
+            "average_score": float(self.scores.mean()) if len(self.scores) else 0.0,
+            "status_counts": {str(v): int(c) for v, c in zip(values, counts)},
+            "processing_time_ms": self.processing_time_ms
+        }
+
+def _statuses(scores: np.ndarray, threshold: float, invalid: np.ndarray) -> np.ndarray:
+    """점수/유효성으로 상태 배열 생성"""
+    return np.where(
+        invalid, ValidationResult.FAIL.value,
+        np.where(scores >= threshold, ValidationResult.PASS.value, ValidationResult.WARNING.value)
+    )
+
+def _row_quantiles(values: np.ndarray, quantiles: List[float]) -> np.ndarray:
+    """행별 NaN 제외 분위수 (선형 보간) - np.nanpercentile의 행 단위 루프 없이 정렬 1회로 계산"""
+    sorted_values = np.sort(values, axis=1)  # NaN은 뒤로 정렬됨
+    counts = np.isfinite(values).sum(axis=1)
+    last = np.maximum(counts - 1, 0)[:, None]
+    positions = last * np.asarray(quantiles, dtype=float)[None, :]
+    lower = np.floor(positions).astype(int)
+    upper = np.minimum(lower + 1, last)
+    low_values = np.take_along_axis(sorted_values, lower, axis=1)
+    high_values = np.take_along_axis(sorted_values, upper, axis=1)
+    result = low_values + (high_values - low_values) * (positions - lower)
+    result[counts == 0] = np.nan
+    return result.T
+
 class DataQualityValidator:
     """데이터 품질 검증기"""
     
@@ -107,6 +208,100 @@ class DataQualityValidator:
             status=ValidationResult.PASS if overall_score >= 0.8 else ValidationResult.WARNING
         )
     
+    def validate_price_batch(
+        self,
+        batch: PriceSeriesBatch,
+        max_staleness_seconds: float = 3 * 86400,
+        gap_factor: float = 3.0,
+        now: Optional[float] = None
+    ) -> BatchValidationResult:
+        """가격 시계열 일괄 검증 (완전성, 범위/OHLC 정합성, 이상치, 공백, 최신성)"""
+        start = time.perf_counter()
+        now = time.time() if now is None else now
+        fields = np.stack([batch.opens, batch.highs, batch.lows, batch.closes, batch.volumes])
+        bar_count = batch.closes.shape[1]
+
+        # 완전성: 5개 필드가 모두 있는 봉 비율
+        complete = np.isfinite(fields).all(axis=0)
+        valid_records = complete.sum(axis=1)
+        completeness = valid_records / max(1, bar_count)
+
+        # 범위/OHLC 정합성: 양수 가격, 음수 아닌 거래량, low <= open/close <= high
+        with np.errstate(invalid="ignore"):
+            consistent = (
+                (batch.lows > 0)
+                & (batch.volumes >= 0)
+                & (batch.highs >= np.fmax(batch.opens, batch.closes))
+                & (batch.lows <= np.fmin(batch.opens, batch.closes))
+            )
+        inconsistent_bars = (complete & ~consistent).sum(axis=1)
+
+        # 이상치: 종가 IQR 밖 비율 (유효 종가 6개 이상인 종목만)
+        finite_closes = np.isfinite(batch.closes)
+        close_counts = finite_closes.sum(axis=1)
+        outlier_score = np.ones(len(batch.symbols))
+        has_enough = close_counts > 5
+        if has_enough.any():
+            closes = batch.closes[has_enough]
+            q1, q3 = _row_quantiles(closes, [0.25, 0.75])
+            iqr = (q3 - q1)[:, None]
+            with np.errstate(invalid="ignore"):
+                outliers = ((closes < q1[:, None] - 1.5 * iqr) | (closes > q3[:, None] + 1.5 * iqr)).sum(axis=1)
+            outlier_score[has_enough] = 1.0 - outliers / close_counts[has_enough]
+
+        # 공백: 봉 간격이 중앙값의 gap_factor배를 넘는 구간 수
+        gaps = np.zeros(len(batch.symbols), dtype=int)
+        if bar_count > 2:
+            deltas = np.diff(batch.timestamps, axis=1)
+            median_delta = _row_quantiles(deltas, [0.5])[0][:, None]
+            with np.errstate(invalid="ignore"):
+                gaps = (deltas > median_delta * gap_factor).sum(axis=1)
+
+        # 최신성: 마지막 타임스탬프 기준
+        last_timestamp = np.nanmax(np.where(np.isfinite(batch.timestamps), batch.timestamps, -np.inf), axis=1)
+        stale = (now - last_timestamp) > max_staleness_seconds
+
+        scores = completeness * 0.7 + outlier_score * 0.3
+        invalid = (valid_records == 0) | stale
+        statuses = _statuses(scores, 0.8, invalid)
+        statuses = np.where(
+            (statuses == ValidationResult.PASS.value) & ((inconsistent_bars > 0) | (gaps > 0)),
+            ValidationResult.WARNING.value, statuses
+        )
+
+        # 통과하지 못한 종목만 메시지 생성
+        failures: Dict[int, List[str]] = {}
+        for i in np.flatnonzero(statuses != ValidationResult.PASS.value):
+            messages = []
+            if valid_records[i] == 0:
+                messages.append("가격 데이터 없음")
+            elif completeness[i] < 1.0:
+                messages.append(f"결측 봉 {bar_count - valid_records[i]}개 (완전성 {completeness[i]:.2f})")
+            if stale[i]:
+                messages.append("가격 데이터 갱신 지연")
+            if inconsistent_bars[i]:
+                messages.append(f"OHLC 정합성 오류 {inconsistent_bars[i]}개")
+            if outlier_score[i] < 1.0:
+                messages.append(f"종가 이상치 비율 {1.0 - outlier_score[i]:.2f}")
+            if gaps[i]:
+                messages.append(f"시계열 공백 {gaps[i]}개")
+            failures[int(i)] = messages
+
+        return BatchValidationResult(
+            scores=scores,
+            statuses=statuses,
+            components={
+                "completeness": completeness,
+                "outlier_score": outlier_score,
+                "inconsistent_bars": inconsistent_bars,
+                "gaps": gaps,
+                "stale": stale
+            },
+            failures=failures,
+            processing_time_ms=(time.perf_counter() - start) * 1000,
+            symbols=batch.symbols
+        )
+    
     def validate_news_data(self, news_data: List[Dict]) -> QualityMetric:
         """뉴스 데이터 품질 검증"""
         if not news_data:
@@ -152,7 +347,7 @@ class DataQualityValidator:
 class AnalysisQualityValidator:
     """분석 품질 검증기"""
     
-    def validate_sentiment_analysis(self, sentiment_result: SentimentResult) -> QualityMetric:
+    def validate_sentiment_analysis(self, sentiment_result: Any) -> QualityMetric:
         """감정 분석 품질 검증"""
         score = sentiment_result.confidence
         
@@ -176,7 +371,7 @@ class AnalysisQualityValidator:
             status=status
         )
     
-    def validate_technical_analysis(self, technical_result: TechnicalResult) -> QualityMetric:
+    def validate_technical_analysis(self, technical_result: Any) -> QualityMetric:
         """기술적 분석 품질 검증"""
         indicators = technical_result.indicators
         
@@ -216,6 +411,125 @@ class SignalQualityValidator:
     
     def __init__(self):
         self.signal_history = defaultdict(list)
+        self.recent_actions: Dict[str, deque] = defaultdict(lambda: deque(maxlen=5))
+        self.action_consistency: Dict[str, float] = {}  # 종목별 최근 액션 일관성 점수 캐시
+    
+    def validate_signal_batch(
+        self,
+        batch: SignalBatch,
+        threshold: float = 0.8,
+        max_age_seconds: float = 86400,
+        now: Optional[float] = None
+    ) -> BatchValidationResult:
+        """거래 신호 일괄 검증 - validate_trading_signal과 같은 점수 구성을 배열 연산으로 계산"""
+        start = time.perf_counter()
+        now = time.time() if now is None else now
+        is_buy = batch.actions == "BUY"
+        is_sell = batch.actions == "SELL"
+        entry, target, stop = batch.entry_prices, batch.target_prices, batch.stop_losses
+
+        with np.errstate(invalid="ignore"):
+            # 범위 검사
+            bad_confidence = ~((batch.confidences >= 0) & (batch.confidences <= 1))
+            bad_price = (entry <= 0) | (target <= 0) | (stop <= 0)
+            bad_stop = (is_buy & (stop >= entry)) | (is_sell & (stop <= entry))
+
+            # 목표가 논리
+            has_prices = np.isfinite(target) & np.isfinite(entry)
+            wrong_target = has_prices & ((is_buy & (target <= entry)) | (is_sell & (target >= entry)))
+            price_logic = np.where(wrong_target, 0.3, 1.0)
+
+            # 위험 관리 요소
+            no_stop = ~(stop > 0)
+            no_position = ~(batch.position_sizes > 0)
+            risk_mgmt = np.clip(1.0 - 0.3 * no_stop - 0.2 * no_position, 0.0, 1.0)
+
+            # 최신성
+            stale = ((now - batch.created_at) > max_age_seconds) | (batch.expires_at <= now)
+
+        consistency, conflicting = self._batch_consistency(batch)
+        confidences = np.nan_to_num(batch.confidences, nan=0.0)
+
+        scores = np.mean(
+            [batch.strength_scores, confidences, price_logic, risk_mgmt, consistency], axis=0
+        )
+        scores = np.where(stale, scores * 0.5, scores)
+        invalid = bad_confidence | bad_price | bad_stop
+        statuses = _statuses(scores, threshold, invalid)
+
+        # 통과하지 못한 신호만 메시지 생성
+        failures: Dict[int, List[str]] = {}
+        for i in np.flatnonzero(statuses != ValidationResult.PASS.value):
+            messages = []
+            if bad_confidence[i]:
+                messages.append("신뢰도가 0-1 범위를 벗어남")
+            if bad_price[i]:
+                messages.append("가격 값이 0 이하")
+            if bad_stop[i]:
+                messages.append("손절가가 진입가 기준 반대 방향")
+            if wrong_target[i]:
+                messages.append("목표가가 신호 방향과 불일치")
+            if no_stop[i]:
+                messages.append("손절가 설정 권장")
+            if no_position[i]:
+                messages.append("포지션 사이즈 조정 필요")
+            if confidences[i] < 0.7:
+                messages.append("신호 신뢰도 낮음 - 추가 분석 권장")
+            if stale[i]:
+                messages.append("신호가 오래되었거나 만료됨")
+            if conflicting[i]:
+                messages.append("같은 종목에 상충하는 신호 존재")
+            if not messages:
+                messages.append("신호 품질 향상 필요")
+            failures[int(i)] = messages
+
+        return BatchValidationResult(
+            scores=scores,
+            statuses=statuses,
+            components={
+                "strength_score": batch.strength_scores,
+                "confidence_score": confidences,
+                "price_logic_score": price_logic,
+                "risk_mgmt_score": risk_mgmt,
+                "consistency_score": consistency,
+                "stale": stale
+            },
+            failures=failures,
+            processing_time_ms=(time.perf_counter() - start) * 1000,
+            symbols=batch.symbols
+        )
+    
+    def _batch_consistency(self, batch: SignalBatch) -> Tuple[np.ndarray, np.ndarray]:
+        """배치 내 상충 신호와 최근 액션 이력 기반 일관성 점수"""
+        n = len(batch)
+        if n == 0:
+            return np.zeros(0), np.zeros(0, dtype=bool)
+
+        unique_symbols, symbol_codes = np.unique(batch.symbols, return_inverse=True)
+        unique_actions, action_codes = np.unique(batch.actions, return_inverse=True)
+
+        # 종목별 서로 다른 액션 수
+        pairs = np.unique(symbol_codes * len(unique_actions) + action_codes)
+        distinct_actions = np.bincount(pairs // len(unique_actions), minlength=len(unique_symbols))
+        conflicting = distinct_actions[symbol_codes] > 1
+
+        # 이력 점수는 기록 시점에 계산해 두고 여기서는 조회만
+        cached = self.action_consistency
+        symbol_scores = np.array([cached.get(symbol, 0.8) for symbol in unique_symbols.tolist()])
+
+        consistency = symbol_scores[symbol_codes]
+        consistency = np.where(conflicting, np.minimum(consistency, 0.5), consistency)
+        return consistency, conflicting
+    
+    def record_batch(self, batch: SignalBatch):
+        """배치 신호를 종목별 최근 액션 이력에 추가"""
+        for symbol, action in zip(batch.symbols.tolist(), batch.actions.tolist()):
+            actions = self.recent_actions[symbol]
+            actions.append(action)
+            if len(actions) >= 2:
+                # _check_signal_consistency와 같은 규칙
+                changes = sum(1 for a, b in zip(actions, list(actions)[1:]) if a != b)
+                self.action_consistency[symbol] = max(0.5, 1.0 - min(0.3, changes * 0.1))
     
     def validate_trading_signal(self, signal: TradingSignal) -> QualityMetric:
         """거래 신호 품질 검증"""
@@ -450,21 +764,31 @@ class QualityGate:
         start_time = datetime.now()
         
         try:
-            metrics = []
-            
-            # 개별 신호들 검증
-            individual_scores = []
-            for signal in portfolio_signal.signals:
-                signal_metric = self.signal_validator.validate_trading_signal(signal)
-                metrics.append(signal_metric)
-                individual_scores.append(signal_metric.score)
+            # 개별 신호들 일괄 검증 (통과하지 못한 신호만 상세 메트릭 생성)
+            batch = SignalBatch.from_signals(portfolio_signal.signals)
+            batch_result = self.signal_validator.validate_signal_batch(batch)
+            individual_scores = batch_result.scores
+            metrics = [
+                QualityMetric(
+                    name="trading_signal_quality",
+                    score=float(batch_result.scores[i]),
+                    threshold=0.8,
+                    details={
+                        "symbol": str(batch.symbols[i]),
+                        "issues": messages,
+                        **{name: float(values[i]) for name, values in batch_result.components.items()}
+                    },
+                    status=ValidationResult(batch_result.statuses[i])
+                )
+                for i, messages in batch_result.failures.items()
+            ]
             
             # 포트폴리오 수준 검증
             portfolio_metrics = self._validate_portfolio_level(portfolio_signal)
             metrics.extend(portfolio_metrics)
             
             # 전체 점수 계산
-            individual_avg = np.mean(individual_scores) if individual_scores else 0.0
+            individual_avg = float(np.mean(individual_scores)) if len(individual_scores) else 0.0
             portfolio_avg = np.mean([m.score for m in portfolio_metrics])
             
             overall_score = individual_avg * 0.7 + portfolio_avg * 0.3
@@ -493,6 +817,7 @@ class QualityGate:
                 metadata={
                     "portfolio_id": portfolio_signal.portfolio_id,
                     "signal_count": len(portfolio_signal.signals),
+                    "signal_status_counts": batch_result.summary()["status_counts"],
                     "total_allocation": sum(s.position_size or 0 for s in portfolio_signal.signals)
                 }
             )
@@ -512,12 +837,50 @@ class QualityGate:
                 metadata={"error": str(e)}
             )
     
+    async def validate_signal_batch(
+        self,
+        batch: SignalBatch,
+        quality_level: QualityLevel = QualityLevel.CRITICAL,
+        price_batch: Optional[PriceSeriesBatch] = None,
+        record_history: bool = True,
+        now: Optional[float] = None
+    ) -> BatchValidationResult:
+        """신호 일괄 검증 (유니버스 실행 후 대량 신호 게이팅용)"""
+        start = time.perf_counter()
+        threshold = self.data_validator.thresholds[quality_level]
+        result = self.signal_validator.validate_signal_batch(batch, threshold=threshold, now=now)
+        
+        if price_batch is not None:
+            # 신호 종목별 가격 데이터 검증 결과 매핑 (가격 데이터가 없는 종목은 실패)
+            price_result = self.data_validator.validate_price_batch(price_batch, now=now)
+            order = np.argsort(price_batch.symbols)
+            sorted_symbols = price_batch.symbols[order]
+            price_scores = np.zeros(len(batch))
+            price_failed = np.ones(len(batch), dtype=bool)
+            if len(sorted_symbols):
+                positions = np.minimum(np.searchsorted(sorted_symbols, batch.symbols), len(sorted_symbols) - 1)
+                found = sorted_symbols[positions] == batch.symbols
+                price_rows = order[positions]
+                price_scores = np.where(found, price_result.scores[price_rows], 0.0)
+                price_failed = ~found | (price_result.statuses[price_rows] == ValidationResult.FAIL.value)
+            
+            for i in np.flatnonzero(price_failed):
+                result.failures.setdefault(int(i), []).append("가격 데이터 품질 미달")
+            result.statuses = np.where(price_failed, ValidationResult.FAIL.value, result.statuses)
+            result.components["price_data_score"] = price_scores
+        
+        if record_history:
+            self.signal_validator.record_batch(batch)
+        
+        result.processing_time_ms = (time.perf_counter() - start) * 1000
+        return result
+    
     def _validate_portfolio_level(self, portfolio_signal: PortfolioSignal) -> List[QualityMetric]:
         """포트폴리오 수준 검증"""
         metrics = []
         
         # 분산 투자 검증
-        sectors = [signal.metadata.get('sector', 'unknown') for signal in portfolio_signal.signals]
+        sectors = [(signal.metadata or {}).get('sector', 'unknown') for signal in portfolio_signal.signals]
         sector_counts = Counter(sectors)
         diversification_score = min(1.0, len(sector_counts) / max(1, len(portfolio_signal.signals) * 0.5))
         
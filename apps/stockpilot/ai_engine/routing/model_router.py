@@ -4,12 +4,15 @@
 
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Tuple, Union
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
 from dataclasses import dataclass, field
 from enum import Enum
 import asyncio
 import json
 import hashlib
+import itertools
+import random
+import time
 from collections import defaultdict, deque
 
 from ..config.model_policy import (
@@ -54,36 +57,239 @@ class RoutingDecision:
     estimated_cost: float
     expected_quality: float
     alternatives: List[Tuple[ModelTier, str, float]] = field(default_factory=list)
+    response: Optional[ModelResponse] = None  # executor로 실제 요청까지 수행한 경우의 응답
+
+class CircuitState(Enum):
+    """모델 서킷 브레이커 상태"""
+    CLOSED = "closed"        # 정상 - 트래픽 허용
+    OPEN = "open"            # 차단 - open_timeout 동안 트래픽 없음
+    HALF_OPEN = "half_open"  # 복구 확인 - 프로브 요청만 허용
+
+@dataclass
+class ModelHealth:
+    """모델별 EWMA 헬스 상태"""
+    model_name: str
+    weight: float = 1.0
+    ewma_latency_ms: Optional[float] = None
+    ewma_error_rate: float = 0.0
+    consecutive_failures: int = 0
+    samples: int = 0
+    state: CircuitState = CircuitState.CLOSED
+    opened_at: float = 0.0
+    probe_started_at: Optional[float] = None
+    probe_successes: int = 0
+    
+    def load_score(self, in_flight: int, default_latency_ms: float) -> float:
+        """부하 점수 (낮을수록 좋음): 지연 × (진행 중 요청 + 1) / 성공률"""
+        latency = self.ewma_latency_ms if self.ewma_latency_ms is not None else default_latency_ms
+        success_rate = max(0.05, 1.0 - self.ewma_error_rate)
+        return latency * (in_flight + 1) / success_rate
 
 class ModelLoadBalancer:
-    """모델 로드 밸런서"""
+    """모델 로드 밸런서
     
-    def __init__(self):
+    - 모델별 지연/오류율 EWMA와 진행 중 요청 수로 부하 점수 계산
+    - 가중치 비례로 후보 둘을 뽑아 점수가 낮은 쪽 선택 (power of two choices)
+    - 연속 실패 또는 오류율 초과 시 서킷 오픈, open_timeout 후 프로브 요청으로 복구
+    """
+    
+    def __init__(
+        self,
+        tier_models: Optional[Dict[ModelTier, List[str]]] = None,
+        model_weights: Optional[Dict[str, float]] = None,
+        ewma_alpha: float = 0.3,
+        failure_threshold: int = 3,
+        error_rate_threshold: float = 0.5,
+        min_samples_for_error_rate: int = 10,
+        open_timeout_seconds: float = 5.0,
+        probe_successes_to_close: int = 2,
+        default_latency_ms: float = 1000.0,
+        fallback_model: str = "gpt-4o-mini",
+        clock=time.monotonic,
+        rng: Optional[random.Random] = None
+    ):
         self.model_usage = defaultdict(int)  # 모델별 사용량
-        self.model_queue_sizes = defaultdict(int)  # 모델별 큐 크기
+        self.model_queue_sizes = defaultdict(int)  # 모델별 진행 중 요청 수
         self.model_response_times = defaultdict(lambda: deque(maxlen=100))  # 응답시간 히스토리
-        self.model_availability = defaultdict(lambda: True)  # 모델 가용성
+        self.model_health: Dict[str, ModelHealth] = {}
+        
+        self.ewma_alpha = ewma_alpha
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.min_samples_for_error_rate = min_samples_for_error_rate
+        self.open_timeout_seconds = open_timeout_seconds
+        self.probe_successes_to_close = probe_successes_to_close
+        self.default_latency_ms = default_latency_ms
+        self.fallback_model = fallback_model
+        self.clock = clock
+        self.rng = rng or random.Random()
+        
+        self.model_weights = dict(model_weights or {})
+        self.tier_models: Dict[ModelTier, List[str]] = {}
+        self._tier_cum_weights: Dict[ModelTier, List[float]] = {}
+        for tier, models in (tier_models or {}).items():
+            for model_name in models:
+                self.register_model(tier, model_name, self.model_weights.get(model_name, 1.0))
+    
+    @property
+    def model_availability(self) -> Dict[str, bool]:
+        """모델 가용성 (서킷이 열려 있지 않으면 True)"""
+        return {
+            name: health.state != CircuitState.OPEN
+            for name, health in self.model_health.items()
+        }
+    
+    def register_model(self, tier: ModelTier, model_name: str, weight: float = 1.0):
+        """티어에 모델 엔드포인트 등록 (가중치는 후보 추출 확률에 반영)"""
+        models = self.tier_models.setdefault(tier, [])
+        if model_name not in models:
+            models.append(model_name)
+        self.model_weights[model_name] = weight
+        self._get_health(model_name).weight = weight
+        self._tier_cum_weights[tier] = list(itertools.accumulate(
+            self.model_weights.get(name, 1.0) for name in models
+        ))
+    
+    def _get_health(self, model_name: str) -> ModelHealth:
+        health = self.model_health.get(model_name)
+        if health is None:
+            health = ModelHealth(model_name, weight=self.model_weights.get(model_name, 1.0))
+            self.model_health[model_name] = health
+        return health
     
-    def get_best_model_for_tier(self, tier: ModelTier) -> str:
-        """티어 내에서 최적 모델 선택"""
-        # model_policy를 사용하여 사용 가능한 모델 찾기
-        policy = model_policy.get_policy(tier)
-        model_name = policy.tier.value if policy else tier.value
+    def _candidates(self, tier: ModelTier) -> List[str]:
+        if tier not in self.tier_models:
+            # model_policy의 티어 기본 모델로 초기화
+            policy = model_policy.get_policy(tier)
+            self.register_model(tier, policy.tier.value if policy else tier.value)
+        return self.tier_models[tier]
+    
+    def _is_selectable(self, model_name: str) -> bool:
+        """선택 가능 여부 (오픈 타임아웃이 지나면 하프오픈으로 전환해 프로브 허용)"""
+        health = self._get_health(model_name)
+        if health.state == CircuitState.CLOSED:
+            return True
         
-        if not self.model_availability[model_name]:
-            logger.warning(f"Model {model_name} not available for tier {tier}")
-            return "gpt-4o-mini"  # 기본 모델 반환
-            
+        now = self.clock()
+        if health.state == CircuitState.OPEN:
+            if now - health.opened_at < self.open_timeout_seconds:
+                return False
+            health.state = CircuitState.HALF_OPEN
+            health.probe_successes = 0
+            health.probe_started_at = None
+            logger.info(f"Model {model_name} circuit half-open, probing")
+        
+        # 하프오픈: 프로브는 한 번에 하나 (결과 보고가 없으면 타임아웃 후 재시도)
+        if health.probe_started_at is None or now - health.probe_started_at >= self.open_timeout_seconds:
+            return True
+        return False
+    
+    def _mark_selected(self, model_name: str):
+        health = self._get_health(model_name)
+        if health.state == CircuitState.HALF_OPEN:
+            health.probe_started_at = self.clock()
+    
+    def get_best_model_for_tier(self, tier: ModelTier, mark_probe: bool = True) -> str:
+        """티어 내에서 최적 모델 선택 (가중 power of two choices)
+        
+        mark_probe=False는 안내용 조회로, 하프오픈 모델의 프로브 슬롯을 차지하지 않습니다.
+        """
+        models = self._candidates(tier)
+        
+        if len(models) == 1:
+            chosen = models[0] if self._is_selectable(models[0]) else None
+        else:
+            first, second = self.rng.choices(models, cum_weights=self._tier_cum_weights[tier], k=2)
+            picks = [name for name in dict.fromkeys((first, second)) if self._is_selectable(name)]
+            if not picks:
+                # 두 후보가 모두 차단된 경우에만 나머지 후보 확인
+                picks = [name for name in models if self._is_selectable(name)]
+            # 프로브 대기 중인 하프오픈 모델은 점수와 무관하게 우선 (복구 확인)
+            probes = [name for name in picks if self._get_health(name).state == CircuitState.HALF_OPEN]
+            chosen = probes[0] if probes else min(
+                picks,
+                key=lambda name: self._get_health(name).load_score(
+                    self.model_queue_sizes[name], self.default_latency_ms
+                ),
+                default=None
+            )
+        
+        if chosen is None:
+            logger.warning(f"No available model for tier {tier}, using {self.fallback_model}")
+            return self.fallback_model
+        
+        if mark_probe:
+            self._mark_selected(chosen)
+        return chosen
+    
+    def acquire(self, tier: ModelTier) -> str:
+        """모델 선택 후 진행 중 요청으로 등록"""
+        model_name = self.get_best_model_for_tier(tier)
+        self.increment_queue(model_name)
         return model_name
     
+    def release(self, model_name: str, response_time_ms: float, success: bool):
+        """요청 완료 보고 (acquire와 짝)"""
+        self.decrement_queue(model_name)
+        self.update_model_stats(model_name, response_time_ms, success)
+    
+    def _open_circuit(self, health: ModelHealth, reason: str):
+        health.state = CircuitState.OPEN
+        health.opened_at = self.clock()
+        health.probe_started_at = None
+        health.probe_successes = 0
+        logger.warning(f"Model {health.model_name} circuit opened: {reason}")
+    
     def update_model_stats(self, model_name: str, response_time_ms: float, success: bool):
-        """모델 통계 업데이트"""
+        """모델 통계 업데이트 (EWMA 및 서킷 상태 전이)"""
         self.model_response_times[model_name].append(response_time_ms)
+        health = self._get_health(model_name)
+        alpha = self.ewma_alpha
+        health.samples += 1
+        
+        health.ewma_error_rate = alpha * (0.0 if success else 1.0) + (1 - alpha) * health.ewma_error_rate
         if success:
             self.model_usage[model_name] += 1
+            health.consecutive_failures = 0
+            if health.ewma_latency_ms is None:
+                health.ewma_latency_ms = response_time_ms
+            else:
+                health.ewma_latency_ms = alpha * response_time_ms + (1 - alpha) * health.ewma_latency_ms
         else:
-            self.model_availability[model_name] = False
-            # 일정 시간 후 재활성화 (실제 구현에서는 헬스체크 로직 필요)
+            health.consecutive_failures += 1
+        
+        if health.state == CircuitState.HALF_OPEN:
+            health.probe_started_at = None
+            if not success:
+                self._open_circuit(health, "probe failed")
+                return
+            health.probe_successes += 1
+            if health.probe_successes >= self.probe_successes_to_close:
+                health.state = CircuitState.CLOSED
+                health.ewma_error_rate = 0.0
+                logger.info(f"Model {model_name} circuit closed after successful probes")
+            return
+        
+        if health.state == CircuitState.CLOSED and not success:
+            if health.consecutive_failures >= self.failure_threshold:
+                self._open_circuit(health, f"{health.consecutive_failures} consecutive failures")
+            elif (health.ewma_error_rate >= self.error_rate_threshold
+                  and health.samples >= self.min_samples_for_error_rate):
+                self._open_circuit(health, f"error rate {health.ewma_error_rate:.2f}")
+    
+    def get_health_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """모델별 헬스 상태 요약"""
+        return {
+            name: {
+                "state": health.state.value,
+                "ewma_latency_ms": health.ewma_latency_ms,
+                "ewma_error_rate": round(health.ewma_error_rate, 4),
+                "in_flight": self.model_queue_sizes[name],
+                "weight": health.weight,
+                "requests": self.model_usage[name]
+            }
+            for name, health in self.model_health.items()
+        }
     
     def get_queue_position(self, model_name: str) -> int:
         """모델 큐에서의 위치 반환"""
@@ -223,18 +429,94 @@ class ComplexityAnalyzer:
         else:
             return TaskComplexity.HIGHLY_COMPLEX
 
+# 티어별 모델 엔드포인트 (별칭 + 고정 스냅샷): 한쪽 서킷이 열려도 같은 티어 안에서 우회
+# ModelTier.MINI는 NANO와 같은 값(별칭)이므로 NANO 항목이 두 티어를 함께 담당
+DEFAULT_TIER_MODELS: Dict[ModelTier, List[str]] = {
+    ModelTier.NANO: ["gpt-4o-mini", "gpt-4o-mini-2024-07-18"],
+    ModelTier.STANDARD: ["gpt-4o", "gpt-4o-2024-08-06"],
+    ModelTier.PREMIUM: ["o1", "o1-2024-12-17"],
+}
+
 class SmartModelRouter:
     """스마트 모델 라우터"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        tier_models: Optional[Dict[ModelTier, List[str]]] = None,
+        client: Optional[Any] = None
+    ):
         self.policy = StockPilotModelPolicy()
-        self.load_balancer = ModelLoadBalancer()
+        self.load_balancer = ModelLoadBalancer(
+            tier_models=DEFAULT_TIER_MODELS if tier_models is None else tier_models
+        )
+        self.client = client  # AsyncOpenAI 호환 클라이언트 (없으면 complete() 첫 호출 시 생성)
         self.complexity_analyzer = ComplexityAnalyzer()
         self.routing_history = deque(maxlen=1000)
         self.escalation_tracker = defaultdict(int)
     
-    async def route_request(self, request: ModelRequest) -> RoutingDecision:
-        """요청을 적절한 모델로 라우팅"""
+    async def route_request(
+        self,
+        request: ModelRequest,
+        executor: Optional[Callable[[RoutingDecision], Awaitable[ModelResponse]]] = None
+    ) -> RoutingDecision:
+        """요청을 적절한 모델로 라우팅
+        
+        executor가 주어지면 선택한 모델로 실제 요청까지 수행합니다. 모델은 acquire로
+        진행 중 요청에 등록되고, 완료 시 측정한 지연과 성공 여부를 release로 보고해
+        EWMA 헬스와 서킷 상태에 반영합니다. 응답은 decision.response에 담깁니다.
+        """
+        decision = self._decide(request, reserve=executor is not None)
+        if executor is None:
+            return decision
+        
+        started = time.perf_counter()
+        success = False
+        try:
+            decision.response = await executor(decision)
+            success = True
+            return decision
+        finally:
+            self.load_balancer.release(
+                decision.model_name, (time.perf_counter() - started) * 1000, success
+            )
+    
+    async def complete(self, request: ModelRequest) -> ModelResponse:
+        """라우팅 후 OpenAI Chat Completions로 요청 수행 (결과는 로드밸런서에 보고)"""
+        decision = await self.route_request(request, executor=lambda d: self._call_openai(request, d))
+        return decision.response
+    
+    async def _call_openai(self, request: ModelRequest, decision: RoutingDecision) -> ModelResponse:
+        if self.client is None:
+            from openai import AsyncOpenAI
+            self.client = AsyncOpenAI()
+        
+        started = time.perf_counter()
+        completion = await self.client.chat.completions.create(
+            model=decision.model_name,
+            messages=[{"role": "user", "content": request.content}],
+            temperature=request.temperature,
+            max_tokens=request.max_tokens
+        )
+        usage = {
+            "prompt_tokens": completion.usage.prompt_tokens,
+            "completion_tokens": completion.usage.completion_tokens,
+            "total_tokens": completion.usage.total_tokens
+        }
+        policy = model_policy.get_policy(decision.model_tier)
+        cost = usage["total_tokens"] / 1000 * policy.cost_per_1k_tokens if policy else decision.estimated_cost
+        
+        return ModelResponse(
+            content=completion.choices[0].message.content or "",
+            model_tier=decision.model_tier,
+            model_name=decision.model_name,
+            usage=usage,
+            cost=cost,
+            processing_time_ms=(time.perf_counter() - started) * 1000
+        )
+    
+    def _decide(self, request: ModelRequest, reserve: bool) -> RoutingDecision:
+        """라우팅 결정 (reserve=True면 선택한 모델을 진행 중 요청으로 등록)"""
+        select = self.load_balancer.acquire if reserve else self.load_balancer.get_best_model_for_tier
         try:
             # 복잡도 분석
             complexity = self.complexity_analyzer.analyze_complexity(request)
@@ -244,9 +526,6 @@ class SmartModelRouter:
                 request.task_type, complexity, request.content_type
             )
             
-            # 로드밸런서를 통한 최적 모델 선택
-            model_name = self.load_balancer.get_best_model_for_tier(model_tier)
-            
             # 비용 및 품질 추정
             estimated_cost = self._estimate_cost(request, model_tier)
             expected_quality = self._estimate_quality(complexity, model_tier)
@@ -254,6 +533,9 @@ class SmartModelRouter:
             # 대안 모델 제안
             alternatives = self._get_alternatives(model_tier, request)
             
+            # 로드밸런서를 통한 최적 모델 선택 (acquire 이후에는 실패할 단계가 없도록 마지막에)
+            model_name = select(model_tier)
+            
             # 라우팅 결정 생성
             decision = RoutingDecision(
                 model_tier=model_tier,
@@ -282,7 +564,7 @@ class SmartModelRouter:
             logger.error(f"Routing failed for task {request.task_id}: {e}")
             # 폴백: 기본 모델
             fallback_tier = ModelTier.MINI
-            fallback_model = self.load_balancer.get_best_model_for_tier(fallback_tier)
+            fallback_model = select(fallback_tier)
             
             return RoutingDecision(
                 model_tier=fallback_tier,
@@ -303,7 +585,7 @@ class SmartModelRouter:
         # 신뢰도 점수가 낮으면 에스컬레이션
         if (current_response.confidence_score and 
             current_response.confidence_score < 0.7 and
-            current_response.model_tier != ModelTier.O3):
+            current_response.model_tier != ModelTier.PREMIUM):
             
             # 에스컬레이션 횟수 확인
             escalation_key = f"{request.task_id}_{current_response.model_tier.value}"
@@ -333,7 +615,7 @@ class SmartModelRouter:
     
     def _get_next_tier(self, current_tier: ModelTier) -> Optional[ModelTier]:
         """다음 티어 반환"""
-        tier_order = [ModelTier.NANO, ModelTier.MINI, ModelTier.STANDARD, ModelTier.O3]
+        tier_order = list(ModelTier)  # NANO → STANDARD → PREMIUM (MINI는 NANO 별칭)
         try:
             current_index = tier_order.index(current_tier)
             if current_index < len(tier_order) - 1:
@@ -362,7 +644,7 @@ class SmartModelRouter:
             ModelTier.NANO: 0.6,
             ModelTier.MINI: 0.7,
             ModelTier.STANDARD: 0.85,
-            ModelTier.O3: 0.95
+            ModelTier.PREMIUM: 0.95
         }
         
         complexity_factor = {
@@ -381,9 +663,9 @@ class SmartModelRouter:
         """대안 모델들 반환"""
         alternatives = []
         
-        for tier in [ModelTier.NANO, ModelTier.MINI, ModelTier.STANDARD, ModelTier.O3]:
+        for tier in ModelTier:
             if tier != primary_tier:
-                model_name = self.load_balancer.get_best_model_for_tier(tier)
+                model_name = self.load_balancer.get_best_model_for_tier(tier, mark_probe=False)
                 cost = self._estimate_cost(request, tier)
                 alternatives.append((tier, model_name, cost))
         
@@ -417,7 +699,8 @@ class SmartModelRouter:
             "total_estimated_cost": total_cost,
             "average_cost_per_request": total_cost / len(history) if history else 0,
             "escalation_count": sum(self.escalation_tracker.values()),
-            "model_availability": dict(self.load_balancer.model_availability)
+            "model_availability": self.load_balancer.model_availability,
+            "model_health": self.load_balancer.get_health_snapshot()
         }
 
 # 글로벌 라우터 인스턴스
@@ -0,0 +1,131 @@
+"""
+문서 중복 제거 테스트
+완전/유사 중복 탐지, 메타데이터 병합, 윈도우 만료, 대표 문서 등록 취소 검증
+"""
+
+import pytest
+import os
+
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from ai_engine.pipeline.dedup import DocumentDeduplicator, minhash_signature, normalize_text, shingle_hashes
+
+ARTICLE = (
+    "삼성전자가 3분기 연결 기준 영업이익이 10조 원을 넘어섰다고 발표했다. "
+    "메모리 반도체 가격 회복과 고대역폭 메모리 판매 증가가 실적 개선을 이끌었으며, "
+    "회사는 4분기에도 서버용 수요가 견조할 것으로 전망했다. 증권가는 목표주가를 잇따라 상향했다."
+)
+
+
+class _FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestDocumentDeduplicator:
+    """문서 중복 제거기 테스트"""
+
+    def test_exact_duplicate_after_normalization(self):
+        """공백/구두점/대소문자만 다른 문서가 완전 중복으로 판정되는지 테스트"""
+        dedup = DocumentDeduplicator()
+        canonical_meta = {}
+
+        assert dedup.check("a", ARTICLE, "news", canonical_meta, "yonhap") is None
+        match = dedup.check("b", "  " + ARTICLE.replace(". ", "!  "), "news", {}, "newsis")
+
+        assert match.canonical_id == "a"
+        assert match.match_type == "exact"
+        assert canonical_meta["duplicate_count"] == 1
+        assert canonical_meta["duplicates"][0]["doc_id"] == "b"
+        assert canonical_meta["duplicate_sources"] == ["newsis"]
+
+    def test_near_duplicate_syndicated_copy(self):
+        """문구가 조금 바뀐 재전송 기사가 유사 중복으로 판정되는지 테스트"""
+        dedup = DocumentDeduplicator()
+        syndicated = ARTICLE.replace("잇따라 상향했다", "잇달아 올렸다") + " (서울=뉴스)"
+
+        assert dedup.check("a", ARTICLE, "news") is None
+        match = dedup.check("b", syndicated, "news")
+
+        assert match is not None
+        assert match.match_type == "near"
+        assert match.similarity >= dedup.similarity_threshold
+        assert dedup.get_stats()["embeddings_saved"] == 1
+
+    def test_different_articles_are_kept(self):
+        """서로 다른 기사는 중복으로 판정하지 않는지 테스트"""
+        dedup = DocumentDeduplicator()
+        other = (
+            "SK하이닉스는 차세대 HBM4 양산 일정을 앞당기기로 하고 청주 공장 증설에 착수했다. "
+            "업계에서는 인공지능 가속기 수요 확대에 따라 공급 부족이 내년까지 이어질 것으로 본다."
+        )
+
+        assert dedup.check("a", ARTICLE, "news") is None
+        assert dedup.check("b", other, "news") is None
+        assert dedup.get_stats()["window_size"] == 2
+
+    def test_near_duplicate_only_for_text_types(self):
+        """가격 데이터처럼 비슷한 구조의 문서는 유사 중복 검사를 하지 않는지 테스트"""
+        dedup = DocumentDeduplicator()
+        base = "005930 종가 71000 거래량 12345678 " * 5
+
+        assert dedup.check("a", base, "price") is None
+        assert dedup.check("b", base.replace("71000", "71100"), "price") is None
+        assert dedup.check("c", base, "price").match_type == "exact"
+
+    def test_window_expiry(self):
+        """윈도우를 벗어난 대표 문서는 더 이상 매칭되지 않는지 테스트"""
+        clock = _FakeClock()
+        dedup = DocumentDeduplicator(window_seconds=3600, clock=clock)
+
+        assert dedup.check("a", ARTICLE, "news") is None
+        clock.now += 3601
+        assert dedup.check("b", ARTICLE, "news") is None
+        assert dedup.get_stats()["evicted"] == 1
+        assert not dedup._band_index or all("a" not in ids for ids in dedup._band_index.values())
+
+    def test_reingesting_same_document_is_not_a_duplicate(self):
+        """같은 ID/같은 내용의 재수집이 자기 자신의 중복으로 판정되지 않는지 테스트"""
+        dedup = DocumentDeduplicator()
+
+        assert dedup.check("a", ARTICLE, "news") is None
+        assert dedup.check("a", ARTICLE, "news") is None
+        assert dedup.check("a", ARTICLE + " (수정)", "news") is None
+        assert dedup.get_stats()["embeddings_saved"] == 0
+        assert dedup.get_stats()["window_size"] == 1
+
+    def test_forget_releases_failed_canonical(self):
+        """등록 취소된 대표 문서 이후의 사본이 새 대표 문서가 되고 절감 수가 되돌려지는지 테스트"""
+        dedup = DocumentDeduplicator()
+
+        assert dedup.check("a", ARTICLE, "news") is None
+        assert dedup.check("b", ARTICLE, "news").canonical_id == "a"
+        assert dedup.forget("a")
+        assert not dedup.forget("a")
+
+        stats = dedup.get_stats()
+        assert stats["embeddings_saved"] == 0
+        assert stats["discarded_duplicates"] == 1
+        assert dedup.check("c", ARTICLE, "news") is None
+        assert dedup.check("d", ARTICLE, "news").canonical_id == "c"
+        assert all("a" not in ids for ids in dedup._band_index.values())
+
+    def test_minhash_estimates_jaccard(self):
+        """MinHash 서명 일치율이 실제 Jaccard 유사도에 근접하는지 테스트"""
+        dedup = DocumentDeduplicator(num_perm=256, num_bands=64)
+        a = shingle_hashes(normalize_text(ARTICLE))
+        b = shingle_hashes(normalize_text(ARTICLE[:len(ARTICLE) // 2]))
+
+        jaccard = len(set(a) & set(b)) / len(set(a) | set(b))
+        estimate = (minhash_signature(a, dedup._seeds) == minhash_signature(b, dedup._seeds)).mean()
+        assert estimate == pytest.approx(jaccard, abs=0.1)
+        assert len(shingle_hashes("")) == 0
+
+    def test_invalid_band_configuration(self):
+        """후보 누락이 생기는 밴드 설정 거부 테스트"""
+        with pytest.raises(ValueError):
+            DocumentDeduplicator(num_perm=100, num_bands=32)
@@ -0,0 +1,163 @@
+"""
+데이터 수집 파이프라인 테스트
+단계별 제한 큐, 백프레셔, 임베딩 결과 정합성 검증
+"""
+
+import pytest
+import asyncio
+import os
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+pytest.importorskip("faiss")
+
+from ai_engine.pipeline.ingest_module import DataIngestionPipeline, RawDataPoint
+
+
+class FakeEmbedder:
+    """요청 텍스트를 그대로 임베딩 자리에 돌려주는 테스트용 임베더"""
+
+    max_concurrent = 4
+
+    def __init__(self, delay: float = 0.0, fail_on: str = None):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.calls = 0
+
+    async def embed_text(self, request):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail_on and self.fail_on in request.text:
+            raise RuntimeError("embedding failed")
+        return SimpleNamespace(embedding=request.text)
+
+
+def _make_raw(i: int) -> RawDataPoint:
+    return RawDataPoint(
+        source_id="news_api",
+        data_type="news",
+        content={
+            "title": f"뉴스 {i}",
+            "content": f"삼성전자 {i}번째 실적 발표 기사 본문입니다. " * (1 + i % 3),
+            "timestamp": datetime.utcnow().isoformat()
+        },
+        timestamp=datetime(2024, 1, 1) + timedelta(seconds=i),
+        metadata={}
+    )
+
+
+class TestDataIngestionPipeline:
+    """데이터 수집 파이프라인 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_embeddings_stay_aligned_with_documents(self):
+        """임베딩 실패가 있어도 문서와 임베딩이 어긋나지 않는지 테스트"""
+        pipeline = DataIngestionPipeline(FakeEmbedder(fail_on="뉴스 3\n"), use_process_pool=False)
+        indexed = []
+
+        async def capture(docs):
+            indexed.extend(docs)
+
+        pipeline._add_to_index = capture
+        await pipeline.manual_ingest("news_api", [_make_raw(i) for i in range(6)])
+
+        assert len(indexed) == 5
+        for doc in indexed:
+            assert doc.embedding.endswith(doc.content)
+        assert pipeline.stats["processed_documents"] == 5
+        assert pipeline.stats["failed_documents"] == 1
+
+    @pytest.mark.asyncio
+    async def test_stage_queues_apply_backpressure(self):
+        """하류 단계가 느릴 때 큐 크기가 상한을 넘지 않는지 테스트"""
+        pipeline = DataIngestionPipeline(
+            FakeEmbedder(delay=0.01),
+            max_queue_size=8,
+            stage_concurrency={"clean": 1, "embed": 1, "index": 1},
+            use_process_pool=False
+        )
+        pipeline.embed_batch_size = 4
+        max_sizes = {"clean": 0, "embed": 0, "index": 0}
+
+        async def slow_index(docs):
+            await asyncio.sleep(0.005)
+
+        pipeline._add_to_index = slow_index
+        runner = asyncio.create_task(pipeline.start_pipeline())
+
+        for i in range(60):
+            await pipeline._enqueue_raw(_make_raw(i))
+            for name in max_sizes:
+                max_sizes[name] = max(max_sizes[name], pipeline.stage_metrics[name].queue.qsize())
+
+        await asyncio.wait_for(pipeline.wait_until_drained(), timeout=10)
+        stats = pipeline.get_pipeline_stats()
+        await pipeline.stop_pipeline()
+        await asyncio.wait_for(runner, timeout=5)
+
+        assert all(size <= 8 for size in max_sizes.values())
+        assert stats["processed_documents"] == 60
+        assert stats["stages"]["clean"]["processed"] == 60
+        assert stats["stages"]["index"]["processed"] == 60
+        assert stats["stages"]["embed"]["throughput_per_sec"] > 0
+        assert stats["stages"]["clean"]["lag_ms_p95"] >= 0
+
+    @pytest.mark.asyncio
+    async def test_duplicates_skip_embedding(self):
+        """재전송 기사는 임베딩하지 않고 대표 문서 메타데이터에 병합되는지 테스트"""
+        embedder = FakeEmbedder()
+        pipeline = DataIngestionPipeline(embedder, use_process_pool=False)
+        indexed = []
+
+        async def capture(docs):
+            indexed.extend(docs)
+
+        pipeline._add_to_index = capture
+        article = (
+            "삼성전자가 3분기 연결 기준 영업이익이 10조 원을 넘어섰다고 발표했다. "
+            "메모리 반도체 가격 회복과 고대역폭 메모리 판매 증가가 실적 개선을 이끌었다."
+        )
+        batch = []
+        for i, source_id in enumerate(["yonhap", "newsis", "news1"]):
+            raw = _make_raw(i)
+            raw.source_id = source_id
+            raw.content = {"title": "삼성전자 3분기 실적", "content": article + f" ({source_id})"}
+            batch.append(raw)
+
+        await pipeline.manual_ingest("news", batch)
+
+        assert embedder.calls == 1
+        assert len(indexed) == 1
+        assert indexed[0].metadata["duplicate_count"] == 2
+        stats = pipeline.get_pipeline_stats()
+        assert stats["duplicate_documents"] == 2
+        assert stats["dedup"]["embeddings_saved"] == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_canonical_does_not_absorb_later_copies(self):
+        """임베딩에 실패한 대표 문서의 이후 사본이 버려지지 않고 다시 임베딩되는지 테스트"""
+        embedder = FakeEmbedder(fail_on="(yonhap)")
+        pipeline = DataIngestionPipeline(embedder, use_process_pool=False)
+        indexed = []
+
+        async def capture(docs):
+            indexed.extend(docs)
+
+        pipeline._add_to_index = capture
+        article = "삼성전자가 3분기 연결 기준 영업이익이 10조 원을 넘어섰다고 발표했다. " * 3
+
+        def raw(i, source_id):
+            data = _make_raw(i)
+            data.source_id = source_id
+            data.content = {"title": "삼성전자 3분기 실적", "content": article + f"({source_id})"}
+            return data
+
+        await pipeline.manual_ingest("news", [raw(0, "yonhap")])
+        await pipeline.manual_ingest("news", [raw(1, "newsis")])
+
+        assert embedder.calls == 2
+        assert len(indexed) == 1
+        assert pipeline.get_pipeline_stats()["dedup"]["embeddings_saved"] == 0
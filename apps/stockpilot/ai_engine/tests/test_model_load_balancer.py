@@ -0,0 +1,266 @@
+"""
+모델 로드밸런서 카오스 테스트
+스텁 모델 엔드포인트 장애/지연 주입 시 서킷 브레이커, 복구, 부하 분산 검증
+SmartModelRouter.route_request(executor) 경로의 acquire/release 보고 검증
+"""
+
+import pytest
+import asyncio
+import os
+import random
+import time
+from collections import Counter
+
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from types import SimpleNamespace
+
+from ai_engine.config.model_policy import ContentType, ModelTier, TaskComplexity
+from ai_engine.routing.model_router import (
+    DEFAULT_TIER_MODELS, CircuitState, ModelLoadBalancer, ModelRequest, ModelResponse, SmartModelRouter
+)
+
+ENDPOINTS = ["ep-a", "ep-b", "ep-c"]
+
+
+class StubEndpoint:
+    """지연과 장애를 주입할 수 있는 스텁 모델 엔드포인트"""
+
+    def __init__(self, latency: float = 0.005):
+        self.latency = latency
+        self.failing = False
+        self.calls = 0
+
+    async def complete(self):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if self.failing:
+            raise ConnectionError("endpoint down")
+        return "ok"
+
+
+class _FakeClock:
+    def __init__(self, now: float = 1_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _balancer(**kwargs) -> ModelLoadBalancer:
+    return ModelLoadBalancer(
+        tier_models={ModelTier.STANDARD: ENDPOINTS},
+        rng=random.Random(7),
+        **kwargs
+    )
+
+
+async def _drive(balancer, endpoints, duration: float, workers: int = 20) -> Counter:
+    """duration 동안 workers개 동시 요청을 보내고 엔드포인트별 성공 수 반환"""
+    served = Counter()
+    deadline = time.monotonic() + duration
+
+    async def worker():
+        while time.monotonic() < deadline:
+            model_name = balancer.acquire(ModelTier.STANDARD)
+            start = time.perf_counter()
+            try:
+                await endpoints[model_name].complete()
+                success = True
+                served[model_name] += 1
+            except ConnectionError:
+                success = False
+            balancer.release(model_name, (time.perf_counter() - start) * 1000, success)
+
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    return served
+
+
+class TestModelLoadBalancerChaos:
+    """장애 주입 시 로드밸런서 동작 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_failed_endpoint_is_isolated_and_recovers(self):
+        """장애 엔드포인트가 차단되었다가 복구 후 수 초 내 다시 트래픽을 받는지 테스트"""
+        balancer = _balancer(open_timeout_seconds=0.3)
+        endpoints = {name: StubEndpoint() for name in ENDPOINTS}
+
+        healthy = await _drive(balancer, endpoints, 0.3)
+        assert all(healthy[name] > 0 for name in ENDPOINTS)
+
+        # 장애 주입 - 서킷이 열리고 프로브 외에는 호출되지 않아야 함
+        endpoints["ep-b"].failing = True
+        await _drive(balancer, endpoints, 0.3)
+        assert balancer.model_health["ep-b"].state != CircuitState.CLOSED
+        calls_while_down = endpoints["ep-b"].calls
+        await _drive(balancer, endpoints, 0.6)
+        assert endpoints["ep-b"].calls - calls_while_down <= 3  # 오픈 타임아웃마다 프로브 1회
+
+        # 복구 - 프로브 성공 후 다시 순환에 포함
+        endpoints["ep-b"].failing = False
+        recovered_at = None
+        start = time.monotonic()
+        while time.monotonic() - start < 3.0:
+            await _drive(balancer, endpoints, 0.05)
+            if balancer.model_health["ep-b"].state == CircuitState.CLOSED:
+                recovered_at = time.monotonic() - start
+                break
+
+        assert recovered_at is not None and recovered_at < 1.0
+        after = await _drive(balancer, endpoints, 0.3)
+        assert after["ep-b"] > 0.15 * sum(after.values())
+
+    @pytest.mark.asyncio
+    async def test_slow_endpoint_gets_less_traffic(self):
+        """지연이 큰 엔드포인트로 가는 트래픽이 줄어드는지 테스트"""
+        balancer = _balancer()
+        endpoints = {name: StubEndpoint() for name in ENDPOINTS}
+        endpoints["ep-c"].latency = 0.05
+
+        served = await _drive(balancer, endpoints, 0.5)
+
+        assert served["ep-c"] < 0.5 * served["ep-a"]
+        assert served["ep-c"] < 0.5 * served["ep-b"]
+        assert balancer.model_health["ep-c"].ewma_latency_ms > balancer.model_health["ep-a"].ewma_latency_ms
+
+
+class TestCircuitBreaker:
+    """서킷 브레이커 상태 전이 테스트"""
+
+    def test_half_open_allows_single_probe(self):
+        """하프오픈 상태에서 프로브가 한 번에 하나만 나가는지 테스트"""
+        clock = _FakeClock()
+        balancer = _balancer(clock=clock, open_timeout_seconds=5)
+        for _ in range(balancer.failure_threshold):
+            balancer.update_model_stats("ep-a", 100, success=False)
+        assert balancer.model_health["ep-a"].state == CircuitState.OPEN
+
+        picks = Counter(balancer.get_best_model_for_tier(ModelTier.STANDARD) for _ in range(200))
+        assert picks["ep-a"] == 0
+
+        clock.now += 5
+        picks = Counter(balancer.get_best_model_for_tier(ModelTier.STANDARD) for _ in range(200))
+        assert picks["ep-a"] == 1
+        assert balancer.model_health["ep-a"].state == CircuitState.HALF_OPEN
+
+    def test_probe_failure_reopens_and_success_closes(self):
+        """프로브 실패 시 재차단, 연속 성공 시 복구되는지 테스트"""
+        clock = _FakeClock()
+        balancer = _balancer(clock=clock, open_timeout_seconds=5, probe_successes_to_close=2)
+        health = balancer.model_health["ep-a"]
+        for _ in range(balancer.failure_threshold):
+            balancer.update_model_stats("ep-a", 100, success=False)
+
+        clock.now += 5
+        assert balancer._is_selectable("ep-a")
+        balancer.update_model_stats("ep-a", 100, success=False)
+        assert health.state == CircuitState.OPEN
+        assert health.opened_at == clock.now
+
+        clock.now += 5
+        assert balancer._is_selectable("ep-a")
+        balancer.update_model_stats("ep-a", 100, success=True)
+        assert health.state == CircuitState.HALF_OPEN
+        balancer.update_model_stats("ep-a", 100, success=True)
+        assert health.state == CircuitState.CLOSED
+        assert balancer.model_availability["ep-a"]
+
+    def test_error_rate_opens_circuit(self):
+        """연속 실패가 아니어도 오류율이 높으면 차단되는지 테스트"""
+        balancer = _balancer(min_samples_for_error_rate=10)
+        for i in range(20):
+            balancer.update_model_stats("ep-a", 100, success=(i % 3 == 0))
+        assert balancer.model_health["ep-a"].state == CircuitState.OPEN
+
+    def test_all_open_falls_back(self):
+        """모든 엔드포인트가 차단되면 기본 모델로 폴백하는지 테스트"""
+        balancer = _balancer()
+        for name in ENDPOINTS:
+            for _ in range(balancer.failure_threshold):
+                balancer.update_model_stats(name, 100, success=False)
+
+        assert balancer.get_best_model_for_tier(ModelTier.STANDARD) == balancer.fallback_model
+
+
+def _standard_request(task_id: str) -> ModelRequest:
+    return ModelRequest(
+        task_id=task_id,
+        task_type="technical_analysis",
+        content="이동평균과 RSI 기반 기술적 분석",
+        content_type=ContentType.TECHNICAL_ANALYSIS,
+        complexity=TaskComplexity.COMPLEX
+    )
+
+
+class TestRouteRequestExecution:
+    """route_request 실행 경로의 로드밸런서 연동 테스트"""
+
+    def test_every_tier_has_failover_model(self):
+        """티어마다 두 개 이상의 모델이 등록되는지 테스트"""
+        router = SmartModelRouter()
+        assert all(len(models) >= 2 for models in DEFAULT_TIER_MODELS.values())
+        for tier, models in DEFAULT_TIER_MODELS.items():
+            assert router.load_balancer.tier_models[tier] == models
+
+    @pytest.mark.asyncio
+    async def test_route_request_reports_outcomes_and_fails_over(self):
+        """실행 결과가 release로 보고되어 장애 모델이 차단되고 같은 티어의 다른 모델로 우회하는지 테스트"""
+        router = SmartModelRouter(tier_models={ModelTier.STANDARD: ["ep-a", "ep-b"]})
+        router.load_balancer.rng = random.Random(3)
+        endpoints = {"ep-a": StubEndpoint(latency=0.001), "ep-b": StubEndpoint(latency=0.001)}
+        endpoints["ep-a"].failing = True
+        in_flight = []
+
+        async def executor(decision):
+            in_flight.append(router.load_balancer.model_queue_sizes[decision.model_name])
+            content = await endpoints[decision.model_name].complete()
+            return ModelResponse(content=content, model_tier=decision.model_tier, model_name=decision.model_name,
+                                 usage={}, cost=0.0, processing_time_ms=1.0)
+
+        served = Counter()
+        for i in range(30):
+            try:
+                decision = await router.route_request(_standard_request(f"task-{i}"), executor=executor)
+                served[decision.response.model_name] += 1
+            except ConnectionError:
+                pass
+
+        health = router.load_balancer.model_health
+        assert health["ep-a"].state == CircuitState.OPEN
+        assert endpoints["ep-a"].calls == router.load_balancer.failure_threshold
+        assert served["ep-b"] == 30 - endpoints["ep-a"].calls
+        assert health["ep-b"].samples == served["ep-b"] and health["ep-b"].ewma_latency_ms is not None
+        # acquire로 진행 중 요청에 등록되었다가 release로 해제
+        assert set(in_flight) == {1}
+        assert router.load_balancer.model_queue_sizes["ep-a"] == router.load_balancer.model_queue_sizes["ep-b"] == 0
+
+    @pytest.mark.asyncio
+    async def test_route_request_without_executor_does_not_reserve(self):
+        """executor 없이 라우팅만 하면 진행 중 요청 수가 변하지 않는지 테스트"""
+        router = SmartModelRouter()
+        decision = await router.route_request(_standard_request("plan-only"))
+        assert decision.model_name in DEFAULT_TIER_MODELS[decision.model_tier]
+        assert decision.response is None
+        assert not any(router.load_balancer.model_queue_sizes.values())
+
+    @pytest.mark.asyncio
+    async def test_complete_calls_client_with_routed_model(self):
+        """complete()가 선택된 모델로 클라이언트를 호출하고 응답/통계를 남기는지 테스트"""
+        calls = []
+
+        async def create(**kwargs):
+            calls.append(kwargs)
+            return SimpleNamespace(
+                choices=[SimpleNamespace(message=SimpleNamespace(content='{"trend": "up"}'))],
+                usage=SimpleNamespace(prompt_tokens=40, completion_tokens=10, total_tokens=50)
+            )
+
+        client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        router = SmartModelRouter(client=client)
+        response = await router.complete(_standard_request("complete-1"))
+
+        assert calls[0]["model"] == response.model_name
+        assert response.model_name in DEFAULT_TIER_MODELS[response.model_tier]
+        assert response.content == '{"trend": "up"}' and response.usage["total_tokens"] == 50
+        assert router.load_balancer.model_health[response.model_name].samples == 1
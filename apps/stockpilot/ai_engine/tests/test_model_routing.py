@@ -229,8 +229,13 @@ class TestModelLoadBalancer:
         assert balancer.model_usage[model_name] == 1
         assert len(balancer.model_response_times[model_name]) == 1
         
-        # 실패 케이스
+        # 단일 실패로는 차단하지 않음
         balancer.update_model_stats(model_name, response_time, success=False)
+        assert balancer.model_availability[model_name]
+        
+        # 연속 실패 시 서킷 오픈
+        for _ in range(balancer.failure_threshold - 1):
+            balancer.update_model_stats(model_name, response_time, success=False)
         assert not balancer.model_availability[model_name]
     
     def test_queue_management(self):
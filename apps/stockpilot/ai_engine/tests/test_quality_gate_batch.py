@@ -0,0 +1,191 @@
+"""
+품질 관문 일괄 검증 테스트
+열 단위 신호/가격 배치의 벡터화 검증, 실패 메시지 생성, 포트폴리오 신호 검증
+"""
+
+import pytest
+import asyncio
+import os
+import time
+
+import numpy as np
+from datetime import datetime, timedelta
+
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# quality_gate -> analysis_module -> rag 인덱서가 faiss에 의존
+pytest.importorskip("faiss")
+
+from ai_engine.pipeline.quality_gate import (
+    PriceSeriesBatch, QualityGate, QualityLevel, SignalBatch, ValidationResult, _row_quantiles
+)
+from ai_engine.pipeline.signal_module import PortfolioSignal, SignalStrength, SignalType, TradingSignal
+
+NOW = 1_700_000_000.0
+
+
+def _signal_batch(n: int) -> SignalBatch:
+    entry = np.linspace(1000, 100000, n)
+    actions = np.where(np.arange(n) % 2 == 0, "BUY", "SELL")
+    is_buy = actions == "BUY"
+    return SignalBatch(
+        symbols=np.array([f"{i:06d}" for i in range(n)]),
+        actions=actions,
+        strength_scores=np.full(n, 1.0),
+        confidences=np.full(n, 0.95),
+        entry_prices=entry,
+        target_prices=np.where(is_buy, entry * 1.1, entry * 0.9),
+        stop_losses=np.where(is_buy, entry * 0.95, entry * 1.05),
+        position_sizes=np.full(n, 0.01),
+        created_at=np.full(n, NOW - 60),
+        expires_at=np.full(n, np.nan)
+    )
+
+
+def _price_batch(symbols: np.ndarray, bars: int = 60) -> PriceSeriesBatch:
+    n = len(symbols)
+    closes = 100 + np.tile(np.sin(np.arange(bars) / 5.0), (n, 1))
+    return PriceSeriesBatch(
+        symbols=symbols,
+        opens=closes.copy(),
+        highs=closes + 1,
+        lows=closes - 1,
+        closes=closes,
+        volumes=np.full((n, bars), 1000.0),
+        timestamps=np.tile(NOW - (bars - np.arange(bars)) * 86400.0, (n, 1))
+    )
+
+
+class TestSignalBatchValidation:
+    """신호 일괄 검증 테스트"""
+
+    def test_only_failures_get_messages(self):
+        """통과한 신호는 메시지를 만들지 않고 실패 사유만 기록되는지 테스트"""
+        gate = QualityGate()
+        batch = _signal_batch(100)
+        batch.confidences[3] = 1.5          # 범위 위반
+        batch.stop_losses[4] = batch.entry_prices[4] * 1.2  # 매수 손절가가 진입가 위
+        batch.position_sizes[5] = np.nan    # 포지션 미설정 + 약한 신호
+        batch.strength_scores[5] = 0.4
+
+        result = gate.signal_validator.validate_signal_batch(batch, now=NOW)
+
+        assert set(result.failures) == {3, 4, 5}
+        assert result.statuses[3] == ValidationResult.FAIL.value
+        assert result.statuses[4] == ValidationResult.FAIL.value
+        assert result.statuses[5] == ValidationResult.WARNING.value
+        assert "포지션 사이즈 조정 필요" in result.failures[5]
+        assert result.passed.sum() == 97
+
+    def test_conflicting_signals_lower_consistency(self):
+        """같은 종목의 상충 신호가 일관성 점수를 낮추는지 테스트"""
+        gate = QualityGate()
+        batch = _signal_batch(4)
+        batch.symbols[:] = ["005930", "005930", "000660", "035420"]
+
+        result = gate.signal_validator.validate_signal_batch(batch, now=NOW)
+
+        assert result.components["consistency_score"][0] == 0.5
+        assert result.components["consistency_score"][2] == 0.8
+
+    def test_stale_signals_are_penalized(self):
+        """오래된 신호의 점수가 낮아지는지 테스트"""
+        gate = QualityGate()
+        batch = _signal_batch(2)
+        batch.created_at[1] = NOW - 3 * 86400
+
+        result = gate.signal_validator.validate_signal_batch(batch, now=NOW)
+
+        assert result.scores[1] == pytest.approx(result.scores[0] * 0.5)
+        assert "신호가 오래되었거나 만료됨" in result.failures[1]
+
+    def test_price_failures_gate_signals(self):
+        """가격 데이터가 없거나 불량인 종목의 신호가 실패 처리되는지 테스트"""
+        gate = QualityGate()
+        batch = _signal_batch(10)
+        prices = _price_batch(batch.symbols[:9])  # 마지막 종목은 가격 데이터 없음
+        prices.timestamps[2] -= 30 * 86400       # 오래된 데이터
+
+        result = asyncio.run(gate.validate_signal_batch(
+            batch, QualityLevel.HIGH, price_batch=prices, record_history=False, now=NOW
+        ))
+
+        assert result.statuses[9] == ValidationResult.FAIL.value
+        assert result.statuses[2] == ValidationResult.FAIL.value
+        assert result.passed.sum() == 8
+
+    def test_thousands_of_signals_in_milliseconds(self):
+        """수천 건 신호 검증이 밀리초 단위로 끝나는지 테스트"""
+        gate = QualityGate()
+        batch = _signal_batch(5000)
+
+        gate.signal_validator.validate_signal_batch(batch, now=NOW)  # 워밍업
+        start = time.perf_counter()
+        result = gate.signal_validator.validate_signal_batch(batch, now=NOW)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        assert result.passed.all()
+        assert elapsed_ms < 100
+
+
+class TestPortfolioSignalValidation:
+    """포트폴리오 신호 검증 테스트"""
+
+    def test_only_failing_signals_get_metrics(self):
+        """개별 신호 중 실패한 신호만 메트릭을 만들고 포트폴리오 점수에 반영되는지 테스트"""
+        created_at = datetime.now() - timedelta(minutes=1)
+        signals = [
+            TradingSignal(
+                signal_id=f"sig-{i}", symbol=symbol, signal_type=SignalType.BUY,
+                strength=SignalStrength.VERY_STRONG, confidence=0.95,
+                entry_price=100.0, target_price=110.0, stop_loss=95.0, position_size=0.3,
+                metadata={"sector": sector}, created_at=created_at
+            )
+            for i, (symbol, sector) in enumerate([("005930", "기술주"), ("000660", "반도체"), ("035420", "인터넷")])
+        ]
+        signals[2].stop_loss = 120.0  # 매수 손절가가 진입가 위
+        portfolio = PortfolioSignal(
+            portfolio_id="pf-1", signals=signals, overall_direction="bullish",
+            risk_score=0.4, diversification_score=0.8
+        )
+
+        report = asyncio.run(QualityGate().validate_portfolio_signals(portfolio, QualityLevel.HIGH))
+
+        signal_metrics = [m for m in report.metrics if m.name == "trading_signal_quality"]
+        assert [m.details["symbol"] for m in signal_metrics] == ["035420"]
+        assert signal_metrics[0].status == ValidationResult.FAIL
+        assert {m.name for m in report.metrics} >= {"portfolio_diversification", "portfolio_allocation"}
+        assert report.metadata["signal_count"] == 3
+        assert report.metadata["total_allocation"] == pytest.approx(0.9)
+        assert 0.0 < report.overall_score < 1.0
+
+
+class TestPriceBatchValidation:
+    """가격 시계열 일괄 검증 테스트"""
+
+    def test_detects_gaps_outliers_and_inconsistent_bars(self):
+        """공백/이상치/OHLC 오류 탐지 테스트"""
+        gate = QualityGate()
+        prices = _price_batch(np.array(["A", "B", "C", "D"]))
+        prices.timestamps[0, 30:] += 10 * 86400  # 공백
+        prices.closes[1, 10] = 10_000            # 이상치 (high보다 커서 정합성 오류도 발생)
+        prices.volumes[2, 5] = np.nan            # 결측
+
+        result = gate.data_validator.validate_price_batch(prices, now=NOW)
+
+        assert result.statuses[3] == ValidationResult.PASS.value
+        assert result.components["gaps"][0] == 1
+        assert result.components["inconsistent_bars"][1] == 1
+        assert result.components["outlier_score"][1] < 1.0
+        assert result.components["completeness"][2] == pytest.approx(59 / 60)
+        assert set(result.failures) == {0, 1}
+
+    def test_row_quantiles_match_numpy(self):
+        """행별 분위수가 np.nanpercentile과 일치하는지 테스트"""
+        rng = np.random.default_rng(0)
+        values = rng.normal(size=(20, 40))
+        values[rng.random(values.shape) < 0.2] = np.nan
+
+        expected = np.nanpercentile(values, [25, 75], axis=1)
+        assert np.allclose(_row_quantiles(values, [0.25, 0.75]), expected)
@@ -0,0 +1,109 @@
+"""
+종목 식별자 인덱스 테스트
+유니버스 CSV 로드, 정확 일치/자동완성/부분 일치/유사 종목 추천 검증
+"""
+
+import pytest
+import os
+
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from ai_engine.utils.ticker_converter import TickerConverter, TickerFormat
+from ai_engine.utils.ticker_index import char_ngrams, normalize_key, short_us_name, to_jamo
+
+KR_CSV = """symbol,exchange,name
+000660,KRX,SK하이닉스
+005930,KRX,삼성전자
+005935,KRX,삼성전자우
+009150,KRX,삼성전기
+323410,KRX,카카오뱅크
+035720,KRX,카카오
+032980,KRX,바이온
+289170,KOSDAQ GLOBAL,바이오텐
+"""
+
+US_CSV = """symbol,exchange,name
+AAPL,NASDAQ,Apple Inc. - Common Stock
+AAPL,NYSE,Apple Inc. - Common Stock
+BRK.B,NYSE,Berkshire Hathaway Inc. New Common Stock
+MSFT,NASDAQ,Microsoft Corporation - Common Stock
+NVDA,NASDAQ,NVIDIA Corporation - Common Stock
+TSLA,NASDAQ,"Tesla, Inc.  - Common Stock"
+"""
+
+
+@pytest.fixture
+def converter(tmp_path):
+    (tmp_path / "kr_all.csv").write_text(KR_CSV, encoding="utf-8")
+    (tmp_path / "us_all.csv").write_text(US_CSV, encoding="utf-8")
+    return TickerConverter(universe_dir=tmp_path)
+
+
+class TestTickerIndex:
+    """종목 인덱스 테스트"""
+
+    def test_key_helpers(self):
+        """정규화, 자모 분해, 3-gram, 미국 종목명 축약 테스트"""
+        assert normalize_key(" SK 하이닉스 ") == "sk하이닉스"
+        assert to_jamo("삼성") == "ㅅㅏㅁㅅㅓㅇ"
+        assert char_ngrams("ab") == frozenset(["\x02ab", "ab\x03"])
+        assert short_us_name("Tesla, Inc.  - Common Stock") == "Tesla"
+        assert short_us_name("Bank Of Montreal Common Stock") == "Bank Of Montreal"
+
+    def test_universe_load_keeps_curated_details(self, converter):
+        """유니버스 CSV 로드 시 큐레이션 종목 정보 유지, 중복 심볼 제거 테스트"""
+        index = converter.index
+        # 큐레이션 10종목 + KR 신규 6종목 + US 5종목 (AAPL 중복 제외)
+        assert len(index) == 21
+        assert converter.get_stock_info("005930").sector == "기술주"
+        assert converter.get_stock_info("289170").market == "KOSDAQ"
+        assert converter.convert_to_format("289170", TickerFormat.YFINANCE) == "289170.KQ"
+        # 같은 유니버스 파일이면 인스턴스 간 인덱스 공유
+        assert TickerConverter(universe_dir=converter.universe_dir).index is index
+
+    def test_exact_lookup(self, converter):
+        """코드/이름/심볼 정확 일치 조회 테스트"""
+        assert converter.get_stock_info("카카오").krx_code == "035720"
+        assert converter.get_stock_info("samsung electronics co ltd").krx_code == "005930"
+        assert converter.get_stock_info("AAPL").name_en.startswith("Apple")
+        assert converter.get_stock_info("BRK.B").yfinance_symbol == "BRK-B"
+        assert converter.get_stock_info("brk-b").yfinance_symbol == "BRK-B"
+        assert converter.get_stock_info("없는회사") is None
+
+    def test_autocomplete_matches_partial_syllables(self, converter):
+        """자동완성: 입력 중인 음절, 코드 접두어, 큐레이션 우선 순위 테스트"""
+        assert [s.name_kr for s in converter.autocomplete("삼성", 3)] == ["삼성전자", "삼성바이오로직스", "삼성전기"]
+        assert [s.name_kr for s in converter.autocomplete("삼성ㅈ", 5)] == ["삼성전자", "삼성전기", "삼성전자우"]
+        assert [s.name_kr for s in converter.autocomplete("카카", 5)] == ["카카오", "카카오뱅크"]
+        assert [s.krx_code for s in converter.autocomplete("0059", 5)] == ["005930", "005935"]
+        assert [s.yfinance_symbol for s in converter.autocomplete("ts", 5)] == ["TSLA"]
+
+    def test_search_by_name_is_substring_match(self, converter):
+        """부분 일치 검색: 접두어 일치 우선, 음절 단위 검증 테스트"""
+        assert [s.name_kr for s in converter.search_by_name("바이오")] == ["바이오텐", "삼성바이오로직스"]
+        assert [s.name_kr for s in converter.search_by_name("전자")] == ["삼성전자", "삼성전자우"]
+        assert [s.name_kr for s in converter.search_by_name("뱅크")] == ["카카오뱅크"]
+        assert [s.yfinance_symbol for s in converter.search_by_name("hathaway")] == ["BRK-B"]
+        assert len(converter.search_by_name("삼성", limit=2)) == 2
+
+    def test_suggest_similar_tickers_ranks_by_similarity(self, converter):
+        """오타 입력에 대한 유사 종목 추천 순위 테스트"""
+        suggestions = converter.suggest_similar_tickers("삼숭전자", limit=3)
+        assert suggestions[0][0] == "삼성전자(005930)"
+        assert all(0.3 <= score <= 1.0 for _, score in suggestions)
+        assert [score for _, score in suggestions] == sorted((score for _, score in suggestions), reverse=True)
+
+        assert converter.suggest_similar_tickers("micrsoft", limit=1)[0][0].endswith("(MSFT)")
+        assert converter.suggest_similar_tickers("nvidai", limit=1)[0][0].endswith("(NVDA)")
+        assert converter.suggest_similar_tickers("tesla", limit=1)[0][1] == 1.0
+        assert converter.suggest_similar_tickers("zzzz") == []
+
+    def test_batch_helpers_deduplicate_inputs(self, converter):
+        """일괄 변환/검증에서 중복 티커 처리 테스트"""
+        tickers = ["005930", "005930.KS", "005930", "삼성전자(005930)", "invalid"]
+        results = converter.batch_convert(tickers, TickerFormat.YFINANCE)
+        assert results == {"005930": "005930.KS", "005930.KS": "005930.KS",
+                           "삼성전자(005930)": "005930.KS", "invalid": None}
+        assert converter.validate_ticker_list(["000660.KQ", "12345", "000660.KQ"]) == {
+            "000660.KQ": True, "12345": False}
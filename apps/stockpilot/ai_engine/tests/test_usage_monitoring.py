@@ -0,0 +1,331 @@
+"""
+사용량 모니터링 테스트
+쓰기 버퍼, 배치 저장, 저장 실패 시 재시도, 종료/조회 시 플러시 검증
+"""
+
+import pytest
+import asyncio
+import os
+from datetime import datetime
+
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from ai_engine.config.model_policy import ModelTier
+from ai_engine.config.types import ContentType
+from ai_engine.routing.model_router import ModelRequest, ModelResponse
+from ai_engine.monitoring import usage_tracker as usage_tracking
+from ai_engine.monitoring.usage_tracker import UsageTracker, MetricType, ModelUsageRecord
+from ai_engine.monitoring.sliding_window import SlidingWindowMetric
+
+
+def _make_call(i: int):
+    request = ModelRequest(
+        task_id=f"task_{i}",
+        task_type="sentiment_analysis",
+        content="삼성전자 실적 발표",
+        content_type=ContentType.NEWS_ANALYSIS
+    )
+    response = ModelResponse(
+        content="positive",
+        model_tier=ModelTier.NANO,
+        model_name="gpt-4o-mini",
+        usage={"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+        cost=0.001,
+        processing_time_ms=120.0
+    )
+    return request, response
+
+
+def _make_record(i: int) -> ModelUsageRecord:
+    return ModelUsageRecord(
+        request_id=f"task_{i}",
+        model_name="gpt-4o-mini",
+        model_tier=ModelTier.NANO,
+        task_type="sentiment_analysis",
+        input_tokens=10,
+        output_tokens=5,
+        total_tokens=15,
+        cost=0.001,
+        response_time_ms=100.0 + i,
+        timestamp=datetime.now(),
+        success=True
+    )
+
+
+class TestUsageWriteBuffer:
+    """사용량 쓰기 버퍼 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_records_are_batched(self, tmp_path):
+        """기록이 배치 단위로 저장되는지 테스트"""
+        tracker = UsageTracker(str(tmp_path / "usage.db"), write_buffer_size=50)
+        await tracker.initialize()
+
+        for i in range(200):
+            await tracker.track_model_usage(*_make_call(i))
+
+        await tracker.write_buffer.flush()
+        stats = tracker.write_buffer.get_stats()
+        assert stats["written"] == 200
+        assert stats["batches"] <= 5
+        assert stats["failed"] == 0
+
+        records = await tracker.db.get_usage_records(limit=1000)
+        assert len(records) == 200
+
+        await tracker.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_shutdown_flushes_pending_records(self, tmp_path):
+        """종료 시 남은 기록이 저장되는지 테스트"""
+        tracker = UsageTracker(str(tmp_path / "usage.db"), write_buffer_size=1000)
+        await tracker.initialize()
+
+        for i in range(30):
+            await tracker.track_model_usage(*_make_call(i))
+
+        # 배치 크기/플러시 주기 전이므로 아직 큐에 남아 있음
+        assert tracker.write_buffer.get_stats()["queue_size"] == 30
+
+        await tracker.shutdown()
+        assert not tracker.write_buffer.running
+
+        records = await tracker.db.get_usage_records(limit=1000)
+        assert len(records) == 30
+
+    @pytest.mark.asyncio
+    async def test_backpressure_when_queue_full(self, tmp_path):
+        """큐가 가득 찼을 때 유실 없이 대기하는지 테스트"""
+        tracker = UsageTracker(str(tmp_path / "usage.db"), write_buffer_size=10)
+        tracker.write_buffer._queue = asyncio.Queue(maxsize=20)
+        await tracker.initialize()
+
+        await asyncio.gather(*(tracker.track_model_usage(*_make_call(i)) for i in range(100)))
+        await tracker.shutdown()
+
+        summary = await tracker.get_usage_summary()
+        assert summary["total_requests"] == 100
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_is_requeued_and_retried(self, tmp_path):
+        """일시적인 DB 오류 시 배치가 큐로 돌아가 다음 플러시에 저장되는지 테스트"""
+        tracker = UsageTracker(str(tmp_path / "usage.db"), write_buffer_size=1000)
+        await tracker.initialize()
+        write_batch = tracker.db.write_batch
+        failures = [RuntimeError("database is locked")] * 2
+
+        async def flaky_write_batch(db, records, metrics):
+            if failures:
+                raise failures.pop()
+            await write_batch(db, records, metrics)
+
+        tracker.db.write_batch = flaky_write_batch
+        for i in range(20):
+            await tracker.track_model_usage(*_make_call(i))
+
+        buffer = tracker.write_buffer
+        await buffer.flush()
+        assert buffer.get_stats()["queue_size"] == 20  # 실패한 배치가 유실 없이 큐로 복귀
+        await buffer.flush()
+        await buffer.flush()
+
+        stats = buffer.get_stats()
+        assert stats["requeued"] == 40 and stats["failed"] == 0 and stats["written"] == 20
+        assert len(await tracker.db.get_usage_records(limit=1000)) == 20
+        await tracker.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_batch_dropped_after_retries_is_counted(self, tmp_path):
+        """재시도 한도를 넘긴 배치는 폐기 건수로 집계되고 종료가 끝나는지 테스트"""
+        tracker = UsageTracker(str(tmp_path / "usage.db"), write_buffer_size=1000)
+        await tracker.initialize()
+
+        async def broken_write_batch(db, records, metrics):
+            raise RuntimeError("disk I/O error")
+
+        tracker.db.write_batch = broken_write_batch
+        for i in range(5):
+            await tracker.track_model_usage(*_make_call(i))
+
+        await asyncio.wait_for(tracker.shutdown(), timeout=5)
+        stats = tracker.write_buffer.get_stats()
+        assert stats["failed"] == 5 and stats["queue_size"] == 0
+        assert stats["requeued"] == 5 * tracker.write_buffer.max_write_retries
+
+    @pytest.mark.asyncio
+    async def test_module_level_shutdown_flushes_initialized_tracker(self, tmp_path, monkeypatch):
+        """initialize_usage_tracking이 추적기를 반환하고 shutdown_usage_tracking이 플러시하는지 테스트"""
+        monkeypatch.setattr(usage_tracking, "usage_tracker", usage_tracking.usage_tracker)
+        tracker = await usage_tracking.initialize_usage_tracking(str(tmp_path / "usage.db"))
+        assert tracker is usage_tracking.usage_tracker
+
+        for i in range(3):
+            await tracker.track_model_usage(*_make_call(i))
+        await usage_tracking.shutdown_usage_tracking()
+
+        assert not tracker.write_buffer.running
+        assert len(await tracker.db.get_usage_records(limit=10)) == 3
+
+
+class TestUsageRollups:
+    """사용량 롤업 집계 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_rollups_match_raw_records(self, tmp_path):
+        """롤업 기반 요약이 원본 기록 합계와 일치하는지 테스트"""
+        tracker = UsageTracker(str(tmp_path / "usage.db"), write_buffer_size=25)
+        await tracker.initialize()
+
+        for i in range(60):
+            await tracker.track_model_usage(*_make_call(i), cache_hit=(i % 3 == 0))
+
+        summary = await tracker.get_usage_summary()
+        assert summary["total_requests"] == 60
+        assert summary["total_tokens"] == 60 * 15
+        assert summary["total_cost"] == pytest.approx(0.06)
+        assert summary["cache_hit_rate"] == pytest.approx(20 / 60)
+        assert summary["model_breakdown"]["gpt-4o-mini"]["requests"] == 60
+        assert sum(summary["hourly_distribution"].values()) == 60
+
+        analysis = await tracker.get_cost_analysis(days=7)
+        assert analysis["total_cost"] == pytest.approx(0.06)
+        assert len(analysis["expensive_requests"]) == 10
+
+        await tracker.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_tracker_reads_include_buffered_records(self, tmp_path):
+        """추적기 롤업/기록 조회가 버퍼에 남은 기록까지 반영하는지 테스트"""
+        tracker = UsageTracker(str(tmp_path / "usage.db"), write_buffer_size=1000)
+        await tracker.initialize()
+
+        for i in range(30):
+            await tracker.track_model_usage(*_make_call(i))
+        assert tracker.write_buffer.get_stats()["queue_size"] > 0
+
+        totals = (await tracker.get_rollups("hour"))[0]
+        assert totals["requests"] == 30
+        assert tracker.write_buffer.get_stats()["queue_size"] == 0
+
+        await tracker.track_model_usage(*_make_call(30))
+        assert len(await tracker.get_usage_records(model_name="gpt-4o-mini")) == 31
+
+        await tracker.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_rebuild_rollups_from_raw(self, tmp_path):
+        """원본 기록으로 롤업 재구축(백필) 테스트"""
+        tracker = UsageTracker(str(tmp_path / "usage.db"))
+        await tracker.initialize()
+
+        for i in range(40):
+            await tracker.track_model_usage(*_make_call(i))
+        await tracker.shutdown()
+
+        before = await tracker.db.get_rollups("minute", group_by=("bucket_start", "model_name"))
+        rows = await tracker.db.rebuild_rollups()
+        after = await tracker.db.get_rollups("minute", group_by=("bucket_start", "model_name"))
+
+        assert rows > 0
+        assert [r["requests"] for r in after] == [r["requests"] for r in before]
+        assert sum(r["cost"] for r in after) == pytest.approx(sum(r["cost"] for r in before))
+
+    @pytest.mark.asyncio
+    async def test_rollup_query_rejects_unknown_dimension(self, tmp_path):
+        """허용되지 않은 집계 차원 거부 테스트"""
+        tracker = UsageTracker(str(tmp_path / "usage.db"))
+        await tracker.db.initialize()
+
+        with pytest.raises(ValueError):
+            await tracker.db.get_rollups("day", group_by=("cost; DROP TABLE usage_records",))
+
+
+class _FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestSlidingWindowMetric:
+    """슬라이딩 윈도우 메트릭 테스트"""
+
+    def test_running_aggregates(self):
+        """합계/평균/최소/최대 누적값 테스트"""
+        clock = _FakeClock()
+        window = SlidingWindowMetric(window_seconds=60, bucket_seconds=1, clock=clock)
+
+        for value in [5, 3, 8, 1, 9, 2]:
+            window.add(value)
+            clock.now += 0.5
+
+        stats = window.snapshot()
+        assert stats["count"] == 6
+        assert stats["sum"] == 28
+        assert stats["min"] == 1
+        assert stats["max"] == 9
+        assert stats["current"] == 2
+
+    def test_expired_buckets_are_evicted(self):
+        """윈도우를 벗어난 값이 제외되는지 테스트"""
+        clock = _FakeClock()
+        window = SlidingWindowMetric(window_seconds=10, bucket_seconds=1, clock=clock)
+
+        window.add(100)  # 가장 큰 값이 먼저 만료되어야 함
+        clock.now += 5
+        window.add(10)
+        window.add(20)
+
+        assert window.snapshot()["max"] == 100
+
+        clock.now += 6  # 첫 값만 윈도우 밖으로
+        stats = window.snapshot()
+        assert stats["count"] == 2
+        assert stats["max"] == 20
+        assert stats["min"] == 10
+
+        clock.now += 3600  # 전체 만료
+        assert window.snapshot() == {}
+        assert window.count == 0
+
+    def test_percentiles_are_approximate(self):
+        """로그 히스토그램 백분위수 정확도 테스트"""
+        clock = _FakeClock()
+        window = SlidingWindowMetric(window_seconds=3600, bucket_seconds=10, clock=clock)
+
+        for i in range(1, 10001):
+            window.add(float(i))
+            clock.now += 0.1
+
+        p = window.percentiles()
+        assert p["p50"] == pytest.approx(5000, rel=0.03)
+        assert p["p95"] == pytest.approx(9500, rel=0.03)
+        assert p["p99"] == pytest.approx(9900, rel=0.03)
+
+    def test_memory_is_bounded(self):
+        """값 개수와 무관하게 덱 크기가 구간 수 이하인지 테스트"""
+        clock = _FakeClock()
+        window = SlidingWindowMetric(window_seconds=60, bucket_seconds=1, clock=clock)
+
+        for i in range(20000):
+            window.add(float(i))  # 단조 증가 - 최소 덱 최악의 경우
+            clock.now += 0.01
+
+        assert len(window._min_deque) <= window.num_buckets
+        assert len(window._max_deque) <= window.num_buckets
+
+    @pytest.mark.asyncio
+    async def test_real_time_stats_include_model_latency(self, tmp_path):
+        """실시간 통계에 모델별 지연 백분위수가 포함되는지 테스트"""
+        tracker = UsageTracker(str(tmp_path / "usage.db"))
+
+        for i in range(50):
+            await tracker._update_real_time_metrics(_make_record(i))
+
+        stats = await tracker.get_real_time_stats()
+        assert stats[MetricType.REQUEST_COUNT.value]["count_1h"] == 50
+        assert "p99_1h" in stats[MetricType.RESPONSE_TIME.value]
+        assert stats["model_latency"]["gpt-4o-mini"]["count_1h"] == 50
+
@@ -10,8 +10,11 @@ from dataclasses import dataclass
 from enum import Enum
 import json
 import csv
+from functools import lru_cache
 from pathlib import Path
 
+from .ticker_index import TickerIndex, default_universe_dir, get_ticker_index
+
 logger = logging.getLogger(__name__)
 
 class TickerFormat(Enum):
@@ -59,9 +62,13 @@ class StockTicker:
 class TickerConverter:
     """한국 주식 티커 변환기"""
     
-    def __init__(self):
-        # 주요 종목 데이터베이스 (실제로는 외부 파일에서 로드)
+    def __init__(self, universe_dir: Optional[Path] = None):
+        # 상세 정보가 있는 주요 종목 (전 종목 유니버스는 index에서 지연 로드)
         self.ticker_database = self._initialize_ticker_database()
+        self.universe_dir = universe_dir if universe_dir is not None else default_universe_dir()
+        self._index: Optional[TickerIndex] = None
+        # 형식 감지 + 정규식 추출 결과 메모 (배치 변환/검증에서 같은 티커 반복)
+        self._extract_cached = lru_cache(maxsize=65536)(self._extract_krx_code_slow)
         
         # 시장별 접미사 매핑
         self.market_suffixes = {
@@ -203,6 +210,13 @@ class TickerConverter:
         
         return major_stocks
     
+    @property
+    def index(self) -> TickerIndex:
+        """전 종목 인덱스 (첫 조회 시 빌드, 유니버스 파일이 같으면 인스턴스 간 공유)"""
+        if self._index is None:
+            self._index = get_ticker_index(self.universe_dir, StockTicker, self.ticker_database)
+        return self._index
+
     def detect_format(self, ticker_string: str) -> TickerFormat:
         """티커 형식 자동 감지"""
         if not ticker_string:
@@ -243,6 +257,17 @@ class TickerConverter:
             return None
         
         ticker_string = ticker_string.strip()
+        # 흔한 두 형식(005930, 005930.KS)은 정규식 없이 바로 처리
+        if ticker_string.isascii():
+            if len(ticker_string) == 6 and ticker_string.isdigit():
+                return ticker_string
+            if (len(ticker_string) == 9 and ticker_string[6] == "." and ticker_string[:6].isdigit()
+                    and ticker_string[7:] in ("KS", "KQ", "KN")):
+                return ticker_string[:6]
+        return self._extract_cached(ticker_string)
+    
+    def _extract_krx_code_slow(self, ticker_string: str) -> Optional[str]:
+        """형식 감지 후 정규식으로 KRX 코드 추출"""
         ticker_format = self.detect_format(ticker_string)
         
         if ticker_format == TickerFormat.KRX_CODE:
@@ -327,37 +352,30 @@ class TickerConverter:
     
     def get_stock_info(self, identifier: str) -> Optional[StockTicker]:
         """종목 정보 조회 (코드 또는 이름으로)"""
+        if not identifier:
+            return None
+        
         # KRX 코드로 직접 조회
         krx_code = self.extract_krx_code(identifier)
-        if krx_code and krx_code in self.ticker_database:
-            return self.ticker_database[krx_code]
-        
-        # 종목명으로 검색
-        identifier_lower = identifier.lower().strip()
-        for stock in self.ticker_database.values():
-            if (stock.name_kr.lower() == identifier_lower or 
-                (stock.name_en and stock.name_en.lower() == identifier_lower)):
-                return stock
+        if krx_code and krx_code in self.index.by_code:
+            return self.index.by_code[krx_code]
         
-        return None
+        # 종목명/심볼 정확 일치
+        return self.index.lookup(identifier)
     
     def search_by_name(self, query: str, limit: int = 10) -> List[StockTicker]:
-        """종목명으로 검색 (부분 일치)"""
+        """종목명으로 검색 (부분 일치, 접두어 일치 우선)"""
         if not query:
             return []
         
-        query_lower = query.lower().strip()
-        results = []
+        return self.index.search(query, limit)
+    
+    def autocomplete(self, prefix: str, limit: int = 10) -> List[StockTicker]:
+        """종목명/코드 자동완성 (입력 중인 한글 음절 포함)"""
+        if not prefix:
+            return []
         
-        for stock in self.ticker_database.values():
-            # 한글명 검색
-            if query_lower in stock.name_kr.lower():
-                results.append(stock)
-            # 영문명 검색
-            elif stock.name_en and query_lower in stock.name_en.lower():
-                results.append(stock)
-        
-        return results[:limit]
+        return self.index.autocomplete(prefix, limit)
     
     def get_market_info(self, ticker: str) -> Dict[str, Any]:
         """시장 정보 반환"""
@@ -385,7 +403,7 @@ class TickerConverter:
         """일괄 변환"""
         results = {}
         
-        for ticker in tickers:
+        for ticker in dict.fromkeys(tickers):
             try:
                 converted = self.convert_to_format(ticker, target_format)
                 results[ticker] = converted
@@ -399,7 +417,7 @@ class TickerConverter:
         """티커 목록 유효성 검증"""
         results = {}
         
-        for ticker in tickers:
+        for ticker in dict.fromkeys(tickers):
             try:
                 krx_code = self.extract_krx_code(ticker)
                 results[ticker] = krx_code is not None and self.validate_krx_code(krx_code)
@@ -409,43 +427,14 @@ class TickerConverter:
         return results
     
     def suggest_similar_tickers(self, query: str, limit: int = 5) -> List[Tuple[str, float]]:
-        """유사한 종목 추천 (간단한 문자열 유사도 기반)"""
+        """유사한 종목 추천 (자모 3-gram Dice 유사도)"""
         if not query:
             return []
         
-        suggestions = []
-        query_lower = query.lower().strip()
-        
-        for stock in self.ticker_database.values():
-            # 한글명 유사도
-            kr_similarity = self._calculate_similarity(query_lower, stock.name_kr.lower())
-            if kr_similarity > 0.3:  # 임계값
-                suggestions.append((f"{stock.name_kr}({stock.krx_code})", kr_similarity))
-            
-            # 영문명 유사도 (있는 경우)
-            if stock.name_en:
-                en_similarity = self._calculate_similarity(query_lower, stock.name_en.lower())
-                if en_similarity > 0.3:
-                    suggestions.append((f"{stock.name_en}({stock.krx_code})", en_similarity))
-        
-        # 유사도 순 정렬
-        suggestions.sort(key=lambda x: x[1], reverse=True)
-        return suggestions[:limit]
-    
-    def _calculate_similarity(self, str1: str, str2: str) -> float:
-        """간단한 문자열 유사도 계산 (Jaccard 유사도)"""
-        if not str1 or not str2:
-            return 0.0
-        
-        # 문자 단위 집합으로 변환
-        set1 = set(str1)
-        set2 = set(str2)
-        
-        # Jaccard 유사도: 교집합 / 합집합
-        intersection = len(set1 & set2)
-        union = len(set1 | set2)
-        
-        return intersection / union if union > 0 else 0.0
+        return [
+            (f"{name}({stock.krx_code or stock.yfinance_symbol})", similarity)
+            for stock, name, similarity in self.index.suggest(query, limit=limit, threshold=0.3)
+        ]
     
     def export_ticker_mapping(self, format: str = "json") -> str:
         """티커 매핑 정보 내보내기"""
@@ -508,7 +497,7 @@ def search_stock(query: str, limit: int = 10) -> List[Dict[str, Any]]:
     stocks = ticker_converter.search_by_name(query, limit)
     return [
         {
-            "code": stock.krx_code,
+            "code": stock.krx_code or stock.yfinance_symbol,
             "name_kr": stock.name_kr,
             "name_en": stock.name_en,
             "market": stock.market,
@@ -0,0 +1,346 @@
+"""
+종목 식별자 인덱스 - 전 종목 유니버스(ALL:KR / ALL:US)에 대한 사전 계산 조회 구조
+정확 일치 맵(KRX 코드, yfinance 심볼, 한글명, 영문명), 자모 단위 접두어 인덱스(자동완성),
+자모 분해 문자 3-gram 역색인(부분 일치 검색, 유사 종목 추천)을 한 번 빌드해 재사용
+"""
+
+import bisect
+import csv
+import heapq
+import logging
+import os
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 한글 음절 → 호환 자모 (사용자가 입력 중인 "삼성ㅈ" 같은 미완성 음절도 같은 공간에서 비교)
+_CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_JUNGSEONG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+_JONGSEONG = ["", "ㄱ", "ㄲ", "ㄳ", "ㄴ", "ㄵ", "ㄶ", "ㄷ", "ㄹ", "ㄺ", "ㄻ", "ㄼ", "ㄽ", "ㄾ", "ㄿ", "ㅀ",
+              "ㅁ", "ㅂ", "ㅄ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"]
+_JAMO_TABLE = {
+    0xAC00 + index: _CHOSEONG[index // 588] + _JUNGSEONG[(index % 588) // 28] + _JONGSEONG[index % 28]
+    for index in range(11172)
+}
+
+_KEY_DROP_PATTERN = re.compile(r"[^0-9a-z&가-힣ㄱ-ㅣ]+")
+# 미국 종목명 뒤의 증권 종류 설명 ("Apple Inc. Common Stock" → "Apple Inc.")
+_US_SECURITY_TAIL = re.compile(
+    r"[\s,\-]*(\bclass [a-z]\b\s*)?\b(common stock|common shares|ordinary shares?|american depositary shares?"
+    r"|depositary shares?|shares of beneficial interest|units?|warrants?)\b.*$",
+    re.IGNORECASE)
+# 법인 형태 접미사 ("Tesla, Inc." → "Tesla") - 유사도가 회사명 자체로 계산되도록
+_US_CORP_TAIL = re.compile(
+    r"[\s,]+(inc\.?|incorporated|corp\.?|corporation|co\.?|company|ltd\.?|limited|plc|n\.v\.|s\.a\.|\(the\))$",
+    re.IGNORECASE)
+
+_GRAM_SIZE = 3
+_START, _END = "\x02", "\x03"
+
+_KR_MARKETS = {"KRX": "KOSPI", "KOSPI": "KOSPI", "KOSDAQ": "KOSDAQ", "KOSDAQ GLOBAL": "KOSDAQ", "KONEX": "KONEX"}
+
+
+def normalize_key(text: str) -> str:
+    """조회 키 정규화 (NFC, 소문자, 공백/구두점 제거)"""
+    if not text:
+        return ""
+    return _KEY_DROP_PATTERN.sub("", unicodedata.normalize("NFC", text).lower())
+
+
+def to_jamo(text: str) -> str:
+    """한글 음절을 호환 자모로 분해 (그 외 문자는 그대로)"""
+    return text.translate(_JAMO_TABLE)
+
+
+def char_ngrams(jamo_key: str) -> FrozenSet[str]:
+    """양 끝 경계 표시를 붙인 문자 3-gram 집합"""
+    padded = _START + jamo_key + _END
+    if len(padded) <= _GRAM_SIZE:
+        return frozenset([padded])
+    return frozenset(padded[i:i + _GRAM_SIZE] for i in range(len(padded) - _GRAM_SIZE + 1))
+
+
+def _inner_ngrams(jamo_key: str) -> FrozenSet[str]:
+    """부분 문자열 검색용 (경계 표시 없는) 3-gram 집합"""
+    return frozenset(jamo_key[i:i + _GRAM_SIZE] for i in range(len(jamo_key) - _GRAM_SIZE + 1))
+
+
+def short_us_name(name: str) -> str:
+    """미국 종목명에서 증권 종류 설명과 법인 형태 접미사 제거"""
+    short = _US_SECURITY_TAIL.sub("", name).strip(" ,-")
+    while True:
+        stripped = _US_CORP_TAIL.sub("", short).strip(" ,-")
+        if stripped == short:
+            break
+        short = stripped
+    return short or name
+
+
+def yfinance_us_symbol(symbol: str) -> str:
+    """나스닥 심볼 → yfinance 심볼 (클래스 주식 구분자 '.'은 '-')"""
+    return symbol.replace(".", "-")
+
+
+class TickerIndex:
+    """
+    종목 식별자 인덱스
+
+    entries는 StockTicker 객체 목록이며, 하나의 종목은 여러 이름 키(한글명, 영문명, 심볼)를 가짐.
+    모든 조회 결과는 entries의 원소를 그대로 반환
+    """
+
+    def __init__(self, entries: Iterable, curated_codes: Iterable[str] = ()):
+        self.entries = list(entries)
+        curated = set(curated_codes)
+
+        # 정확 일치 맵
+        self.by_code: Dict[str, object] = {}
+        self.by_symbol: Dict[str, object] = {}
+        self.by_name_kr: Dict[str, object] = {}
+        self.by_name_en: Dict[str, object] = {}
+
+        # 이름 키 (종목 id, 표시명, 3-gram 집합, 정렬 순위)
+        self._key_entry: List[int] = []
+        self._key_label: List[str] = []
+        self._key_grams: List[FrozenSet[str]] = []
+        self._key_rank: List[int] = []
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+
+        prefix_keys: List[Tuple[str, int]] = []
+        for entry_id, entry in enumerate(self.entries):
+            # 큐레이션된 종목을 우선, 그 다음 짧은 이름 순
+            base_rank = 0 if entry.krx_code in curated else 1_000
+
+            if entry.krx_code:
+                self.by_code.setdefault(entry.krx_code, entry)
+            if entry.yfinance_symbol:
+                self.by_symbol.setdefault(entry.yfinance_symbol.upper(), entry)
+            code = self._code_of(entry)
+            if code:
+                self.by_symbol.setdefault(code.upper(), entry)
+                key_id = self._add_key(entry_id, entry.name_kr or entry.name_en or code, "", base_rank + len(code))
+                prefix_keys.append((normalize_key(code), key_id))
+
+            for name, exact_map, search_name in (
+                    (entry.name_kr, self.by_name_kr, entry.name_kr),
+                    (entry.name_en, self.by_name_en,
+                     short_us_name(entry.name_en) if entry.name_en and not entry.krx_code else entry.name_en)):
+                key = normalize_key(name)
+                if not key:
+                    continue
+                exact_map.setdefault(key, entry)
+                search_key = normalize_key(search_name) or key
+                jamo_key = to_jamo(search_key)
+                key_id = self._add_key(entry_id, name, jamo_key, base_rank + min(len(search_key), 999))
+                for gram in self._key_grams[key_id]:
+                    self._postings[gram].append(key_id)
+                prefix_keys.append((jamo_key, key_id))
+
+        prefix_keys.sort()
+        self._prefix_keys = [key for key, _ in prefix_keys]
+        self._prefix_ids = [key_id for _, key_id in prefix_keys]
+        # 흔한 3-gram("com", "ㅈㅜㅅ" 등)은 후보 생성에서 빼고 최종 점수 계산에만 사용
+        self._max_df = max(64, len(self._key_entry) // 50)
+        logger.info(f"종목 인덱스 빌드: 종목 {len(self.entries):,}개, 이름 키 {len(self._key_entry):,}개, "
+                    f"3-gram {len(self._postings):,}개")
+
+    @staticmethod
+    def _code_of(entry) -> str:
+        # 한국 종목은 KRX 코드, 미국 종목은 원래 심볼(BRK.B)로 자동완성
+        if entry.krx_code:
+            return entry.krx_code
+        return entry.yfinance_symbol.replace("-", ".") if entry.yfinance_symbol else ""
+
+    def _add_key(self, entry_id: int, label: str, jamo_key: str, rank: int) -> int:
+        self._key_entry.append(entry_id)
+        self._key_label.append(label)
+        self._key_grams.append(char_ngrams(jamo_key) if jamo_key else frozenset())
+        self._key_rank.append(rank)
+        return len(self._key_entry) - 1
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    # ---------- 정확 일치 ----------
+    def lookup(self, identifier: str):
+        """KRX 코드 → 한글명 → 영문명 → 심볼 순으로 정확 일치 조회"""
+        if not identifier:
+            return None
+        identifier = identifier.strip()
+        entry = self.by_code.get(identifier)
+        if entry is not None:
+            return entry
+        key = normalize_key(identifier)
+        return (self.by_name_kr.get(key) or self.by_name_en.get(key)
+                or self.by_symbol.get(identifier.upper()))
+
+    # ---------- 접두어 (자동완성) ----------
+    def _unique_entries(self, key_ids: Iterable[int], limit: int) -> List:
+        results, seen = [], set()
+        for key_id in key_ids:
+            entry_id = self._key_entry[key_id]
+            if entry_id not in seen:
+                seen.add(entry_id)
+                results.append(self.entries[entry_id])
+                if len(results) >= limit:
+                    break
+        return results
+
+    def _prefix_range(self, jamo_prefix: str) -> Tuple[int, int]:
+        low = bisect.bisect_left(self._prefix_keys, jamo_prefix)
+        high = bisect.bisect_left(self._prefix_keys, jamo_prefix + "\U0010ffff", low)
+        return low, high
+
+    def autocomplete(self, prefix: str, limit: int = 10) -> List:
+        """이름/심볼 접두어 자동완성 (자모 단위라 입력 중인 음절도 매칭)"""
+        jamo_prefix = to_jamo(normalize_key(prefix))
+        if not jamo_prefix or limit <= 0:
+            return []
+        low, high = self._prefix_range(jamo_prefix)
+        key_ids = heapq.nsmallest(limit * 3, self._prefix_ids[low:high], key=self._key_rank.__getitem__)
+        return self._unique_entries(key_ids, limit)
+
+    # ---------- 부분 일치 ----------
+    def search(self, query: str, limit: int = 10) -> List:
+        """이름 부분 일치 검색. 접두어 일치를 먼저, 그 다음 중간 일치를 짧은 이름 순으로"""
+        key = normalize_key(query)
+        if not key or limit <= 0:
+            return []
+        # 접두어 결과 중 음절 단위로도 포함하는 것만 ("바이오"에 "바이온"은 제외)
+        results = [entry for entry in self.autocomplete(key, limit * 2) if self._contains(entry, key)][:limit]
+        grams = _inner_ngrams(to_jamo(key))
+        if len(results) >= limit or not grams:
+            return results
+
+        # 3-gram 포스팅 교집합 (짧은 목록부터) 후 원문으로 검증
+        postings = sorted((self._postings.get(gram, ()) for gram in grams), key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(posting)
+        matched = sorted((key_id for key_id in candidates if key in normalize_key(self._key_label[key_id])),
+                         key=self._key_rank.__getitem__)
+
+        seen = {id(entry) for entry in results}
+        for entry in self._unique_entries(matched, limit):
+            if id(entry) not in seen:
+                seen.add(id(entry))
+                results.append(entry)
+                if len(results) >= limit:
+                    break
+        return results
+
+    def _contains(self, entry, key: str) -> bool:
+        return any(key in normalize_key(text) for text in (entry.name_kr, entry.name_en, self._code_of(entry)))
+
+    # ---------- 유사 검색 ----------
+    def suggest(self, query: str, limit: int = 5, threshold: float = 0.3,
+                candidates: int = 100) -> List[Tuple[object, str, float]]:
+        """
+        자모 3-gram Dice 유사도 기반 유사 종목 (종목, 일치한 이름, 점수)
+
+        희소한 3-gram의 포스팅으로 후보를 모은 뒤, 후보만 전체 3-gram 집합으로 정확히 채점
+        """
+        key = normalize_key(query)
+        if not key or limit <= 0:
+            return []
+        query_grams = char_ngrams(to_jamo(key))
+        ranked_grams = sorted(query_grams, key=lambda gram: len(self._postings.get(gram, ())))
+        selective = [gram for gram in ranked_grams if len(self._postings.get(gram, ())) <= self._max_df]
+        if not selective:
+            selective = ranked_grams[:1]
+
+        hits: Dict[int, int] = defaultdict(int)
+        for gram in selective:
+            for key_id in self._postings.get(gram, ()):
+                hits[key_id] += 1
+        shortlist = heapq.nlargest(candidates, hits, key=hits.__getitem__)
+
+        best: Dict[int, Tuple[float, int]] = {}
+        query_size = len(query_grams)
+        for key_id in shortlist:
+            target = self._key_grams[key_id]
+            score = 2 * len(query_grams & target) / (query_size + len(target))
+            entry_id = self._key_entry[key_id]
+            if score >= threshold and score > best.get(entry_id, (0.0, -1))[0]:
+                best[entry_id] = (score, key_id)
+
+        ordered = sorted(best.items(), key=lambda item: (-item[1][0], self._key_rank[item[1][1]]))[:limit]
+        return [(self.entries[entry_id], self._key_label[key_id], round(score, 4))
+                for entry_id, (score, key_id) in ordered]
+
+
+# ---------- 유니버스 로드 ----------
+def default_universe_dir() -> Optional[Path]:
+    """TICKER_UNIVERSE_DIR 또는 상위 디렉터리의 data/universe (scripts/universe_sync.sh 출력 위치)"""
+    configured = os.getenv("TICKER_UNIVERSE_DIR")
+    if configured:
+        return Path(configured)
+    for parent in Path(__file__).resolve().parents:
+        candidate = parent / "data" / "universe"
+        if candidate.is_dir():
+            return candidate
+    return None
+
+
+def _read_universe_csv(path: Path) -> List[Tuple[str, str, str]]:
+    """resolve_universe.py와 같은 형식 (symbol,exchange,name), 심볼 기준 첫 행만"""
+    rows, seen = [], set()
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for row in reader:
+            if len(row) != 3 or not row[0] or row[0] in seen:
+                continue
+            seen.add(row[0])
+            rows.append((row[0].strip(), row[1].strip(), row[2].strip()))
+    return rows
+
+
+def load_universe_entries(universe_dir: Optional[Path], stock_cls, curated: Dict[str, object]) -> List:
+    """kr_all.csv / us_all.csv → StockTicker 목록 (큐레이션 종목은 상세 정보 유지)"""
+    entries = list(curated.values())
+    if universe_dir is None:
+        return entries
+
+    kr_path, us_path = Path(universe_dir) / "kr_all.csv", Path(universe_dir) / "us_all.csv"
+    if kr_path.exists():
+        for symbol, exchange, name in _read_universe_csv(kr_path):
+            if symbol in curated or not re.fullmatch(r"\d{6}", symbol):
+                continue
+            entries.append(stock_cls(krx_code=symbol, name_kr=name,
+                                     market=_KR_MARKETS.get(exchange.upper(), "KOSPI")))
+    if us_path.exists():
+        for symbol, exchange, name in _read_universe_csv(us_path):
+            entries.append(stock_cls(krx_code="", name_kr="", name_en=name, market=exchange,
+                                     yfinance_symbol=yfinance_us_symbol(symbol),
+                                     is_etf="ETF" in name.split()))
+    return entries
+
+
+_index_cache: Dict[Tuple, TickerIndex] = {}
+_index_lock = threading.Lock()
+
+
+def get_ticker_index(universe_dir: Optional[Path], stock_cls, curated: Dict[str, object]) -> TickerIndex:
+    """유니버스 파일의 수정 시각 기준으로 캐시된 인덱스 반환 (파일이 바뀌면 재빌드)"""
+    stamps = []
+    if universe_dir is not None:
+        for name in ("kr_all.csv", "us_all.csv"):
+            path = Path(universe_dir) / name
+            stamps.append(path.stat().st_mtime_ns if path.exists() else None)
+    cache_key = (str(universe_dir), tuple(stamps), tuple(sorted(curated)))
+
+    with _index_lock:
+        index = _index_cache.get(cache_key)
+        if index is None:
+            index = TickerIndex(load_universe_entries(universe_dir, stock_cls, curated), curated_codes=curated)
+            _index_cache.clear()
+            _index_cache[cache_key] = index
+        return index
@@ -64,6 +64,7 @@ class LockStatusResponse(BaseModel):
     lock_exists: bool
     lock_age_hours: Optional[float] = None
     is_expired: bool = False
+    owner: Optional[str] = None
 
 
 class ForceReleaseRequest(BaseModel):
@@ -378,6 +379,25 @@ async def get_recent_executions(
         raise HTTPException(status_code=500, detail=f"실행 이력 조회 실패: {str(e)}")
 
 
+@router.get("/runs/recent")
+async def get_recent_batch_runs(
+    limit: int = Query(default=20, ge=1, le=200, description="조회할 배치 실행 수")
+):
+    """최근 일일 배치 실행 리포트 (전체 소요 시간, 임계 경로)"""
+    try:
+        batch_manager = get_batch_manager()
+        runs = batch_manager.get_recent_batch_runs(limit)
+        
+        return {
+            "runs": runs,
+            "total_count": len(runs),
+            "limit": limit
+        }
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"배치 실행 리포트 조회 실패: {str(e)}")
+
+
 @router.get("/executions/stats", response_model=ExecutionStatsResponse)
 async def get_execution_stats(
     job_id: Optional[str] = Query(default=None, description="특정 작업 ID (선택)"),
@@ -400,23 +420,14 @@ async def get_lock_status(job_id: str):
     try:
         batch_manager = get_batch_manager()
         
-        # 오늘 날짜의 잠금 파일 확인
-        today = datetime.now().strftime("%Y-%m-%d")
-        lock_file = batch_manager.lock_dir / f"{job_id}_{today}.lock"
-        
-        lock_exists = lock_file.exists()
-        lock_age_hours = None
-        is_expired = False
-        
-        if lock_exists:
-            lock_age_hours = (datetime.now().timestamp() - lock_file.stat().st_mtime) / 3600
-            is_expired = lock_age_hours > 24  # 24시간 초과시 만료
+        lock_info = batch_manager.get_lock_info(job_id)
         
         return LockStatusResponse(
             job_id=job_id,
-            lock_exists=lock_exists,
-            lock_age_hours=lock_age_hours,
-            is_expired=is_expired
+            lock_exists=lock_info is not None,
+            lock_age_hours=lock_info["age_hours"] if lock_info else None,
+            is_expired=lock_info["is_expired"] if lock_info else False,
+            owner=lock_info["owner"] if lock_info else None
         )
         
     except Exception as e:
@@ -1,6 +1,7 @@
 """
 배치 작업 관리자
 일일 배치 작업의 실행, 중복 방지, 오류 처리 관리
+의존성 그래프(DAG) 기반 병렬 실행, SQLite 임대 잠금, 재실행 체크포인트
 """
 
 import asyncio
@@ -9,16 +10,16 @@ import hashlib
 import uuid
 import psutil
 import os
+import socket
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Callable, Any
 from dataclasses import dataclass, field
 from enum import Enum
-from pathlib import Path
-import json
-import fcntl
 from loguru import logger
 
 from app.config import get_settings
+from utils.job_dag import ResourcePool, critical_path, run_dag
+from utils.job_state_store import JobStateStore
 
 settings = get_settings()
 
@@ -54,7 +55,7 @@ class JobExecution:
     retry_count: int = 0
     max_retries: int = 3
     result: Optional[Dict[str, Any]] = None
-    lock_file_path: Optional[str] = None
+    lease_owner: Optional[str] = None  # 임대 잠금 소유자
     # 추가 모니터링 메트릭스
     execution_id: str = field(default_factory=lambda: str(uuid.uuid4()))
     items_processed: Optional[int] = None
@@ -77,6 +78,7 @@ class BatchJob:
     timeout: int = 3600  # 1시간 기본 타임아웃
     dependencies: List[str] = field(default_factory=list)
     enabled: bool = True
+    resource_class: str = "io"  # 동시 실행 제한 자원 클래스 (io/cpu/api_quota)
     cron_expression: Optional[str] = None  # 향후 cron 지원용
 
 
@@ -103,18 +105,27 @@ class LoggerBatchAlertHook(BatchAlertHook):
 class BatchManager:
     """배치 작업 관리자 - 중복 실행 방지 및 강화된 오류 처리"""
     
-    def __init__(self, lock_dir: str = "/tmp/stockpilot_locks"):
+    def __init__(self,
+                 state_db_path: Optional[str] = None,
+                 max_workers: int = 5,
+                 resource_limits: Optional[Dict[str, int]] = None):
         self.jobs: Dict[str, BatchJob] = {}
         self.executions: Dict[str, JobExecution] = {}
-        self.lock_dir = Path(lock_dir)
-        self.lock_dir.mkdir(parents=True, exist_ok=True)
-        
+
+        # 잠금(임대)/체크포인트/배치 실행 이력 저장소
+        self.state_db_path = state_db_path or os.getenv("BATCH_STATE_DB", "data/batch_state.db")
+        self.state_store = JobStateStore(self.state_db_path)
+        self.lease_margin_seconds = 60  # 작업 타임아웃 이후 임대 유지 여유
+        self.lock_expiry_hours = 24  # 이 시간보다 오래 유지된 임대는 만료로 간주
+
         # 실행 통계
         self.daily_stats: Dict[str, Dict[str, int]] = {}
-        
-        # 동시 실행 제한
-        self.max_concurrent_jobs = 5
+
+        # 동시 실행 제한 (전체 워커 수 + 자원 클래스별 한도)
+        self.max_concurrent_jobs = max_workers
+        self.resource_pool = ResourcePool(max_workers, resource_limits)
         self.running_jobs = set()
+        self.last_batch_report: Optional[Dict[str, Any]] = None
         
         # 오류 임계치
         self.error_threshold = 0.3  # 30% 실패율 초과 시 알림
@@ -125,19 +136,23 @@ class BatchManager:
         self.alert_hooks: List[BatchAlertHook] = [LoggerBatchAlertHook()]
         self.process_monitor = psutil.Process()
         
-        logger.info(f"배치 관리자 초기화 완료, 잠금 디렉토리: {self.lock_dir}")
+        logger.info(
+            f"배치 관리자 초기화 완료, 상태 DB: {self.state_db_path}, "
+            f"워커: {max_workers}, 자원 한도: {self.resource_pool.resource_limits}"
+        )
     
     def register_job(self, job: BatchJob):
         """배치 작업 등록"""
         self.jobs[job.job_id] = job
         logger.info(f"배치 작업 등록: {job.name} ({job.job_id})")
     
-    async def execute_job(self, job_id: str, force: bool = False) -> JobExecution:
+    async def execute_job(self, job_id: str, force: bool = False, run_date: Optional[str] = None) -> JobExecution:
         """배치 작업 실행 - 중복 방지 및 강화된 오류 처리"""
         if job_id not in self.jobs:
             raise ValueError(f"등록되지 않은 작업: {job_id}")
         
         job = self.jobs[job_id]
+        run_date = run_date or datetime.now().strftime("%Y-%m-%d")
         execution = JobExecution(
             job_id=job_id,
             job_name=job.name,
@@ -152,7 +167,7 @@ class BatchManager:
             return execution
         
         # 중복 실행 방지 잠금 획득
-        lock_acquired = await self._acquire_lock(job_id, execution)
+        lock_acquired = await self._acquire_lock(job, execution)
         if not lock_acquired:
             execution.status = JobStatus.SKIPPED
             execution.error_message = "이미 실행 중인 작업"
@@ -161,48 +176,54 @@ class BatchManager:
         
         try:
             # 의존성 체크
-            if not await self._check_dependencies(job):
+            if not await self._check_dependencies(job, run_date):
                 execution.status = JobStatus.FAILED
                 execution.error_message = "의존성 작업 실패"
                 return execution
             
-            # 동시 실행 제한 체크
-            while len(self.running_jobs) >= self.max_concurrent_jobs:
-                logger.info(f"동시 실행 제한 대기 중: {job.name}")
-                await asyncio.sleep(5)
-            
-            self.running_jobs.add(job_id)
-            execution.status = JobStatus.RUNNING
-            execution.start_time = datetime.now()
-            
-            logger.info(f"배치 작업 시작: {job.name} ({job_id})")
-            
-            # 타임아웃과 함께 작업 실행
-            try:
-                result = await asyncio.wait_for(
-                    self._execute_with_retries(job, execution),
-                    timeout=job.timeout
-                )
+            # 동시 실행 제한 (워커/자원 클래스 슬롯 대기)
+            async with self.resource_pool.slot(job.resource_class):
+                # 슬롯 대기 시간만큼 임대 연장
+                self.state_store.renew_lease(job_id, execution.lease_owner, job.timeout + self.lease_margin_seconds)
                 
-                execution.result = result
-                execution.status = JobStatus.SUCCESS
-                logger.info(f"배치 작업 성공: {job.name}, 결과: {result}")
+                self.running_jobs.add(job_id)
+                execution.status = JobStatus.RUNNING
+                execution.start_time = datetime.now()
                 
-            except asyncio.TimeoutError:
-                execution.status = JobStatus.FAILED
-                execution.error_message = f"작업 타임아웃 ({job.timeout}초)"
-                logger.error(f"배치 작업 타임아웃: {job.name}")
+                logger.info(f"배치 작업 시작: {job.name} ({job_id}), 자원: {job.resource_class}")
                 
-            except Exception as e:
-                execution.status = JobStatus.FAILED
-                execution.error_message = str(e)
-                logger.error(f"배치 작업 실패: {job.name}, 오류: {str(e)}")
+                # 타임아웃과 함께 작업 실행
+                try:
+                    result = await asyncio.wait_for(
+                        self._execute_with_retries(job, execution),
+                        timeout=job.timeout
+                    )
+                    
+                    execution.result = result
+                    execution.status = JobStatus.SUCCESS
+                    logger.info(f"배치 작업 성공: {job.name}, 결과: {result}")
+                    
+                except asyncio.TimeoutError:
+                    execution.status = JobStatus.FAILED
+                    execution.error_message = f"작업 타임아웃 ({job.timeout}초)"
+                    logger.error(f"배치 작업 타임아웃: {job.name}")
+                    
+                except Exception as e:
+                    execution.status = JobStatus.FAILED
+                    execution.error_message = str(e)
+                    logger.error(f"배치 작업 실패: {job.name}, 오류: {str(e)}")
         
         finally:
             execution.end_time = datetime.now()
             if execution.start_time:
                 execution.duration = (execution.end_time - execution.start_time).total_seconds()
             
+            # 성공 체크포인트 기록 (같은 실행일 재실행 시 생략)
+            if execution.status == JobStatus.SUCCESS:
+                self.state_store.save_checkpoint(
+                    run_date, job_id, execution.execution_id, execution.duration, execution.result
+                )
+            
             self.running_jobs.discard(job_id)
             await self._release_lock(execution)
             self.executions[job_id] = execution
@@ -221,48 +242,28 @@ class BatchManager:
         
         return execution
     
-    async def _acquire_lock(self, job_id: str, execution: JobExecution) -> bool:
-        """작업 잠금 획득 - 중복 실행 방지"""
-        today = datetime.now().strftime("%Y-%m-%d")
-        lock_file = self.lock_dir / f"{job_id}_{today}.lock"
-        execution.lock_file_path = str(lock_file)
+    async def _acquire_lock(self, job: BatchJob, execution: JobExecution) -> bool:
+        """작업 임대 잠금 획득 - 중복 실행 방지 (만료된 임대는 인수)"""
+        owner = f"{socket.gethostname()}:{os.getpid()}:{execution.execution_id}"
+        lease_seconds = job.timeout + self.lease_margin_seconds
         
         try:
-            # 잠금 파일 생성 및 배타적 잠금 시도
-            fd = open(lock_file, 'w')
-            fcntl.flock(fd.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
-            
-            # 잠금 파일에 실행 정보 기록
-            lock_info = {
-                "job_id": job_id,
-                "pid": "python-process",  # 실제 구현에서는 os.getpid() 사용
-                "start_time": datetime.now().isoformat(),
-                "hostname": "localhost"  # 실제 구현에서는 socket.gethostname() 사용
-            }
-            json.dump(lock_info, fd)
-            fd.flush()
-            
-            # 잠금 유지를 위해 파일 디스크립터 저장
-            execution._lock_fd = fd
-            
-            logger.info(f"작업 잠금 획득: {job_id}")
-            return True
-            
-        except (IOError, OSError) as e:
-            logger.warning(f"작업 잠금 실패: {job_id}, 오류: {str(e)}")
+            if not self.state_store.acquire_lease(job.job_id, owner, lease_seconds):
+                logger.warning(f"작업 잠금 실패: {job.job_id}, 다른 실행이 임대 중")
+                return False
+        except Exception as e:
+            logger.warning(f"작업 잠금 실패: {job.job_id}, 오류: {str(e)}")
             return False
+        
+        execution.lease_owner = owner
+        logger.info(f"작업 잠금 획득: {job.job_id}")
+        return True
     
     async def _release_lock(self, execution: JobExecution):
         """작업 잠금 해제"""
         try:
-            if hasattr(execution, '_lock_fd'):
-                execution._lock_fd.close()
-            
-            if execution.lock_file_path:
-                lock_file = Path(execution.lock_file_path)
-                if lock_file.exists():
-                    lock_file.unlink()
-                    logger.debug(f"작업 잠금 해제: {execution.job_id}")
+            if execution.lease_owner and self.state_store.release_lease(execution.job_id, execution.lease_owner):
+                logger.debug(f"작업 잠금 해제: {execution.job_id}")
                     
         except Exception as e:
             logger.warning(f"잠금 해제 중 오류: {execution.job_id}, {str(e)}")
@@ -307,15 +308,18 @@ class BatchManager:
         error_msg = str(error).lower()
         return any(fatal in error_msg for fatal in fatal_errors)
     
-    async def _check_dependencies(self, job: BatchJob) -> bool:
-        """의존성 작업 완료 상태 체크"""
+    async def _check_dependencies(self, job: BatchJob, run_date: Optional[str] = None) -> bool:
+        """의존성 작업 완료 상태 체크 (같은 실행일 체크포인트도 완료로 인정)"""
         if not job.dependencies:
             return True
         
+        run_date = run_date or datetime.now().strftime("%Y-%m-%d")
         for dep_job_id in job.dependencies:
             dep_execution = self.executions.get(dep_job_id)
+            if dep_execution and dep_execution.status == JobStatus.SUCCESS:
+                continue
             
-            if not dep_execution or dep_execution.status != JobStatus.SUCCESS:
+            if not self.state_store.is_completed(run_date, dep_job_id):
                 logger.warning(f"의존성 작업 미완료: {dep_job_id} -> {job.job_id}")
                 return False
         
@@ -336,45 +340,101 @@ class BatchManager:
         self.daily_stats[today]["total"] += 1
         self.daily_stats[today][status.value] = self.daily_stats[today].get(status.value, 0) + 1
     
-    async def execute_daily_batch(self, date: Optional[str] = None) -> Dict[str, JobExecution]:
-        """일일 배치 작업 실행"""
+    async def execute_daily_batch(self, date: Optional[str] = None, resume: bool = True) -> Dict[str, JobExecution]:
+        """
+        일일 배치 작업 실행 - 의존성 그래프 순서로 독립 작업 동시 실행
+        resume=True면 같은 실행일에 이미 성공한 작업(체크포인트)은 생략
+        """
         if date is None:
             date = datetime.now().strftime("%Y-%m-%d")
         
-        logger.info(f"일일 배치 작업 시작: {date}")
+        run_id = str(uuid.uuid4())
+        started_at = time.time()
+        wall_start = time.perf_counter()
+        logger.info(f"일일 배치 작업 시작: {date} (실행 ID: {run_id})")
         
-        results = {}
+        results: Dict[str, JobExecution] = {}
+        enabled_jobs = {job_id: job for job_id, job in self.jobs.items() if job.enabled}
+        completed = self.state_store.completed_jobs(date) if resume else set()
         
-        # 우선순위별로 정렬
-        sorted_jobs = sorted(
-            self.jobs.values(), 
-            key=lambda job: (job.priority.value, job.job_id)
-        )
+        # 비활성/미등록 의존성은 체크포인트로 완료된 경우에만 충족
+        graph = {
+            job_id: [dep for dep in job.dependencies if dep not in completed or dep in enabled_jobs]
+            for job_id, job in enabled_jobs.items()
+        }
         
-        for job in sorted_jobs:
-            if job.enabled:
-                try:
-                    execution = await self.execute_job(job.job_id)
-                    results[job.job_id] = execution
-                    
-                    # 치명적 실패 시 후속 작업 중단 여부 결정
-                    if execution.status == JobStatus.FAILED and job.priority in [JobPriority.CRITICAL, JobPriority.HIGH]:
-                        logger.error(f"중요 작업 실패로 후속 작업 검토 필요: {job.name}")
-                        
-                except Exception as e:
-                    logger.error(f"배치 작업 실행 중 예외: {job.job_id}, {str(e)}")
-                    results[job.job_id] = JobExecution(
-                        job_id=job.job_id,
-                        job_name=job.name,
-                        status=JobStatus.FAILED,
-                        error_message=str(e)
-                    )
+        async def run(job_id: str) -> bool:
+            job = enabled_jobs[job_id]
+            if job_id in completed:
+                results[job_id] = JobExecution(
+                    job_id=job_id,
+                    job_name=job.name,
+                    status=JobStatus.SKIPPED,
+                    error_message="체크포인트: 이미 성공한 작업"
+                )
+                return True
+            
+            try:
+                execution = await self.execute_job(job_id, run_date=date)
+            except Exception as e:
+                logger.error(f"배치 작업 실행 중 예외: {job_id}, {str(e)}")
+                execution = JobExecution(
+                    job_id=job_id,
+                    job_name=job.name,
+                    status=JobStatus.FAILED,
+                    error_message=str(e)
+                )
+            results[job_id] = execution
+            
+            # 치명적 실패 시 후속 작업은 의존성 그래프에서 자동 차단
+            if execution.status == JobStatus.FAILED and job.priority in [JobPriority.CRITICAL, JobPriority.HIGH]:
+                logger.error(f"중요 작업 실패로 후속 작업 검토 필요: {job.name}")
+            return execution.status == JobStatus.SUCCESS
+        
+        try:
+            outcome = await run_dag(graph, run, order_key=lambda job_id: (enabled_jobs[job_id].priority.value, job_id))
+        except ValueError as e:
+            logger.error(f"배치 의존성 그래프 오류: {str(e)}")
+            raise
+        
+        # 선행 작업 실패/누락으로 실행되지 않은 작업
+        for job_id, succeeded in outcome.items():
+            if succeeded is None:
+                failed_deps = [dep for dep in graph[job_id] if outcome.get(dep) is not True]
+                results[job_id] = JobExecution(
+                    job_id=job_id,
+                    job_name=enabled_jobs[job_id].name,
+                    status=JobStatus.SKIPPED,
+                    error_message=f"의존성 작업 미완료: {', '.join(failed_deps)}"
+                )
+        
+        wall_clock = time.perf_counter() - wall_start
+        self.last_batch_report = self._build_batch_report(run_id, date, wall_clock, graph, results)
+        self.state_store.record_batch_run(run_id, date, started_at, wall_clock, self.last_batch_report)
         
         # 배치 완료 통계 로깅
         await self._log_batch_summary(date, results)
         
         return results
     
+    def _build_batch_report(self, run_id: str, date: str, wall_clock: float,
+                            graph: Dict[str, List[str]], results: Dict[str, JobExecution]) -> Dict[str, Any]:
+        """배치 실행 리포트 (전체 소요 시간, 임계 경로, 병렬도)"""
+        durations = {job_id: execution.duration or 0.0 for job_id, execution in results.items()}
+        path, path_seconds = critical_path(graph, durations)
+        total_job_seconds = sum(durations.values())
+        
+        return {
+            "run_id": run_id,
+            "date": date,
+            "wall_clock_seconds": round(wall_clock, 3),
+            "total_job_seconds": round(total_job_seconds, 3),
+            "critical_path": path,
+            "critical_path_seconds": round(path_seconds, 3),
+            "parallelism": round(total_job_seconds / wall_clock, 2) if wall_clock > 0 else 0.0,
+            "statuses": {job_id: execution.status.value for job_id, execution in results.items()}
+        }
+    
     async def _log_batch_summary(self, date: str, results: Dict[str, JobExecution]):
         """배치 실행 결과 요약 로깅"""
         total = len(results)
@@ -392,10 +452,23 @@ class BatchManager:
             f"실패율: {failure_rate:.1%}"
         )
         
+        report = self.last_batch_report
+        if report is not None and report["date"] == date:
+            logger.info(
+                f"배치 소요 시간: {report['wall_clock_seconds']:.1f}초 "
+                f"(작업 합계 {report['total_job_seconds']:.1f}초, 병렬도 {report['parallelism']}), "
+                f"임계 경로: {' -> '.join(report['critical_path']) or '-'} "
+                f"({report['critical_path_seconds']:.1f}초)"
+            )
+        
         # 실패율이 임계치를 초과하면 경고
         if failure_rate > self.error_threshold:
             logger.warning(f"배치 작업 실패율 임계치 초과: {failure_rate:.1%} > {self.error_threshold:.1%}")
     
+    def get_recent_batch_runs(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """최근 배치 실행 리포트 조회"""
+        return self.state_store.recent_batch_runs(limit)
+    
     def get_job_status(self, job_id: str) -> Optional[JobExecution]:
         """작업 상태 조회"""
         return self.executions.get(job_id)
@@ -412,20 +485,16 @@ class BatchManager:
         return list(self.running_jobs)
     
     async def cleanup_old_locks(self, days: int = 7):
-        """오래된 잠금 파일 정리"""
-        cutoff_date = datetime.now() - timedelta(days=days)
+        """만료된 임대와 오래된 체크포인트/배치 실행 이력 정리"""
         cleaned = 0
         
-        for lock_file in self.lock_dir.glob("*.lock"):
-            try:
-                if lock_file.stat().st_mtime < cutoff_date.timestamp():
-                    lock_file.unlink()
-                    cleaned += 1
-            except Exception as e:
-                logger.warning(f"잠금 파일 정리 실패: {lock_file}, {str(e)}")
+        for job_id in self.state_store.stale_leases():
+            if self.state_store.release_lease(job_id):
+                cleaned += 1
+        cleaned += self.state_store.cleanup(days * 86400)
         
         if cleaned > 0:
-            logger.info(f"오래된 잠금 파일 {cleaned}개 정리 완료")
+            logger.info(f"만료된 잠금/오래된 상태 기록 {cleaned}개 정리 완료")
     
     async def _send_failure_alert(self, execution: JobExecution):
         """배치 작업 실패 알림 전송"""
@@ -511,14 +580,23 @@ class BatchManager:
             }
         }
     
+    def get_lock_info(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """작업 임대 잠금 정보 (소유자, 유지 시간, 만료 여부)"""
+        lease = self.state_store.get_lease(job_id)
+        if lease is None:
+            return None
+        
+        age_hours = (time.time() - lease["acquired_at"]) / 3600
+        return {
+            **lease,
+            "age_hours": age_hours,
+            "is_expired": lease["expired"] or age_hours > self.lock_expiry_hours
+        }
+    
     async def force_release_lock(self, job_id: str, reason: str = "Manual release") -> bool:
         """강제 잠금 해제"""
-        today = datetime.now().strftime("%Y-%m-%d")
-        lock_file = self.lock_dir / f"{job_id}_{today}.lock"
-        
         try:
-            if lock_file.exists():
-                lock_file.unlink()
+            if self.state_store.release_lease(job_id):
                 logger.warning(f"강제 잠금 해제: {job_id}, 이유: {reason}")
                 
                 # 알림 전송
@@ -534,7 +612,7 @@ class BatchManager:
                 
                 return True
             else:
-                logger.info(f"잠금 파일이 존재하지 않음: {job_id}")
+                logger.info(f"잠금이 존재하지 않음: {job_id}")
                 return False
                 
         except Exception as e:
@@ -542,21 +620,10 @@ class BatchManager:
             return False
     
     def check_lock_expiration(self, max_age_hours: int = 24) -> List[str]:
-        """만료된 잠금 파일 확인"""
-        expired_locks = []
-        cutoff_time = datetime.now() - timedelta(hours=max_age_hours)
-        
-        for lock_file in self.lock_dir.glob("*.lock"):
-            try:
-                if lock_file.stat().st_mtime < cutoff_time.timestamp():
-                    # 잠금 파일에서 작업 ID 추출
-                    job_id = lock_file.stem.rsplit("_", 1)[0]
-                    expired_locks.append(job_id)
-                    logger.warning(f"만료된 잠금 파일 발견: {job_id}")
-                    
-            except Exception as e:
-                logger.warning(f"잠금 파일 상태 확인 실패: {lock_file}, {str(e)}")
-        
+        """만료되었거나 max_age_hours보다 오래 유지된 임대 잠금 확인"""
+        expired_locks = self.state_store.stale_leases(max_age_hours * 3600)
+        for job_id in expired_locks:
+            logger.warning(f"만료된 잠금 발견: {job_id}")
         return expired_locks
 
 
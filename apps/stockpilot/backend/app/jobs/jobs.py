@@ -296,7 +296,8 @@ def register_all_jobs():
             priority=JobPriority.HIGH,
             max_retries=3,
             timeout=3600,  # 1시간
-            dependencies=["daily_data_collection"]
+            dependencies=["daily_data_collection"],
+            resource_class="api_quota"  # OpenAI 호출
         ),
         BatchJob(
             job_id="daily_cleanup",
@@ -6,17 +6,18 @@ WebSocket 연결 관리자
 import json
 import asyncio
 import time
-from typing import Dict, Set, List, Optional, Any, Tuple
+from typing import Dict, Set, List, Optional, Any, Tuple, Iterable, Hashable
 from datetime import datetime, timedelta
 from fastapi import WebSocket, WebSocketDisconnect
 from loguru import logger
 import uuid
 from enum import Enum
-from asyncio import Queue, Lock
 from dataclasses import dataclass, field
 
 from app.models import WebSocketMessage, PriceUpdateMessage
 from app.config import get_settings
+from app.websocket.send_queue import ConnectionSendQueue
+from utils.subscription_index import SubscriptionIndex
 
 settings = get_settings()
 
@@ -43,6 +44,8 @@ class QueuedMessage:
     """대기열 메시지"""
     content: Dict[str, Any]
     priority: MessagePriority
+    payload: Optional[str] = None  # 브로드캐스트 시 한 번만 직렬화한 본문 (수신자 간 공유)
+    conflation_key: Optional[Hashable] = None  # 같은 키의 대기 중 메시지는 최신 내용으로 교체
     timestamp: float = field(default_factory=time.time)
     retry_count: int = 0
     max_retries: int = 3
@@ -63,72 +66,46 @@ class ConnectionHealth:
 
 
 class BackpressureManager:
-    """백프레셔 관리"""
+    """백프레셔 관리 - 연결별 유한 우선순위 큐 (가격 업데이트는 종목별 최신값만 유지)"""
     
-    def __init__(self, max_queue_size: int = 100, drop_threshold: int = 200):
+    def __init__(self, max_queue_size: int = 100):
         self.max_queue_size = max_queue_size
-        self.drop_threshold = drop_threshold
-        self.message_queues: Dict[str, Queue] = {}
-        self.queue_locks: Dict[str, Lock] = {}
+        self.message_queues: Dict[str, ConnectionSendQueue] = {}
+    
+    def get_queue(self, connection_id: str) -> ConnectionSendQueue:
+        """연결의 송신 큐 (없으면 생성)"""
+        queue = self.message_queues.get(connection_id)
+        if queue is None:
+            queue = self.message_queues[connection_id] = ConnectionSendQueue(
+                max_size=self.max_queue_size,
+                guaranteed_priority=MessagePriority.CRITICAL.value
+            )
+        return queue
     
     async def add_message(self, connection_id: str, message: QueuedMessage) -> bool:
-        """메시지를 대기열에 추가 (백프레셔 적용)"""
-        if connection_id not in self.message_queues:
-            self.message_queues[connection_id] = Queue()
-            self.queue_locks[connection_id] = Lock()
-        
-        queue = self.message_queues[connection_id]
-        
-        # 드롭 임계치 초과 시 낮은 우선순위 메시지 드롭
-        if queue.qsize() >= self.drop_threshold:
-            await self._drop_low_priority_messages(queue)
-        
-        # 여전히 큐가 가득 차면 메시지 거부
-        if queue.qsize() >= self.max_queue_size:
+        """메시지를 대기열에 추가 (백프레셔 적용, 제어 메시지는 항상 보존)"""
+        queue = self.get_queue(connection_id)
+        added = queue.put(message, message.priority.value, message.conflation_key)
+        if not added:
             logger.warning(f"메시지 큐 포화: {connection_id}, 메시지 드롭됨")
-            return False
-        
-        await queue.put(message)
-        return True
-    
-    async def _drop_low_priority_messages(self, queue: Queue):
-        """낮은 우선순위 메시지 드롭"""
-        temp_messages = []
-        dropped = 0
-        
-        # 큐에서 메시지들을 꺼내서 우선순위 확인
-        while not queue.empty():
-            try:
-                message = queue.get_nowait()
-                if message.priority in [MessagePriority.CRITICAL, MessagePriority.HIGH]:
-                    temp_messages.append(message)
-                else:
-                    dropped += 1
-            except asyncio.QueueEmpty:
-                break
-        
-        # 높은 우선순위 메시지들만 다시 큐에 넣기
-        for message in temp_messages:
-            await queue.put(message)
-        
-        if dropped > 0:
-            logger.info(f"낮은 우선순위 메시지 {dropped}개 드롭됨")
+        return added
     
     async def get_message(self, connection_id: str) -> Optional[QueuedMessage]:
-        """메시지 큐에서 메시지 가져오기"""
-        if connection_id not in self.message_queues:
-            return None
-        
-        queue = self.message_queues[connection_id]
-        try:
-            return await asyncio.wait_for(queue.get(), timeout=0.1)
-        except asyncio.TimeoutError:
+        """메시지가 들어올 때까지 대기 후 반환 (연결 정리 시 None)"""
+        queue = self.message_queues.get(connection_id)
+        if queue is None:
             return None
+        return await queue.get()
+    
+    def queue_size(self, connection_id: str) -> int:
+        queue = self.message_queues.get(connection_id)
+        return len(queue) if queue is not None else 0
     
     def cleanup_connection(self, connection_id: str):
-        """연결 정리 시 큐 제거"""
-        self.message_queues.pop(connection_id, None)
-        self.queue_locks.pop(connection_id, None)
+        """연결 정리 시 큐 제거 (대기 중인 발송 태스크를 깨움)"""
+        queue = self.message_queues.pop(connection_id, None)
+        if queue is not None:
+            queue.close()
 
 
 class ConnectionManager:
@@ -139,10 +116,13 @@ class ConnectionManager:
         self.active_connections: Dict[str, WebSocket] = {}
         self.connection_health: Dict[str, ConnectionHealth] = {}
         
-        # 구독 관리
-        self.price_subscriptions: Dict[str, Set[str]] = {}  # connection_id -> set of symbols
-        self.signal_subscriptions: Dict[str, Set[str]] = {}  # connection_id -> set of symbols
-        self.news_subscriptions: Dict[str, Set[str]] = {}   # connection_id -> set of categories
+        # 구독 관리 (종목/카테고리 -> 연결 역인덱스)
+        self.price_index = SubscriptionIndex()
+        self.signal_index = SubscriptionIndex()
+        self.news_index = SubscriptionIndex()
+        self.price_subscriptions = self.price_index.by_connection    # connection_id -> set of symbols
+        self.signal_subscriptions = self.signal_index.by_connection  # connection_id -> set of symbols
+        self.news_subscriptions = self.news_index.by_connection      # connection_id -> set of categories
         self.market_subscriptions: Set[str] = set()  # connection_ids for market status
         
         # 사용자별 연결 추적
@@ -191,7 +171,8 @@ class ConnectionManager:
         
         self.last_heartbeat[connection_id] = datetime.now()
         
-        # 개별 메시지 발송 태스크 시작
+        # 개별 메시지 발송 태스크 시작 (큐에 메시지가 들어오면 깨어남)
+        self.backpressure_manager.get_queue(connection_id)
         self._message_sender_tasks[connection_id] = asyncio.create_task(
             self._message_sender_loop(connection_id)
         )
@@ -236,9 +217,9 @@ class ConnectionManager:
                 del self._message_sender_tasks[connection_id]
             
             # 구독 정보 정리
-            self.price_subscriptions.pop(connection_id, None)
-            self.signal_subscriptions.pop(connection_id, None)
-            self.news_subscriptions.pop(connection_id, None)
+            self.price_index.remove_connection(connection_id)
+            self.signal_index.remove_connection(connection_id)
+            self.news_index.remove_connection(connection_id)
             self.market_subscriptions.discard(connection_id)
             self.last_heartbeat.pop(connection_id, None)
             
@@ -255,47 +236,35 @@ class ConnectionManager:
         if connection_id in self.active_connections:
             await self._queue_message(connection_id, message, priority)
     
-    async def broadcast_message(self, message: Dict[str, Any], connection_ids: Optional[Set[str]] = None, priority: MessagePriority = MessagePriority.NORMAL):
-        """여러 연결에 메시지 브로드캐스트 - 큐 시스템 사용"""
-        target_connections = connection_ids or set(self.active_connections.keys())
+    async def broadcast_message(self, message: Dict[str, Any], connection_ids: Optional[Iterable[str]] = None, priority: MessagePriority = MessagePriority.NORMAL, conflation_key: Optional[Hashable] = None):
+        """여러 연결에 메시지 브로드캐스트 - 큐 시스템 사용 (본문은 한 번만 직렬화)"""
+        target_connections = connection_ids if connection_ids is not None else list(self.active_connections.keys())
+        payload = json.dumps(message, ensure_ascii=False, default=str)
         
         # 모든 대상 연결에 큐를 통해 메시지 전송
         for connection_id in target_connections:
             if connection_id in self.active_connections:
-                await self._queue_message(connection_id, message, priority)
+                await self._queue_message(connection_id, message, priority, payload, conflation_key)
     
     # 구독 관리
     def subscribe_to_prices(self, connection_id: str, symbols: List[str]):
         """주가 실시간 업데이트 구독"""
-        if connection_id not in self.price_subscriptions:
-            self.price_subscriptions[connection_id] = set()
-        
-        self.price_subscriptions[connection_id].update(symbols)
+        self.price_index.add(connection_id, symbols)
         logger.info(f"주가 구독 추가: {connection_id}, 종목: {symbols}")
     
     def unsubscribe_from_prices(self, connection_id: str, symbols: List[str]):
         """주가 실시간 업데이트 구독 해제"""
-        if connection_id in self.price_subscriptions:
-            self.price_subscriptions[connection_id] -= set(symbols)
-            if not self.price_subscriptions[connection_id]:
-                del self.price_subscriptions[connection_id]
-        
+        self.price_index.remove(connection_id, symbols)
         logger.info(f"주가 구독 해제: {connection_id}, 종목: {symbols}")
     
     def subscribe_to_signals(self, connection_id: str, symbols: List[str]):
         """AI 시그널 업데이트 구독"""
-        if connection_id not in self.signal_subscriptions:
-            self.signal_subscriptions[connection_id] = set()
-        
-        self.signal_subscriptions[connection_id].update(symbols)
+        self.signal_index.add(connection_id, symbols)
         logger.info(f"시그널 구독 추가: {connection_id}, 종목: {symbols}")
     
     def subscribe_to_news(self, connection_id: str, categories: List[str]):
         """뉴스 업데이트 구독"""
-        if connection_id not in self.news_subscriptions:
-            self.news_subscriptions[connection_id] = set()
-        
-        self.news_subscriptions[connection_id].update(categories)
+        self.news_index.add(connection_id, categories)
         logger.info(f"뉴스 구독 추가: {connection_id}, 카테고리: {categories}")
     
     def subscribe_to_market(self, connection_id: str):
@@ -307,10 +276,7 @@ class ConnectionManager:
     async def broadcast_price_update(self, symbol: str, price_data: Dict[str, Any]):
         """주가 업데이트 브로드캐스트"""
         # 해당 종목을 구독하는 연결들 찾기
-        target_connections = set()
-        for connection_id, subscribed_symbols in self.price_subscriptions.items():
-            if symbol in subscribed_symbols:
-                target_connections.add(connection_id)
+        target_connections = self.price_index.subscribers(symbol)
         
         if target_connections:
             message = PriceUpdateMessage(
@@ -322,19 +288,16 @@ class ConnectionManager:
                 timestamp=datetime.now()
             ).model_dump()
             
-            await self.broadcast_message(message, target_connections, MessagePriority.HIGH)
+            # 느린 클라이언트에게는 종목별 최신 가격만 남김
+            await self.broadcast_message(message, target_connections, MessagePriority.HIGH, conflation_key=("price", symbol))
             logger.debug(f"주가 업데이트 브로드캐스트: {symbol}, {len(target_connections)}개 연결")
     
     async def broadcast_signal_update(self, signal_data: Dict[str, Any]):
         """시그널 업데이트 브로드캐스트"""
         symbol = signal_data.get("symbol")
-        target_connections = set()
         
         # 해당 종목을 구독하는 연결들 찾기
-        if symbol:
-            for connection_id, subscribed_symbols in self.signal_subscriptions.items():
-                if symbol in subscribed_symbols:
-                    target_connections.add(connection_id)
+        target_connections = self.signal_index.subscribers(symbol) if symbol else ()
         
         if target_connections:
             message = {
@@ -349,13 +312,9 @@ class ConnectionManager:
     async def broadcast_news_update(self, news_data: Dict[str, Any]):
         """뉴스 업데이트 브로드캐스트"""
         category = news_data.get("category")
-        target_connections = set()
         
         # 해당 카테고리를 구독하는 연결들 찾기
-        if category:
-            for connection_id, subscribed_categories in self.news_subscriptions.items():
-                if category in subscribed_categories:
-                    target_connections.add(connection_id)
+        target_connections = self.news_index.subscribers(category) if category else ()
         
         if target_connections:
             message = {
@@ -376,7 +335,7 @@ class ConnectionManager:
                 "timestamp": datetime.now().isoformat()
             }
             
-            await self.broadcast_message(message, self.market_subscriptions, MessagePriority.NORMAL)
+            await self.broadcast_message(message, list(self.market_subscriptions), MessagePriority.NORMAL)
             logger.info(f"시장 상태 브로드캐스트: {len(self.market_subscriptions)}개 연결")
     
     async def send_heartbeat(self):
@@ -402,9 +361,9 @@ class ConnectionManager:
             logger.warning(f"비활성 연결 정리: {connection_id}")
             self.disconnect(connection_id)
     
-    async def _queue_message(self, connection_id: str, message: Dict[str, Any], priority: MessagePriority = MessagePriority.NORMAL):
+    async def _queue_message(self, connection_id: str, message: Dict[str, Any], priority: MessagePriority = MessagePriority.NORMAL, payload: Optional[str] = None, conflation_key: Optional[Hashable] = None):
         """메시지를 대기열에 추가"""
-        queued_message = QueuedMessage(content=message, priority=priority)
+        queued_message = QueuedMessage(content=message, priority=priority, payload=payload, conflation_key=conflation_key)
         success = await self.backpressure_manager.add_message(connection_id, queued_message)
         
         if not success:
@@ -419,20 +378,22 @@ class ConnectionManager:
                     logger.warning(f"연결 백프레셔 시작: {connection_id}")
 
     async def _message_sender_loop(self, connection_id: str):
-        """개별 연결의 메시지 발송 루프"""
+        """개별 연결의 메시지 발송 루프 (이벤트 기반, 큐가 비면 대기)"""
+        queue = self.backpressure_manager.get_queue(connection_id)
         while connection_id in self.active_connections:
             try:
-                message = await self.backpressure_manager.get_message(connection_id)
-                if message is None:
-                    await asyncio.sleep(0.1)
-                    continue
+                message = await queue.get()
+                if message is None:  # 연결 정리로 큐 종료
+                    break
                 
                 websocket = self.active_connections[connection_id]
                 health = self.connection_health[connection_id]
                 
                 # 메시지 발송 시도
                 try:
-                    await websocket.send_text(json.dumps(message.content, ensure_ascii=False))
+                    if message.payload is None:
+                        message.payload = json.dumps(message.content, ensure_ascii=False, default=str)
+                    await websocket.send_text(message.payload)
                     self.message_count += 1
                     health.last_activity = time.time()
                     health.failed_sends = 0
@@ -450,7 +411,7 @@ class ConnectionManager:
                     # 재시도 로직
                     if message.retry_count < message.max_retries:
                         message.retry_count += 1
-                        await self.backpressure_manager.add_message(connection_id, message)
+                        queue.requeue(message, message.priority.value, message.conflation_key)
                     else:
                         self.failed_message_count += 1
                         # 연속 실패 시 연결 해제
@@ -581,12 +542,17 @@ class ConnectionManager:
         if latencies:
             avg_latency = sum(latencies) / len(latencies)
         
+        queues = self.backpressure_manager.message_queues.values()
+        
         return {
             "total_connections": self.connection_count,
             "healthy_connections": healthy_connections,
             "backpressure_connections": backpressure_connections,
             "total_messages_sent": self.message_count,
             "failed_messages": self.failed_message_count,
+            "queued_messages": sum(len(q) for q in queues),
+            "conflated_messages": sum(q.conflated for q in queues),
+            "dropped_messages": sum(q.dropped for q in queues),
             "average_latency": avg_latency,
             "price_subscriptions": len(self.price_subscriptions),
             "signal_subscriptions": len(self.signal_subscriptions),
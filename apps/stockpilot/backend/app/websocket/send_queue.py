@@ -0,0 +1,117 @@
+"""
+연결별 WebSocket 송신 큐
+우선순위별 대기열, 크기 제한, 종목별 가격 업데이트 합치기(conflation), 이벤트 기반 대기
+"""
+
+import asyncio
+from collections import deque
+from typing import Any, Deque, Dict, Hashable, List, Optional
+
+
+class ConnectionSendQueue:
+    """연결 하나의 유한 우선순위 송신 큐 (단일 소비자)"""
+
+    def __init__(self, max_size: int = 100, guaranteed_priority: int = 1):
+        self.max_size = max_size
+        self.guaranteed_priority = guaranteed_priority  # 이 값 이하 우선순위(제어 메시지)는 드롭하지 않음
+        self._levels: Dict[int, Deque[List[Any]]] = {}   # 우선순위 -> [item, conflation_key] 대기열
+        self._pending: Dict[Hashable, List[Any]] = {}     # conflation_key -> 대기 중인 항목
+        self._size = 0
+        self._ready = asyncio.Event()
+        self._closed = False
+
+        self.dropped = 0
+        self.conflated = 0
+
+    def put(self, item: Any, priority: int, conflation_key: Optional[Hashable] = None) -> bool:
+        """메시지 추가 - 같은 키가 대기 중이면 내용만 최신으로 교체, 가득 차면 낮은 우선순위부터 드롭"""
+        if self._closed:
+            return False
+
+        if conflation_key is not None:
+            entry = self._pending.get(conflation_key)
+            if entry is not None:
+                entry[0] = item  # 대기열 위치는 유지 (종목별 순서 보존)
+                self.conflated += 1
+                return True
+
+        if priority > self.guaranteed_priority and self._size >= self.max_size:
+            if not self._evict_below(priority):
+                self.dropped += 1
+                return False
+
+        self._append(item, priority, conflation_key, left=False)
+        return True
+
+    def requeue(self, item: Any, priority: int, conflation_key: Optional[Hashable] = None) -> bool:
+        """전송 실패 메시지를 같은 우선순위 맨 앞에 다시 추가 (더 새로운 같은 키 메시지가 있으면 버림)"""
+        if self._closed or (conflation_key is not None and conflation_key in self._pending):
+            return False
+        self._append(item, priority, conflation_key, left=True)
+        return True
+
+    def _append(self, item: Any, priority: int, conflation_key: Optional[Hashable], left: bool):
+        entry = [item, conflation_key]
+        level = self._levels.get(priority)
+        if level is None:
+            level = self._levels[priority] = deque()
+        if left:
+            level.appendleft(entry)
+        else:
+            level.append(entry)
+        if conflation_key is not None:
+            self._pending[conflation_key] = entry
+        self._size += 1
+        self._ready.set()
+
+    def _evict_below(self, priority: int) -> bool:
+        """들어올 메시지보다 우선순위가 낮거나 같은 가장 오래된 메시지 하나 드롭"""
+        for level_priority in sorted(self._levels, reverse=True):
+            if level_priority < priority or level_priority <= self.guaranteed_priority:
+                break
+            level = self._levels[level_priority]
+            if level:
+                self._remove(level.popleft())
+                self.dropped += 1
+                return True
+        return False
+
+    def _remove(self, entry: List[Any]):
+        conflation_key = entry[1]
+        if conflation_key is not None and self._pending.get(conflation_key) is entry:
+            del self._pending[conflation_key]
+        self._size -= 1
+
+    def get_nowait(self) -> Optional[Any]:
+        """가장 높은 우선순위의 가장 오래된 메시지 (없으면 None)"""
+        for level_priority in sorted(self._levels):
+            level = self._levels[level_priority]
+            if level:
+                entry = level.popleft()
+                self._remove(entry)
+                return entry[0]
+        return None
+
+    async def get(self) -> Optional[Any]:
+        """메시지가 들어올 때까지 대기 (폴링 없음), 큐가 닫히면 None"""
+        while True:
+            item = self.get_nowait()
+            if item is not None or self._closed:
+                return item
+            self._ready.clear()
+            await self._ready.wait()
+
+    def close(self):
+        """큐 종료 - 대기 중인 소비자를 깨움"""
+        self._closed = True
+        self._levels.clear()
+        self._pending.clear()
+        self._size = 0
+        self._ready.set()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def __len__(self) -> int:
+        return self._size
@@ -25,6 +25,7 @@ load_dotenv()
 from utils.websocket_auth import get_auth_manager
 from utils.rate_limiter import get_rate_limiter
 from utils.openai_optimizer import get_openai_optimizer
+from utils.llm_response_cache import get_llm_response_cache
 
 # 로깅 설정
 logging.basicConfig(
@@ -333,6 +334,7 @@ async def dashboard_home():
                     <li><a href="/api/metrics/system">📈 시스템 통계</a> - 전반적인 시스템 상태</li>
                     <li><a href="/api/metrics/auth?window_minutes=60">🔐 인증 통계</a> - 인증/권한 이벤트</li>
                     <li><a href="/api/metrics/openai?window_hours=24">🤖 OpenAI 통계</a> - API 호출량/비용</li>
+                    <li><a href="/api/metrics/llm-cache">💾 LLM 응답 캐시</a> - 적중률/퇴출 현황</li>
                     <li><a href="/api/metrics/rate-limit">⚡ 레이트 리미팅</a> - 요청 제한 현황</li>
                     <li><a href="/api/metrics/channels">📡 채널별 QPS</a> - 메시지 처리량</li>
                     <li><a href="/api/health">💚 헬스체크</a> - 서비스 상태 확인</li>
@@ -373,6 +375,11 @@ async def get_openai_metrics(window_hours: int = Query(24, ge=1, le=168)):
     """OpenAI 메트릭"""
     return dashboard_metrics.get_openai_stats(window_hours)
 
+@app.get("/api/metrics/llm-cache")
+async def get_llm_cache_metrics():
+    """LLM 응답 캐시 메트릭"""
+    return get_llm_response_cache().get_stats()
+
 @app.get("/api/metrics/rate-limit")
 async def get_rate_limit_metrics(rate_limiter = Depends(get_rate_limiter_instance)):
     """레이트 리미팅 메트릭"""
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+LLM 호출 스케줄러 벤치마크
+로컬 가짜 OpenAI 서버(분당 요청 한도 초과 시 429 응답)에 대해 처리량, 큐 대기 p99, 429 횟수 측정
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+from collections import deque
+from pathlib import Path
+
+from aiohttp import web
+from openai import AsyncOpenAI
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.openai_cost_control import OpenAICostController, Priority
+
+class FakeOpenAIServer:
+    """분당 요청 한도를 강제하는 /v1/chat/completions 모의 서버"""
+
+    def __init__(self, rpm: int, latency: float):
+        self.rpm = rpm
+        self.latency = latency
+        self.requests = deque()
+        self.accepted = 0
+        self.rejected = 0
+
+    async def chat_completions(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        now = time.monotonic()
+        while self.requests and now - self.requests[0] >= 60:
+            self.requests.popleft()
+
+        if len(self.requests) >= self.rpm:
+            self.rejected += 1
+            return web.json_response(
+                {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+                status=429
+            )
+
+        self.requests.append(now)
+        self.accepted += 1
+        await asyncio.sleep(self.latency)
+        return web.json_response({
+            "id": f"chatcmpl-{self.accepted}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body["model"],
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "ok"},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 20, "completion_tokens": 5, "total_tokens": 25}
+        })
+
+    async def start(self, port: int) -> web.AppRunner:
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", self.chat_completions)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", port).start()
+        return runner
+
+async def run_benchmark(args) -> dict:
+    """벤치마크 실행"""
+    server = FakeOpenAIServer(rpm=args.server_rpm, latency=args.latency)
+    runner = await server.start(args.port)
+
+    client = AsyncOpenAI(api_key="sk-benchmark", base_url=f"http://127.0.0.1:{args.port}/v1", max_retries=0)
+    controller = OpenAICostController(
+        daily_budget=1000.0,
+        max_concurrency=args.concurrency,
+        rate_limits={"gpt-4o-mini": {"rpm": args.client_rpm}}
+    )
+    controller.backoff_base = 0.1
+
+    priorities = [Priority.HIGH, Priority.MEDIUM, Priority.LOW]
+    start = time.perf_counter()
+    try:
+        controller.start(client)
+        results = await asyncio.gather(*(
+            controller.submit(
+                "gpt-4o-mini",
+                [{"role": "user", "content": f"종목 {i} 요약"}],
+                priorities[i % 3]
+            )
+            for i in range(args.requests)
+        ), return_exceptions=True)
+        elapsed = time.perf_counter() - start
+    finally:
+        await controller.stop()
+        await client.close()
+        await runner.cleanup()
+
+    metrics = controller.get_metrics()
+    return {
+        "requests": args.requests,
+        "succeeded": sum(1 for r in results if not isinstance(r, BaseException)),
+        "elapsed_s": round(elapsed, 2),
+        "throughput_rps": round(args.requests / elapsed, 2),
+        "queue_wait_p50_ms": round(metrics["queue_wait_ms"]["p50"], 1),
+        "queue_wait_p99_ms": round(metrics["queue_wait_ms"]["p99"], 1),
+        "http_429": server.rejected
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="LLM 호출 스케줄러 벤치마크")
+    parser.add_argument("--requests", type=int, default=300, help="총 요청 수")
+    parser.add_argument("--concurrency", type=int, default=16, help="동시 실행 호출 수")
+    parser.add_argument("--server-rpm", type=int, default=1200, help="모의 서버 분당 요청 한도")
+    parser.add_argument("--client-rpm", type=int, default=1200, help="스케줄러 분당 요청 한도")
+    parser.add_argument("--latency", type=float, default=0.05, help="모의 응답 지연 (초)")
+    parser.add_argument("--port", type=int, default=18080, help="모의 서버 포트")
+    args = parser.parse_args()
+
+    print("🚀 LLM 호출 스케줄러 벤치마크")
+    result = asyncio.run(run_benchmark(args))
+    for key, value in result.items():
+        print(f"  {key}: {value}")
+
+    if result["http_429"] > 0:
+        print("❌ 레이트 리밋 초과 응답 발생")
+        sys.exit(1)
+    print("✅ 429 응답 없이 완료")
+
+if __name__ == "__main__":
+    main()
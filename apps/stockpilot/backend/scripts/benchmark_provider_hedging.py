@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+다중 프로바이더 헤지 요청 벤치마크
+지연 스파이크를 주입한 로컬 가짜 시세 프로바이더로 헤지 끄기/켜기의 시세 조회 지연 분위수 비교
+"""
+
+import sys
+import time
+import random
+import asyncio
+import argparse
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.multi_provider_failover import DataRequest, DataSourceType, MultiProviderFailover
+from utils.token_bucket import TokenBucket
+
+class FakeQuoteProvider:
+    """평소 base_latency, spike_ratio 확률로 spike_latency만큼 지연하는 가짜 프로바이더"""
+
+    def __init__(self, name: str, rng: random.Random, base_latency: float, spike_latency: float, spike_ratio: float):
+        self.name = name
+        self.rng = rng
+        self.base_latency = base_latency
+        self.spike_latency = spike_latency
+        self.spike_ratio = spike_ratio
+        self.calls = 0
+
+    async def fetch(self, provider, request):
+        self.calls += 1
+        latency = self.base_latency * self.rng.uniform(0.7, 1.3)
+        if self.rng.random() < self.spike_ratio:
+            latency = self.spike_latency
+        await asyncio.sleep(latency)
+        return {'symbol': request.symbol, 'price': 100.0, 'source': self.name}
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+async def run_scenario(args, hedging: bool) -> dict:
+    """시나리오 실행 (캐시 우회 실시간 조회)"""
+    rng = random.Random(args.seed)
+    failover = MultiProviderFailover({'hedging_enabled': hedging, 'hedge_default_delay': args.default_delay})
+    fakes = {}
+    for name in ("yahoo_finance", "alpha_vantage", "krx_data"):
+        fakes[name] = FakeQuoteProvider(name, rng, args.base_latency, args.spike_latency, args.spike_ratio)
+        failover.fetchers[name] = fakes[name].fetch
+        failover.rate_limiters[name] = TokenBucket(10000, 10000)  # 레이트 리밋이 결과를 가리지 않도록
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies = []
+
+    async def one(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            response = await failover.get_data(DataRequest(
+                data_type=DataSourceType.MARKET_DATA,
+                symbol=f"SYM{i % 50}",
+                parameters={},
+                require_realtime=True
+            ))
+            if response is not None:
+                latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one(i) for i in range(args.requests)))
+    latencies.sort()
+    return {
+        "hedging": hedging,
+        "succeeded": len(latencies),
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 1),
+        "p95_ms": round(_percentile(latencies, 0.95) * 1000, 1),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 1),
+        "provider_calls": sum(fake.calls for fake in fakes.values()),
+        **failover.hedge_stats
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="다중 프로바이더 헤지 요청 벤치마크")
+    parser.add_argument("--requests", type=int, default=1000, help="총 요청 수")
+    parser.add_argument("--concurrency", type=int, default=20, help="동시 요청 수")
+    parser.add_argument("--base-latency", type=float, default=0.02, help="평소 응답 지연 (초)")
+    parser.add_argument("--spike-latency", type=float, default=0.8, help="스파이크 응답 지연 (초)")
+    parser.add_argument("--spike-ratio", type=float, default=0.05, help="스파이크 확률")
+    parser.add_argument("--default-delay", type=float, default=0.2, help="표본이 쌓이기 전 헤지 지연 (초)")
+    parser.add_argument("--seed", type=int, default=7, help="난수 시드")
+    args = parser.parse_args()
+
+    print("🚀 다중 프로바이더 헤지 요청 벤치마크")
+    for hedging in (False, True):
+        result = asyncio.run(run_scenario(args, hedging))
+        print(f"  {'헤지 켜기' if hedging else '헤지 끄기'}: {result}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+WebSocket 팬아웃 부하 하네스
+로컬 모의 클라이언트(기본 1만 개)를 ConnectionManager에 연결하고 가격 틱을 브로드캐스트하여
+틱 발행부터 클라이언트 수신까지의 지연 백분위수, 합치기(conflation)/드롭 횟수 측정
+"""
+
+import re
+import sys
+import time
+import random
+import asyncio
+import argparse
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.websocket.manager import ConnectionManager
+
+# 틱 번호를 volume 필드에 실어 보내고 수신 측에서 발행 시각과 매칭
+_TICK_PATTERN = re.compile(r'"volume": (\d+)')
+
+class SimulatedClient:
+    """send_text만 구현한 모의 WebSocket (느린 클라이언트는 전송마다 지연)"""
+
+    def __init__(self, sent_at: Dict[int, float], latencies: List[float], delay: float = 0.0):
+        self.sent_at = sent_at
+        self.latencies = latencies
+        self.delay = delay
+        self.received = 0
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        match = _TICK_PATTERN.search(text)
+        if match:
+            published = self.sent_at[int(match.group(1))]
+            self.latencies.append(time.perf_counter() - published)
+            self.received += 1
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+async def run_benchmark(args) -> dict:
+    """하네스 실행"""
+    rng = random.Random(args.seed)
+    manager = ConnectionManager()
+    symbols = [f"SYM{i:03d}" for i in range(args.symbols)]
+    sent_at: Dict[int, float] = {}
+    latencies: List[float] = []
+
+    clients = []
+    for i in range(args.clients):
+        delay = args.slow_delay if rng.random() < args.slow_ratio else 0.0
+        client = SimulatedClient(sent_at, latencies, delay)
+        connection_id = await manager.connect(client)
+        manager.subscribe_to_prices(connection_id, rng.sample(symbols, args.symbols_per_client))
+        clients.append(client)
+    await asyncio.sleep(0.5)  # 연결 확인 메시지 소진
+
+    interval = 1.0 / args.tick_rate
+    ticks = int(args.duration * args.tick_rate)
+    start = time.perf_counter()
+    for tick in range(ticks):
+        symbol = symbols[tick % len(symbols)]
+        sent_at[tick] = time.perf_counter()
+        await manager.broadcast_price_update(symbol, {
+            "price": 100 + tick * 0.01,
+            "change_amount": 0.01,
+            "change_rate": 0.01,
+            "volume": tick
+        })
+        next_tick = start + (tick + 1) * interval
+        await asyncio.sleep(max(0.0, next_tick - time.perf_counter()))
+
+    # 남은 메시지 전송 대기
+    drain_deadline = time.perf_counter() + args.drain_timeout
+    while time.perf_counter() < drain_deadline:
+        if not any(len(q) for q in manager.backpressure_manager.message_queues.values()):
+            break
+        await asyncio.sleep(0.05)
+
+    stats = manager.get_statistics()
+    for connection_id in list(manager.active_connections):
+        manager.disconnect(connection_id)
+    if manager._health_check_task:
+        manager._health_check_task.cancel()
+
+    latencies.sort()
+    return {
+        "clients": args.clients,
+        "slow_clients": sum(1 for c in clients if c.delay),
+        "ticks": ticks,
+        "deliveries": len(latencies),
+        "conflated": stats["conflated_messages"],
+        "dropped": stats["dropped_messages"],
+        "latency_p50_ms": round(_percentile(latencies, 0.50) * 1000, 2),
+        "latency_p95_ms": round(_percentile(latencies, 0.95) * 1000, 2),
+        "latency_p99_ms": round(_percentile(latencies, 0.99) * 1000, 2),
+        "latency_max_ms": round((latencies[-1] if latencies else 0.0) * 1000, 2)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="WebSocket 팬아웃 부하 하네스")
+    parser.add_argument("--clients", type=int, default=10000, help="모의 클라이언트 수")
+    parser.add_argument("--symbols", type=int, default=200, help="종목 수")
+    parser.add_argument("--symbols-per-client", type=int, default=5, help="클라이언트당 구독 종목 수")
+    parser.add_argument("--tick-rate", type=float, default=200, help="초당 가격 틱 수")
+    parser.add_argument("--duration", type=float, default=5, help="틱 발행 시간 (초)")
+    parser.add_argument("--slow-ratio", type=float, default=0.01, help="느린 클라이언트 비율")
+    parser.add_argument("--slow-delay", type=float, default=0.05, help="느린 클라이언트 전송 지연 (초)")
+    parser.add_argument("--drain-timeout", type=float, default=10, help="종료 후 전송 대기 시간 (초)")
+    parser.add_argument("--seed", type=int, default=42, help="난수 시드")
+    args = parser.parse_args()
+
+    print("🚀 WebSocket 팬아웃 부하 하네스")
+    result = asyncio.run(run_benchmark(args))
+    for key, value in result.items():
+        print(f"  {key}: {value}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+WebSocket 레이트 리미터 벤치마크
+연결 클라이언트 수(기본 100 ~ 5만)를 늘려 가며 메시지 한 건의 check_rate_limit 비용과
+정리 작업(타이밍 휠 tick) 한 번의 비용을 측정. 가상 시계를 써서 1시간 분량의 트래픽을 재생
+"""
+
+import sys
+import time
+import random
+import asyncio
+import argparse
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.rate_limiter import WHEEL_TICK_SECONDS, RateLimiter
+
+CHANNELS = ["us_stocks", "us_indices", "exchange_rates", "market_status"]
+
+class VirtualClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+async def run_case(clients: int, messages: int, seed: int) -> Dict[str, float]:
+    """clients개 연결이 모두 메시지를 보낸 뒤 무작위 클라이언트 메시지 messages건 처리"""
+    rng = random.Random(seed)
+    clock = VirtualClock()
+    limiter = RateLimiter(clock=clock)
+    client_ids = [f"client_{i}" for i in range(clients)]
+
+    for client_id in client_ids:
+        await limiter.check_rate_limit(client_id, rng.choice(CHANNELS))
+
+    sample = [(rng.choice(client_ids), rng.choice(CHANNELS)) for _ in range(messages)]
+    step = 3600.0 / messages  # 측정 구간 = 가상 1시간 (휠 tick 60회 포함)
+    cleanup_seconds: List[float] = []
+    start = time.perf_counter()
+    for client_id, channel in sample:
+        clock.now += step
+        if clock.now >= limiter.wheel.next_tick_at:
+            began = time.perf_counter()
+            limiter._cleanup_old_data()
+            cleanup_seconds.append(time.perf_counter() - began)
+        await limiter.check_rate_limit(client_id, channel)
+    elapsed = time.perf_counter() - start
+
+    stats = limiter.get_global_stats()
+    return {
+        "clients": clients,
+        "us_per_message": round(elapsed / messages * 1e6, 2),
+        "max_cleanup_ms": round(max(cleanup_seconds, default=0.0) * 1000, 3),
+        "cleanup_ticks": len(cleanup_seconds),
+        "active_clients": stats["active_clients"],
+        "blocked_requests": stats["blocked_requests"]
+    }
+
+async def main_async(args):
+    results = [await run_case(clients, args.messages, args.seed) for clients in args.clients]
+    print(f"\n레이트 리미터 벤치마크 (메시지 {args.messages:,}건, 가상 1시간, 휠 tick {WHEEL_TICK_SECONDS}초)")
+    for result in results:
+        print(f"  클라이언트 {result['clients']:>7,}개: 메시지당 {result['us_per_message']:>6}µs, "
+              f"정리 tick 최대 {result['max_cleanup_ms']}ms ({result['cleanup_ticks']}회), "
+              f"활성 {result['active_clients']:,}, 차단 {result['blocked_requests']:,}")
+    costs = [result["us_per_message"] for result in results]
+    print(f"  최대/최소 메시지 비용 비: {max(costs) / min(costs):.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="WebSocket 레이트 리미터 벤치마크")
+    parser.add_argument("--clients", type=int, nargs="+", default=[100, 1000, 10000, 50000])
+    parser.add_argument("--messages", type=int, default=200000)
+    parser.add_argument("--seed", type=int, default=7)
+    asyncio.run(main_async(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
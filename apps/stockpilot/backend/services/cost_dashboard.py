@@ -21,6 +21,16 @@ from pathlib import Path
 # 로깅 설정
 logger = logging.getLogger(__name__)
 
+# 롤업 집계 단위별 버킷 포맷 (SQLite strftime과 동일한 포맷 사용)
+ROLLUP_BUCKET_FORMATS = {
+    "minute": "%Y-%m-%d %H:%M:00",
+    "hour": "%Y-%m-%d %H:00:00",
+    "day": "%Y-%m-%d"
+}
+
+# 분/시간 롤업 정리 주기 (메트릭 저장 경로에서 이 간격마다 한 번 실행)
+ROLLUP_PRUNE_INTERVAL_SECONDS = 3600
+
 class CostCategory(Enum):
     """비용 카테고리"""
     OPENAI_API = "openai_api"
@@ -82,15 +92,16 @@ class CostAlert:
 class CostTracker:
     """실시간 비용 추적기"""
     
-    def __init__(self, redis_url: str = "redis://localhost:6379"):
+    def __init__(self, redis_url: str = "redis://localhost:6379", db_path: Optional[str] = None):
         self.redis_url = redis_url
         self.redis_client = None
         self.cost_buffer = deque(maxlen=1000)  # 최근 1000개 메트릭 버퍼
         self.budget_rules: Dict[str, BudgetRule] = {}
         self.active_throttles: Dict[str, datetime] = {}
+        self._last_rollup_prune: Optional[datetime] = None
         
         # SQLite 데이터베이스 초기화
-        self.db_path = Path("data/cost_metrics.db")
+        self.db_path = Path(db_path or "data/cost_metrics.db")
         self.db_path.parent.mkdir(exist_ok=True)
         self._init_database()
         
@@ -152,6 +163,23 @@ class CostTracker:
                 )
             """)
             
+            # 분/시간/일 단위 사전 집계 테이블 (메트릭 저장 시 증분 갱신)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS cost_rollups (
+                    granularity TEXT NOT NULL,
+                    bucket_start TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    channel TEXT NOT NULL,
+                    country TEXT NOT NULL,
+                    user_id TEXT NOT NULL DEFAULT '',
+                    call_count INTEGER NOT NULL DEFAULT 0,
+                    token_count INTEGER NOT NULL DEFAULT 0,
+                    cost_usd REAL NOT NULL DEFAULT 0,
+                    PRIMARY KEY (granularity, bucket_start, category, model, channel, country, user_id)
+                )
+            """)
+            
             # 인덱스 생성
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_timestamp ON cost_metrics(timestamp)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_category ON cost_metrics(category)")
@@ -283,12 +311,93 @@ class CostTracker:
                 metric.session_id
             ))
             
+            # 같은 트랜잭션에서 롤업 증분 갱신
+            cursor.executemany("""
+                INSERT INTO cost_rollups
+                (granularity, bucket_start, category, model, channel, country, user_id,
+                 call_count, token_count, cost_usd)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (granularity, bucket_start, category, model, channel, country, user_id)
+                DO UPDATE SET
+                    call_count = call_count + excluded.call_count,
+                    token_count = token_count + excluded.token_count,
+                    cost_usd = cost_usd + excluded.cost_usd
+            """, [
+                (
+                    granularity,
+                    metric.timestamp.strftime(fmt),
+                    metric.category.value,
+                    metric.model,
+                    metric.channel,
+                    metric.country,
+                    metric.user_id or "",
+                    metric.call_count,
+                    metric.token_count,
+                    metric.cost_usd
+                )
+                for granularity, fmt in ROLLUP_BUCKET_FORMATS.items()
+            ])
+            
             conn.commit()
             conn.close()
             
+            # 오래된 분/시간 롤업 주기적 정리
+            now = datetime.now()
+            if (self._last_rollup_prune is None or
+                    (now - self._last_rollup_prune).total_seconds() >= ROLLUP_PRUNE_INTERVAL_SECONDS):
+                self._last_rollup_prune = now
+                self.prune_rollups()
+            
         except Exception as e:
             logger.error(f"메트릭 데이터베이스 저장 오류: {e}")
 
+    def rebuild_rollups(self) -> int:
+        """원본 메트릭으로부터 롤업 테이블 재구축 (백필)"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM cost_rollups")
+            
+            for granularity, fmt in ROLLUP_BUCKET_FORMATS.items():
+                cursor.execute(f"""
+                    INSERT INTO cost_rollups
+                    (granularity, bucket_start, category, model, channel, country, user_id,
+                     call_count, token_count, cost_usd)
+                    SELECT ?, strftime('{fmt}', timestamp), category, model, channel, country,
+                           COALESCE(user_id, ''), SUM(call_count), SUM(token_count), SUM(cost_usd)
+                    FROM cost_metrics
+                    GROUP BY 2, 3, 4, 5, 6, 7
+                """, (granularity,))
+            
+            conn.commit()
+            cursor.execute("SELECT COUNT(*) FROM cost_rollups")
+            count = cursor.fetchone()[0]
+        finally:
+            conn.close()
+        
+        logger.info(f"비용 롤업 재구축 완료: {count}개 행")
+        return count
+
+    def prune_rollups(self, minute_retention_days: int = 2, hour_retention_days: int = 90) -> int:
+        """오래된 분/시간 단위 롤업 정리 (일 단위는 유지), 삭제된 행 수 반환"""
+        now = datetime.now()
+        deleted = 0
+        conn = sqlite3.connect(self.db_path)
+        try:
+            for granularity, days in (("minute", minute_retention_days), ("hour", hour_retention_days)):
+                cutoff = (now - timedelta(days=days)).strftime(ROLLUP_BUCKET_FORMATS[granularity])
+                deleted += conn.execute(
+                    "DELETE FROM cost_rollups WHERE granularity = ? AND bucket_start < ?",
+                    (granularity, cutoff)
+                ).rowcount
+            conn.commit()
+        finally:
+            conn.close()
+        
+        if deleted:
+            logger.info(f"오래된 비용 롤업 정리: {deleted}개 행")
+        return deleted
+
     async def _check_budget_rules(self, metric: CostMetric) -> List[CostAlert]:
         """예산 규칙 체크 및 알림 생성"""
         alerts = []
@@ -383,17 +492,18 @@ class CostTracker:
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
             
-            # 기간 설정
+            # 기간 설정 - 기간 길이에 맞는 롤업 단위 선택
+            now = datetime.now()
             if period == "daily":
-                start_time = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+                granularity, start_time = "day", now
             elif period == "monthly":
-                start_time = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+                granularity, start_time = "day", now.replace(day=1)
             else:
-                start_time = datetime.now() - timedelta(hours=1)
+                granularity, start_time = "minute", now - timedelta(hours=1)
             
             # 필터 조건 구성
-            where_conditions = ["timestamp >= ?"]
-            params = [start_time]
+            where_conditions = ["granularity = ?", "bucket_start >= ?"]
+            params = [granularity, start_time.strftime(ROLLUP_BUCKET_FORMATS[granularity])]
             
             where_conditions.append("category = ?")
             params.append(rule.category.value)
@@ -412,7 +522,7 @@ class CostTracker:
             
             query = f"""
                 SELECT COALESCE(SUM(cost_usd), 0) as total_cost
-                FROM cost_metrics
+                FROM cost_rollups
                 WHERE {' AND '.join(where_conditions)}
             """
             
@@ -601,9 +711,9 @@ class CostTracker:
             today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
             cursor.execute("""
                 SELECT COALESCE(SUM(cost_usd), 0), COALESCE(SUM(call_count), 0), COALESCE(SUM(token_count), 0)
-                FROM cost_metrics 
-                WHERE timestamp >= ?
-            """, (today,))
+                FROM cost_rollups 
+                WHERE granularity = 'day' AND bucket_start = ?
+            """, (today.strftime(ROLLUP_BUCKET_FORMATS["day"]),))
             
             today_cost, today_calls, today_tokens = cursor.fetchone()
             
@@ -611,19 +721,19 @@ class CostTracker:
             yesterday = today - timedelta(days=1)
             cursor.execute("""
                 SELECT COALESCE(SUM(cost_usd), 0)
-                FROM cost_metrics 
-                WHERE timestamp >= ? AND timestamp < ?
-            """, (yesterday, today))
+                FROM cost_rollups 
+                WHERE granularity = 'day' AND bucket_start = ?
+            """, (yesterday.strftime(ROLLUP_BUCKET_FORMATS["day"]),))
             
             yesterday_cost = cursor.fetchone()[0]
             
             # 이번 달 총 비용
-            this_month = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+            this_month = today.replace(day=1)
             cursor.execute("""
                 SELECT COALESCE(SUM(cost_usd), 0)
-                FROM cost_metrics 
-                WHERE timestamp >= ?
-            """, (this_month,))
+                FROM cost_rollups 
+                WHERE granularity = 'day' AND bucket_start >= ?
+            """, (this_month.strftime(ROLLUP_BUCKET_FORMATS["day"]),))
             
             month_cost = cursor.fetchone()[0]
             
@@ -650,32 +760,31 @@ class CostTracker:
     async def _get_cost_trends(self, period: str, limit: int) -> Dict[str, List]:
         """비용 트렌드 데이터"""
         try:
-            if period == "hourly":
-                time_format = "%Y-%m-%d %H:00:00"
-                time_delta = timedelta(hours=1)
-            elif period == "daily":
-                time_format = "%Y-%m-%d"
+            if period == "daily":
+                granularity = "day"
                 time_delta = timedelta(days=1)
             else:
-                time_format = "%Y-%m-%d %H:00:00"
+                granularity = "hour"
                 time_delta = timedelta(hours=1)
             
+            start_bucket = (datetime.now() - time_delta * limit).strftime(ROLLUP_BUCKET_FORMATS[granularity])
+            
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
             
             # 시간별/일별 비용 트렌드
-            cursor.execute(f"""
+            cursor.execute("""
                 SELECT 
-                    strftime('{time_format}', timestamp) as period,
+                    bucket_start as period,
                     COALESCE(SUM(cost_usd), 0) as total_cost,
                     COALESCE(SUM(call_count), 0) as total_calls,
                     COALESCE(SUM(token_count), 0) as total_tokens
-                FROM cost_metrics 
-                WHERE timestamp >= datetime('now', '-{limit} {period.replace("ly", "")}')
-                GROUP BY strftime('{time_format}', timestamp)
+                FROM cost_rollups 
+                WHERE granularity = ? AND bucket_start >= ?
+                GROUP BY bucket_start
                 ORDER BY period DESC
-                LIMIT {limit}
-            """)
+                LIMIT ?
+            """, (granularity, start_bucket, limit))
             
             trend_data = cursor.fetchall()
             conn.close()
@@ -708,40 +817,24 @@ class CostTracker:
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
             
-            today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-            
-            # 모델별 분석
-            cursor.execute("""
-                SELECT model, COALESCE(SUM(cost_usd), 0) as cost, COALESCE(SUM(call_count), 0) as calls
-                FROM cost_metrics 
-                WHERE timestamp >= ?
-                GROUP BY model 
-                ORDER BY cost DESC
-            """, (today,))
-            
-            model_breakdown = [{"model": row[0], "cost": round(row[1], 4), "calls": row[2]} for row in cursor.fetchall()]
-            
-            # 채널별 분석
-            cursor.execute("""
-                SELECT channel, COALESCE(SUM(cost_usd), 0) as cost, COALESCE(SUM(call_count), 0) as calls
-                FROM cost_metrics 
-                WHERE timestamp >= ?
-                GROUP BY channel 
-                ORDER BY cost DESC
-            """, (today,))
-            
-            channel_breakdown = [{"channel": row[0], "cost": round(row[1], 4), "calls": row[2]} for row in cursor.fetchall()]
-            
-            # 국가별 분석
-            cursor.execute("""
-                SELECT country, COALESCE(SUM(cost_usd), 0) as cost, COALESCE(SUM(call_count), 0) as calls
-                FROM cost_metrics 
-                WHERE timestamp >= ?
-                GROUP BY country 
-                ORDER BY cost DESC
-            """, (today,))
-            
-            country_breakdown = [{"country": row[0], "cost": round(row[1], 4), "calls": row[2]} for row in cursor.fetchall()]
+            today = datetime.now().strftime(ROLLUP_BUCKET_FORMATS["day"])
+            
+            breakdowns = {}
+            for dimension in ("model", "channel", "country"):
+                cursor.execute(f"""
+                    SELECT {dimension}, COALESCE(SUM(cost_usd), 0) as cost, COALESCE(SUM(call_count), 0) as calls
+                    FROM cost_rollups 
+                    WHERE granularity = 'day' AND bucket_start = ?
+                    GROUP BY {dimension} 
+                    ORDER BY cost DESC
+                """, (today,))
+                breakdowns[dimension] = [
+                    {dimension: row[0], "cost": round(row[1], 4), "calls": row[2]} for row in cursor.fetchall()
+                ]
+            
+            model_breakdown = breakdowns["model"]
+            channel_breakdown = breakdowns["channel"]
+            country_breakdown = breakdowns["country"]
             
             conn.close()
             
@@ -897,4 +990,19 @@ async def track_openai_cost(model: str, channel: str, country: str,
         session_id=session_id
     )
     
-    return await cost_tracker.track_cost(metric)
\ No newline at end of file
+    return await cost_tracker.track_cost(metric)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="비용 대시보드 DB 관리")
+    parser.add_argument("--db", default="data/cost_metrics.db", help="비용 메트릭 DB 경로")
+    parser.add_argument("--rebuild-rollups", action="store_true", help="원본 메트릭으로 롤업 테이블 재구축")
+    args = parser.parse_args()
+
+    if args.rebuild_rollups:
+        rows = CostTracker(db_path=args.db).rebuild_rollups()
+        print(f"✅ 롤업 재구축 완료: {rows}개 행 ({args.db})")
+    else:
+        parser.print_help()
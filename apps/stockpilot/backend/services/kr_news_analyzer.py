@@ -96,8 +96,8 @@ class KRNewsAnalyzer:
         self.session: Optional[aiohttp.ClientSession] = None
         # 한국 뉴스 분석용 최적화기 (5분 캐시 TTL)
         self.openai_optimizer = get_openai_optimizer(daily_budget=2.0)
-        # 한국 뉴스 분석용 캐시 TTL을 5분으로 설정
-        self.openai_optimizer.cache_ttl = 300  # 5분 = 300초
+        # 한국 뉴스 분석용 캐시 TTL (호출마다 전달)
+        self.cache_ttl = 300  # 5분 = 300초
         
     async def __aenter__(self):
         """비동기 컨텍스트 매니저 진입"""
@@ -156,7 +156,8 @@ class KRNewsAnalyzer:
                 model="gpt-4o-mini",
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=300,
-                temperature=0.3
+                temperature=0.3,
+                cache_ttl=self.cache_ttl
             )
             
             result_text = response.choices[0].message.content.strip()
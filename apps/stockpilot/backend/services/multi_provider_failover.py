@@ -3,6 +3,7 @@
 """
 StockPilot 다중 프로바이더 페일오버 시스템
 Yahoo Finance, Reuters, Bloomberg 다중화 및 자동 페일오버 로직
+1순위 프로바이더가 p95 응답 시간 안에 답하지 않으면 다음 프로바이더로 헤지 요청
 """
 
 import asyncio
@@ -17,6 +18,13 @@ from enum import Enum
 import random
 from urllib.parse import urlencode
 import hashlib
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.hedging import LatencyTracker, hedged_call
+from utils.token_bucket import TokenBucket
+from utils.ttl_cache import TTLCache
 
 # 로깅 설정
 logging.basicConfig(
@@ -96,10 +104,30 @@ class MultiProviderFailover:
         self.config = config or {}
         self.providers = self._init_providers()
         self.provider_metrics = {p.name: self._init_metrics(p) for p in self.providers}
-        self.cache = {}
-        self.rate_limiters = {p.name: {'requests': [], 'window': 1.0} for p in self.providers}
+        self.cache = TTLCache(max_entries=self.config.get('cache_max_entries', 1000))
+        # 초당 rate_limit 충전, 1초 분량까지 버스트 허용
+        self.rate_limiters = {p.name: TokenBucket(p.rate_limit, p.rate_limit) for p in self.providers}
         self.circuit_breakers = {p.name: {'failures': 0, 'last_failure': None, 'state': 'closed'} for p in self.providers}
         
+        # 헤지 요청 설정 (표본이 쌓이기 전에는 hedge_default_delay초 후 헤지)
+        self.hedging_enabled = self.config.get('hedging_enabled', True)
+        self.latency_trackers = {
+            p.name: LatencyTracker(default_seconds=self.config.get('hedge_default_delay', 1.0))
+            for p in self.providers
+        }
+        self.hedge_stats = {'hedged_requests': 0, 'backup_wins': 0}
+        
+        # 프로바이더별 조회 함수 (이름 -> 코루틴 함수)
+        self.fetchers = {
+            "yahoo_finance": self._fetch_yahoo_finance,
+            "alpha_vantage": self._fetch_alpha_vantage,
+            "reuters_news": self._fetch_reuters_news,
+            "newsapi": self._fetch_newsapi,
+            "fred_economic": self._fetch_fred_economic,
+            "krx_data": self._fetch_krx_data,
+            "dart_api": self._fetch_dart_api
+        }
+        
         # 백그라운드 작업
         self.health_check_task = None
         self.metrics_cleanup_task = None
@@ -240,31 +268,56 @@ class MultiProviderFailover:
         # 프로바이더 우선순위 정렬
         sorted_providers = self._sort_providers_by_priority(eligible_providers)
         
-        # 각 프로바이더 순차 시도
-        for provider in sorted_providers:
-            if not self._can_make_request(provider):
-                logger.warning(f"요청 제한 또는 회로 차단기로 인해 {provider.name} 스킵")
-                continue
-            
-            try:
-                response = await self._fetch_from_provider(provider, request)
-                if response:
-                    # 성공 메트릭 업데이트
-                    self._update_success_metrics(provider.name, response.response_time)
-                    
-                    # 캐시 저장
-                    self._save_to_cache(request, response)
-                    
-                    logger.info(f"데이터 조회 성공: {provider.name} - {request.symbol}")
-                    return response
-                    
-            except Exception as e:
-                logger.warning(f"{provider.name}에서 데이터 조회 실패: {str(e)}")
-                self._update_failure_metrics(provider.name, str(e))
-                continue
+        # 우선순위 순으로 시도하되, 응답이 늦으면 다음 프로바이더를 동시에 호출
+        result = await hedged_call(
+            sorted_providers,
+            lambda provider: self._attempt_provider(provider, request),
+            self._hedge_delay if self.hedging_enabled else (lambda provider: None),
+            on_hedge=self._on_hedge
+        )
+        
+        if result is None:
+            logger.error(f"모든 프로바이더에서 데이터 조회 실패: {request.symbol}")
+            return None
+        
+        provider, response = result
+        if provider is not sorted_providers[0]:
+            self.hedge_stats['backup_wins'] += 1
+        
+        # 캐시 저장
+        self._save_to_cache(request, response)
+        
+        logger.info(f"데이터 조회 성공: {provider.name} - {request.symbol}")
+        return response
+    
+    async def _attempt_provider(self, provider: ProviderConfig, request: DataRequest) -> Optional[DataResponse]:
+        """프로바이더 한 곳 시도 (실패 시 None, 헤지 패배로 취소되면 메트릭 미반영)"""
+        if not self._can_make_request(provider):
+            logger.warning(f"요청 제한 또는 회로 차단기로 인해 {provider.name} 스킵")
+            return None
+        
+        try:
+            response = await self._fetch_from_provider(provider, request)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"{provider.name}에서 데이터 조회 실패: {str(e)}")
+            self._update_failure_metrics(provider.name, str(e))
+            return None
         
-        logger.error(f"모든 프로바이더에서 데이터 조회 실패: {request.symbol}")
-        return None
+        if response:
+            # 성공 메트릭 업데이트
+            self._update_success_metrics(provider.name, response.response_time)
+            self.latency_trackers[provider.name].record(response.response_time / 1000)
+        return response
+    
+    def _on_hedge(self, provider: ProviderConfig):
+        self.hedge_stats['hedged_requests'] += 1
+        logger.info(f"응답 지연으로 헤지 요청: {provider.name}")
+    
+    def _hedge_delay(self, provider: ProviderConfig) -> float:
+        """헤지 발사 지연: 프로바이더의 최근 p95 응답 시간 (타임아웃 이내)"""
+        return min(self.latency_trackers[provider.name].hedge_delay(), provider.timeout)
     
     def _get_eligible_providers(self, data_type: DataSourceType) -> List[ProviderConfig]:
         """데이터 유형에 맞는 프로바이더 선택"""
@@ -323,45 +376,19 @@ class MultiProviderFailover:
             else:
                 return False
         
-        # Rate Limiting 확인
-        rate_limiter = self.rate_limiters[provider.name]
-        
-        # 시간 윈도우 내 요청 수 정리
-        rate_limiter['requests'] = [
-            req_time for req_time in rate_limiter['requests']
-            if now - req_time < rate_limiter['window']
-        ]
-        
-        # 요청 제한 확인
-        if len(rate_limiter['requests']) >= provider.rate_limit:
-            return False
-        
-        # 요청 시간 기록
-        rate_limiter['requests'].append(now)
-        return True
+        # Rate Limiting 확인 (토큰 버킷)
+        return self.rate_limiters[provider.name].try_consume()
     
     async def _fetch_from_provider(self, provider: ProviderConfig, request: DataRequest) -> Optional[DataResponse]:
         """특정 프로바이더에서 데이터 조회"""
         start_time = time.time()
         
         try:
-            if provider.name == "yahoo_finance":
-                data = await self._fetch_yahoo_finance(provider, request)
-            elif provider.name == "alpha_vantage":
-                data = await self._fetch_alpha_vantage(provider, request)
-            elif provider.name == "reuters_news":
-                data = await self._fetch_reuters_news(provider, request)
-            elif provider.name == "newsapi":
-                data = await self._fetch_newsapi(provider, request)
-            elif provider.name == "fred_economic":
-                data = await self._fetch_fred_economic(provider, request)
-            elif provider.name == "krx_data":
-                data = await self._fetch_krx_data(provider, request)
-            elif provider.name == "dart_api":
-                data = await self._fetch_dart_api(provider, request)
-            else:
+            fetcher = self.fetchers.get(provider.name)
+            if fetcher is None:
                 logger.warning(f"알 수 없는 프로바이더: {provider.name}")
                 return None
+            data = await fetcher(provider, request)
             
             response_time = (time.time() - start_time) * 1000
             
@@ -612,36 +639,16 @@ class MultiProviderFailover:
     
     def _get_from_cache(self, request: DataRequest) -> Optional[DataResponse]:
         """캐시에서 데이터 조회"""
-        cache_key = self._generate_cache_key(request)
-        
-        if cache_key in self.cache:
-            cached_item = self.cache[cache_key]
-            
-            # 캐시 유효성 확인
-            age = (datetime.now(timezone.utc) - cached_item['timestamp']).total_seconds()
-            if age <= request.max_age_seconds:
-                response = cached_item['response']
-                response.is_cached = True
-                return response
-            else:
-                # 만료된 캐시 삭제
-                del self.cache[cache_key]
-        
-        return None
+        # 요청별 최대 수명을 넘긴 항목은 만료 처리
+        response = self.cache.get(self._generate_cache_key(request), max_age=request.max_age_seconds)
+        if response is not None:
+            response.is_cached = True
+        return response
     
     def _save_to_cache(self, request: DataRequest, response: DataResponse):
         """캐시에 데이터 저장"""
-        cache_key = self._generate_cache_key(request)
-        
-        self.cache[cache_key] = {
-            'timestamp': datetime.now(timezone.utc),
-            'response': response
-        }
-        
-        # 캐시 크기 제한 (최대 1000개 항목)
-        if len(self.cache) > 1000:
-            oldest_key = min(self.cache.keys(), key=lambda k: self.cache[k]['timestamp'])
-            del self.cache[oldest_key]
+        # 최대 항목 수를 넘으면 가장 오래 사용하지 않은 항목 퇴출
+        self.cache.set(self._generate_cache_key(request), response)
     
     def _generate_cache_key(self, request: DataRequest) -> str:
         """캐시 키 생성"""
@@ -768,6 +775,7 @@ class MultiProviderFailover:
                 'last_success': metrics.last_success.isoformat() if metrics.last_success else None,
                 'last_failure': metrics.last_failure.isoformat() if metrics.last_failure else None,
                 'circuit_breaker_state': circuit_breaker['state'],
+                'hedge_delay_ms': round(self._hedge_delay(provider) * 1000, 1),
                 'data_types': [dt.value for dt in provider.data_types],
                 'priority': provider.priority
             }
@@ -801,28 +809,10 @@ class MultiProviderFailover:
             try:
                 await asyncio.sleep(3600)  # 1시간 대기
                 
-                # 오래된 캐시 정리
-                now = datetime.now(timezone.utc)
-                expired_keys = []
-                
-                for key, item in self.cache.items():
-                    age = (now - item['timestamp']).total_seconds()
-                    if age > 3600:  # 1시간 이상 된 캐시 삭제
-                        expired_keys.append(key)
-                
-                for key in expired_keys:
-                    del self.cache[key]
-                
-                if expired_keys:
-                    logger.info(f"만료된 캐시 {len(expired_keys)}개 정리 완료")
-                
-                # Rate Limiter 정리
-                current_time = time.time()
-                for provider_name, rate_limiter in self.rate_limiters.items():
-                    rate_limiter['requests'] = [
-                        req_time for req_time in rate_limiter['requests']
-                        if current_time - req_time < rate_limiter['window']
-                    ]
+                # 오래된 캐시 정리 (1시간 이상 된 캐시 삭제)
+                expired_count = self.cache.purge_older_than(3600)
+                if expired_count:
+                    logger.info(f"만료된 캐시 {expired_count}개 정리 완료")
                 
             except asyncio.CancelledError:
                 break
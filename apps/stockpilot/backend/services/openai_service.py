@@ -15,12 +15,14 @@ from typing import Dict, List, Optional, Any, Union
 import logging
 import aioredis
 import os
-from dataclasses import dataclass, asdict, field
+from dataclasses import dataclass, asdict, field, replace
 from enum import Enum
 import hashlib
 import tiktoken
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
+from utils.llm_response_cache import get_llm_response_cache
+
 # 로깅 설정
 logging.basicConfig(
     level=logging.INFO,
@@ -110,6 +112,10 @@ class OpenAIService:
         # 비용 계산 테이블
         self.pricing = self._get_pricing_table()
         
+        # 응답 캐시 (OpenAIOptimizer와 공유)
+        self.cache_config = self.config.get('cache', {'enabled': True, 'ttl': None})
+        self.response_cache = get_llm_response_cache()
+        
         # 사용량 제한
         self.limits = self.config.get('limits', {
             'daily_cost_limit': 100.0,  # USD
@@ -153,6 +159,10 @@ class OpenAIService:
                 "enabled": True,
                 "cost_alerts": True,
                 "usage_logging": True
+            },
+            "cache": {
+                "enabled": True,
+                "ttl": None  # None이면 공용 캐시의 모델별/기본 TTL
             }
         }
     
@@ -419,9 +429,36 @@ class OpenAIService:
             logger.error(f"OpenAI API 요청 실패: {e}")
             raise
     
+    def _generate_cache_key(self, request: GPTRequest) -> str:
+        """응답 캐시 키 생성 (사용자와 무관하게 동일 프롬프트는 같은 키)"""
+        cache_data = {
+            "model": request.model.value,
+            "system_prompt": request.system_prompt,
+            "messages": request.messages,
+            "max_tokens": request.max_tokens,
+            "temperature": request.temperature
+        }
+        cache_str = json.dumps(cache_data, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(cache_str.encode()).hexdigest()
+    
     async def process_request(self, request: GPTRequest) -> GPTResponse:
         """GPT 요청 처리"""
         try:
+            # 캐시 확인
+            use_cache = self.cache_config.get('enabled', True) and request.context_data.get('use_cache', True)
+            cache_key = self._generate_cache_key(request) if use_cache else None
+            if cache_key:
+                cached_response = self.response_cache.get(cache_key)
+                if cached_response is not None:
+                    logger.info(f"GPT 응답 캐시 히트: {request.id}")
+                    return replace(
+                        cached_response,
+                        request_id=request.id,
+                        cost_usd=0.0,
+                        response_time=0.0,
+                        created_at=datetime.now()
+                    )
+            
             # 토큰 수 계산
             messages_text = " ".join([msg["content"] for msg in request.messages])
             if request.system_prompt:
@@ -443,6 +480,11 @@ class OpenAIService:
             # 사용량 기록
             await self._record_usage(request, response)
             
+            if cache_key:
+                self.response_cache.set(
+                    cache_key, response, model=request.model.value, ttl=self.cache_config.get('ttl')
+                )
+            
             logger.info(f"GPT 요청 처리 완료: {request.id} (비용: ${response.cost_usd:.6f})")
             return response
             
@@ -65,8 +65,8 @@ class USAISignalGenerator:
         self.currency_service = CurrencyExchangeService()
         # AI 시그널 생성용 최적화기 (15분 캐시 TTL)
         self.openai_optimizer = get_openai_optimizer(daily_budget=5.0)
-        # AI 시그널용 캐시 TTL을 15분으로 설정
-        self.openai_optimizer.cache_ttl = 900  # 15분 = 900초
+        # AI 시그널용 캐시 TTL (호출마다 전달)
+        self.cache_ttl = 900  # 15분 = 900초
         
     async def __aenter__(self):
         """비동기 컨텍스트 매니저 진입"""
@@ -210,7 +210,8 @@ class USAISignalGenerator:
                 model="gpt-4o-mini",
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=500,
-                temperature=0.3
+                temperature=0.3,
+                cache_ttl=self.cache_ttl
             )
             
             result_text = response.choices[0].message.content.strip()
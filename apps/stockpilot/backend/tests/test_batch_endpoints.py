@@ -89,24 +89,21 @@ class TestBatchEndpoints:
     def test_get_lock_status(self, mock_batch_manager):
         """잠금 상태 조회 테스트"""
         mock_manager = Mock(spec=BatchManager)
-        mock_manager.lock_dir = Mock()
-        
-        # Mock Path 객체
-        mock_lock_file = Mock()
-        mock_lock_file.exists.return_value = True
-        mock_lock_file.stat.return_value.st_mtime = datetime.now().timestamp() - 3600  # 1시간 전
+        mock_manager.get_lock_info.return_value = {
+            "job_id": "test-job",
+            "owner": "host:1234:exec",
+            "age_hours": 1.0,
+            "is_expired": False
+        }
+        mock_batch_manager.return_value = mock_manager
+
+        response = client.get("/api/v1/batch/jobs/test-job/lock/status")
+        assert response.status_code == 200
         
-        with patch('pathlib.Path') as mock_path:
-            mock_path.return_value = mock_lock_file
-            mock_batch_manager.return_value = mock_manager
-
-            response = client.get("/api/v1/batch/jobs/test-job/lock/status")
-            assert response.status_code == 200
-            
-            data = response.json()
-            assert data["job_id"] == "test-job"
-            assert "lock_exists" in data
-            assert "is_expired" in data
+        data = response.json()
+        assert data["job_id"] == "test-job"
+        assert "lock_exists" in data
+        assert "is_expired" in data
 
     @patch('app.jobs.batch_manager.get_batch_manager')
     @pytest.mark.asyncio
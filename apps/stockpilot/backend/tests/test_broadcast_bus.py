@@ -0,0 +1,147 @@
+"""
+브로드캐스트 버스 테스트
+발행자 선출, 워커별 로컬 팬아웃, 종목별 순서 보장, 허브 인계 검증
+"""
+
+import asyncio
+import pytest
+
+from utils.broadcast_bus import InProcessBus, RedisBus, UnixSocketBus, create_broadcast_bus
+
+SYMBOLS = ["AAPL", "MSFT", "NVDA", "TSLA"]
+
+
+class Worker:
+    """버스에서 받은 틱을 기록하는 워커"""
+
+    def __init__(self):
+        self.received = []
+
+    async def handle(self, message):
+        self.received.append((message["payload"]["symbol"], message["payload"]["seq"]))
+
+
+def _ticks(count: int):
+    return [
+        {"type": "us_stocks", "payload": {"symbol": SYMBOLS[i % len(SYMBOLS)], "seq": i}}
+        for i in range(count)
+    ]
+
+
+async def _wait_for(predicate, timeout: float = 2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "timeout"
+        await asyncio.sleep(0.01)
+
+
+def _assert_ordered_per_symbol(received):
+    for symbol in SYMBOLS:
+        seqs = [seq for s, seq in received if s == symbol]
+        assert seqs == sorted(seqs)
+
+
+class TestBroadcastBus:
+    """브로드캐스트 버스 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_in_process_bus_delivers_in_order(self):
+        """프로세스 내부 버스가 발행 순서대로 전달하는지 테스트"""
+        bus = InProcessBus()
+        worker = Worker()
+        await bus.start(worker.handle)
+
+        for tick in _ticks(100):
+            await bus.publish(tick)
+
+        assert bus.is_publisher
+        assert [seq for _, seq in worker.received] == list(range(100))
+        await bus.close()
+
+    @pytest.mark.asyncio
+    async def test_unix_bus_fans_out_to_every_worker_once(self, tmp_path):
+        """Unix 소켓 버스에서 허브 하나만 발행하고 모든 워커가 순서대로 한 번씩 받는지 테스트"""
+        path = str(tmp_path / "bus.sock")
+        buses = [UnixSocketBus(path) for _ in range(3)]
+        workers = [Worker() for _ in buses]
+        for bus, worker in zip(buses, workers):
+            await bus.start(worker.handle)
+        await asyncio.sleep(0.05)  # 클라이언트 접속 완료 대기
+
+        publishers = [bus for bus in buses if bus.is_publisher]
+        assert len(publishers) == 1
+
+        ticks = _ticks(400)
+        for bus in buses:  # 모든 워커가 발행을 시도해도 허브만 실제로 발행
+            for tick in ticks:
+                await bus.publish(tick)
+
+        await _wait_for(lambda: all(len(w.received) >= len(ticks) for w in workers))
+        await asyncio.sleep(0.05)
+        for worker in workers:
+            assert len(worker.received) == len(ticks)
+            _assert_ordered_per_symbol(worker.received)
+
+        for bus in buses:
+            await bus.close()
+
+    @pytest.mark.asyncio
+    async def test_unix_bus_hub_failover(self, tmp_path):
+        """허브가 종료되면 남은 워커가 허브를 인계받아 계속 전달하는지 테스트"""
+        path = str(tmp_path / "bus.sock")
+        hub, follower_a, follower_b = (UnixSocketBus(path, reconnect_delay=0.02) for _ in range(3))
+        worker_a, worker_b = Worker(), Worker()
+        await hub.start(Worker().handle)
+        await follower_a.start(worker_a.handle)
+        await follower_b.start(worker_b.handle)
+        assert hub.is_publisher and not follower_a.is_publisher
+
+        await hub.close()
+        await _wait_for(lambda: follower_a.is_publisher or follower_b.is_publisher)
+        new_hub = follower_a if follower_a.is_publisher else follower_b
+        await asyncio.sleep(0.1)  # 나머지 워커 재접속 대기
+
+        for tick in _ticks(20):
+            await new_hub.publish(tick)
+
+        await _wait_for(lambda: len(worker_a.received) == 20 and len(worker_b.received) == 20)
+        await follower_a.close()
+        await follower_b.close()
+
+    @pytest.mark.asyncio
+    async def test_redis_bus_elects_single_publisher(self):
+        """Redis 버스에서 발행자가 하나만 선출되고 모든 워커가 수신하는지 테스트 (로컬 redis-server 필요)"""
+        import redis.asyncio as redis
+
+        client = redis.from_url("redis://localhost:6379/15")
+        try:
+            await client.ping()
+        except Exception:
+            pytest.skip("로컬 redis-server 없음")
+        finally:
+            await client.aclose()
+
+        buses = [RedisBus("redis://localhost:6379/15", channel="test:ws:broadcast") for _ in range(2)]
+        workers = [Worker() for _ in buses]
+        for bus, worker in zip(buses, workers):
+            await bus.start(worker.handle)
+        assert sum(bus.is_publisher for bus in buses) == 1
+
+        ticks = _ticks(200)
+        for bus in buses:
+            for tick in ticks:
+                await bus.publish(tick)
+
+        await _wait_for(lambda: all(len(w.received) == len(ticks) for w in workers))
+        for worker in workers:
+            _assert_ordered_per_symbol(worker.received)
+        for bus in buses:
+            await bus.close()
+
+    def test_factory_selects_backend(self, monkeypatch):
+        """환경변수로 백엔드를 선택하는지 테스트"""
+        monkeypatch.setenv("WS_BROADCAST_BACKEND", "unix")
+        assert isinstance(create_broadcast_bus(), UnixSocketBus)
+        assert isinstance(create_broadcast_bus("redis"), RedisBus)
+        monkeypatch.delenv("WS_BROADCAST_BACKEND")
+        assert isinstance(create_broadcast_bus(), InProcessBus)
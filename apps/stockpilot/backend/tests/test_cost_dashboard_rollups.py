@@ -0,0 +1,107 @@
+"""
+비용 대시보드 롤업 테스트
+분/시간/일 롤업 합계와 원본 메트릭 일치, 재구축(백필), 오래된 롤업 정리 검증
+"""
+
+import pytest
+import random
+import sqlite3
+from datetime import datetime, timedelta
+
+pytest.importorskip("aioredis")
+pytest.importorskip("psutil")
+
+from services import cost_dashboard
+from services.cost_dashboard import CostCategory, CostMetric, CostTracker
+
+
+def _metric(timestamp: datetime, rng: random.Random) -> CostMetric:
+    return CostMetric(
+        timestamp=timestamp,
+        category=CostCategory.OPENAI_API,
+        model=rng.choice(["gpt-4o-mini", "gpt-4o"]),
+        channel=rng.choice(["web", "telegram"]),
+        country=rng.choice(["KR", "US"]),
+        call_count=1,
+        token_count=rng.randint(10, 2000),
+        cost_usd=round(rng.random() / 100, 6),
+        response_time_ms=rng.randint(50, 900),
+        user_id=rng.choice([None, "u1", "u2"])
+    )
+
+
+def _totals(db_path, sql: str):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(sql).fetchall()
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def tracker(tmp_path):
+    return CostTracker(db_path=str(tmp_path / "cost_metrics.db"))
+
+
+class TestCostRollups:
+    """비용 롤업 테스트"""
+
+    def test_rollup_totals_match_raw_rows(self, tracker):
+        """증분 갱신된 롤업 합계가 단위별로 원본 메트릭 합계와 일치하는지 테스트"""
+        rng = random.Random(11)
+        start = datetime.now() - timedelta(hours=5)
+        for i in range(300):
+            tracker._save_metric_to_db(_metric(start + timedelta(seconds=53 * i), rng))
+
+        for granularity, fmt in cost_dashboard.ROLLUP_BUCKET_FORMATS.items():
+            raw = _totals(tracker.db_path, f"""
+                SELECT strftime('{fmt}', timestamp), model, channel, country, COALESCE(user_id, ''),
+                       SUM(call_count), SUM(token_count), ROUND(SUM(cost_usd), 9)
+                FROM cost_metrics GROUP BY 1, 2, 3, 4, 5 ORDER BY 1, 2, 3, 4, 5
+            """)
+            rollup = _totals(tracker.db_path, f"""
+                SELECT bucket_start, model, channel, country, user_id,
+                       call_count, token_count, ROUND(cost_usd, 9)
+                FROM cost_rollups WHERE granularity = '{granularity}' ORDER BY 1, 2, 3, 4, 5
+            """)
+            assert rollup == raw
+
+        # 재구축(백필) 결과도 증분 갱신 결과와 동일
+        before = _totals(tracker.db_path, "SELECT * FROM cost_rollups ORDER BY 1, 2, 3, 4, 5, 6, 7")
+        tracker.rebuild_rollups()
+        after = _totals(tracker.db_path, "SELECT * FROM cost_rollups ORDER BY 1, 2, 3, 4, 5, 6, 7")
+        assert [row[:9] + (round(row[9], 9),) for row in after] == \
+            [row[:9] + (round(row[9], 9),) for row in before]
+
+    def test_prune_drops_old_minute_and_hour_rollups_only(self, tracker):
+        """보관 기간이 지난 분/시간 롤업만 삭제되고 일 롤업은 유지되는지 테스트"""
+        rng = random.Random(5)
+        now = datetime.now()
+        tracker._last_rollup_prune = now  # 저장 경로의 자동 정리는 이 테스트에서 제외
+        for timestamp in (now - timedelta(days=120), now - timedelta(days=10), now - timedelta(minutes=5)):
+            tracker._save_metric_to_db(_metric(timestamp, rng))
+
+        deleted = tracker.prune_rollups(minute_retention_days=2, hour_retention_days=90)
+
+        counts = dict(_totals(tracker.db_path,
+                              "SELECT granularity, COUNT(*) FROM cost_rollups GROUP BY granularity"))
+        assert deleted == 3  # 120일 전/10일 전 분 롤업 + 120일 전 시간 롤업
+        assert counts == {"minute": 1, "hour": 2, "day": 3}
+
+    def test_metric_writes_prune_rollups_periodically(self, tracker, monkeypatch):
+        """메트릭 저장 경로에서 정리 주기마다 한 번씩 롤업 정리가 실행되는지 테스트"""
+        rng = random.Random(3)
+        old = datetime.now() - timedelta(days=30)
+        tracker._save_metric_to_db(_metric(old, rng))  # 첫 저장 시 정리 실행
+        assert _totals(tracker.db_path,
+                       "SELECT COUNT(*) FROM cost_rollups WHERE granularity = 'minute'") == [(0,)]
+
+        # 정리 주기 안에서는 다시 정리하지 않음
+        tracker._save_metric_to_db(_metric(old, rng))
+        assert _totals(tracker.db_path,
+                       "SELECT COUNT(*) FROM cost_rollups WHERE granularity = 'minute'") == [(1,)]
+
+        monkeypatch.setattr(cost_dashboard, "ROLLUP_PRUNE_INTERVAL_SECONDS", 0)
+        tracker._save_metric_to_db(_metric(datetime.now(), rng))
+        assert _totals(tracker.db_path,
+                       "SELECT COUNT(*) FROM cost_rollups WHERE granularity = 'minute'") == [(1,)]
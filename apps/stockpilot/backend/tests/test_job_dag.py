@@ -0,0 +1,148 @@
+"""
+배치 작업 DAG 실행 테스트
+위상 정렬, 병렬 실행/자원 한도, 실패 전파, 임계 경로, 임대 잠금/체크포인트 검증
+"""
+
+import asyncio
+import pytest
+
+from utils.job_dag import ResourcePool, critical_path, run_dag, topological_order
+from utils.job_state_store import JobStateStore
+
+# 수집 -> (AI 분석, 리포트) , 정리/헬스체크는 독립
+GRAPH = {
+    "collect": [],
+    "analyze": ["collect"],
+    "report": ["collect", "analyze"],
+    "cleanup": [],
+    "health": []
+}
+
+
+class _FakeClock:
+    def __init__(self, now: float = 1_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTopology:
+    """위상 정렬/임계 경로 테스트"""
+
+    def test_order_respects_dependencies(self):
+        """선행 작업이 항상 먼저 오고 외부 의존성은 무시하는지 테스트"""
+        order = topological_order({**GRAPH, "export": ["report", "external"]})
+        for node, deps in GRAPH.items():
+            assert all(order.index(dep) < order.index(node) for dep in deps)
+
+    def test_cycle_detected(self):
+        """순환 의존성이면 ValueError인지 테스트"""
+        with pytest.raises(ValueError, match="순환"):
+            topological_order({"a": ["c"], "b": ["a"], "c": ["b"], "d": []})
+
+    def test_critical_path(self):
+        """소요 시간 합이 가장 긴 의존성 경로를 찾는지 테스트"""
+        durations = {"collect": 3.0, "analyze": 5.0, "report": 1.0, "cleanup": 8.5, "health": 0.5}
+        path, total = critical_path(GRAPH, durations)
+        assert path == ["collect", "analyze", "report"]
+        assert total == pytest.approx(9.0)
+
+
+class TestRunDag:
+    """DAG 병렬 실행 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_independent_jobs_run_concurrently(self):
+        """독립 작업이 동시에 실행되어 전체 시간이 임계 경로 수준인지 테스트"""
+        finished = []
+
+        async def run(node):
+            await asyncio.sleep(0.05)
+            finished.append(node)
+            return True
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        outcome = await run_dag(GRAPH, run)
+
+        assert outcome == {node: True for node in GRAPH}
+        assert loop.time() - start < 0.2  # 순차 실행이면 0.25초
+        assert finished.index("collect") < finished.index("analyze") < finished.index("report")
+
+    @pytest.mark.asyncio
+    async def test_failure_blocks_dependents_only(self):
+        """실패한 작업의 후속 작업만 차단되고 나머지는 실행되는지 테스트"""
+        started = []
+
+        async def run(node):
+            started.append(node)
+            return node != "collect"
+
+        outcome = await run_dag({**GRAPH, "export": ["missing"]}, run)
+
+        assert outcome["collect"] is False
+        assert outcome["analyze"] is None and outcome["report"] is None
+        assert outcome["export"] is None  # 외부 의존성 누락
+        assert outcome["cleanup"] is True and outcome["health"] is True
+        assert set(started) == {"collect", "cleanup", "health"}
+
+    @pytest.mark.asyncio
+    async def test_resource_pool_limits(self):
+        """전체 워커 수와 자원 클래스별 한도를 넘지 않는지 테스트"""
+        pool = ResourcePool(max_workers=3, resource_limits={"api_quota": 1})
+        graph = {f"api{i}": [] for i in range(4)}
+        graph.update({f"io{i}": [] for i in range(4)})
+        peak = {"total": 0, "api_quota": 0}
+
+        async def run(node):
+            resource = "api_quota" if node.startswith("api") else "io"
+            async with pool.slot(resource):
+                peak["total"] = max(peak["total"], sum(pool.active.values()))
+                peak["api_quota"] = max(peak["api_quota"], pool.active.get("api_quota", 0))
+                await asyncio.sleep(0.01)
+            return True
+
+        outcome = await run_dag(graph, run, order_key=lambda node: node)
+
+        assert all(outcome.values())
+        assert peak == {"total": 3, "api_quota": 1}
+
+
+class TestJobStateStore:
+    """임대 잠금/체크포인트 저장소 테스트"""
+
+    def test_lease_exclusive_until_expired(self, tmp_path):
+        """임대는 한 소유자만 잡고, 만료 후에는 다른 소유자가 인수하는지 테스트"""
+        clock = _FakeClock()
+        store = JobStateStore(str(tmp_path / "batch.db"), clock=clock)
+        other = JobStateStore(str(tmp_path / "batch.db"), clock=clock)  # 다른 프로세스
+
+        assert store.acquire_lease("collect", "worker-a", 60)
+        assert not other.acquire_lease("collect", "worker-b", 60)
+        assert not store.release_lease("collect", "worker-b")
+
+        clock.now += 61
+        assert other.stale_leases() == ["collect"]
+        assert other.acquire_lease("collect", "worker-b", 60)
+        assert store.get_lease("collect")["owner"] == "worker-b"
+        assert not store.renew_lease("collect", "worker-a", 60)
+
+        assert other.release_lease("collect", "worker-b")
+        assert store.get_lease("collect") is None
+
+    def test_checkpoints_and_batch_runs(self, tmp_path):
+        """실행일별 체크포인트와 배치 실행 리포트가 유지되는지 테스트"""
+        path = str(tmp_path / "batch.db")
+        store = JobStateStore(path)
+        store.save_checkpoint("2024-01-02", "collect", "exec-1", 3.0, {"stocks_updated": 5})
+        store.record_batch_run("run-1", "2024-01-02", 1.0, 9.5, {"run_id": "run-1", "wall_clock_seconds": 9.5})
+        store.close()
+
+        reopened = JobStateStore(path)  # 재시작 후 재실행
+        assert reopened.completed_jobs("2024-01-02") == {"collect"}
+        assert reopened.completed_jobs("2024-01-03") == set()
+        assert reopened.recent_batch_runs() == [{"run_id": "run-1", "wall_clock_seconds": 9.5}]
+
+        assert reopened.clear_checkpoints("2024-01-02", ["collect"]) == 1
+        assert not reopened.is_completed("2024-01-02", "collect")
@@ -0,0 +1,185 @@
+"""
+LLM 응답 캐시 테스트
+바이트 예산 LRU 퇴출, 모델별 TTL 설정, 디스크 계층 재시작 유지/JSON 저장, 최적화기 적중률 검증
+"""
+
+import pytest
+import sqlite3
+from types import SimpleNamespace
+
+from utils import llm_response_cache
+from utils.llm_response_cache import LLMResponseCache, load_model_ttls
+from utils.openai_optimizer import OpenAIOptimizer
+
+
+class _FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeOpenAIClient:
+    """호출 횟수를 기록하는 테스트용 클라이언트"""
+
+    def __init__(self):
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, model, messages, **kwargs):
+        self.calls += 1
+        return SimpleNamespace(content=f"답변 {self.calls}", usage=None)
+
+
+class TestLLMResponseCache:
+    """LLM 응답 캐시 테스트"""
+
+    def test_lru_eviction_by_bytes(self):
+        """바이트 예산을 넘으면 가장 오래 사용하지 않은 항목부터 퇴출되는지 테스트"""
+        cache = LLMResponseCache(max_bytes=3000)
+        for key in ["a", "b", "c"]:
+            cache.set(key, "x" * 900)
+
+        assert cache.get("a") is not None  # a를 최근 사용으로
+        cache.set("d", "x" * 900)
+
+        assert "b" not in cache
+        assert "a" in cache and "c" in cache and "d" in cache
+        stats = cache.get_stats()
+        assert stats["evictions"] == 1
+        assert stats["bytes"] <= 3000
+
+    def test_ttl_per_model(self):
+        """모델별 TTL과 명시 TTL이 적용되는지 테스트"""
+        clock = _FakeClock()
+        cache = LLMResponseCache(default_ttl=60, model_ttls={"gpt-4o": 600}, clock=clock)
+        cache.set("mini", "a", model="gpt-4o-mini")
+        cache.set("large", "b", model="gpt-4o")
+        cache.set("pinned", "c", model="gpt-4o", ttl=10)
+
+        clock.now += 30
+        assert cache.get("pinned") is None
+        assert cache.get("mini") == "a"
+
+        clock.now += 60
+        assert cache.get("mini") is None
+        assert cache.get("large") == "b"
+        assert cache.get_stats()["expirations"] == 2
+
+    def test_hit_and_miss_counters(self):
+        """적중/미스 카운터와 적중률 테스트"""
+        cache = LLMResponseCache()
+        cache.set("k", {"answer": 1})
+
+        cache.get("k")
+        cache.get("k")
+        cache.get("missing")
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == pytest.approx(2 / 3)
+
+    def test_disk_tier_survives_restart(self, tmp_path):
+        """디스크 계층 항목이 재시작 후에도 조회되는지 테스트"""
+        path = str(tmp_path / "llm_cache.db")
+        clock = _FakeClock()
+        cache = LLMResponseCache(disk_path=path, clock=clock)
+        cache.set("k", {"answer": "삼성전자 매수"}, model="gpt-4o-mini")
+        cache.set("short", "v", ttl=5)
+        cache.close()
+
+        clock.now += 10
+        restarted = LLMResponseCache(disk_path=path, clock=clock)
+        assert len(restarted) == 0
+        assert restarted.get("k") == {"answer": "삼성전자 매수"}
+        assert restarted.get("short") is None
+        assert "k" in restarted  # 메모리 계층으로 승격
+        assert restarted.get_stats()["disk_hits"] == 1
+        restarted.close()
+
+    def test_disk_tier_is_bounded(self, tmp_path):
+        """디스크 계층이 바이트 예산 안으로 정리되는지 테스트"""
+        cache = LLMResponseCache(max_bytes=1000, disk_path=str(tmp_path / "c.db"), max_disk_bytes=5000)
+        for i in range(20):
+            cache.set(f"k{i}", "x" * 900)
+
+        stats = cache.get_stats()
+        assert stats["disk_bytes"] <= 5000
+        assert stats["disk_evictions"] > 0
+        assert cache.get("k19") is not None
+        cache.close()
+
+
+    def test_disk_tier_stores_json_only(self, tmp_path):
+        """디스크 계층은 JSON으로만 저장하고, 그 외 객체와 이전 형식 항목은 디스크에서 읽지 않는지 테스트"""
+        path = str(tmp_path / "llm_cache.db")
+        cache = LLMResponseCache(disk_path=path)
+        cache.set("json", {"answer": "보유", "score": 0.7})
+        cache.set("object", SimpleNamespace(content="메모리 전용"))
+        assert cache.get("object").content == "메모리 전용"
+        cache.close()
+
+        conn = sqlite3.connect(path)
+        rows = dict(conn.execute("SELECT cache_key, payload FROM llm_cache").fetchall())
+        assert set(rows) == {"json"}
+        conn.execute("UPDATE llm_cache SET payload = ? WHERE cache_key = 'json'", (b"\x80\x04legacy",))
+        conn.commit()
+        conn.close()
+
+        restarted = LLMResponseCache(disk_path=path)
+        assert restarted.get("json") is None
+        assert restarted.get("object") is None
+        assert restarted.get_stats()["disk_bytes"] == 0
+        restarted.close()
+
+    def test_model_ttls_from_environment(self, monkeypatch):
+        """LLM_CACHE_MODEL_TTLS 환경변수가 전역 캐시의 모델별 TTL로 적용되는지 테스트"""
+        assert load_model_ttls('{"gpt-4o": 1800, "gpt-4o-mini": "600"}') == {"gpt-4o": 1800.0, "gpt-4o-mini": 600.0}
+        assert load_model_ttls("[1, 2]") == {}
+        assert load_model_ttls("not json") == {}
+
+        monkeypatch.setenv("LLM_CACHE_MODEL_TTLS", '{"gpt-4o": 1800}')
+        monkeypatch.setattr(llm_response_cache, "_global_cache", None)
+        cache = llm_response_cache.get_llm_response_cache()
+        assert cache.ttl_for("gpt-4o") == 1800
+        assert cache.ttl_for("gpt-4o-mini") == cache.default_ttl
+
+
+class TestOptimizerCache:
+    """최적화기 공용 캐시 사용 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_cache_hit_rate_is_reported(self):
+        """동일 요청이 캐시에서 응답되고 적중률이 집계되는지 테스트"""
+        optimizer = OpenAIOptimizer(response_cache=LLMResponseCache())
+        client = FakeOpenAIClient()
+        messages = [{"role": "user", "content": "AAPL 요약"}]
+
+        first = await optimizer.optimize_chat_completion(client, "gpt-4o-mini", messages)
+        second = await optimizer.optimize_chat_completion(client, "gpt-4o-mini", messages)
+
+        assert first == second
+        assert client.calls == 1
+        summary = optimizer.get_cost_summary()
+        assert summary["cache_hit_rate"] == pytest.approx(50.0)
+        assert summary["cache"]["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_call_ttl_does_not_leak_between_callers(self):
+        """호출별 TTL이 공용 최적화기 설정을 바꾸지 않는지 테스트"""
+        clock = _FakeClock()
+        cache = LLMResponseCache(clock=clock)
+        optimizer = OpenAIOptimizer(cache_ttl=300, response_cache=cache)
+        client = FakeOpenAIClient()
+
+        await optimizer.optimize_chat_completion(client, "gpt-4o-mini", [{"role": "user", "content": "a"}], cache_ttl=900)
+        await optimizer.optimize_chat_completion(client, "gpt-4o-mini", [{"role": "user", "content": "b"}])
+
+        clock.now += 600
+        await optimizer.optimize_chat_completion(client, "gpt-4o-mini", [{"role": "user", "content": "a"}], cache_ttl=900)
+        await optimizer.optimize_chat_completion(client, "gpt-4o-mini", [{"role": "user", "content": "b"}])
+
+        assert optimizer.cache_ttl == 300
+        assert client.calls == 3  # b만 만료되어 재호출
@@ -0,0 +1,180 @@
+"""
+OpenAI 비용 제어 스케줄러 테스트
+우선순위 순서, 동일 요청 병합, 레이트 리밋 준수, 마감 시각 만료, 결과 보관 정리 검증
+"""
+
+import pytest
+import asyncio
+import time
+from types import SimpleNamespace
+
+from utils.openai_cost_control import OpenAICostController, Priority, TokenBucket
+
+
+class FakeOpenAIClient:
+    """호출 순서와 시각을 기록하는 테스트용 클라이언트"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, model, messages, **kwargs):
+        self.calls.append((time.monotonic(), messages[0]["content"]))
+        await asyncio.sleep(self.delay)
+        return SimpleNamespace(
+            usage=SimpleNamespace(prompt_tokens=10, completion_tokens=5),
+            choices=[SimpleNamespace(message=SimpleNamespace(content=f"답변: {messages[0]['content']}"))]
+        )
+
+
+# 레이트 리밋 대기 없이 스케줄 순서만 검증할 때 사용
+FAST_LIMITS = {"gpt-4o-mini": {"rpm": 60000}}
+
+
+def _messages(text: str):
+    return [{"role": "user", "content": text}]
+
+
+class TestLLMScheduler:
+    """LLM 호출 스케줄러 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_priority_order(self):
+        """높은 우선순위와 이른 마감 시각의 호출이 먼저 실행되는지 테스트"""
+        controller = OpenAICostController(max_concurrency=1, rate_limits=FAST_LIMITS)
+        client = FakeOpenAIClient()
+
+        await controller.request_api_call("gpt-4o-mini", _messages("low"), Priority.LOW)
+        await controller.request_api_call("gpt-4o-mini", _messages("medium"), Priority.MEDIUM)
+        await controller.request_api_call("gpt-4o-mini", _messages("high-late"), Priority.HIGH, deadline=60)
+        await controller.request_api_call("gpt-4o-mini", _messages("high-soon"), Priority.HIGH, deadline=5)
+
+        result = await controller.execute_queued_calls(client)
+        await controller.stop()
+
+        assert result == {"executed": 4, "skipped": 0}
+        assert [text for _, text in client.calls] == ["high-soon", "high-late", "medium", "low"]
+
+    @pytest.mark.asyncio
+    async def test_identical_requests_are_coalesced(self):
+        """대기 중인 동일 프롬프트가 업스트림 호출 하나로 병합되는지 테스트"""
+        controller = OpenAICostController(rate_limits=FAST_LIMITS)
+        client = FakeOpenAIClient(delay=0.01)
+        controller.start(client)
+
+        results = await asyncio.gather(*(
+            controller.submit("gpt-4o-mini", _messages("AAPL 분석")) for _ in range(5)
+        ))
+        await controller.stop()
+
+        assert results == ["답변: AAPL 분석"] * 5
+        assert len(client.calls) == 1
+        assert controller.metrics.coalesced_calls == 4
+        assert controller.get_metrics()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_requests_per_minute_limit(self):
+        """분당 요청 한도를 넘는 속도로 호출하지 않는지 테스트"""
+        # 분당 600회 = 초당 10회, 버킷 용량 0.2초분(2회)
+        controller = OpenAICostController(
+            max_concurrency=16,
+            rate_limits={"gpt-4o-mini": {"rpm": 600}},
+            burst_seconds=0.2
+        )
+        client = FakeOpenAIClient()
+        controller.start(client)
+
+        start = time.monotonic()
+        await asyncio.gather(*(
+            controller.submit("gpt-4o-mini", _messages(f"q{i}")) for i in range(12)
+        ))
+        elapsed = time.monotonic() - start
+        await controller.stop()
+
+        # 처음 2회는 즉시, 나머지 10회는 0.1초 간격
+        assert elapsed >= 0.9
+        timestamps = [ts for ts, _ in client.calls]
+        for i in range(len(timestamps) - 2):
+            assert timestamps[i + 2] - timestamps[i] >= 0.1 - 0.01
+        assert controller.get_metrics()["queue_wait_ms"]["p99"] > 0
+
+    @pytest.mark.asyncio
+    async def test_expired_calls_are_not_executed(self):
+        """마감 시각이 지난 호출은 실행하지 않고 실패 처리되는지 테스트"""
+        controller = OpenAICostController(max_concurrency=1, rate_limits=FAST_LIMITS)
+        client = FakeOpenAIClient()
+
+        expired_id = await controller.request_api_call("gpt-4o-mini", _messages("stale"), deadline=0.01)
+        await controller.request_api_call("gpt-4o-mini", _messages("fresh"))
+        await asyncio.sleep(0.02)
+
+        result = await controller.execute_queued_calls(client)
+        await controller.stop()
+
+        assert result == {"executed": 1, "skipped": 1}
+        assert [text for _, text in client.calls] == ["fresh"]
+        assert controller.metrics.expired_calls == 1
+        with pytest.raises(asyncio.TimeoutError):
+            await controller.get_result(expired_id)
+
+    @pytest.mark.asyncio
+    async def test_rate_limited_counted_once_per_call(self):
+        """레이트 리밋 대기 중 스케줄러 루프가 여러 번 돌아도 호출당 한 번만 집계되는지 테스트"""
+        controller = OpenAICostController(
+            max_concurrency=4,
+            rate_limits={"gpt-4o-mini": {"rpm": 600}},
+            burst_seconds=0.1
+        )
+        client = FakeOpenAIClient()
+        controller.start(client)
+
+        submits = [controller.submit("gpt-4o-mini", _messages(f"q{i}")) for i in range(4)]
+        # 대기 중에 새 요청이 들어오면 스케줄러가 깨어나 같은 선두 호출을 다시 확인
+        first = asyncio.gather(*submits)
+        for i in range(4, 8):
+            await asyncio.sleep(0.03)
+            await controller.request_api_call("gpt-4o-mini", _messages(f"q{i}"), Priority.LOW)
+        await first
+        await asyncio.sleep(0.5)
+        await controller.stop()
+
+        assert len(client.calls) == 8
+        # 첫 호출만 버킷에서 바로 나가고 나머지 7건은 각각 한 번씩 대기
+        assert controller.metrics.rate_limited == 7
+
+    @pytest.mark.asyncio
+    async def test_unclaimed_results_expire_after_completion(self):
+        """get_result로 가져가지 않은 결과(병합된 ID 포함)가 완료 후 TTL이 지나면 제거되는지 테스트"""
+        controller = OpenAICostController(rate_limits=FAST_LIMITS, result_ttl=0.05)
+        client = FakeOpenAIClient()
+
+        first_id = await controller.request_api_call("gpt-4o-mini", _messages("AAPL"))
+        coalesced_id = await controller.request_api_call("gpt-4o-mini", _messages("AAPL"))
+        other_id = await controller.request_api_call("gpt-4o-mini", _messages("MSFT"))
+        assert controller.metrics.coalesced_calls == 1
+
+        assert await controller.execute_queued_calls(client) == {"executed": 2, "skipped": 0}
+        # 완료 직후에는 결과 조회 가능, 조회하면 바로 제거
+        assert await controller.get_result(other_id) == "답변: MSFT"
+        assert set(controller._results) == {first_id, coalesced_id}
+
+        await asyncio.sleep(0.1)
+        await controller.stop()
+        assert controller._results == {}
+        with pytest.raises(KeyError):
+            await controller.get_result(coalesced_id)
+
+    def test_token_bucket_adjustment(self):
+        """실제 사용량 정산으로 다음 소비가 늦춰지는지 테스트"""
+        now = [0.0]
+        bucket = TokenBucket(rate_per_second=100, capacity=100, clock=lambda: now[0])
+
+        bucket.consume(100)
+        assert bucket.wait_time(50) == pytest.approx(0.5)
+
+        bucket.adjust(50)  # 예상보다 50토큰 더 사용
+        assert bucket.wait_time(50) == pytest.approx(1.0)
+
+        now[0] += 10
+        assert bucket.wait_time(100) == 0.0
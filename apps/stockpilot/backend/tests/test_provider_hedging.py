@@ -0,0 +1,154 @@
+"""
+프로바이더 헤지 요청 구성 요소 테스트
+헤지 호출, 지연 분위수 추적, TTL/LRU 캐시, 토큰 버킷 검증
+"""
+
+import asyncio
+import pytest
+
+from utils.hedging import LatencyTracker, hedged_call
+from utils.token_bucket import TokenBucket
+from utils.ttl_cache import TTLCache
+
+
+class _FakeClock:
+    def __init__(self, now: float = 1_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeProvider:
+    """지연/실패를 주입하는 가짜 프로바이더"""
+
+    def __init__(self, name: str, latency: float, result="ok"):
+        self.name = name
+        self.latency = latency
+        self.result = result
+        self.started = 0
+        self.cancelled = 0
+
+    async def __call__(self):
+        self.started += 1
+        try:
+            await asyncio.sleep(self.latency)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return self.result
+
+
+async def _run(providers, delay):
+    return await hedged_call(providers, lambda p: p(), lambda p: delay)
+
+
+class TestHedgedCall:
+    """헤지 호출 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_fast_primary_is_not_hedged(self):
+        """1순위가 제때 응답하면 다음 후보를 호출하지 않는지 테스트"""
+        primary, backup = FakeProvider("a", 0.01), FakeProvider("b", 0.01)
+        winner, result = await _run([primary, backup], 0.2)
+
+        assert winner is primary and result == "ok"
+        assert backup.started == 0
+
+    @pytest.mark.asyncio
+    async def test_slow_primary_is_hedged_and_cancelled(self):
+        """1순위가 지연되면 다음 후보 응답을 채택하고 1순위 호출은 취소되는지 테스트"""
+        primary, backup = FakeProvider("a", 1.0), FakeProvider("b", 0.01)
+        hedged = []
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+
+        winner, _ = await hedged_call([primary, backup], lambda p: p(), lambda p: 0.05, on_hedge=hedged.append)
+        await asyncio.sleep(0)
+
+        assert winner is backup
+        assert loop.time() - start < 0.5
+        assert hedged == [backup]
+        assert primary.cancelled == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_primary_falls_over_immediately(self):
+        """1순위가 실패하면 헤지 지연을 기다리지 않고 다음 후보를 호출하는지 테스트"""
+        primary, backup = FakeProvider("a", 0.0, result=None), FakeProvider("b", 0.0)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+
+        winner, _ = await _run([primary, backup], 10)
+
+        assert winner is backup
+        assert loop.time() - start < 0.5
+
+    @pytest.mark.asyncio
+    async def test_all_fail_and_no_hedge_when_disabled(self):
+        """모두 실패하면 None, 헤지 비활성 시 순차 호출만 하는지 테스트"""
+        providers = [FakeProvider(name, 0.01, result=None) for name in "abc"]
+        assert await _run(providers, None) is None
+        assert [p.started for p in providers] == [1, 1, 1]
+
+
+class TestLatencyTracker:
+    """지연 분위수 추적 테스트"""
+
+    def test_p95_after_min_samples(self):
+        """표본이 부족하면 기본값, 충분하면 p95를 반환하는지 테스트"""
+        tracker = LatencyTracker(min_samples=20, default_seconds=1.0)
+        for _ in range(10):
+            tracker.record(0.01)
+        assert tracker.hedge_delay() == 1.0
+
+        for i in range(1, 101):
+            tracker.record(i / 1000)
+        assert tracker.hedge_delay() == pytest.approx(0.095)
+
+
+class TestTTLCache:
+    """TTL/LRU 캐시 테스트"""
+
+    def test_lru_eviction(self):
+        """최대 항목 수를 넘으면 가장 오래 사용하지 않은 항목이 퇴출되는지 테스트"""
+        cache = TTLCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1
+        cache.set("c", 3)
+
+        assert "b" not in cache
+        assert cache.get("a") == 1 and cache.get("c") == 3
+        assert cache.stats["evictions"] == 1
+
+    def test_max_age_per_lookup(self):
+        """조회별 최대 수명과 일괄 정리가 적용되는지 테스트"""
+        clock = _FakeClock()
+        cache = TTLCache(clock=clock)
+        cache.set("quote", 100)
+        cache.set("report", 200)
+
+        clock.now += 30
+        assert cache.get("quote", max_age=60) == 100
+        assert cache.get("quote", max_age=10) is None
+        assert "quote" not in cache
+
+        clock.now += 3600
+        assert cache.purge_older_than(3600) == 1
+        assert len(cache) == 0
+
+
+class TestTokenBucket:
+    """토큰 버킷 테스트"""
+
+    def test_try_consume_refills_over_time(self):
+        """버스트 소진 후 시간이 지나면 다시 허용되는지 테스트"""
+        clock = _FakeClock()
+        bucket = TokenBucket(rate_per_second=5, capacity=5, clock=clock)
+
+        assert all(bucket.try_consume() for _ in range(5))
+        assert not bucket.try_consume()
+
+        clock.now += 0.2
+        assert bucket.try_consume()
+        assert not bucket.try_consume()
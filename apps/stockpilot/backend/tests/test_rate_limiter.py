@@ -0,0 +1,108 @@
+"""
+WebSocket 레이트 리미터 테스트
+토큰 버킷 버스트/윈도우 제한과 경고 후 차단, 타이밍 휠 기반 차단 해제·유휴 만료, 누적 통계 검증
+"""
+
+import asyncio
+
+from utils.rate_limiter import IDLE_TTL_SECONDS, WHEEL_TICK_SECONDS, RateLimiter
+from utils.timing_wheel import TimingWheel
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_700_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _check(limiter: RateLimiter, client_id: str, channel: str = "us_stocks"):
+    return asyncio.run(limiter.check_rate_limit(client_id, channel))
+
+
+class TestTimingWheel:
+    """타이밍 휠 테스트"""
+
+    def test_returns_items_after_deadline(self):
+        """마감이 지난 항목만 반환하고 한 바퀴보다 먼 마감은 다음 바퀴로 넘기는지 테스트"""
+        wheel = TimingWheel(tick_seconds=10, slots=4, start=0)
+        wheel.schedule("a", 15)
+        wheel.schedule("b", 35)
+        wheel.schedule("far", 95)  # 한 바퀴(40초)보다 먼 마감
+
+        assert wheel.advance(9) == []
+        assert wheel.advance(20) == ["a"]
+        assert wheel.advance(40) == ["b"]
+        assert wheel.advance(60) == []
+        assert wheel.advance(100) == ["far"]
+        assert len(wheel) == 0
+
+
+class TestRateLimiter:
+    """레이트 리미터 테스트"""
+
+    def test_burst_warnings_then_block_and_wheel_unblock(self):
+        """버스트 초과 경고 3회 후 차단되고, 쿨다운 후 타이밍 휠이 차단을 해제하는지 테스트"""
+        clock = FakeClock()
+        limiter = RateLimiter(clock=clock)
+
+        results = [_check(limiter, "c1", "ai_signals") for _ in range(5)]  # burst_limit=2
+        assert [allowed for allowed, _ in results] == [True, True, False, False, False]
+        assert "경고 1/3" in results[2][1] and "차단됨" in results[4][1]
+        assert limiter.get_global_stats()["blocked_clients"] == ["c1"]
+        assert _check(limiter, "c2", "ai_signals")[0] is True  # 다른 클라이언트는 영향 없음
+
+        clock.now += 600 + WHEEL_TICK_SECONDS  # ai_signals 쿨다운 600초
+        limiter._cleanup_old_data()
+        assert limiter.get_global_stats()["blocked_clients_count"] == 0
+        assert _check(limiter, "c1", "ai_signals")[0] is True
+
+    def test_window_limit_refills_lazily(self):
+        """분당 한도보다 빠른 속도가 이어지면 윈도우 제한으로 경고 후 차단되는지 테스트"""
+        clock = FakeClock()
+        limiter = RateLimiter(clock=clock)
+
+        results = []
+        for _ in range(40):  # us_news: 10/분 (6초당 1개 충전), 4초 간격은 버스트 한도 이내
+            results.append(_check(limiter, "c1", "us_news"))
+            clock.now += 4
+        first_denied = next(i for i, (allowed, _) in enumerate(results) if not allowed)
+
+        assert 25 <= first_denied <= 35  # 처음 10개 + 충전분만큼 허용
+        assert "시간 윈도우 제한 초과 (경고 1/2)" in results[first_denied][1]
+        assert any("시간 윈도우 제한 초과로 차단됨" in reason for _, reason in results[first_denied + 1:])
+
+        clock.now += 300
+        assert _check(limiter, "c1", "us_news")[0] is True
+
+    def test_idle_clients_expire_through_wheel(self):
+        """유휴 클라이언트는 만기 슬롯에서만 제거되고 최근 활동한 클라이언트는 유지되는지 테스트"""
+        clock = FakeClock()
+        limiter = RateLimiter(clock=clock)
+        for i in range(1000):
+            _check(limiter, f"idle-{i}", "us_stocks")
+
+        clock.now += IDLE_TTL_SECONDS - 120
+        _check(limiter, "active", "us_stocks")
+        clock.now += 240
+        _check(limiter, "active", "us_stocks")  # 메시지 처리 중에 만기 슬롯 진행
+
+        stats = limiter.get_global_stats()
+        assert stats["active_clients"] == 1 and stats["expired_clients"] == 1000
+        assert stats["channel_requests"]["us_stocks"] == {"requests": 1002}
+        assert stats["total_requests"] == 1002
+
+    def test_manual_block_and_unblock(self):
+        """관리자 차단/해제가 상태와 차단 목록에 반영되는지 테스트"""
+        clock = FakeClock()
+        limiter = RateLimiter(clock=clock)
+        limiter.manually_block_client("c1", duration_seconds=60)
+
+        allowed, reason = _check(limiter, "c1")
+        assert allowed is False and "차단됨" in reason
+        assert limiter.get_client_status("c1")["status"] == "blocked"
+
+        limiter.manually_unblock_client("c1")
+        assert _check(limiter, "c1")[0] is True
+        assert limiter.get_global_stats()["blocked_clients_count"] == 0
@@ -0,0 +1,109 @@
+"""
+WebSocket 송신 큐 테스트
+우선순위 순서, 종목별 합치기, 제어 메시지 보존, 유한 크기 드롭, 이벤트 기반 대기 검증
+"""
+
+import asyncio
+import pytest
+
+from app.websocket.send_queue import ConnectionSendQueue
+
+CRITICAL, HIGH, NORMAL, LOW = 1, 2, 3, 4
+
+
+def _drain(queue: ConnectionSendQueue) -> list:
+    items = []
+    while True:
+        item = queue.get_nowait()
+        if item is None:
+            return items
+        items.append(item)
+
+
+class TestConnectionSendQueue:
+    """연결별 송신 큐 테스트"""
+
+    def test_priority_then_fifo_order(self):
+        """높은 우선순위 먼저, 같은 우선순위는 들어온 순서대로 나오는지 테스트"""
+        queue = ConnectionSendQueue()
+        queue.put("news-1", NORMAL)
+        queue.put("price-1", HIGH)
+        queue.put("stats", LOW)
+        queue.put("price-2", HIGH)
+        queue.put("hello", CRITICAL)
+
+        assert _drain(queue) == ["hello", "price-1", "price-2", "news-1", "stats"]
+        assert len(queue) == 0
+
+    def test_price_updates_conflate_per_symbol(self):
+        """대기 중인 같은 종목 가격은 최신값으로 교체되고 순서가 유지되는지 테스트"""
+        queue = ConnectionSendQueue()
+        queue.put("AAPL@1", HIGH, ("price", "AAPL"))
+        queue.put("MSFT@1", HIGH, ("price", "MSFT"))
+        queue.put("AAPL@2", HIGH, ("price", "AAPL"))
+        queue.put("AAPL@3", HIGH, ("price", "AAPL"))
+
+        assert len(queue) == 2
+        assert queue.conflated == 2
+        assert _drain(queue) == ["AAPL@3", "MSFT@1"]
+
+        # 전송 후에는 새 항목으로 다시 대기
+        queue.put("AAPL@4", HIGH, ("price", "AAPL"))
+        assert _drain(queue) == ["AAPL@4"]
+
+    def test_bounded_queue_drops_lowest_priority_first(self):
+        """가득 차면 가장 낮은 우선순위의 오래된 메시지부터 드롭되는지 테스트"""
+        queue = ConnectionSendQueue(max_size=3)
+        queue.put("stats-1", LOW)
+        queue.put("news-1", NORMAL)
+        queue.put("price-1", HIGH)
+
+        assert queue.put("price-2", HIGH)      # stats-1 드롭
+        assert queue.put("price-3", HIGH)      # news-1 드롭
+        assert not queue.put("stats-2", LOW)   # 자신보다 낮은 메시지가 없으면 거부
+
+        assert queue.dropped == 3
+        assert _drain(queue) == ["price-1", "price-2", "price-3"]
+
+    def test_control_messages_are_never_dropped(self):
+        """가득 찬 큐에도 제어 메시지는 들어가고 드롭되지 않는지 테스트"""
+        queue = ConnectionSendQueue(max_size=2)
+        queue.put("price-1", HIGH)
+        queue.put("price-2", HIGH)
+        for i in range(3):
+            assert queue.put(f"control-{i}", CRITICAL)
+        queue.put("price-3", HIGH)
+
+        items = _drain(queue)
+        assert items[:3] == ["control-0", "control-1", "control-2"]
+        assert "price-3" in items
+
+    def test_requeue_does_not_overwrite_newer_price(self):
+        """전송 실패한 가격은 더 새로운 같은 종목 가격이 있으면 버려지는지 테스트"""
+        queue = ConnectionSendQueue()
+        queue.put("AAPL@1", HIGH, ("price", "AAPL"))
+        failed = queue.get_nowait()
+        queue.put("AAPL@2", HIGH, ("price", "AAPL"))
+
+        assert not queue.requeue(failed, HIGH, ("price", "AAPL"))
+        assert queue.requeue("news-1", NORMAL)
+        assert _drain(queue) == ["AAPL@2", "news-1"]
+
+    @pytest.mark.asyncio
+    async def test_get_wakes_on_put_and_close(self):
+        """대기 중인 소비자가 메시지 추가/큐 종료 시 즉시 깨어나는지 테스트"""
+        queue = ConnectionSendQueue()
+        loop = asyncio.get_running_loop()
+
+        waiter = asyncio.create_task(queue.get())
+        await asyncio.sleep(0)
+        started = loop.time()
+        queue.put("tick", HIGH)
+        assert await asyncio.wait_for(waiter, 1) == "tick"
+        assert loop.time() - started < 0.05
+
+        waiter = asyncio.create_task(queue.get())
+        await asyncio.sleep(0)
+        queue.close()
+        assert await asyncio.wait_for(waiter, 1) is None
+        assert not queue.put("late", CRITICAL)
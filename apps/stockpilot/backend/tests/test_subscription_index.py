@@ -0,0 +1,62 @@
+"""
+WebSocket 구독 역인덱스 테스트
+구독/해제/연결 종료 시 양방향 인덱스 동기화와 구독자 조회 검증
+"""
+
+from utils.subscription_index import SubscriptionIndex
+
+
+class TestSubscriptionIndex:
+    """구독 역인덱스 테스트"""
+
+    def test_subscribers_by_key(self):
+        """키별 구독자만 조회되는지 테스트"""
+        index = SubscriptionIndex()
+        index.add("c1", ["AAPL", "MSFT"])
+        index.add("c2", ["AAPL"])
+        index.add("c3", ["TSLA"])
+
+        assert set(index.subscribers("AAPL")) == {"c1", "c2"}
+        assert index.subscribers("MSFT") == ("c1",)
+        assert index.subscribers("NVDA") == ()
+        assert index.subscriber_count("AAPL") == 2
+        assert index.keys_for("c1") == {"AAPL", "MSFT"}
+
+    def test_unsubscribe_keeps_both_sides_in_sync(self):
+        """구독 해제 시 빈 키/연결 항목이 정리되는지 테스트"""
+        index = SubscriptionIndex()
+        index.add("c1", ["AAPL", "MSFT"])
+        index.add("c2", ["AAPL"])
+
+        index.remove("c1", ["AAPL", "NVDA"])
+        assert index.subscribers("AAPL") == ("c2",)
+        assert not index.is_subscribed("c1", "AAPL")
+
+        index.remove("c1", ["MSFT"])
+        assert "MSFT" not in index.by_key
+        assert "c1" not in index.by_connection
+
+    def test_disconnect_removes_all_subscriptions(self):
+        """연결 종료 시 모든 키에서 제거되는지 테스트"""
+        index = SubscriptionIndex()
+        index.add("c1", ["AAPL", "MSFT", "TSLA"])
+        index.add("c2", ["TSLA"])
+
+        removed = index.remove_connection("c1")
+
+        assert removed == {"AAPL", "MSFT", "TSLA"}
+        assert index.by_key == {"TSLA": {"c2"}}
+        assert len(index) == 1
+        assert index.remove_connection("unknown") == set()
+
+    def test_subscribers_snapshot_is_safe_during_changes(self):
+        """조회 결과 순회 중 구독이 바뀌어도 안전한지 테스트"""
+        index = SubscriptionIndex()
+        for i in range(10):
+            index.add(f"c{i}", ["AAPL"])
+
+        for connection_id in index.subscribers("AAPL"):
+            index.remove_connection(connection_id)
+
+        assert index.subscriber_count("AAPL") == 0
+        assert len(index) == 0
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+WebSocket 브로드캐스트 버스
+- 여러 워커 프로세스가 같은 틱을 받아 각자 로컬 구독자에게만 팬아웃
+- 백엔드: 프로세스 내부 / Unix 도메인 소켓 (허브-클라이언트) / Redis pub/sub
+- 발행자는 하나만 선출 (틱을 한 번만 발행), 단일 발행자 + 순서 보장 전송으로 종목별 순서 유지
+"""
+
+import os
+import json
+import fcntl
+import uuid
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MessageHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+class BroadcastBus:
+    """브로드캐스트 버스 기본 클래스"""
+
+    backend = "base"
+
+    def __init__(self):
+        self._handler: Optional[MessageHandler] = None
+        self.stats = {"published": 0, "received": 0, "errors": 0}
+
+    async def start(self, handler: MessageHandler):
+        """버스 연결 - 수신한 메시지마다 handler(message)를 순서대로 호출"""
+        self._handler = handler
+
+    async def publish(self, message: Dict[str, Any]):
+        """모든 워커에 메시지 발행 (발행한 워커 자신 포함)"""
+        raise NotImplementedError
+
+    @property
+    def is_publisher(self) -> bool:
+        """이 워커가 틱 발행 담당인지 여부"""
+        return True
+
+    @property
+    def started(self) -> bool:
+        return self._handler is not None
+
+    async def close(self):
+        self._handler = None
+
+    async def _deliver(self, message: Dict[str, Any]):
+        if self._handler is None:
+            return
+        self.stats["received"] += 1
+        try:
+            await self._handler(message)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"❌ 브로드캐스트 로컬 전달 실패: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": self.backend, "is_publisher": self.is_publisher, **self.stats}
+
+class InProcessBus(BroadcastBus):
+    """단일 프로세스용 버스 (로컬 구독자에게 바로 전달)"""
+
+    backend = "inprocess"
+
+    async def publish(self, message: Dict[str, Any]):
+        self.stats["published"] += 1
+        await self._deliver(message)
+
+class UnixSocketBus(BroadcastBus):
+    """
+    Unix 도메인 소켓 버스 (같은 호스트의 워커들)
+    잠금 파일을 잡은 워커가 허브(발행자)가 되어 소켓을 열고, 나머지는 클라이언트로 접속
+    허브가 종료되면 클라이언트 중 하나가 잠금을 잡고 허브를 이어받음
+    """
+
+    backend = "unix"
+
+    def __init__(self, path: str, reconnect_delay: float = 0.5):
+        super().__init__()
+        self.path = path
+        self.reconnect_delay = reconnect_delay
+        self._lock_fd: Optional[int] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._peers: List[asyncio.StreamWriter] = []
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    @property
+    def is_publisher(self) -> bool:
+        return self._server is not None
+
+    async def start(self, handler: MessageHandler):
+        await super().start(handler)
+        await self._join()
+        self._task = asyncio.create_task(self._supervise())
+
+    def _try_lock(self) -> bool:
+        fd = os.open(self.path + ".lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    async def _join(self):
+        """허브가 되거나 허브에 클라이언트로 접속"""
+        while not self._closed:
+            if self._try_lock():
+                if os.path.exists(self.path):
+                    os.unlink(self.path)  # 이전 허브가 남긴 소켓 파일
+                self._server = await asyncio.start_unix_server(self._serve_peer, path=self.path)
+                logger.info(f"📡 브로드캐스트 허브 시작: {self.path}")
+                return
+            try:
+                self._reader, self._writer = await asyncio.open_unix_connection(self.path)
+                # 허브가 피어로 등록했다는 확인을 받은 뒤부터 수신 (등록 전 종료된 허브 감지)
+                if await asyncio.wait_for(self._reader.readline(), self.reconnect_delay * 10) == b"\n":
+                    logger.info(f"🔗 브로드캐스트 허브 접속: {self.path}")
+                    return
+                self._writer.close()
+            except (ConnectionError, FileNotFoundError, asyncio.TimeoutError):
+                if self._writer is not None:
+                    self._writer.close()
+            self._reader = self._writer = None
+            await asyncio.sleep(self.reconnect_delay)  # 허브가 소켓을 여는 중
+
+    async def _supervise(self):
+        """클라이언트는 허브 메시지를 읽고, 허브가 끊기면 다시 참여"""
+        while not self._closed and self._server is None:
+            try:
+                while True:
+                    line = await self._reader.readline()
+                    if not line:
+                        break
+                    await self._deliver(json.loads(line))
+            except (ConnectionError, asyncio.IncompleteReadError):
+                pass
+            if self._closed:
+                return
+            logger.warning("⚠️ 브로드캐스트 허브 연결 끊김 - 재참여")
+            self._writer.close()
+            self._writer = None
+            await self._join()
+
+    async def _serve_peer(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        if self._closed:  # 허브 종료 직전에 수락된 연결
+            writer.close()
+            return
+        self._peers.append(writer)
+        try:
+            writer.write(b"\n")  # 등록 확인
+            await writer.drain()
+            await reader.read()  # 클라이언트는 수신만 함, 종료 대기
+        except (ConnectionError, asyncio.CancelledError):
+            pass  # 피어 종료 또는 허브 종료
+        finally:
+            if writer in self._peers:
+                self._peers.remove(writer)
+            writer.close()
+
+    async def publish(self, message: Dict[str, Any]):
+        if self._server is None:
+            return  # 발행은 허브만 담당
+        self.stats["published"] += 1
+        frame = json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n"
+        for writer in list(self._peers):
+            try:
+                writer.write(frame)
+            except Exception:
+                self._peers.remove(writer)
+        await self._deliver(message)
+        for writer in list(self._peers):
+            try:
+                await writer.drain()
+            except ConnectionError:
+                if writer in self._peers:
+                    self._peers.remove(writer)
+
+    async def close(self):
+        self._closed = True
+        if self._server is not None:
+            self._server.close()
+            for writer in self._peers:
+                writer.close()
+            self._peers.clear()
+            await self._server.wait_closed()
+            self._server = None
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)  # 잠금 해제 -> 다른 워커가 허브 인계
+            self._lock_fd = None
+        await super().close()
+
+class RedisBus(BroadcastBus):
+    """
+    Redis pub/sub 버스 (여러 호스트의 워커들)
+    발행자는 만료 시간이 있는 키(SET NX PX)로 선출하고 주기적으로 갱신
+    """
+
+    backend = "redis"
+
+    def __init__(self, url: str, channel: str = "stockpilot:ws:broadcast", lease_ms: int = 10000):
+        super().__init__()
+        self.url = url
+        self.channel = channel
+        self.leader_key = f"{channel}:publisher"
+        self.lease_ms = lease_ms
+        self.worker_id = uuid.uuid4().hex
+        self._redis = None
+        self._pubsub = None
+        self._is_publisher = False
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def is_publisher(self) -> bool:
+        return self._is_publisher
+
+    async def start(self, handler: MessageHandler):
+        import redis.asyncio as redis
+
+        await super().start(handler)
+        self._redis = redis.from_url(self.url)
+        self._pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.subscribe(self.channel)
+        await self._renew_lease()
+        self._tasks = [
+            asyncio.create_task(self._listen()),
+            asyncio.create_task(self._lease_loop())
+        ]
+        logger.info(f"📡 Redis 브로드캐스트 버스 시작: {self.channel} (발행자: {self._is_publisher})")
+
+    async def _renew_lease(self):
+        """발행자 임대 획득/갱신 (Lua로 소유자 확인 후 연장)"""
+        try:
+            acquired = await self._redis.set(self.leader_key, self.worker_id, nx=True, px=self.lease_ms)
+            if not acquired:
+                acquired = await self._redis.eval(
+                    "if redis.call('get', KEYS[1]) == ARGV[1] then "
+                    "return redis.call('pexpire', KEYS[1], ARGV[2]) else return 0 end",
+                    1, self.leader_key, self.worker_id, self.lease_ms
+                )
+            self._is_publisher = bool(acquired)
+        except Exception as e:
+            self._is_publisher = False
+            self.stats["errors"] += 1
+            logger.warning(f"⚠️ 발행자 임대 갱신 실패: {e}")
+
+    async def _lease_loop(self):
+        while True:
+            await asyncio.sleep(self.lease_ms / 3000)
+            await self._renew_lease()
+
+    async def _listen(self):
+        async for item in self._pubsub.listen():
+            if item.get("type") == "message":
+                await self._deliver(json.loads(item["data"]))
+
+    async def publish(self, message: Dict[str, Any]):
+        if not self._is_publisher:
+            return
+        self.stats["published"] += 1
+        await self._redis.publish(self.channel, json.dumps(message, ensure_ascii=False))
+
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        if self._redis is not None:
+            if self._is_publisher:
+                await self._redis.eval(
+                    "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) else return 0 end",
+                    1, self.leader_key, self.worker_id
+                )
+            await self._pubsub.aclose()
+            await self._redis.aclose()
+            self._redis = None
+        self._is_publisher = False
+        await super().close()
+
+def create_broadcast_bus(backend: Optional[str] = None) -> BroadcastBus:
+    """환경변수 설정으로 버스 생성 (WS_BROADCAST_BACKEND=inprocess|unix|redis)"""
+    backend = (backend or os.getenv("WS_BROADCAST_BACKEND", "inprocess")).lower()
+    if backend == "unix":
+        return UnixSocketBus(os.getenv("WS_BROADCAST_SOCKET", "/tmp/stockpilot_ws_bus.sock"))
+    if backend == "redis":
+        return RedisBus(os.getenv("WS_BROADCAST_REDIS_URL", "redis://localhost:6379/0"))
+    if backend != "inprocess":
+        logger.warning(f"⚠️ 알 수 없는 브로드캐스트 백엔드 '{backend}' - 프로세스 내부 버스 사용")
+    return InProcessBus()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+헤지(hedged) 요청
+- 1순위 후보가 최근 p95 응답 시간 안에 답하지 않으면 다음 후보를 추가로 호출
+- 가장 먼저 도착한 유효 응답을 채택하고 나머지 호출은 취소
+"""
+
+import asyncio
+import math
+from collections import deque
+from typing import Awaitable, Callable, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+class LatencyTracker:
+    """최근 응답 시간 분위수 추적"""
+
+    def __init__(self, window: int = 200, min_samples: int = 20,
+                 default_seconds: float = 1.0, quantile: float = 0.95):
+        self.samples = deque(maxlen=window)
+        self.min_samples = min_samples
+        self.default_seconds = default_seconds
+        self.quantile = quantile
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def hedge_delay(self) -> float:
+        """헤지 발사 지연 (표본이 부족하면 기본값)"""
+        if len(self.samples) < self.min_samples:
+            return self.default_seconds
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, math.ceil(self.quantile * len(ordered)) - 1)]
+
+async def hedged_call(candidates: Sequence[T],
+                      attempt: Callable[[T], Awaitable[Optional[R]]],
+                      hedge_delay: Callable[[T], Optional[float]],
+                      on_hedge: Optional[Callable[[T], None]] = None) -> Optional[Tuple[T, R]]:
+    """
+    후보를 우선순위 순으로 호출하여 처음 성공한 (후보, 결과) 반환
+
+    attempt는 실패 시 None을 반환해야 한다 (예외 처리/메트릭 기록은 호출자 몫).
+    마지막으로 호출한 후보가 hedge_delay 안에 끝나지 않으면 다음 후보를 동시에 호출하고,
+    진행 중인 호출이 모두 실패하면 다음 후보를 즉시 호출한다. hedge_delay가 None이면 헤지하지 않는다.
+    on_hedge는 지연 때문에 추가 호출한 후보마다 호출된다.
+    """
+    pending = {}
+    next_index = 0
+
+    def launch() -> Optional[T]:
+        nonlocal next_index
+        if next_index >= len(candidates):
+            return None
+        candidate = candidates[next_index]
+        next_index += 1
+        pending[asyncio.ensure_future(attempt(candidate))] = candidate
+        return candidate
+
+    latest = launch()
+    try:
+        while pending:
+            delay = hedge_delay(latest) if next_index < len(candidates) else None
+            done, _ = await asyncio.wait(pending, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                latest = launch()  # 지연 - 다음 후보 추가 호출
+                if on_hedge is not None:
+                    on_hedge(latest)
+                continue
+
+            for task in done:
+                candidate = pending.pop(task)
+                result = task.result()
+                if result is not None:
+                    return candidate, result
+
+            if not pending:
+                latest = launch()  # 진행 중인 호출이 모두 실패
+        return None
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+배치 작업 의존성 그래프(DAG) 실행
+- 위상 순서 검증 (순환/자기 의존 감지)
+- 의존성이 모두 성공한 작업부터 동시에 실행, 실패한 작업의 후속 작업은 차단
+- 전체 워커 수 + 자원 클래스(io/cpu/api_quota)별 동시 실행 제한
+- 작업 소요 시간 기반 임계 경로(critical path) 계산
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+# 자원 클래스별 기본 동시 실행 한도
+DEFAULT_RESOURCE_LIMITS = {"io": 4, "cpu": 2, "api_quota": 1}
+
+def topological_order(graph: Mapping[str, Iterable[str]]) -> List[str]:
+    """
+    위상 정렬 (Kahn) - graph는 {노드: 선행 노드 목록}
+    그래프에 없는 선행 노드는 외부 의존성으로 보고 순서 계산에서 제외, 순환이 있으면 ValueError
+    """
+    indegree = {node: 0 for node in graph}
+    dependents: Dict[str, List[str]] = {node: [] for node in graph}
+    for node, deps in graph.items():
+        for dep in set(deps):
+            if dep in graph:
+                indegree[node] += 1
+                dependents[dep].append(node)
+
+    ready = [node for node, count in indegree.items() if count == 0]
+    order = []
+    while ready:
+        node = ready.pop()
+        order.append(node)
+        for child in dependents[node]:
+            indegree[child] -= 1
+            if indegree[child] == 0:
+                ready.append(child)
+
+    if len(order) != len(graph):
+        cycle = sorted(node for node, count in indegree.items() if count > 0)
+        raise ValueError(f"순환 의존성: {', '.join(cycle)}")
+    return order
+
+def critical_path(graph: Mapping[str, Iterable[str]], durations: Mapping[str, float]) -> Tuple[List[str], float]:
+    """소요 시간 합이 가장 긴 의존성 경로와 그 길이(초) - 배치 전체 소요 시간의 하한"""
+    finish: Dict[str, float] = {}
+    previous: Dict[str, Optional[str]] = {}
+    for node in topological_order(graph):
+        best_dep, best_finish = None, 0.0
+        for dep in graph[node]:
+            if dep in finish and finish[dep] > best_finish:
+                best_dep, best_finish = dep, finish[dep]
+        finish[node] = best_finish + (durations.get(node) or 0.0)
+        previous[node] = best_dep
+
+    if not finish:
+        return [], 0.0
+    node: Optional[str] = max(finish, key=finish.get)
+    total = finish[node]
+    path = []
+    while node is not None:
+        path.append(node)
+        node = previous[node]
+    return path[::-1], total
+
+class ResourcePool:
+    """전체 워커 수 한도 + 자원 클래스별 한도 (이벤트 루프 안에서 사용)"""
+
+    def __init__(self, max_workers: int = 4, resource_limits: Optional[Mapping[str, int]] = None):
+        self.max_workers = max_workers
+        self.resource_limits = dict(DEFAULT_RESOURCE_LIMITS if resource_limits is None else resource_limits)
+        self._workers = asyncio.Semaphore(max_workers)
+        self._resources = {name: asyncio.Semaphore(limit) for name, limit in self.resource_limits.items()}
+        self.active: Dict[str, int] = {}
+
+    @asynccontextmanager
+    async def slot(self, resource_class: Optional[str] = None):
+        """자원 클래스 슬롯 -> 워커 슬롯 순으로 획득 (한도 미설정 클래스는 워커 수만 제한)"""
+        resource = self._resources.get(resource_class)
+        if resource is not None:
+            await resource.acquire()
+        try:
+            async with self._workers:
+                self.active[resource_class] = self.active.get(resource_class, 0) + 1
+                try:
+                    yield
+                finally:
+                    self.active[resource_class] -= 1
+        finally:
+            if resource is not None:
+                resource.release()
+
+async def run_dag(graph: Mapping[str, Iterable[str]],
+                  run: Callable[[str], Awaitable[bool]],
+                  order_key: Optional[Callable[[str], Any]] = None) -> Dict[str, Optional[bool]]:
+    """
+    선행 노드가 모두 성공한 노드부터 run(node)를 동시에 실행
+
+    run은 성공 여부를 반환한다 (동시 실행 제한은 run 안에서 ResourcePool로 처리).
+    반환값은 {노드: True(성공) | False(실패) | None(선행 노드 실패/외부 의존성 누락으로 미실행)}.
+    같은 시점에 실행 가능한 노드는 order_key 순서로 시작한다.
+    """
+    topological_order(graph)  # 순환 검증
+    deps = {node: set(d) for node, d in graph.items()}
+    outcome: Dict[str, Optional[bool]] = {}
+    running: Dict[asyncio.Task, str] = {}
+
+    for node, node_deps in deps.items():
+        if any(dep not in deps for dep in node_deps):
+            outcome[node] = None
+
+    def block_dependents():
+        """실패/차단된 노드에 의존하는 노드를 연쇄적으로 차단"""
+        changed = True
+        while changed:
+            changed = False
+            for node, node_deps in deps.items():
+                if node not in outcome and any(outcome.get(dep) is not True for dep in node_deps if dep in outcome):
+                    outcome[node] = None
+                    changed = True
+
+    def launch_ready():
+        started = {node for node in running.values()}
+        ready = [
+            node for node, node_deps in deps.items()
+            if node not in outcome and node not in started and all(outcome.get(dep) is True for dep in node_deps)
+        ]
+        for node in sorted(ready, key=order_key) if order_key else ready:
+            running[asyncio.ensure_future(run(node))] = node
+
+    block_dependents()
+    launch_ready()
+    try:
+        while running:
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                node = running.pop(task)
+                outcome[node] = bool(task.result())
+            block_dependents()
+            launch_ready()
+    finally:
+        for task in running:
+            task.cancel()
+    return outcome
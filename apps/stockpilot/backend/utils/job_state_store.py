@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+배치 작업 상태 저장소 (SQLite)
+- 잠금/임대(lease) 테이블: 작업별 소유자와 만료 시각, 만료된 임대는 다른 실행이 인수
+- 체크포인트 테이블: 실행일별 성공 작업 기록 (재실행 시 이미 성공한 작업 생략)
+- 배치 실행 이력: 실행별 전체 소요 시간과 임계 경로
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set
+
+class JobStateStore:
+    """배치 작업 잠금/체크포인트/실행 이력 저장소"""
+
+    def __init__(self, db_path: str, clock: Callable[[], float] = time.time):
+        self.db_path = db_path
+        self.clock = clock
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None, timeout=5.0)
+        self._db.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        if db_path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS job_leases (
+                job_id TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                acquired_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS job_checkpoints (
+                run_date TEXT NOT NULL,
+                job_id TEXT NOT NULL,
+                execution_id TEXT,
+                finished_at REAL NOT NULL,
+                duration REAL,
+                result TEXT,
+                PRIMARY KEY (run_date, job_id)
+            );
+            CREATE TABLE IF NOT EXISTS batch_runs (
+                run_id TEXT PRIMARY KEY,
+                run_date TEXT NOT NULL,
+                started_at REAL NOT NULL,
+                wall_clock_seconds REAL NOT NULL,
+                report TEXT NOT NULL
+            );
+        """)
+
+    # ---- 잠금/임대 ----
+
+    def acquire_lease(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        """임대 획득 (비어 있거나 만료된 경우에만), 원자적 단일 UPSERT"""
+        now = self.clock()
+        with self._lock:
+            cursor = self._db.execute("""
+                INSERT INTO job_leases (job_id, owner, acquired_at, expires_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(job_id) DO UPDATE SET
+                    owner = excluded.owner, acquired_at = excluded.acquired_at, expires_at = excluded.expires_at
+                WHERE job_leases.expires_at <= ?
+            """, (job_id, owner, now, now + lease_seconds, now))
+            return cursor.rowcount == 1
+
+    def renew_lease(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        """소유자 본인의 임대 연장"""
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE job_leases SET expires_at = ? WHERE job_id = ? AND owner = ?",
+                (self.clock() + lease_seconds, job_id, owner)
+            )
+            return cursor.rowcount == 1
+
+    def release_lease(self, job_id: str, owner: Optional[str] = None) -> bool:
+        """임대 해제 (owner가 None이면 소유자와 무관하게 강제 해제)"""
+        with self._lock:
+            if owner is None:
+                cursor = self._db.execute("DELETE FROM job_leases WHERE job_id = ?", (job_id,))
+            else:
+                cursor = self._db.execute("DELETE FROM job_leases WHERE job_id = ? AND owner = ?", (job_id, owner))
+            return cursor.rowcount == 1
+
+    def get_lease(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """임대 정보 (만료 여부 포함)"""
+        with self._lock:
+            row = self._db.execute("SELECT * FROM job_leases WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        lease = dict(row)
+        lease["expired"] = lease["expires_at"] <= self.clock()
+        return lease
+
+    def stale_leases(self, max_age_seconds: Optional[float] = None) -> List[str]:
+        """만료되었거나 max_age_seconds보다 오래 유지된 임대의 작업 ID"""
+        now = self.clock()
+        oldest = now - max_age_seconds if max_age_seconds is not None else float("-inf")
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT job_id FROM job_leases WHERE expires_at <= ? OR acquired_at < ? ORDER BY job_id",
+                (now, oldest)
+            ).fetchall()
+        return [row["job_id"] for row in rows]
+
+    # ---- 체크포인트 ----
+
+    def save_checkpoint(self, run_date: str, job_id: str, execution_id: Optional[str] = None,
+                        duration: Optional[float] = None, result: Any = None):
+        """작업 성공 기록"""
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO job_checkpoints VALUES (?, ?, ?, ?, ?, ?)",
+                (run_date, job_id, execution_id, self.clock(), duration, json.dumps(result, default=str))
+            )
+
+    def completed_jobs(self, run_date: str) -> Set[str]:
+        """해당 실행일에 이미 성공한 작업"""
+        with self._lock:
+            rows = self._db.execute("SELECT job_id FROM job_checkpoints WHERE run_date = ?", (run_date,)).fetchall()
+        return {row["job_id"] for row in rows}
+
+    def is_completed(self, run_date: str, job_id: str) -> bool:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT 1 FROM job_checkpoints WHERE run_date = ? AND job_id = ?", (run_date, job_id)
+            ).fetchone()
+        return row is not None
+
+    def clear_checkpoints(self, run_date: str, job_ids: Optional[List[str]] = None) -> int:
+        """체크포인트 삭제 (강제 재실행용)"""
+        with self._lock:
+            if job_ids is None:
+                cursor = self._db.execute("DELETE FROM job_checkpoints WHERE run_date = ?", (run_date,))
+            else:
+                cursor = self._db.executemany(
+                    "DELETE FROM job_checkpoints WHERE run_date = ? AND job_id = ?",
+                    [(run_date, job_id) for job_id in job_ids]
+                )
+            return cursor.rowcount
+
+    # ---- 배치 실행 이력 ----
+
+    def record_batch_run(self, run_id: str, run_date: str, started_at: float,
+                         wall_clock_seconds: float, report: Dict[str, Any]):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO batch_runs VALUES (?, ?, ?, ?, ?)",
+                (run_id, run_date, started_at, wall_clock_seconds, json.dumps(report, default=str))
+            )
+
+    def recent_batch_runs(self, limit: int = 20) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT report FROM batch_runs ORDER BY started_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [json.loads(row["report"]) for row in rows]
+
+    def cleanup(self, older_than_seconds: float) -> int:
+        """오래된 체크포인트/실행 이력 정리"""
+        cutoff = self.clock() - older_than_seconds
+        with self._lock:
+            removed = self._db.execute("DELETE FROM job_checkpoints WHERE finished_at < ?", (cutoff,)).rowcount
+            removed += self._db.execute("DELETE FROM batch_runs WHERE started_at < ?", (cutoff,)).rowcount
+        return removed
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+LLM 응답 공용 캐시
+- 바이트 예산 기반 LRU (OrderedDict, 삽입/조회/퇴출 O(1))
+- 모델별 TTL (LLM_CACHE_MODEL_TTLS 환경변수, JSON)
+- 선택적 SQLite 디스크 계층 (재시작 후에도 응답 유지, JSON 직렬화 가능한 값만)
+- 적중/미스/퇴출 카운터 (대시보드 노출)
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+@dataclass
+class CacheEntry:
+    """메모리 계층 캐시 항목"""
+    value: Any
+    model: Optional[str]
+    expires_at: float
+    size: int
+
+class LLMResponseCache:
+    """LLM 응답 캐시 (메모리 LRU + 선택적 SQLite 계층)"""
+
+    def __init__(self,
+                 max_bytes: int = 64 * 1024 * 1024,       # 메모리 계층 바이트 예산
+                 default_ttl: float = 300,                 # 기본 TTL (초)
+                 model_ttls: Optional[Dict[str, float]] = None,  # 모델별 TTL (초)
+                 disk_path: Optional[str] = None,          # SQLite 파일 경로 (None이면 메모리만)
+                 max_disk_bytes: int = 512 * 1024 * 1024,  # 디스크 계층 바이트 예산
+                 clock: Callable[[], float] = time.time):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.model_ttls = dict(model_ttls or {})
+        self.disk_path = disk_path
+        self.max_disk_bytes = max_disk_bytes
+        self.clock = clock
+
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._disk_bytes = 0
+
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "disk_hits": 0,
+            "sets": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "disk_evictions": 0,
+            "errors": 0
+        }
+
+        if disk_path:
+            self._open_disk()
+
+    # ---- 디스크 계층 ----
+
+    def _open_disk(self):
+        """SQLite 디스크 계층 초기화"""
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.disk_path)), exist_ok=True)
+            self._db = sqlite3.connect(self.disk_path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    model TEXT,
+                    payload BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_cache(accessed_at)")
+            self._db.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (self.clock(),))
+            self._disk_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+            logger.info(f"💾 LLM 캐시 디스크 계층: {self.disk_path} ({self._disk_bytes:,} bytes)")
+        except Exception as e:
+            logger.error(f"❌ LLM 캐시 디스크 계층 초기화 실패 (메모리만 사용): {e}")
+            self._db = None
+
+    def _disk_get(self, cache_key: str) -> Any:
+        row = self._db.execute(
+            "SELECT model, payload, size, expires_at FROM llm_cache WHERE cache_key = ?",
+            (cache_key,)
+        ).fetchone()
+        if row is None:
+            return _MISSING
+
+        model, payload, size, expires_at = row
+        now = self.clock()
+        if expires_at <= now:
+            self._disk_delete(cache_key, size)
+            self.stats["expirations"] += 1
+            return _MISSING
+
+        try:
+            value = json.loads(payload)
+        except ValueError:
+            # 해석할 수 없는 항목 (이전 형식 등)은 버림
+            self._disk_delete(cache_key, size)
+            return _MISSING
+        self._db.execute("UPDATE llm_cache SET accessed_at = ? WHERE cache_key = ?", (now, cache_key))
+        # 메모리 계층으로 승격
+        self._memory_put(cache_key, CacheEntry(value, model, expires_at, size))
+        return value
+
+    def _disk_put(self, cache_key: str, model: Optional[str], payload: bytes, expires_at: float):
+        old = self._db.execute("SELECT size FROM llm_cache WHERE cache_key = ?", (cache_key,)).fetchone()
+        self._db.execute(
+            "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?, ?, ?, ?)",
+            (cache_key, model, payload, len(payload), expires_at, self.clock())
+        )
+        self._disk_bytes += len(payload) - (old[0] if old else 0)
+        if self._disk_bytes > self.max_disk_bytes:
+            self._trim_disk()
+
+    def _disk_delete(self, cache_key: str, size: int):
+        self._db.execute("DELETE FROM llm_cache WHERE cache_key = ?", (cache_key,))
+        self._disk_bytes -= size
+
+    def _trim_disk(self):
+        """만료 항목과 오래 사용하지 않은 항목부터 디스크 예산의 90%까지 정리"""
+        target = int(self.max_disk_bytes * 0.9)
+        self._db.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (self.clock(),))
+        self._disk_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        if self._disk_bytes <= target:
+            return
+
+        removed = 0
+        freed = 0
+        for cache_key, size in self._db.execute(
+            "SELECT cache_key, size FROM llm_cache ORDER BY accessed_at"
+        ).fetchall():
+            if self._disk_bytes - freed <= target:
+                break
+            self._db.execute("DELETE FROM llm_cache WHERE cache_key = ?", (cache_key,))
+            freed += size
+            removed += 1
+        self._disk_bytes -= freed
+        self.stats["disk_evictions"] += removed
+
+    # ---- 메모리 계층 ----
+
+    def _memory_put(self, cache_key: str, entry: CacheEntry):
+        old = self._entries.pop(cache_key, None)
+        if old is not None:
+            self._bytes -= old.size
+        if entry.size > self.max_bytes:
+            return  # 예산보다 큰 항목은 메모리에 두지 않음
+
+        self._entries[cache_key] = entry
+        self._bytes += entry.size
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+            self.stats["evictions"] += 1
+
+    def ttl_for(self, model: Optional[str], ttl: Optional[float] = None) -> float:
+        """TTL 결정: 명시값 > 모델별 TTL > 기본 TTL"""
+        if ttl is not None:
+            return ttl
+        return self.model_ttls.get(model, self.default_ttl)
+
+    def get(self, cache_key: str, default: Any = None) -> Any:
+        """캐시 조회 (메모리 → 디스크 순)"""
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None:
+                if entry.expires_at > self.clock():
+                    self._entries.move_to_end(cache_key)
+                    self.stats["hits"] += 1
+                    return entry.value
+                del self._entries[cache_key]
+                self._bytes -= entry.size
+                self.stats["expirations"] += 1
+
+            if self._db is not None:
+                try:
+                    value = self._disk_get(cache_key)
+                    if value is not _MISSING:
+                        self.stats["hits"] += 1
+                        self.stats["disk_hits"] += 1
+                        return value
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    logger.warning(f"⚠️ LLM 캐시 디스크 조회 실패: {e}")
+
+            self.stats["misses"] += 1
+            return default
+
+    def set(self, cache_key: str, value: Any, model: Optional[str] = None, ttl: Optional[float] = None):
+        """캐시 저장 (디스크 계층이 있으면 함께 기록)"""
+        ttl = self.ttl_for(model, ttl)
+        if ttl <= 0:
+            return
+
+        try:
+            payload = json.dumps(value, ensure_ascii=False).encode("utf-8")
+            size = len(payload)
+        except (TypeError, ValueError):
+            # JSON으로 직렬화할 수 없는 객체는 메모리 계층에만 보관 (크기는 문자열 표현으로 근사)
+            payload = None
+            size = len(repr(value).encode("utf-8", "replace"))
+
+        expires_at = self.clock() + ttl
+        with self._lock:
+            self._memory_put(cache_key, CacheEntry(value, model, expires_at, size))
+            self.stats["sets"] += 1
+            if self._db is not None and payload is not None:
+                try:
+                    self._disk_put(cache_key, model, payload, expires_at)
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    logger.warning(f"⚠️ LLM 캐시 디스크 저장 실패: {e}")
+
+    def delete(self, cache_key: str):
+        """캐시 항목 삭제"""
+        with self._lock:
+            entry = self._entries.pop(cache_key, None)
+            if entry is not None:
+                self._bytes -= entry.size
+            if self._db is not None:
+                row = self._db.execute("SELECT size FROM llm_cache WHERE cache_key = ?", (cache_key,)).fetchone()
+                if row:
+                    self._disk_delete(cache_key, row[0])
+
+    def clear(self):
+        """캐시 전체 삭제 (디스크 계층 포함)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM llm_cache")
+                self._disk_bytes = 0
+
+    def close(self):
+        """디스크 계층 연결 종료"""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, cache_key: str) -> bool:
+        entry = self._entries.get(cache_key)
+        return entry is not None and entry.expires_at > self.clock()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """캐시 통계"""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "disk_enabled": self._db is not None,
+            "disk_bytes": self._disk_bytes if self._db is not None else 0
+        }
+
+def load_model_ttls(raw: Optional[str] = None) -> Dict[str, float]:
+    """모델별 TTL 설정 해석 (JSON 객체, 예: {"gpt-4o": 3600, "gpt-4o-mini": 600})
+
+    raw를 생략하면 LLM_CACHE_MODEL_TTLS 환경변수를 읽는다. 형식이 잘못되면 경고 후 빈 설정.
+    """
+    if raw is None:
+        raw = os.getenv('LLM_CACHE_MODEL_TTLS', '')
+    if not raw.strip():
+        return {}
+    try:
+        parsed = json.loads(raw)
+        if not isinstance(parsed, dict):
+            raise ValueError("JSON 객체가 아님")
+        return {str(model): float(ttl) for model, ttl in parsed.items()}
+    except (TypeError, ValueError) as e:
+        logger.warning(f"⚠️ LLM_CACHE_MODEL_TTLS 해석 실패 (모델별 TTL 미적용): {e}")
+        return {}
+
+# 전역 캐시 인스턴스
+_global_cache = None
+
+def get_llm_response_cache() -> LLMResponseCache:
+    """전역 LLM 응답 캐시 인스턴스 반환 (환경변수로 예산/모델별 TTL/디스크 경로 설정)"""
+    global _global_cache
+    if _global_cache is None:
+        _global_cache = LLMResponseCache(
+            max_bytes=int(os.getenv('LLM_CACHE_MAX_BYTES', 64 * 1024 * 1024)),
+            default_ttl=float(os.getenv('LLM_CACHE_DEFAULT_TTL', 300)),
+            model_ttls=load_model_ttls(),
+            disk_path=os.getenv('LLM_CACHE_DISK_PATH') or None
+        )
+    return _global_cache
@@ -1,19 +1,25 @@
 """
 OpenAI API 비용 제어 시스템
 API 호출 최적화, 캐싱, 백오프 로직, 비용 모니터링
+우선순위/마감 힙 스케줄러와 모델별 토큰 버킷으로 레이트 리밋 내 동시 실행
 """
 
 import asyncio
+import heapq
+import itertools
 import time
 import json
 import hashlib
-from typing import Dict, Any, Optional, List, Tuple
+from collections import defaultdict, deque
+from typing import Dict, Any, Optional, List, Set, Tuple
 from datetime import datetime, timedelta
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from enum import Enum
 import logging
 import os
 
+from utils.token_bucket import TokenBucket
+
 logger = logging.getLogger(__name__)
 
 class Priority(Enum):
@@ -33,6 +39,17 @@ class APICall:
     cache_key: Optional[str] = None
     retries: int = 0
     max_retries: int = 3
+    messages: List[Dict] = field(default_factory=list)
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    deadline: Optional[float] = None   # time.monotonic() 기준 마감 시각
+    enqueued_at: float = 0.0           # time.monotonic() 기준 큐 투입 시각
+    rate_limited: bool = False         # 레이트 리밋으로 대기한 적이 있는지 (메트릭 1회 집계용)
+    future: Optional[asyncio.Future] = field(default=None, repr=False, compare=False)
+
+    def sort_key(self, seq: int) -> Tuple[int, float, int]:
+        """힙 정렬 키: 우선순위 → 마감 시각 → 투입 순서"""
+        deadline = self.deadline if self.deadline is not None else float("inf")
+        return (self.priority.value, deadline, seq)
 
 @dataclass
 class CostMetrics:
@@ -44,6 +61,8 @@ class CostMetrics:
     cache_misses: int = 0
     rate_limited: int = 0
     failed_calls: int = 0
+    coalesced_calls: int = 0
+    expired_calls: int = 0
     last_reset: datetime = datetime.now()
 
 class OpenAICostController:
@@ -57,24 +76,50 @@ class OpenAICostController:
         }
     }
     
+    # 모델별 분당 토큰 한도 (분당 요청 한도는 max_calls_per_window에서 계산)
+    MODEL_RATE_LIMITS = {
+        "gpt-4o-mini": {"tpm": 200000}
+    }
+    DEFAULT_TOKENS_PER_MINUTE = 200000
+    
     def __init__(self, 
                  daily_budget: float = 10.0,    # 일일 예산 (USD)
                  cache_ttl: int = 300,          # 캐시 TTL (초)
                  rate_limit_window: int = 60,   # 레이트 제한 윈도우 (초)
-                 max_calls_per_window: int = 20): # 윈도우당 최대 호출
+                 max_calls_per_window: int = 20, # 윈도우당 최대 호출
+                 max_concurrency: int = 8,      # 동시 실행 호출 수
+                 rate_limits: Optional[Dict[str, Dict[str, float]]] = None, # 모델별 {"rpm", "tpm"}
+                 burst_seconds: float = 1.0,    # 버킷 용량 (초 단위 한도)
+                 result_ttl: float = 300.0):    # 완료된 호출 결과 보관 시간 (초, get_result 미호출 대비)
         
         self.daily_budget = daily_budget
         self.cache_ttl = cache_ttl
         self.rate_limit_window = rate_limit_window
         self.max_calls_per_window = max_calls_per_window
+        self.max_concurrency = max_concurrency
+        self.burst_seconds = burst_seconds
+        self.result_ttl = result_ttl
+        self.rate_limits = {**self.MODEL_RATE_LIMITS, **(rate_limits or {})}
         
         # 상태 관리
         self.metrics = CostMetrics()
         self.call_cache: Dict[str, Tuple[Any, datetime]] = {}
-        self.call_queue: List[APICall] = []
         self.call_history: List[Tuple[datetime, str]] = []
         self.is_paused = False
         
+        # 스케줄러 상태
+        self._model_queues: Dict[str, List[Tuple[Tuple[int, float, int], APICall]]] = defaultdict(list)
+        self._seq = itertools.count()
+        self._buckets: Dict[str, Tuple[TokenBucket, TokenBucket]] = {}
+        self._results: Dict[str, asyncio.Future] = {}   # call_id → 결과
+        self._inflight: Dict[str, asyncio.Future] = {}  # cache_key → 대기/실행 중 호출 (동일 프롬프트 병합)
+        self._wakeup: Optional[asyncio.Event] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._active_tasks: Set[asyncio.Task] = set()
+        self._client = None
+        self.queue_wait_ms: deque = deque(maxlen=10000)
+        
         # 백오프 설정
         self.backoff_base = 1.0      # 기본 백오프 (초)
         self.backoff_multiplier = 2.0 # 백오프 증가 배수
@@ -174,12 +219,43 @@ class OpenAICostController:
                 logger.warning(f"API 호출 실패, {delay:.1f}초 후 재시도 ({attempt + 1}/{api_call.max_retries + 1}): {e}")
                 await asyncio.sleep(delay)
 
+    @property
+    def call_queue(self) -> List[APICall]:
+        """대기 중인 호출 목록 (스케줄 순서)"""
+        entries = [entry for heap in self._model_queues.values() for entry in heap]
+        return [call for _, call in sorted(entries, key=lambda entry: entry[0])]
+
+    def _get_buckets(self, model: str) -> Tuple[TokenBucket, TokenBucket]:
+        """모델별 (분당 요청, 분당 토큰) 버킷"""
+        if model not in self._buckets:
+            limits = self.rate_limits.get(model, {})
+            rpm = limits.get("rpm", self.max_calls_per_window * 60 / self.rate_limit_window)
+            tpm = limits.get("tpm", self.DEFAULT_TOKENS_PER_MINUTE)
+            self._buckets[model] = (
+                TokenBucket(rpm / 60, max(1.0, rpm / 60 * self.burst_seconds)),
+                TokenBucket(tpm / 60, max(1.0, tpm / 60 * self.burst_seconds))
+            )
+        return self._buckets[model]
+
+    def _lookup_cache(self, cache_key: str) -> Optional[Any]:
+        """유효한 캐시 결과 조회 (만료 항목은 제거)"""
+        if cache_key in self.call_cache:
+            cached_result, cached_time = self.call_cache[cache_key]
+            if self._is_cache_valid(cached_time):
+                return cached_result
+            del self.call_cache[cache_key]
+        return None
+
     async def request_api_call(self, 
                              model: str, 
                              messages: List[Dict], 
                              priority: Priority = Priority.MEDIUM,
+                             deadline: Optional[float] = None,
                              **kwargs) -> str:
-        """API 호출 요청 (큐에 추가)"""
+        """API 호출 요청 (큐에 추가). 캐시 히트면 결과, 아니면 호출 ID 반환
+
+        deadline은 요청 시점부터의 허용 대기 시간(초)이며, 지나면 실행하지 않고 실패 처리한다.
+        """
         
         # 예산 확인
         if self._is_budget_exceeded():
@@ -190,112 +266,262 @@ class OpenAICostController:
         cache_key = self._generate_cache_key(model, messages, **kwargs)
         
         # 캐시 확인
-        if cache_key in self.call_cache:
-            cached_result, cached_time = self.call_cache[cache_key]
-            if self._is_cache_valid(cached_time):
-                self.metrics.cache_hits += 1
-                logger.info(f"캐시 히트: {cache_key[:8]}")
-                return cached_result
-            else:
-                # 만료된 캐시 제거
-                del self.call_cache[cache_key]
+        cached_result = self._lookup_cache(cache_key)
+        if cached_result is not None:
+            self.metrics.cache_hits += 1
+            logger.info(f"캐시 히트: {cache_key[:8]}")
+            return cached_result
+        
+        call_id = f"call_{int(time.time() * 1000)}_{next(self._seq)}"
+        
+        # 같은 프롬프트가 대기/실행 중이면 업스트림 호출 하나로 병합
+        if cache_key in self._inflight:
+            self.metrics.coalesced_calls += 1
+            self._track_result(call_id, self._inflight[cache_key])
+            logger.info(f"동일 요청 병합: {call_id} → {cache_key[:8]}")
+            return call_id
         
         self.metrics.cache_misses += 1
         
         # API 호출 생성
-        call_id = f"call_{int(time.time() * 1000)}"
         tokens_estimate = self._estimate_tokens(messages, kwargs.get('max_tokens', 500))
+        future = asyncio.get_running_loop().create_future()
+        # 결과를 기다리지 않는 호출의 예외 경고 방지
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
         
+        now = time.monotonic()
         api_call = APICall(
             id=call_id,
             model=model,
             tokens_estimate=tokens_estimate,
             priority=priority,
             created_at=datetime.now(),
-            cache_key=cache_key
+            cache_key=cache_key,
+            messages=messages,
+            kwargs=kwargs,
+            deadline=now + deadline if deadline is not None else None,
+            enqueued_at=now,
+            future=future
         )
         
-        # 우선순위 큐에 추가
-        self.call_queue.append(api_call)
-        self.call_queue.sort(key=lambda x: x.priority.value)
+        # 모델별 우선순위 힙에 추가
+        heapq.heappush(self._model_queues[model], (api_call.sort_key(next(self._seq)), api_call))
+        self._inflight[cache_key] = future
+        self._track_result(call_id, future)
+        if self._wakeup is not None:
+            self._wakeup.set()
         
         logger.info(f"API 호출 요청 큐 추가: {call_id} (우선순위: {priority.name}, 예상토큰: {tokens_estimate})")
         
         return call_id
 
-    async def execute_queued_calls(self, openai_client) -> Dict[str, Any]:
-        """큐된 API 호출들 실행"""
-        if not self.call_queue:
-            return {"executed": 0, "skipped": 0}
-        
-        executed = 0
-        skipped = 0
-        
-        # 우선순위별로 호출 실행
-        for api_call in self.call_queue[:]:  # 복사본으로 순회
+    def _track_result(self, call_id: str, future: asyncio.Future):
+        """호출 결과 등록 - 완료 후 result_ttl이 지나도록 get_result로 가져가지 않으면 제거"""
+        self._results[call_id] = future
+
+        def expire_later(_):
+            asyncio.get_running_loop().call_later(self.result_ttl, self._results.pop, call_id, None)
+
+        future.add_done_callback(expire_later)
+
+    async def get_result(self, call_id: str, timeout: Optional[float] = None) -> Any:
+        """호출 결과 대기 (응답 내용 반환)"""
+        future = self._results.get(call_id)
+        if future is None:
+            raise KeyError(f"알 수 없는 호출 ID: {call_id}")
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        finally:
+            if future.done():
+                self._results.pop(call_id, None)
+
+    async def submit(self,
+                     model: str,
+                     messages: List[Dict],
+                     priority: Priority = Priority.MEDIUM,
+                     deadline: Optional[float] = None,
+                     **kwargs) -> Any:
+        """요청 후 결과까지 대기 (스케줄러가 실행 중이어야 함)"""
+        cached_result = self._lookup_cache(self._generate_cache_key(model, messages, **kwargs))
+        if cached_result is not None:
+            self.metrics.cache_hits += 1
+            return cached_result
+        call_id = await self.request_api_call(model, messages, priority, deadline, **kwargs)
+        return await self.get_result(call_id)
+
+    def start(self, openai_client, max_concurrency: Optional[int] = None):
+        """스케줄러 시작 - 모델별 레이트 리밋 안에서 최대 max_concurrency개 동시 실행"""
+        if self._dispatcher is not None and not self._dispatcher.done():
+            return
+        self._client = openai_client
+        self._slots = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+        self._wakeup = asyncio.Event()
+        self._dispatcher = asyncio.create_task(self._dispatch_loop())
+
+    async def stop(self, wait: bool = True):
+        """스케줄러 중지 (wait이면 실행 중인 호출 완료까지 대기)"""
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            try:
+                await self._dispatcher
+            except asyncio.CancelledError:
+                pass
+            self._dispatcher = None
+        if wait and self._active_tasks:
+            await asyncio.gather(*self._active_tasks, return_exceptions=True)
+
+    async def _dispatch_loop(self):
+        """빈 실행 슬롯마다 실행 가능한 최우선 호출을 꺼내 실행"""
+        while True:
+            await self._slots.acquire()
+            try:
+                api_call = await self._next_ready_call()
+            except BaseException:
+                self._slots.release()
+                raise
+            task = asyncio.create_task(self._run_call(api_call))
+            self._active_tasks.add(task)
+            task.add_done_callback(self._active_tasks.discard)
+
+    def _expire_call(self, api_call: APICall):
+        """마감 시각이 지난 호출 실패 처리"""
+        self.metrics.expired_calls += 1
+        self._release_inflight(api_call)
+        if not api_call.future.done():
+            api_call.future.set_exception(asyncio.TimeoutError(f"마감 시각 초과: {api_call.id}"))
+
+    async def _next_ready_call(self) -> APICall:
+        """레이트 리밋을 통과하는 모델 중 정렬 키가 가장 앞선 호출 반환 (없으면 대기)"""
+        while True:
+            self._wakeup.clear()
+            now = time.monotonic()
+            best: Optional[Tuple[Tuple[int, float, int], str]] = None
+            min_wait: Optional[float] = None
             
-            # 레이트 제한 확인
-            if self._is_rate_limited():
-                logger.info("레이트 제한으로 인한 API 호출 지연")
-                break
+            for model, heap in self._model_queues.items():
+                while heap and heap[0][1].deadline is not None and heap[0][1].deadline < now:
+                    self._expire_call(heapq.heappop(heap)[1])
+                if not heap:
+                    continue
+                
+                request_bucket, token_bucket = self._get_buckets(model)
+                wait = max(
+                    request_bucket.wait_time(1),
+                    token_bucket.wait_time(heap[0][1].tokens_estimate)
+                )
+                if wait > 0:
+                    # 대기 루프를 돌 때마다가 아니라 호출당 한 번만 집계
+                    if not heap[0][1].rate_limited:
+                        heap[0][1].rate_limited = True
+                        self.metrics.rate_limited += 1
+                    min_wait = wait if min_wait is None else min(min_wait, wait)
+                elif best is None or heap[0][0] < best[0]:
+                    best = (heap[0][0], model)
+            
+            if best is not None:
+                model = best[1]
+                api_call = heapq.heappop(self._model_queues[model])[1]
+                request_bucket, token_bucket = self._get_buckets(model)
+                request_bucket.consume(1)
+                token_bucket.consume(api_call.tokens_estimate)
+                return api_call
             
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=min_wait)
+            except asyncio.TimeoutError:
+                pass
+
+    def _release_inflight(self, api_call: APICall):
+        if api_call.cache_key and self._inflight.get(api_call.cache_key) is api_call.future:
+            del self._inflight[api_call.cache_key]
+
+    async def _run_call(self, api_call: APICall):
+        """단일 호출 실행 (백오프 재시도, 메트릭/캐시 갱신, 토큰 정산)"""
+        self.queue_wait_ms.append((time.monotonic() - api_call.enqueued_at) * 1000)
+        try:
             # 예산 재확인
             if self._is_budget_exceeded():
-                logger.warning("예산 초과로 나머지 API 호출 스킵")
-                skipped += len(self.call_queue) - executed
-                break
+                raise Exception("Daily budget exceeded")
             
-            try:
-                # 실제 OpenAI API 호출 함수
-                async def make_api_call():
-                    response = await openai_client.chat.completions.create(
-                        model=api_call.model,
-                        messages=[{"role": "user", "content": "test"}],  # 실제 메시지로 교체 필요
-                        max_tokens=500,
-                        temperature=0.3
-                    )
-                    return response
-                
-                # 백오프와 함께 실행
-                result = await self._execute_with_backoff(api_call, make_api_call)
-                
-                # 메트릭 업데이트
-                self.metrics.total_calls += 1
-                usage = result.usage
-                
-                if usage:
-                    input_tokens = usage.prompt_tokens
-                    output_tokens = usage.completion_tokens
-                    cost = self._calculate_cost(api_call.model, input_tokens, output_tokens)
-                    
-                    self.metrics.total_tokens += input_tokens + output_tokens
-                    self.metrics.total_cost += cost
-                    
-                    logger.info(f"API 호출 성공: {api_call.id} (토큰: {input_tokens + output_tokens}, 비용: ${cost:.6f})")
-                
-                # 캐시 저장
-                if api_call.cache_key:
-                    self.call_cache[api_call.cache_key] = (result.choices[0].message.content, datetime.now())
+            async def make_api_call():
+                params = {"max_tokens": 500, "temperature": 0.3, **api_call.kwargs}
+                return await self._client.chat.completions.create(
+                    model=api_call.model,
+                    messages=api_call.messages,
+                    **params
+                )
+            
+            # 백오프와 함께 실행
+            result = await self._execute_with_backoff(api_call, make_api_call)
+            
+            # 메트릭 업데이트
+            self.metrics.total_calls += 1
+            usage = result.usage
+            
+            if usage:
+                input_tokens = usage.prompt_tokens
+                output_tokens = usage.completion_tokens
+                cost = self._calculate_cost(api_call.model, input_tokens, output_tokens)
                 
-                # 호출 히스토리 업데이트
-                self.call_history.append((datetime.now(), api_call.id))
+                self.metrics.total_tokens += input_tokens + output_tokens
+                self.metrics.total_cost += cost
                 
-                # 큐에서 제거
-                self.call_queue.remove(api_call)
-                executed += 1
+                # 예상 토큰과 실제 토큰 차이 정산
+                self._get_buckets(api_call.model)[1].adjust(
+                    input_tokens + output_tokens - api_call.tokens_estimate
+                )
                 
-            except Exception as e:
-                logger.error(f"API 호출 실행 실패: {api_call.id} - {e}")
-                self.call_queue.remove(api_call)
-                skipped += 1
+                logger.info(f"API 호출 성공: {api_call.id} (토큰: {input_tokens + output_tokens}, 비용: ${cost:.6f})")
+            
+            content = result.choices[0].message.content
+            
+            # 캐시 저장
+            if api_call.cache_key:
+                self.call_cache[api_call.cache_key] = (content, datetime.now())
+            
+            # 호출 히스토리 업데이트
+            self.call_history.append((datetime.now(), api_call.id))
+            
+            if not api_call.future.done():
+                api_call.future.set_result(content)
+            
+        except Exception as e:
+            logger.error(f"API 호출 실행 실패: {api_call.id} - {e}")
+            if not api_call.future.done():
+                api_call.future.set_exception(e)
+        finally:
+            self._release_inflight(api_call)
+            self._slots.release()
+
+    async def execute_queued_calls(self, openai_client) -> Dict[str, Any]:
+        """큐된 API 호출들 실행 (모두 끝날 때까지 대기)"""
+        pending = [call.future for call in self.call_queue]
+        if not pending:
+            return {"executed": 0, "skipped": 0}
+        
+        self.start(openai_client)
+        results = await asyncio.gather(*pending, return_exceptions=True)
+        skipped = sum(1 for result in results if isinstance(result, BaseException))
         
-        return {"executed": executed, "skipped": skipped}
+        return {"executed": len(results) - skipped, "skipped": skipped}
+
+    def _queue_wait_percentiles(self) -> Dict[str, float]:
+        """최근 호출들의 큐 대기 시간 백분위수 (ms)"""
+        if not self.queue_wait_ms:
+            return {"p50": 0.0, "p99": 0.0}
+        waits = sorted(self.queue_wait_ms)
+        return {
+            "p50": waits[int(0.50 * (len(waits) - 1))],
+            "p99": waits[int(0.99 * (len(waits) - 1))]
+        }
 
     def get_metrics(self) -> Dict[str, Any]:
         """현재 메트릭 반환"""
         return {
             "cost_metrics": asdict(self.metrics),
-            "queue_size": len(self.call_queue),
+            "queue_size": sum(len(heap) for heap in self._model_queues.values()),
+            "in_flight": len(self._inflight),
+            "queue_wait_ms": self._queue_wait_percentiles(),
             "cache_size": len(self.call_cache),
             "budget_utilization": self.metrics.total_cost / self.daily_budget * 100,
             "cache_hit_rate": self.metrics.cache_hits / max(self.metrics.cache_hits + self.metrics.cache_misses, 1) * 100,
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
 OpenAI API 호출 최적화기
-- LRU 캐시를 통한 중복 요청 방지
+- 공용 LLM 응답 캐시(바이트 예산 LRU, 모델별 TTL)를 통한 중복 요청 방지
 - 지수 백오프를 통한 Rate Limit 처리
 - 실시간 비용 모니터링 및 임계치 제어
 - 프로덕션용 고성능 최적화
@@ -14,9 +14,10 @@ import logging
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List, Tuple
 from dataclasses import dataclass, asdict
-from functools import lru_cache
 import json
 
+from utils.llm_response_cache import LLMResponseCache, get_llm_response_cache
+
 # 로깅 설정
 logger = logging.getLogger(__name__)
 
@@ -49,14 +50,16 @@ class OpenAIOptimizer:
     def __init__(self, 
                  daily_budget: float = 10.0,  # 일일 예산 ($10)
                  cache_ttl: int = 300,         # 캐시 유효시간 (5분)
-                 max_retries: int = 5):        # 최대 재시도 횟수
+                 max_retries: int = 5,         # 최대 재시도 횟수
+                 response_cache: Optional[LLMResponseCache] = None):  # 공용 응답 캐시
         """
         최적화기 초기화
         
         Args:
             daily_budget: 일일 예산 (USD)
-            cache_ttl: 캐시 유효시간 (초)  
+            cache_ttl: 모델별 TTL이 없을 때의 캐시 유효시간 (초)  
             max_retries: 최대 재시도 횟수
+            response_cache: 응답 캐시 (기본: 전역 공용 캐시)
         """
         self.daily_budget = daily_budget
         self.cache_ttl = cache_ttl
@@ -67,8 +70,10 @@ class OpenAIOptimizer:
         self.total_daily_cost = 0.0
         self.last_reset_date = datetime.now().date()
         
-        # 캐시 시스템
-        self.response_cache: Dict[str, Tuple[Any, float]] = {}  # {request_hash: (response, timestamp)}
+        # 캐시 시스템 (OpenAIService 등과 공유)
+        self.response_cache = response_cache if response_cache is not None else get_llm_response_cache()
+        self.cache_hits = 0
+        self.cache_misses = 0
         
         # Rate Limit 추적
         self.rate_limit_resets: Dict[str, float] = {}  # {model: reset_timestamp}
@@ -102,38 +107,21 @@ class OpenAIOptimizer:
     
     def _get_cached_response(self, cache_key: str) -> Optional[Any]:
         """캐시된 응답 조회"""
-        if cache_key in self.response_cache:
-            response, timestamp = self.response_cache[cache_key]
-            
-            # TTL 확인
-            if time.time() - timestamp <= self.cache_ttl:
-                logger.info(f"💡 캐시 히트: {cache_key[:8]}...")
-                return response
-            else:
-                # 만료된 캐시 삭제
-                del self.response_cache[cache_key]
-                logger.debug(f"🗑️ 만료된 캐시 삭제: {cache_key[:8]}...")
-        
-        return None
+        response = self.response_cache.get(cache_key)
+        if response is not None:
+            self.cache_hits += 1
+            logger.info(f"💡 캐시 히트: {cache_key[:8]}...")
+        else:
+            self.cache_misses += 1
+        return response
     
-    def _cache_response(self, cache_key: str, response: Any):
-        """응답 캐시 저장"""
-        self.response_cache[cache_key] = (response, time.time())
+    def _cache_response(self, cache_key: str, response: Any, model: Optional[str] = None,
+                        cache_ttl: Optional[float] = None):
+        """응답 캐시 저장 (TTL: 호출별 지정 > 모델별 설정 > 최적화기 기본값)"""
+        if cache_ttl is None and model not in self.response_cache.model_ttls:
+            cache_ttl = self.cache_ttl
+        self.response_cache.set(cache_key, response, model=model, ttl=cache_ttl)
         logger.debug(f"💾 캐시 저장: {cache_key[:8]}...")
-        
-        # 캐시 크기 제한 (최대 1000개)
-        if len(self.response_cache) > 1000:
-            # 가장 오래된 캐시 10개 삭제
-            sorted_cache = sorted(
-                self.response_cache.items(),
-                key=lambda x: x[1][1]  # timestamp로 정렬
-            )
-            
-            for i in range(10):
-                if i < len(sorted_cache):
-                    del self.response_cache[sorted_cache[i][0]]
-            
-            logger.info(f"🧹 캐시 정리: {len(self.response_cache)}개 유지")
     
     def _calculate_cost(self, model: str, input_tokens: int, output_tokens: int) -> OpenAICost:
         """API 호출 비용 계산"""
@@ -209,6 +197,7 @@ class OpenAIOptimizer:
                                      openai_client,
                                      model: str,
                                      messages: List[Dict],
+                                     cache_ttl: Optional[float] = None,
                                      **kwargs) -> Any:
         """
         최적화된 OpenAI Chat Completion 호출
@@ -217,6 +206,7 @@ class OpenAIOptimizer:
             openai_client: OpenAI 클라이언트
             model: 모델명
             messages: 메시지 리스트
+            cache_ttl: 이 호출의 캐시 유효시간 (초, 기본: 모델별/최적화기 설정)
             **kwargs: 추가 파라미터
             
         Returns:
@@ -259,7 +249,7 @@ class OpenAIOptimizer:
                     self._track_cost(cost_info)
                 
                 # 응답 캐시 저장
-                self._cache_response(cache_key, response)
+                self._cache_response(cache_key, response, model, cache_ttl)
                 
                 logger.info(f"✅ OpenAI API 성공: {model}")
                 return response
@@ -293,7 +283,10 @@ class OpenAIOptimizer:
             "budget_utilization": (self.total_daily_cost / self.daily_budget) * 100,
             "total_requests": len(self.daily_costs),
             "cache_size": len(self.response_cache),
-            "cache_hit_rate": 0.0  # TODO: 계산 구현
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "cache_hit_rate": self.cache_hits / max(self.cache_hits + self.cache_misses, 1) * 100,
+            "cache": self.response_cache.get_stats()
         }
         
         if self.daily_costs:
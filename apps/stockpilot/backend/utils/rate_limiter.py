@@ -1,18 +1,31 @@
 """
 StockPilot 레이트 리미팅 시스템
 클라이언트/채널별 메시지 처리 제한 및 악성 클라이언트 차단
+- 클라이언트·채널마다 토큰 버킷(시간 윈도우/버스트)을 접근 시점에 충전 → 메시지당 O(1)
+- 유휴 클라이언트 만료와 차단 해제는 타이밍 휠로 예약 (전체 클라이언트 순회 없음)
+- 전역 통계는 누적 카운터로 유지
 """
 
 import time
 import asyncio
 from typing import Dict, Optional, Tuple, Any
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
-from collections import defaultdict, deque
+from collections import Counter, defaultdict
 import logging
 
+from utils.timing_wheel import TimingWheel
+from utils.token_bucket import TokenBucket
+
 logger = logging.getLogger(__name__)
 
+# 버스트 제한을 적용하는 구간 (초)
+BURST_WINDOW_SECONDS = 10
+# 마지막 요청 후 이 시간이 지나면 클라이언트 상태 제거
+IDLE_TTL_SECONDS = 3600
+# 타이밍 휠 정밀도 (초) 및 슬롯 수 (tick × slots가 IDLE_TTL보다 길도록)
+WHEEL_TICK_SECONDS = 60
+WHEEL_SLOTS = 64
+
 @dataclass
 class RateLimitConfig:
     """레이트 리미트 설정"""
@@ -23,24 +36,36 @@ class RateLimitConfig:
 
 @dataclass
 class ClientRateState:
-    """클라이언트 레이트 리미트 상태"""
-    requests: deque = field(default_factory=deque)  # 요청 타임스탬프들
+    """클라이언트 레이트 리미트 상태 (요청 타임스탬프 목록 대신 토큰 버킷)"""
+    window: TokenBucket  # time_window 동안 max_requests개 충전
+    burst: TokenBucket   # BURST_WINDOW_SECONDS 동안 burst_limit개 충전
     total_requests: int = 0
     blocked_until: Optional[float] = None
     warning_count: int = 0
     first_request: Optional[float] = None
     last_request: Optional[float] = None
-    
-    def is_blocked(self) -> bool:
+    last_seen: Optional[float] = None
+    channels: Dict[str, "ClientRateState"] = field(default_factory=dict)  # 채널별 상태 (클라이언트 상태에만 사용)
+
+    @classmethod
+    def for_config(cls, config: RateLimitConfig, clock=time.time) -> "ClientRateState":
+        return cls(
+            window=TokenBucket(config.max_requests / config.time_window, config.max_requests, clock),
+            burst=TokenBucket(config.burst_limit / BURST_WINDOW_SECONDS, config.burst_limit, clock)
+        )
+
+    def is_blocked(self, now: Optional[float] = None) -> bool:
         """클라이언트가 차단된 상태인지 확인"""
         if self.blocked_until is None:
             return False
-        return time.time() < self.blocked_until
+        return (time.time() if now is None else now) < self.blocked_until
 
 class RateLimiter:
     """레이트 리미터 메인 클래스"""
     
-    def __init__(self):
+    def __init__(self, clock=time.time):
+        self.clock = clock
+
         # 채널별 레이트 리미트 설정
         self.channel_configs = {
             "us_stocks": RateLimitConfig(max_requests=30, time_window=60, burst_limit=10, cooldown_seconds=180),
@@ -52,20 +77,23 @@ class RateLimiter:
             "connection": RateLimitConfig(max_requests=100, time_window=60, burst_limit=20, cooldown_seconds=60),
             "_default": RateLimitConfig(max_requests=15, time_window=60, burst_limit=5, cooldown_seconds=300)
         }
+        # 채널과 무관한 클라이언트 전체 한도
+        self.client_config = self.channel_configs["connection"]
         
-        # 클라이언트별 상태 추적
-        self.client_states: Dict[str, ClientRateState] = defaultdict(ClientRateState)
-        
-        # 채널별 클라이언트 상태 추적
-        self.channel_client_states: Dict[str, Dict[str, ClientRateState]] = defaultdict(lambda: defaultdict(ClientRateState))
+        # 클라이언트별 상태 (채널별 상태는 ClientRateState.channels에 포함)
+        self.client_states: Dict[str, ClientRateState] = {}
         
-        # 글로벌 통계
+        # 글로벌 통계 (누적 카운터)
         self.global_stats = {
             "total_requests": 0,
             "blocked_requests": 0,
-            "active_clients": 0,
+            "expired_clients": 0,
             "blocked_clients": set()
         }
+        self.channel_stats: Dict[str, Counter] = defaultdict(Counter)
+        
+        # 유휴 만료/차단 해제 예약
+        self.wheel = TimingWheel(WHEEL_TICK_SECONDS, WHEEL_SLOTS, clock())
         
         # 정리 작업 스케줄링
         self._cleanup_task = None
@@ -86,106 +114,111 @@ class RateLimiter:
             self._cleanup_task = None
     
     async def _periodic_cleanup(self):
-        """주기적으로 오래된 데이터 정리"""
+        """타이밍 휠을 tick마다 진행 (메시지가 없는 동안에도 만료 처리)"""
         while True:
             try:
-                await asyncio.sleep(300)  # 5분마다 정리
-                self._cleanup_old_data()
-                logger.debug(f"레이트 리미터 정리 완료. 활성 클라이언트: {len(self.client_states)}")
+                await asyncio.sleep(WHEEL_TICK_SECONDS)
+                expired = self._cleanup_old_data()
+                if expired:
+                    logger.debug(f"레이트 리미터 정리 완료. 만료 {expired}, 활성 클라이언트: {len(self.client_states)}")
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error(f"레이트 리미터 정리 오류: {e}")
     
-    def _cleanup_old_data(self):
-        """오래된 요청 데이터 정리"""
-        current_time = time.time()
-        cleanup_threshold = current_time - 3600  # 1시간 이전 데이터 정리
-        
-        # 클라이언트 상태 정리
-        clients_to_remove = []
-        for client_id, state in self.client_states.items():
-            # 차단 해제된 클라이언트 확인
-            if state.blocked_until and current_time >= state.blocked_until:
-                state.blocked_until = None
-                state.warning_count = 0
-                logger.info(f"클라이언트 {client_id} 차단 해제")
-            
-            # 오래된 요청 기록 제거
-            while state.requests and state.requests[0] < cleanup_threshold:
-                state.requests.popleft()
-            
-            # 비활성 클라이언트 제거
-            if (not state.requests and 
-                (not state.last_request or current_time - state.last_request > 3600)):
-                clients_to_remove.append(client_id)
-        
-        for client_id in clients_to_remove:
+    def _cleanup_old_data(self) -> int:
+        """만기가 된 타이밍 휠 슬롯만 처리 (유휴 클라이언트 제거, 차단 해제). 제거한 클라이언트 수 반환"""
+        current_time = self.clock()
+        expired = 0
+        for kind, client_id, channel in self.wheel.advance(current_time):
+            state = self.client_states.get(client_id)
+            if state is None:
+                continue
+            if kind == "unblock":
+                target = state.channels.get(channel) if channel else state
+                if target is not None and target.blocked_until is not None and current_time >= target.blocked_until:
+                    self._unblock(client_id, state, target)
+                    logger.info(f"클라이언트 {client_id} 차단 해제")
+                continue
+
+            # 유휴 만료: 마지막 접근 후 IDLE_TTL이 지나고 차단도 끝난 경우에만 제거
+            deadline = max(
+                [(state.last_seen or 0) + IDLE_TTL_SECONDS, state.blocked_until or 0]
+                + [channel_state.blocked_until or 0 for channel_state in state.channels.values()]
+            )
+            if deadline > current_time:
+                self.wheel.schedule(("idle", client_id, None), deadline)
+                continue
             del self.client_states[client_id]
             self.global_stats["blocked_clients"].discard(client_id)
-        
-        # 채널별 상태도 정리
-        for channel, client_states in list(self.channel_client_states.items()):
-            clients_to_remove = []
-            for client_id, state in client_states.items():
-                while state.requests and state.requests[0] < cleanup_threshold:
-                    state.requests.popleft()
-                
-                if not state.requests and (not state.last_request or current_time - state.last_request > 3600):
-                    clients_to_remove.append(client_id)
-            
-            for client_id in clients_to_remove:
-                del client_states[client_id]
+            self.global_stats["expired_clients"] += 1
+            expired += 1
+        return expired
     
     def get_config_for_channel(self, channel: str) -> RateLimitConfig:
         """채널에 대한 레이트 리미트 설정 조회"""
         return self.channel_configs.get(channel, self.channel_configs["_default"])
+
+    def _client_state(self, client_id: str, current_time: float) -> ClientRateState:
+        """클라이언트 상태 조회/생성 (생성 시 유휴 만료 예약)"""
+        state = self.client_states.get(client_id)
+        if state is None:
+            state = self.client_states[client_id] = ClientRateState.for_config(self.client_config, self.clock)
+            self.wheel.schedule(("idle", client_id, None), current_time + IDLE_TTL_SECONDS)
+        return state
+
+    def _block(self, client_id: str, state: ClientRateState, channel: Optional[str], until: float):
+        """차단 설정 및 해제 예약"""
+        state.blocked_until = until
+        self.global_stats["blocked_clients"].add(client_id)
+        self.wheel.schedule(("unblock", client_id, channel), until)
+
+    def _unblock(self, client_id: str, client_state: ClientRateState, target: ClientRateState):
+        """차단 해제 (클라이언트·채널 상태 모두 풀렸을 때만 차단 목록에서 제거)"""
+        target.blocked_until = None
+        target.warning_count = 0
+        if client_state.blocked_until is None and all(
+            channel_state.blocked_until is None for channel_state in client_state.channels.values()
+        ):
+            self.global_stats["blocked_clients"].discard(client_id)
     
     def _update_client_state(self, client_id: str, state: ClientRateState, current_time: float):
-        """클라이언트 상태 업데이트"""
-        state.requests.append(current_time)
+        """클라이언트 상태 업데이트 (버킷에서 토큰 1개 소비)"""
+        state.window.tokens -= 1
+        state.burst.tokens -= 1
         state.total_requests += 1
         state.last_request = current_time
         if state.first_request is None:
             state.first_request = current_time
     
-    def _check_rate_limit(self, client_id: str, state: ClientRateState, config: RateLimitConfig, current_time: float) -> Tuple[bool, str]:
-        """레이트 리미트 검사"""
+    def _check_rate_limit(self, client_id: str, state: ClientRateState, config: RateLimitConfig, current_time: float,
+                          client_state: Optional[ClientRateState] = None, channel: Optional[str] = None) -> Tuple[bool, str]:
+        """레이트 리미트 검사 (토큰 버킷 충전은 접근 시점에만)"""
         # 이미 차단된 클라이언트 확인
-        if state.is_blocked():
-            remaining_time = int(state.blocked_until - current_time)
-            return False, f"클라이언트가 차단됨 (남은 시간: {remaining_time}초)"
+        if state.blocked_until is not None:
+            if current_time < state.blocked_until:
+                remaining_time = int(state.blocked_until - current_time)
+                return False, f"클라이언트가 차단됨 (남은 시간: {remaining_time}초)"
+            self._unblock(client_id, client_state or state, state)
         
-        # 시간 윈도우 내 요청 수 계산
-        window_start = current_time - config.time_window
-        while state.requests and state.requests[0] < window_start:
-            state.requests.popleft()
-        
-        requests_in_window = len(state.requests)
-        
-        # 버스트 제한 검사 (최근 10초)
-        burst_window_start = current_time - 10
-        recent_requests = sum(1 for req_time in state.requests if req_time >= burst_window_start)
-        
-        if recent_requests >= config.burst_limit:
+        # 버스트 제한 검사 (최근 BURST_WINDOW_SECONDS초 동안 burst_limit개)
+        if state.burst.wait_time(1) > 0:
             # 경고 누적
             state.warning_count += 1
             if state.warning_count >= 3:
                 # 3회 경고 후 차단
-                state.blocked_until = current_time + config.cooldown_seconds
-                self.global_stats["blocked_clients"].add(client_id)
+                self._block(client_id, state, channel, current_time + config.cooldown_seconds)
                 logger.warning(f"클라이언트 {client_id} 차단됨 (버스트 제한 초과, {config.cooldown_seconds}초)")
                 return False, f"버스트 제한 초과로 차단됨 ({config.cooldown_seconds}초)"
             else:
                 return False, f"버스트 제한 초과 (경고 {state.warning_count}/3)"
         
         # 시간 윈도우 제한 검사
-        if requests_in_window >= config.max_requests:
+        if state.window.wait_time(1) > 0:
             state.warning_count += 1
             if state.warning_count >= 2:
                 # 2회 경고 후 차단
-                state.blocked_until = current_time + config.cooldown_seconds
-                self.global_stats["blocked_clients"].add(client_id)
+                self._block(client_id, state, channel, current_time + config.cooldown_seconds)
                 logger.warning(f"클라이언트 {client_id} 차단됨 (시간 윈도우 제한 초과, {config.cooldown_seconds}초)")
                 return False, f"시간 윈도우 제한 초과로 차단됨 ({config.cooldown_seconds}초)"
             else:
@@ -197,27 +230,37 @@ class RateLimiter:
     async def check_rate_limit(self, client_id: str, channel: str = "connection", message_type: str = "message") -> Tuple[bool, str]:
         """레이트 리미트 검사 (메인 함수)"""
         try:
-            current_time = time.time()
+            current_time = self.clock()
+            if current_time >= self.wheel.next_tick_at:
+                self._cleanup_old_data()
             config = self.get_config_for_channel(channel)
             
             # 글로벌 통계 업데이트
             self.global_stats["total_requests"] += 1
+            channel_stats = self.channel_stats[channel]
+            channel_stats["requests"] += 1
             
-            # 클라이언트별 상태 확인
-            client_state = self.client_states[client_id]
-            allowed, reason = self._check_rate_limit(client_id, client_state, config, current_time)
+            # 클라이언트 전체 한도 확인
+            client_state = self._client_state(client_id, current_time)
+            client_state.last_seen = current_time
+            allowed, reason = self._check_rate_limit(client_id, client_state, self.client_config, current_time)
             
             if not allowed:
                 self.global_stats["blocked_requests"] += 1
+                channel_stats["blocked"] += 1
                 logger.warning(f"레이트 리미트 차단: client={client_id}, channel={channel}, reason={reason}")
                 return False, reason
             
             # 채널별 상태 확인
-            channel_state = self.channel_client_states[channel][client_id]
-            allowed, reason = self._check_rate_limit(client_id, channel_state, config, current_time)
+            channel_state = client_state.channels.get(channel)
+            if channel_state is None:
+                channel_state = client_state.channels[channel] = ClientRateState.for_config(config, self.clock)
+            allowed, reason = self._check_rate_limit(client_id, channel_state, config, current_time,
+                                                     client_state, channel)
             
             if not allowed:
                 self.global_stats["blocked_requests"] += 1
+                channel_stats["blocked"] += 1
                 logger.warning(f"채널 레이트 리미트 차단: client={client_id}, channel={channel}, reason={reason}")
                 return False, f"채널 {reason}"
             
@@ -238,45 +281,52 @@ class RateLimiter:
         if not client_state:
             return {"status": "unknown", "total_requests": 0}
         
-        current_time = time.time()
+        current_time = self.clock()
+        window = client_state.window
+        window.wait_time(0)  # 조회 시점까지 충전
+        used_per_window = max(0.0, window.capacity - window.tokens)
         return {
-            "status": "blocked" if client_state.is_blocked() else "active",
+            "status": "blocked" if client_state.is_blocked(current_time) else "active",
             "total_requests": client_state.total_requests,
             "warning_count": client_state.warning_count,
             "blocked_until": client_state.blocked_until,
             "remaining_block_time": max(0, int(client_state.blocked_until - current_time)) if client_state.blocked_until else 0,
-            "requests_in_last_minute": len([req for req in client_state.requests if current_time - req <= 60]),
+            # 버킷 소비량 기준 근사치 (최근 time_window 동안의 요청 수)
+            "requests_in_last_minute": int(round(used_per_window * 60 / self.client_config.time_window)),
             "first_request": client_state.first_request,
             "last_request": client_state.last_request
         }
     
     def get_global_stats(self) -> Dict[str, Any]:
-        """전역 레이트 리미팅 통계"""
+        """전역 레이트 리미팅 통계 (누적 카운터 기반, 클라이언트 순회 없음)"""
         return {
             "total_requests": self.global_stats["total_requests"],
             "blocked_requests": self.global_stats["blocked_requests"],
             "active_clients": len(self.client_states),
+            "expired_clients": self.global_stats["expired_clients"],
             "blocked_clients_count": len(self.global_stats["blocked_clients"]),
             "blocked_clients": list(self.global_stats["blocked_clients"]),
+            "channel_requests": {channel: dict(counts) for channel, counts in self.channel_stats.items()},
             "channels_monitored": list(self.channel_configs.keys()),
+            "scheduled_expiries": len(self.wheel),
             "uptime": time.time() - getattr(self, 'start_time', time.time())
         }
     
     def manually_block_client(self, client_id: str, duration_seconds: int = 600, reason: str = "관리자 차단"):
         """관리자 수동 클라이언트 차단"""
-        current_time = time.time()
-        state = self.client_states[client_id]
-        state.blocked_until = current_time + duration_seconds
-        self.global_stats["blocked_clients"].add(client_id)
+        current_time = self.clock()
+        state = self._client_state(client_id, current_time)
+        self._block(client_id, state, None, current_time + duration_seconds)
         logger.info(f"관리자가 클라이언트 {client_id}를 {duration_seconds}초 차단: {reason}")
     
     def manually_unblock_client(self, client_id: str, reason: str = "관리자 차단 해제"):
         """관리자 수동 클라이언트 차단 해제"""
         if client_id in self.client_states:
             state = self.client_states[client_id]
-            state.blocked_until = None
-            state.warning_count = 0
-            self.global_stats["blocked_clients"].discard(client_id)
+            for channel_state in state.channels.values():
+                channel_state.blocked_until = None
+                channel_state.warning_count = 0
+            self._unblock(client_id, state, state)
             logger.info(f"관리자가 클라이언트 {client_id} 차단 해제: {reason}")
 
 # 전역 레이트 리미터 인스턴스
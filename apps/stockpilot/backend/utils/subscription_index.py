@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+WebSocket 구독 역인덱스
+- 키(종목/채널) → 연결 ID 집합, 연결 ID → 키 집합을 함께 유지
+- 틱마다 수신자 조회 비용이 O(해당 키 구독자 수)
+"""
+
+from typing import Dict, Hashable, Iterable, Set, Tuple
+
+class SubscriptionIndex:
+    """양방향 구독 인덱스 (구독/해제/연결 종료 시 동기화)"""
+
+    def __init__(self):
+        self.by_key: Dict[Hashable, Set[str]] = {}         # 키 -> 연결 ID 집합
+        self.by_connection: Dict[str, Set[Hashable]] = {}  # 연결 ID -> 키 집합
+
+    def add(self, connection_id: str, keys: Iterable[Hashable]):
+        """구독 추가"""
+        keys = set(keys)
+        if not keys:
+            return
+        self.by_connection.setdefault(connection_id, set()).update(keys)
+        for key in keys:
+            self.by_key.setdefault(key, set()).add(connection_id)
+
+    def remove(self, connection_id: str, keys: Iterable[Hashable]):
+        """구독 해제 (구독자가 없는 키는 인덱스에서 제거)"""
+        subscribed = self.by_connection.get(connection_id)
+        if not subscribed:
+            return
+        for key in set(keys) & subscribed:
+            subscribed.discard(key)
+            self._discard(key, connection_id)
+        if not subscribed:
+            del self.by_connection[connection_id]
+
+    def remove_connection(self, connection_id: str) -> Set[Hashable]:
+        """연결의 모든 구독 제거 (연결 종료 시), 제거된 키 반환"""
+        keys = self.by_connection.pop(connection_id, set())
+        for key in keys:
+            self._discard(key, connection_id)
+        return keys
+
+    def _discard(self, key: Hashable, connection_id: str):
+        subscribers = self.by_key.get(key)
+        if subscribers is not None:
+            subscribers.discard(connection_id)
+            if not subscribers:
+                del self.by_key[key]
+
+    def subscribers(self, key: Hashable) -> Tuple[str, ...]:
+        """키 구독자 스냅샷 (전송 중 구독 변경에 안전)"""
+        return tuple(self.by_key.get(key, ()))
+
+    def subscriber_count(self, key: Hashable) -> int:
+        return len(self.by_key.get(key, ()))
+
+    def keys_for(self, connection_id: str) -> Set[Hashable]:
+        """연결이 구독한 키 집합"""
+        return self.by_connection.get(connection_id, set())
+
+    def is_subscribed(self, connection_id: str, key: Hashable) -> bool:
+        return connection_id in self.by_key.get(key, ())
+
+    def __len__(self) -> int:
+        return len(self.by_connection)
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+타이밍 휠 (만료 예약)
+- 마감 시각을 tick 단위 슬롯에 넣고, 시간이 지나면 지나간 슬롯만 꺼냄
+- 예약 O(1), 진행 비용은 꺼낸 항목 수에 비례 (전체 항목을 훑지 않음)
+- 한 바퀴(tick × slots)보다 먼 마감은 슬롯을 지날 때 다시 예약
+"""
+
+from typing import Any, List, Tuple
+
+class TimingWheel:
+    """tick 정밀도의 단일 단계 타이밍 휠"""
+
+    def __init__(self, tick_seconds: float, slots: int, start: float):
+        self.tick = tick_seconds
+        self.slots: List[List[Tuple[float, Any]]] = [[] for _ in range(slots)]
+        self.current = int(start // tick_seconds)  # 처리 완료한 마지막 tick
+        self.size = 0
+
+    @property
+    def next_tick_at(self) -> float:
+        """다음 슬롯이 만기가 되는 시각"""
+        return (self.current + 1) * self.tick
+
+    def schedule(self, item: Any, deadline: float):
+        """deadline 이후 advance()에서 item이 반환되도록 예약"""
+        tick = max(int(deadline // self.tick), self.current + 1)
+        self.slots[tick % len(self.slots)].append((deadline, item))
+        self.size += 1
+
+    def advance(self, now: float) -> List[Any]:
+        """now까지 지나간 슬롯을 비우고 마감이 지난 항목 반환 (아직인 항목은 재예약)"""
+        target = int(now // self.tick)
+        if target <= self.current:
+            return []
+
+        pending: List[Tuple[float, Any]] = []
+        for step in range(1, min(target - self.current, len(self.slots)) + 1):
+            index = (self.current + step) % len(self.slots)
+            if self.slots[index]:
+                pending.extend(self.slots[index])
+                self.slots[index] = []
+        self.current = target
+        self.size -= len(pending)
+
+        due = []
+        for deadline, item in pending:
+            if deadline <= now:
+                due.append(item)
+            else:
+                self.schedule(item, deadline)
+        return due
+
+    def __len__(self) -> int:
+        return self.size
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+토큰 버킷 레이트 리미터
+- 요청마다 타임스탬프 목록을 재구성하지 않고 O(1)로 충전/소비
+"""
+
+import time
+
+class TokenBucket:
+    """토큰 버킷 - 초당 rate만큼 충전, 최대 capacity까지 누적
+
+    실제 사용량이 예상보다 크면 잔량이 음수가 되어 다음 소비가 그만큼 늦춰진다.
+    """
+    
+    def __init__(self, rate_per_second: float, capacity: float, clock=time.monotonic):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self.updated = clock()
+    
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def wait_time(self, amount: float) -> float:
+        """amount를 소비할 수 있을 때까지 남은 시간 (초)"""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+    
+    def consume(self, amount: float):
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+    
+    def adjust(self, delta: float):
+        """사후 정산 (양수: 추가 소비, 음수: 반환)"""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - delta)
+    
+    def try_consume(self, amount: float = 1) -> bool:
+        """즉시 소비 가능하면 소비하고 True, 아니면 False"""
+        if self.wait_time(amount) > 0:
+            return False
+        self.tokens -= min(amount, self.capacity)
+        return True
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+TTL + LRU 캐시
+- OrderedDict 기반으로 조회/저장/퇴출 모두 O(1)
+- 조회 시 최대 허용 수명(max_age)을 지정할 수 있어 요청별 신선도 요구를 그대로 반영
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+class TTLCache:
+    """최대 항목 수 제한 LRU 캐시 (항목별 저장 시각 기록)"""
+
+    def __init__(self, max_entries: int = 1000, default_ttl: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.clock = clock
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (저장 시각, 값)
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    def get(self, key: Hashable, max_age: Optional[float] = None, default: Any = None) -> Any:
+        """조회 - 저장 후 max_age(없으면 default_ttl)초가 지난 항목은 만료 처리"""
+        item = self._entries.get(key)
+        if item is None:
+            self.stats["misses"] += 1
+            return default
+
+        stored_at, value = item
+        max_age = max_age if max_age is not None else self.default_ttl
+        if max_age is not None and self.clock() - stored_at > max_age:
+            del self._entries[key]
+            self.stats["expirations"] += 1
+            self.stats["misses"] += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        """저장 - 가득 차면 가장 오래 사용하지 않은 항목 퇴출"""
+        if key in self._entries:
+            self._entries.move_to_end(key)
+        self._entries[key] = (self.clock(), value)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def purge_older_than(self, max_age: float) -> int:
+        """저장 후 max_age초가 지난 항목 일괄 삭제 (주기 정리용), 삭제 수 반환"""
+        cutoff = self.clock() - max_age
+        expired = [key for key, (stored_at, _) in self._entries.items() if stored_at < cutoff]
+        for key in expired:
+            del self._entries[key]
+        self.stats["expirations"] += len(expired)
+        return len(expired)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -23,6 +23,8 @@ from utils.market_time_calculator import get_current_market_status
 from utils.simple_schema_validator import validate_simple_message
 from utils.websocket_auth import get_auth_manager, UserRole
 from utils.rate_limiter import get_rate_limiter, rate_limit, connection_rate_limit, message_rate_limit
+from utils.subscription_index import SubscriptionIndex
+from utils.broadcast_bus import create_broadcast_bus
 
 # 미국 시장 서비스 모듈들
 from services.us_stock_data import USStockDataService
@@ -60,8 +62,9 @@ class USMarketConnectionManager:
         # 활성 연결 관리
         self.active_connections: Dict[str, WebSocket] = {}
         
-        # 구독 관리 (연결ID -> 구독 이벤트 목록)
-        self.subscriptions: Dict[str, Set[str]] = {}
+        # 구독 관리 (이벤트 -> 연결ID 역인덱스, subscriptions는 연결ID -> 구독 이벤트 목록)
+        self.subscription_index = SubscriptionIndex()
+        self.subscriptions: Dict[str, Set[str]] = self.subscription_index.by_connection
         
         # Ping/Pong 관리
         self.last_pong: Dict[str, float] = {}
@@ -112,6 +115,9 @@ class USMarketConnectionManager:
         # 레이트 리미터 초기화
         self.rate_limiter = get_rate_limiter()
         
+        # 워커 간 브로드캐스트 버스 (WS_BROADCAST_BACKEND=inprocess|unix|redis)
+        self.broadcast_bus = create_broadcast_bus()
+        
         logger.info("🔐 WebSocket 인증 시스템 통합 완료")
         logger.info("⚡ 레이트 리미팅 시스템 통합 완료")
 
@@ -230,8 +236,7 @@ class USMarketConnectionManager:
         if client_id in self.active_connections:
             del self.active_connections[client_id]
             
-        if client_id in self.subscriptions:
-            del self.subscriptions[client_id]
+        self.subscription_index.remove_connection(client_id)
             
         if client_id in self.last_pong:
             del self.last_pong[client_id]
@@ -243,10 +248,14 @@ class USMarketConnectionManager:
 
     async def send_to_client(self, client_id: str, data: Dict[str, Any]):
         """특정 클라이언트에게 메시지 전송"""
+        return await self._send_text(client_id, json.dumps(data, ensure_ascii=False))
+
+    async def _send_text(self, client_id: str, text: str):
+        """직렬화된 메시지 전송 (브로드캐스트 시 구독자 간 같은 문자열 공유)"""
         if client_id in self.active_connections:
             try:
                 websocket = self.active_connections[client_id]
-                await websocket.send_text(json.dumps(data, ensure_ascii=False))
+                await websocket.send_text(text)
                 self.message_count += 1
                 return True
             except Exception as e:
@@ -270,22 +279,30 @@ class USMarketConnectionManager:
             logger.warning(f"⚠️ 브로드캐스트 메시지 스키마 검증 실패 ({event_type}): {error_msg}")
             # 검증 실패해도 계속 진행 (프로덕션 환경에서 서비스 중단 방지)
         
-        # 해당 이벤트를 구독한 클라이언트들에게만 전송
-        subscribers = [
-            client_id for client_id, events in self.subscriptions.items()
-            if event_type in events
-        ]
+        # 버스로 한 번 발행하면 각 워커가 자기 로컬 구독자에게 팬아웃 (버스 시작 전에는 로컬 전송)
+        if self.broadcast_bus.started:
+            await self.broadcast_bus.publish(message)
+        else:
+            await self._fan_out_local(message)
+
+    async def _fan_out_local(self, message: Dict[str, Any]):
+        """버스에서 받은 메시지를 이 워커의 구독자들에게 전송"""
+        event_type = message["type"]
+        
+        # 해당 이벤트를 구독한 클라이언트들에게만 전송 (역인덱스 조회, 틱당 한 번만 직렬화)
+        subscribers = self.subscription_index.subscribers(event_type)
         
         if subscribers:
-            logger.info(f"📡 브로드캐스트: {event_type} -> {len(subscribers)}명 (스키마 검증: {'✅' if is_valid else '⚠️'})")
+            logger.info(f"📡 브로드캐스트: {event_type} -> {len(subscribers)}명")
+            text = json.dumps(message, ensure_ascii=False)
+            channel_type = event_type.split(':')[0] if ':' in event_type else event_type
             
             for client_id in subscribers:
                 # 클라이언트별 채널 레이트 리미트 검사
-                channel_type = event_type.split(':')[0] if ':' in event_type else event_type
                 allowed, reason = await self.rate_limiter.check_rate_limit(client_id, channel_type, "broadcast_receive")
                 
                 if allowed:
-                    await self.send_to_client(client_id, message)
+                    await self._send_text(client_id, text)
                 else:
                     logger.debug(f"클라이언트 {client_id} 브로드캐스트 차단 ({channel_type}): {reason}")
 
@@ -308,20 +325,18 @@ class USMarketConnectionManager:
             await self.send_error(client_id, "RATE_LIMIT_EXCEEDED", f"구독 요청 제한: {reason}")
             return
             
-        if client_id not in self.subscriptions:
-            self.subscriptions[client_id] = set()
-        
         # 권한 검사 및 필터링
         allowed_events = []
         denied_events = []
         
         for event in events:
             if self._check_subscription_permission(client_id, event):
-                self.subscriptions[client_id].add(event)
                 allowed_events.append(event)
             else:
                 denied_events.append(event)
         
+        self.subscription_index.add(client_id, allowed_events)
+        
         # 구독 결과 로그
         if allowed_events:
             logger.info(f"📵 구독 성공: {client_id} -> {allowed_events}")
@@ -392,9 +407,7 @@ class USMarketConnectionManager:
 
     async def handle_unsubscribe(self, client_id: str, events: List[str]):
         """이벤트 구독 해제"""
-        if client_id in self.subscriptions:
-            for event in events:
-                self.subscriptions[client_id].discard(event)
+        self.subscription_index.remove(client_id, events)
                 
         logger.info(f"📋 구독 해제: {client_id} -> {events}")
         
@@ -410,6 +423,7 @@ class USMarketConnectionManager:
             "active_connections": len(self.active_connections),
             "total_connections": self.connection_count,
             "total_messages": self.message_count,
+            "broadcast_bus": self.broadcast_bus.get_stats(),
             "subscriptions": {
                 client_id: list(events) 
                 for client_id, events in self.subscriptions.items()
@@ -419,6 +433,7 @@ class USMarketConnectionManager:
     async def start_us_market_streaming(self):
         """미국 시장 실시간 스트리밍 시작"""
         logger.info("🚀 미국 시장 실시간 스트리밍 시작")
+        await self.broadcast_bus.start(self._fan_out_local)
         
         # 병렬 스트리밍 작업들
         tasks = [
@@ -443,6 +458,11 @@ class USMarketConnectionManager:
         major_us_stocks = ["AAPL", "MSFT", "GOOGL", "AMZN", "TSLA", "META", "NVDA", "NFLX"]
         
         while True:
+            # 틱 조회/발행은 발행 담당 워커만 (나머지 워커는 버스로 수신)
+            if not self.broadcast_bus.is_publisher:
+                await asyncio.sleep(self.streaming_intervals['us_stocks'])
+                continue
+            
             try:
                 stock_updates = []
                 
@@ -1006,6 +1026,11 @@ async def startup_event():
     # 레이트 리미터 백그라운드 작업 시작
     asyncio.create_task(manager.rate_limiter.start_cleanup_task())
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """서버 종료 시 브로드캐스트 버스 정리 (Unix 허브는 다른 워커가 인계)"""
+    await manager.broadcast_bus.close()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8765)
\ No newline at end of file
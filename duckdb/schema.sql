@@ -1,10 +1,10 @@
--- 뼈대용 DDL (실행은 나중에)
+-- 정책자금 매칭 DDL (mcp/modules/policy/match_engine.connect()에서 적용)
 CREATE TABLE IF NOT EXISTS policies (
   program_id TEXT PRIMARY KEY,
   name TEXT,
   agency TEXT,
-  region TEXT,
-  industry_code TEXT,
+  region TEXT[],
+  industry_code TEXT[],
   limit_max BIGINT,
   interest_rate_max DOUBLE,
   raw JSON
@@ -19,21 +19,37 @@ CREATE TABLE IF NOT EXISTS applicants (
   revenue_last12m BIGINT,
   credit_band TEXT,
   tax_arrears_flag BOOLEAN,
-  special_flags JSON
+  tax_arrears_amount BIGINT,
+  employment_count INTEGER,
+  special_flags TEXT[]
 );
 
+-- matches/scores는 신청자×정책 규모로 커지므로 PK 인덱스 없이 두고,
+-- 엔진이 바뀐 신청자/정책 범위를 지운 뒤 다시 넣는 방식으로 (applicant_id, program_id) 유일성을 지킨다
 CREATE TABLE IF NOT EXISTS matches (
   applicant_id TEXT,
   program_id TEXT,
   eligible BOOLEAN,
-  reasons JSON,
-  PRIMARY KEY (applicant_id, program_id)
+  reasons JSON
 );
 
 CREATE TABLE IF NOT EXISTS scores (
   applicant_id TEXT,
   program_id TEXT,
   score INTEGER,
-  notes JSON,
-  PRIMARY KEY (applicant_id, program_id)
+  notes JSON
+);
+
+-- 증분 재매칭: 마지막 실행 때의 행 해시 (kind = applicant | policy | scoring)
+CREATE TABLE IF NOT EXISTS match_fingerprints (
+  kind TEXT,
+  id TEXT,
+  row_hash UBIGINT,
+  PRIMARY KEY (kind, id)
+);
+
+-- 마지막 매칭 실행에서 다시 계산한 신청자/정책 (스코어러가 같은 범위만 재채점)
+CREATE TABLE IF NOT EXISTS match_dirty (
+  kind TEXT,
+  id TEXT
 );
@@ -0,0 +1,158 @@
+import yaml
+from collections import deque
+from pathlib import Path
+
+ALIA = Path("schemas/stocks/aliases.yaml")
+
+# 한글 별칭 뒤에 붙어도 단어 경계로 보는 조사 (긴 것부터 검사)
+PARTICLES = sorted([
+    "은", "는", "이", "가", "을", "를", "의", "에", "와", "과", "도", "로", "만",
+    "에서", "으로", "에게", "한테", "까지", "부터", "보다", "처럼", "이나", "이다",
+    "이며", "라는", "이라는", "과의", "와의", "에서는", "으로는", "에게서",
+], key=len, reverse=True)
+
+def _is_hangul(ch):
+    return "가" <= ch <= "힣" or "ㄱ" <= ch <= "ㆎ"
+
+def _is_word(ch):
+    return ch.isalnum() or ch == "_"
+
+def _left_ok(s, i, first):
+    # i: 별칭 시작 위치. 영문/숫자 별칭은 앞 글자가 한글이 아닌 단어 문자면 안 되고, 한글 별칭은 앞이 한글이면 안 됨
+    if i == 0 or not _is_word(first):
+        return True
+    prev = s[i - 1]
+    if _is_hangul(first):
+        return not _is_hangul(prev)
+    return not _is_word(prev) or _is_hangul(prev)
+
+def _right_ok(s, j, last):
+    # j: 별칭 끝 다음 위치. 한글 별칭은 조사까지 붙은 형태(삼성전자는, 네이버의)를 허용
+    if j == len(s) or not _is_word(last):
+        return True
+    nxt = s[j]
+    if not _is_hangul(last):
+        return not _is_word(nxt) or _is_hangul(nxt)
+    if not _is_hangul(nxt):
+        return True
+    for p in PARTICLES:
+        if s.startswith(p, j):
+            end = j + len(p)
+            if end == len(s) or not _is_hangul(s[end]):
+                return True
+    return False
+
+class AliasMatcher:
+    """별칭 표 {심볼: [별칭...]} 전체로 한 번 만든 Aho-Corasick 자동자.
+    기사 한 번 훑기로 모든 심볼의 적중 별칭을 찾는다 (심볼 자체도 별칭으로 포함)."""
+
+    def __init__(self, aliases):
+        self.symbols = []          # 입력 순서 (동점일 때 앞선 심볼 우선)
+        self.rank = {}
+        self.terms = []            # 별칭 id -> (소문자 별칭, [심볼 id...])
+        term_ids = {}
+        for sym, names in (aliases or {}).items():
+            sid = self.rank.setdefault(sym, len(self.symbols))
+            if sid == len(self.symbols):
+                self.symbols.append(sym)
+            for t in [sym] + list(names or []):
+                t = (t or "").strip().lower()
+                if not t:
+                    continue
+                tid = term_ids.setdefault(t, len(self.terms))
+                if tid == len(self.terms):
+                    self.terms.append((t, []))
+                if sid not in self.terms[tid][1]:
+                    self.terms[tid][1].append(sid)
+        self._build()
+
+    def _build(self):
+        goto, out = [{}], [[]]
+        for tid, (t, _) in enumerate(self.terms):
+            node = 0
+            for ch in t:
+                nxt = goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][ch] = nxt
+                    goto.append({})
+                    out.append([])
+                node = nxt
+            out[node].append(tid)
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in goto[node].items():
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[child] = goto[f].get(ch, 0)
+                out[child] = out[child] + out[fail[child]]  # 접미사 별칭 출력을 미리 합쳐 둠
+                queue.append(child)
+
+        self._goto, self._fail, self._out = goto, fail, out
+
+    def find_terms(self, text):
+        """text(대소문자 무시)에서 단어 경계를 만족하며 등장한 별칭 id 집합"""
+        if not text:
+            return set()
+        s = text.lower()
+        goto, fail, out, terms = self._goto, self._fail, self._out, self.terms
+        found = set()
+        node = 0
+        for i, ch in enumerate(s):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                for tid in out[node]:
+                    if tid in found:
+                        continue
+                    t = terms[tid][0]
+                    start = i + 1 - len(t)
+                    if _left_ok(s, start, t[0]) and _right_ok(s, i + 1, t[-1]):
+                        found.add(tid)
+        return found
+
+    def symbol_hits(self, text):
+        """{심볼: 적중한 서로 다른 별칭 수}"""
+        hits = {}
+        for tid in self.find_terms(text):
+            for sid in self.terms[tid][1]:
+                hits[sid] = hits.get(sid, 0) + 1
+        return {self.symbols[sid]: n for sid, n in hits.items()}
+
+    def best_symbol(self, text):
+        """(적중 별칭 수가 가장 많은 심볼, 적중 수). 동점이면 별칭 표에서 앞선 심볼, 없으면 (None, 0)"""
+        hits = self.symbol_hits(text)
+        if not hits:
+            return None, 0
+        sym = min(hits, key=lambda s: (-hits[s], self.rank[s]))
+        return sym, hits[sym]
+
+def load_aliases(path=ALIA):
+    alias = {}
+    if path.exists():
+        try:
+            a = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+            alias = a.get("aliases", {}) or {}
+        except Exception:
+            pass
+    return alias
+
+_cache = {}
+
+def get_matcher(path=ALIA):
+    """별칭 파일로 만든 자동자 (파일이 바뀌지 않았으면 재사용). news, stocks 에이전트 공용"""
+    try:
+        mtime = path.stat().st_mtime_ns
+    except OSError:
+        mtime = None
+    key = str(path)
+    cached = _cache.get(key)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, AliasMatcher(load_aliases(path)))
+        _cache[key] = cached
+    return cached[1]
@@ -1,34 +1,22 @@
-import json, re, yaml
+import json
 from pathlib import Path
 
+from .alias_matcher import ALIA, AliasMatcher, get_matcher
+
 PARSED = Path("db/news_parsed.json")
-ALIA   = Path("schemas/stocks/aliases.yaml")
 LINKED = Path("db/news_by_symbol.json"); LINKED.parent.mkdir(parents=True, exist_ok=True)
 
-def _load_aliases():
-    alias = {}
-    if ALIA.exists():
-        try:
-            a = yaml.safe_load(ALIA.read_text(encoding="utf-8")) or {}
-            alias = a.get("aliases", {}) or {}
-        except Exception:
-            pass
-    return alias
+_hint_matchers = {}
 
-def _hits(text, terms):
-    if not text or not terms: return 0
-    s = text.lower()
-    cnt = 0
-    for t in terms:
-        t = (t or "").strip()
-        if not t: 
-            continue
-        if re.search(r'\b'+re.escape(t.lower())+r'\b', s):
-            cnt += 1
-    return cnt
+def _hint_hits(text, sym):
+    # 별칭 표에 없는 검색 심볼(_sym_query)은 심볼 문자열 하나짜리 자동자로 따로 센다
+    m = _hint_matchers.get(sym)
+    if m is None:
+        m = _hint_matchers[sym] = AliasMatcher({sym: []})
+    return m.best_symbol(text)[1]
 
 def link():
-    alias = _load_aliases()
+    matcher = get_matcher(ALIA)
     try:
         parsed = json.loads(PARSED.read_text(encoding="utf-8") or "[]")
     except Exception:
@@ -37,19 +25,14 @@ def link():
     out = []
     for a in parsed:
         text = (a.get("title") or "") + " " + (a.get("desc") or "")
-        best, best_hits = None, 0
         sym_hint = a.get("_sym_query")
+        best, best_hits = matcher.best_symbol(text)
 
-        candidates = list(alias.keys())
-        if sym_hint and sym_hint not in candidates:
-            candidates.insert(0, sym_hint)
-
-        for sym in candidates:
-            terms = [sym] + (alias.get(sym, []))
-            h = _hits(text, terms)
-            if h > best_hits:
-                best_hits = h
-                best = sym
+        # 별칭 표에 없는 힌트 심볼은 후보 맨 앞이므로 동점이면 힌트가 이긴다
+        if sym_hint and sym_hint not in matcher.rank:
+            h = _hint_hits(text, sym_hint)
+            if h and h >= best_hits:
+                best, best_hits = sym_hint, h
 
         out.append({
             "symbol": best or sym_hint,
@@ -1,6 +1,45 @@
-# policy_matcher.py — 매칭 엔진(뼈대)
+# policy_matcher.py — 매칭 엔진 실행
 # 입력: data/applicants.json, db/policies_normalized.json, schemas/policy_matching_rules.yaml
-# 출력: data/matches.json (자리표시자)
+# 출력: duckdb/policies.db matches (지난 실행 이후 바뀐 신청자/정책만 재매칭), data/matches.json
+import json, os, yaml
+from pathlib import Path
+
+from ..modules.policy import match_engine as engine
+
+APPLICANTS = Path("data/applicants.json")
+POLICIES = Path("db/policies_normalized.json")
+RULES = Path("schemas/policy_matching_rules.yaml")
+OUT = Path("data/matches.json")
+
+# 근접 탈락(미충족 조건 N개 이하)도 사유와 함께 남길지 (0=통과 쌍만)
+MAX_FAILED = int(os.getenv("POLICY_MATCH_MAX_FAILED", "0"))
+# JSON 내보내기 상한 (그 이상은 DuckDB matches 테이블만 사용)
+EXPORT_LIMIT = int(os.getenv("POLICY_MATCH_EXPORT_LIMIT", "100000"))
+
+def _load_json(p: Path):
+    try:
+        return json.loads(p.read_text(encoding="utf-8") or "[]")
+    except Exception:
+        return []
+
+def _load_yaml(p: Path):
+    try:
+        return yaml.safe_load(p.read_text(encoding="utf-8")) or {}
+    except Exception:
+        return {}
+
 def match():
-    """MCP agent stub: compute eligibility & simple reasons"""
-    pass
+    """신청자 × 정책 자격 판정 (DuckDB 집합 조인, 증분)"""
+    policies = engine.load_policies(_load_json(POLICIES), _load_yaml(RULES))
+    con = engine.connect()
+    try:
+        stats = engine.match(con, _load_json(APPLICANTS), policies, max_failed=MAX_FAILED)
+        exported = engine.export_json(
+            con, "SELECT applicant_id, program_id, eligible, CAST(reasons AS TEXT[]) AS reasons "
+                 "FROM matches ORDER BY applicant_id, program_id", OUT, EXPORT_LIMIT)
+    finally:
+        con.close()
+    print(f"[policy.match] applicants={stats['applicants']} policies={stats['policies']} "
+          f"changed={stats['dirty_applicants']}/{stats['dirty_policies']} written={stats['matches_written']} "
+          f"-> {OUT if exported is not None else 'duckdb only (export limit)'}")
+    return stats
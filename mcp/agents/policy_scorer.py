@@ -1,6 +1,34 @@
-# policy_scorer.py — 스코어러(뼈대)
-# 입력: data/matches.json, schemas/policy_scoring_rules.yaml, schemas/policy_exception_rules.yaml
-# 출력: data/scores.json (자리표시자)
+# policy_scorer.py — 스코어러 실행
+# 입력: duckdb/policies.db matches, schemas/policy_scoring_rules.yaml, schemas/policy_exception_rules.yaml
+# 출력: duckdb/policies.db scores (마지막 매칭에서 바뀐 범위만 재채점), data/scores.json
+import os, yaml
+from pathlib import Path
+
+from ..modules.policy import match_engine as engine
+
+SCORING = Path("schemas/policy_scoring_rules.yaml")
+EXCEPTIONS = Path("schemas/policy_exception_rules.yaml")
+OUT = Path("data/scores.json")
+
+EXPORT_LIMIT = int(os.getenv("POLICY_MATCH_EXPORT_LIMIT", "100000"))
+
+def _load_yaml(p: Path):
+    try:
+        return yaml.safe_load(p.read_text(encoding="utf-8")) or {}
+    except Exception:
+        return {}
+
 def score():
-    """MCP agent stub: assign scores using rules & exceptions"""
-    pass
+    """통과 쌍 점수 + 사유 코드(적용 규칙 id) 산출"""
+    settings, rules = engine.load_score_rules(_load_yaml(SCORING), _load_yaml(EXCEPTIONS))
+    con = engine.connect()
+    try:
+        stats = engine.score(con, settings, rules)
+        exported = engine.export_json(
+            con, "SELECT applicant_id, program_id, score, CAST(notes AS TEXT[]) AS notes "
+                 "FROM scores ORDER BY applicant_id, score DESC, program_id", OUT, EXPORT_LIMIT)
+    finally:
+        con.close()
+    print(f"[policy.score] {'full' if stats['full'] else 'incremental'} written={stats['scores_written']} "
+          f"-> {OUT if exported is not None else 'duckdb only (export limit)'}")
+    return stats
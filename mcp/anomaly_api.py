@@ -12,6 +12,7 @@ FastAPI 라우터로 이상탐지 분석 결과를 RESTful API로 제공
 - GET /api/v1/anomaly/timeseries       # 시계열 이상치 마킹 데이터
 - GET /api/v1/anomaly/forecast         # 7일 예측 정보
 - POST /api/v1/anomaly/run             # 분석 실행 트리거
+- POST /api/v1/anomaly/ingest          # 메트릭 포인트 증분 반영
 - GET /api/v1/anomaly/report.md        # Markdown 리포트
 - GET /api/v1/anomaly/health           # 헬스체크
 
@@ -23,8 +24,6 @@ import asyncio
 import json
 import logging
 import os
-import subprocess
-import tempfile
 import time
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -33,11 +32,11 @@ from typing import Any, Dict, List, Optional, Union
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from fastapi.responses import PlainTextResponse, JSONResponse
 from pydantic import BaseModel, Field
-import aiofiles
 
 # 내부 모듈
 from .auth import require_role, get_current_user, RoleEnum
 from .cache import cache_response, get_cached_data, set_cache_data
+from .anomaly_service import get_anomaly_service
 
 # 로깅 설정
 logger = logging.getLogger(__name__)
@@ -100,6 +99,11 @@ class AnalysisRequest(BaseModel):
     forecast_days: Optional[int] = Field(7, ge=1, le=30, description="예측 기간 (일)")
     force_refresh: Optional[bool] = Field(False, description="캐시 무시 강제 실행")
 
+class IngestRequest(BaseModel):
+    """메트릭 포인트 푸시 요청 모델"""
+    metric: str = Field(..., description="메트릭 이름")
+    points: List[Dict[str, Any]] = Field(..., description="포인트 목록 [{timestamp, value}]")
+
 class HealthStatus(BaseModel):
     """헬스체크 상태 모델"""
     status: str = Field(..., description="서비스 상태 (healthy/degraded/unhealthy)")
@@ -134,85 +138,36 @@ async def run_anomaly_script(
     output_format: str = "json"
 ) -> Optional[str]:
     """
-    이상탐지 스크립트를 비동기로 실행
+    상주 이상탐지 서비스에서 분석 리포트 생성 (메모리 상태 기반, 서브프로세스 없음)
 
     Args:
-        days: 분석 기간 (일)
+        days: 분석 기간 (일) - 상주 서비스는 로드된 전체 이력을 사용
         threshold: Z-score 임계치
         window: 롤링 윈도우 크기
         forecast: 예측 기간
         output_format: 출력 형식 (json/markdown)
 
     Returns:
-        str: 스크립트 실행 결과 또는 None (실패시)
+        str: 분석 리포트 또는 None (실패시)
     """
     try:
-        script_path = Path(__file__).parent.parent / "scripts" / "anomaly_detect.py"
-
-        if not script_path.exists():
-            logger.error(f"이상탐지 스크립트를 찾을 수 없음: {script_path}")
-            return None
-
-        # 임시 출력 파일 생성
-        with tempfile.NamedTemporaryFile(mode='w', suffix=f'.{output_format}', delete=False) as temp_file:
-            temp_output_path = temp_file.name
-
-        # 스크립트 실행 명령 구성
-        cmd = [
-            "python3", str(script_path),
-            "--days", str(days),
-            "--threshold", str(threshold),
-            "--window", str(window),
-            "--forecast", str(forecast),
-            "--output", temp_output_path
-        ]
-
-        if output_format == "json":
-            cmd.append("--json")
-        elif output_format == "markdown":
-            cmd.append("--md")
-
-        logger.info(f"이상탐지 스크립트 실행: {' '.join(cmd)}")
-
-        # 비동기 프로세스 실행
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            cwd=script_path.parent.parent
+        started = time.perf_counter()
+        result = await get_anomaly_service().get_report(
+            threshold=threshold,
+            window=window,
+            forecast=forecast,
+            output_format=output_format
         )
 
-        # 타임아웃 60초로 프로세스 완료 대기
-        try:
-            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=60.0)
-        except asyncio.TimeoutError:
-            process.kill()
-            logger.error("이상탐지 스크립트 실행 타임아웃 (60초)")
+        if result is None:
+            logger.error("이상탐지 분석할 메트릭 데이터가 없음")
             return None
 
-        if process.returncode == 0:
-            # 성공적으로 실행됨 - 결과 파일 읽기
-            try:
-                async with aiofiles.open(temp_output_path, 'r', encoding='utf-8') as f:
-                    result = await f.read()
-
-                # 임시 파일 정리
-                os.unlink(temp_output_path)
-
-                logger.info(f"이상탐지 스크립트 실행 성공 ({len(result)} bytes)")
-                return result
-
-            except Exception as e:
-                logger.error(f"결과 파일 읽기 실패: {str(e)}")
-                return None
-        else:
-            # 실행 실패
-            error_msg = stderr.decode('utf-8') if stderr else "알 수 없는 오류"
-            logger.error(f"이상탐지 스크립트 실행 실패 (코드 {process.returncode}): {error_msg}")
-            return None
+        logger.info(f"이상탐지 리포트 생성 ({len(result)} bytes, {(time.perf_counter() - started) * 1000:.1f}ms)")
+        return result
 
     except Exception as e:
-        logger.error(f"이상탐지 스크립트 실행 중 예외 발생: {str(e)}")
+        logger.error(f"이상탐지 리포트 생성 중 예외 발생: {str(e)}")
         return None
 
 def parse_analysis_result(result_json: str) -> Optional[Dict[str, Any]]:
@@ -568,8 +523,9 @@ async def run_analysis(
     try:
         logger.info(f"이상탐지 분석 실행 요청: {request.dict()}")
 
-        # 캐시 무효화 (force_refresh가 True인 경우)
+        # 캐시 무효화 (force_refresh가 True인 경우 상주 탐지기도 전체 재구성)
         if request.force_refresh:
+            get_anomaly_service().invalidate()
             cache_keys = [
                 "anomaly_summary",
                 "anomaly_timeseries_all_*",
@@ -622,6 +578,33 @@ async def run_analysis(
         logger.error(f"분석 실행 중 오류: {str(e)}")
         raise HTTPException(status_code=500, detail="분석 실행 중 오류 발생")
 
+@router.post("/ingest", summary="메트릭 포인트 수집", description="새 메트릭 포인트를 상주 이상탐지 상태에 반영합니다")
+async def ingest_points(
+    request: IngestRequest,
+    current_user = Depends(require_role([RoleEnum.ADMIN, RoleEnum.OPERATOR]))
+):
+    """
+    새 포인트를 메트릭별 EWMA/Z-score 상태에 증분 반영
+
+    접근 권한: admin, operator
+    """
+    try:
+        points = [(point["timestamp"], float(point["value"])) for point in request.points]
+        new_anomalies = await get_anomaly_service().ingest(request.metric, points)
+
+        return JSONResponse({
+            "status": "accepted",
+            "metric": request.metric,
+            "points": len(points),
+            "new_anomalies": new_anomalies
+        })
+
+    except (KeyError, TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"잘못된 포인트 형식: {str(e)}")
+    except Exception as e:
+        logger.error(f"포인트 수집 중 오류: {str(e)}")
+        raise HTTPException(status_code=500, detail="포인트 수집 중 오류 발생")
+
 @router.get("/report.md", response_class=PlainTextResponse,
            summary="Markdown 리포트", description="최신 이상탐지 분석 결과를 Markdown 형식으로 반환합니다")
 async def get_markdown_report(
@@ -0,0 +1,320 @@
+# mcp/anomaly_service.py
+"""
+이상탐지 상주 서비스 (프로세스 내부)
+
+주요 기능:
+- 파라미터 조합별 AnomalyDetector를 메모리에 유지 (최초 1회 전체 로드 + 벡터화 백필)
+- 메트릭별 EWMA/Z-score 상태를 새 포인트마다 증분 갱신 (전체 이력 재로드 없음)
+- 데이터 소스는 수정된 파일만 다시 읽어 마지막 시각 이후 포인트만 반영
+- API 요청은 메모리 상태에서 리포트 생성 (서브프로세스 실행 없음)
+
+증분 갱신 포인트는 배치 전처리의 IQR 극단값 제거를 거치지 않는다.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+# 로깅 설정
+log = logging.getLogger("mcp.anomaly_service")
+
+# 분모 0 방지 (배치 전처리와 동일한 값)
+Z_SCORE_EPSILON = 1e-8
+
+
+class MetricState:
+    """
+    메트릭별 증분 EWMA/Z-score 상태
+
+    배치 전처리와 같은 값을 낸다:
+    - ewma: pandas ewm(alpha, adjust=True).mean()
+    - z_score: 최근 window개 ewma의 평균/표본표준편차(ddof=1) 기준
+    """
+
+    def __init__(self, ewma_alpha: float, window_size: int, history_size: int = 500):
+        self.ewma_alpha = ewma_alpha
+        self.window_size = window_size
+        self.weighted_sum = 0.0   # EWMA 분자 (가중 합)
+        self.weight_total = 0.0   # EWMA 분모 (가중치 합)
+        self.recent_ewma: deque = deque(maxlen=window_size)
+        self.history: deque = deque(maxlen=history_size)  # 예측/시계열 조회용 최근 포인트
+        self.last_timestamp: Optional[pd.Timestamp] = None
+        self.count = 0
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, ewma_alpha: float, window_size: int,
+                   history_size: int = 500) -> "MetricState":
+        """전처리된 프레임(timestamp, value, ewma, z_score)의 마지막 상태로 초기화"""
+        state = cls(ewma_alpha, window_size, history_size)
+        count = len(df)
+        if count == 0:
+            return state
+
+        decay = 1.0 - ewma_alpha
+        state.count = count
+        state.weight_total = (1.0 - decay ** count) / ewma_alpha  # sum(decay^i), i < count
+        state.weighted_sum = float(df['ewma'].iloc[-1]) * state.weight_total
+        state.recent_ewma.extend(df['ewma'].iloc[-window_size:].astype(float))
+        tail = df.iloc[-(state.history.maxlen or count):]
+        state.history.extend(
+            zip(pd.to_datetime(tail['timestamp']), tail['value'].astype(float),
+                tail['ewma'].astype(float), tail['z_score'].astype(float))
+        )
+        state.last_timestamp = pd.Timestamp(df['timestamp'].iloc[-1])
+        return state
+
+    def update(self, timestamp: pd.Timestamp, value: float) -> Tuple[float, float]:
+        """새 포인트 반영 - (ewma, z_score) 반환, 표본이 1개면 z_score는 NaN"""
+        decay = 1.0 - self.ewma_alpha
+        self.weighted_sum = self.weighted_sum * decay + value
+        self.weight_total = self.weight_total * decay + 1.0
+        ewma = self.weighted_sum / self.weight_total
+
+        self.recent_ewma.append(ewma)
+        n = len(self.recent_ewma)
+        if n > 1:
+            mean = sum(self.recent_ewma) / n
+            std = math.sqrt(sum((x - mean) ** 2 for x in self.recent_ewma) / (n - 1))
+            z_score = (ewma - mean) / (std + Z_SCORE_EPSILON)
+        else:
+            z_score = float('nan')
+
+        self.count += 1
+        self.last_timestamp = timestamp
+        self.history.append((timestamp, value, ewma, z_score))
+        return ewma, z_score
+
+    def to_frame(self) -> pd.DataFrame:
+        """최근 포인트를 전처리 프레임 형식으로 반환 (예측 모델 입력)"""
+        return pd.DataFrame(list(self.history), columns=['timestamp', 'value', 'ewma', 'z_score'])
+
+
+@dataclass
+class HostedDetector:
+    """상주 중인 탐지기와 메트릭별 증분 상태"""
+    detector: Any                                  # scripts.anomaly_detect.AnomalyDetector
+    states: Dict[str, MetricState] = field(default_factory=dict)
+    file_mtimes: Dict[str, float] = field(default_factory=dict)
+    dirty: set = field(default_factory=set)        # 예측/위험도 재계산이 필요한 메트릭
+    last_refresh: float = 0.0
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+class AnomalyService:
+    """이상탐지 상주 서비스 - 파라미터 조합별 탐지기 유지 및 증분 갱신"""
+
+    def __init__(self,
+                 base_dir: Optional[Path] = None,
+                 refresh_interval: float = 60.0,
+                 history_size: int = 500,
+                 max_detectors: int = 4,
+                 ewma_alpha: float = 0.3):
+        """
+        초기화
+
+        Args:
+            base_dir: 데이터 소스 기준 디렉토리 (reports/metrics, logs, reports/ci_reports)
+            refresh_interval: 데이터 소스 변경 확인 주기 (초)
+            history_size: 메트릭별 메모리 보관 포인트/이상치 수
+            max_detectors: 동시에 유지할 파라미터 조합 수 (초과 시 가장 오래된 조합 해제)
+            ewma_alpha: EWMA 평활화 계수
+        """
+        self.base_dir = Path(base_dir) if base_dir else Path(__file__).parent.parent
+        self.refresh_interval = refresh_interval
+        self.history_size = history_size
+        self.max_detectors = max_detectors
+        self.ewma_alpha = ewma_alpha
+        self.detectors: Dict[Tuple[float, int, int], HostedDetector] = {}
+        self._build_lock = asyncio.Lock()
+        self.stats = {"builds": 0, "refreshes": 0, "points_ingested": 0, "reports": 0}
+
+    # ---- 탐지기 수명 관리 ----
+
+    def _source_dirs(self) -> Dict[str, str]:
+        return {
+            "metrics_dir": str(self.base_dir / "reports" / "metrics"),
+            "logs_dir": str(self.base_dir / "logs"),
+            "ci_reports_dir": str(self.base_dir / "reports" / "ci_reports")
+        }
+
+    def _create_detector(self, threshold: float, window: int, forecast: int):
+        from scripts.anomaly_detect import AnomalyDetector
+
+        return AnomalyDetector(window_size=window, threshold=threshold,
+                               forecast_days=forecast, ewma_alpha=self.ewma_alpha)
+
+    def _build(self, threshold: float, window: int, forecast: int) -> HostedDetector:
+        """전체 소스 로드 + 벡터화 백필 (조합별 최초 1회, 작업 스레드에서 실행)"""
+        hosted = HostedDetector(detector=self._create_detector(threshold, window, forecast))
+        hosted.detector.load_metric_sources(**self._source_dirs(), file_mtimes=hosted.file_mtimes)
+        self.backfill(hosted, hosted.detector.metrics_data)
+        hosted.last_refresh = time.monotonic()
+        self.stats["builds"] += 1
+        return hosted
+
+    def backfill(self, hosted: HostedDetector, metrics_data: Dict[str, pd.DataFrame]):
+        """소스 데이터를 배치로 전처리/채점하여 메트릭 상태를 (재)구성"""
+        detector = hosted.detector
+        processed = detector.preprocess_data(metrics_data)
+        for metric_name, df in processed.items():
+            detector.anomalies[metric_name] = detector.score_anomalies(df)[-self.history_size:]
+            hosted.states[metric_name] = MetricState.from_frame(
+                df, detector.ewma_alpha, detector.window_size, self.history_size
+            )
+        hosted.dirty.update(processed)
+
+    async def get_detector(self, threshold: float = 3.0, window: int = 7, forecast: int = 7) -> HostedDetector:
+        """파라미터 조합의 상주 탐지기 (없으면 생성, 갱신 주기가 지났으면 변경분 반영)"""
+        key = (float(threshold), int(window), int(forecast))
+        hosted = self.detectors.get(key)
+        if hosted is None:
+            async with self._build_lock:
+                hosted = self.detectors.get(key)
+                if hosted is None:
+                    hosted = await asyncio.to_thread(self._build, *key)
+                    self.detectors[key] = hosted
+                    while len(self.detectors) > self.max_detectors:
+                        self.detectors.pop(next(iter(self.detectors)))
+
+        if time.monotonic() - hosted.last_refresh >= self.refresh_interval:
+            await self.refresh(hosted)
+        return hosted
+
+    def invalidate(self):
+        """상주 탐지기 전체 해제 (다음 요청에서 전체 재구성)"""
+        self.detectors.clear()
+
+    # ---- 증분 갱신 ----
+
+    def _apply_points(self, hosted: HostedDetector, metric: str,
+                      points: Iterable[Tuple[Any, float]]) -> List[Dict]:
+        """메트릭 상태에 마지막 시각 이후 포인트만 순서대로 반영 - 새 이상치 반환"""
+        detector = hosted.detector
+        state = hosted.states.get(metric)
+        if state is None:
+            state = hosted.states[metric] = MetricState(detector.ewma_alpha, detector.window_size, self.history_size)
+
+        new_anomalies = []
+        for timestamp, value in points:
+            timestamp = pd.Timestamp(timestamp)
+            if state.last_timestamp is not None and timestamp <= state.last_timestamp:
+                continue
+            ewma, z_score = state.update(timestamp, float(value))
+            self.stats["points_ingested"] += 1
+            if abs(z_score) > detector.threshold:  # NaN은 False
+                new_anomalies.append({
+                    'timestamp': timestamp.isoformat(),
+                    'value': float(value),
+                    'ewma': ewma,
+                    'z_score': z_score,
+                    'severity': detector._classify_anomaly_severity(abs(z_score)),
+                    'direction': 'increase' if z_score > 0 else 'decrease'
+                })
+
+        if new_anomalies:
+            metric_anomalies = detector.anomalies.setdefault(metric, [])
+            metric_anomalies.extend(new_anomalies)
+            del metric_anomalies[:-self.history_size]
+        hosted.dirty.add(metric)
+        return new_anomalies
+
+    def _refresh_sources(self, hosted: HostedDetector):
+        """수정된 소스 파일만 다시 읽어 새 포인트 반영 (작업 스레드에서 실행)"""
+        changed = hosted.detector.load_metric_sources(**self._source_dirs(), file_mtimes=hosted.file_mtimes)
+        new_sources = {}
+        for source_name, df in changed.items():
+            for metric_name, metric_df in df.groupby('metric', sort=False):
+                if metric_name not in hosted.states:
+                    new_sources.setdefault(source_name, []).append(metric_df)
+                    continue
+                metric_df = metric_df.dropna(subset=['value']).sort_values('timestamp')
+                self._apply_points(hosted, metric_name, zip(metric_df['timestamp'], metric_df['value']))
+
+        # 처음 보는 메트릭은 배치 경로로 백필
+        if new_sources:
+            self.backfill(hosted, {name: pd.concat(frames) for name, frames in new_sources.items()})
+
+    async def refresh(self, hosted: HostedDetector):
+        async with hosted.lock:
+            await asyncio.to_thread(self._refresh_sources, hosted)
+            hosted.last_refresh = time.monotonic()
+            self.stats["refreshes"] += 1
+
+    async def ingest(self, metric: str, points: Iterable[Tuple[Any, float]]) -> Dict[str, int]:
+        """
+        수집기가 푸시한 포인트를 상주 중인 모든 탐지기에 반영
+
+        Returns:
+            Dict: 파라미터 조합별 새 이상치 수
+        """
+        points = sorted(points, key=lambda point: pd.Timestamp(point[0]))
+        if not self.detectors:
+            await self.get_detector()  # 기본 조합 상주 (푸시된 포인트 유실 방지)
+        result = {}
+        for key, hosted in list(self.detectors.items()):
+            async with hosted.lock:
+                result[f"threshold={key[0]},window={key[1]}"] = len(self._apply_points(hosted, metric, points))
+        return result
+
+    # ---- 조회 ----
+
+    def _recompute(self, hosted: HostedDetector):
+        """갱신된 메트릭만 예측을 다시 계산하고 위험도 갱신"""
+        if not hosted.dirty:
+            return
+        detector = hosted.detector
+        forecasts = dict(detector.forecasts)
+        for metric in hosted.dirty:
+            forecasts.pop(metric, None)
+        frames = {metric: hosted.states[metric].to_frame() for metric in hosted.dirty if metric in hosted.states}
+        forecasts.update(detector.generate_forecasts(frames))
+        detector.forecasts = forecasts
+        detector.calculate_risk_levels()
+        hosted.dirty.clear()
+
+    async def get_report(self, threshold: float = 3.0, window: int = 7, forecast: int = 7,
+                         output_format: str = "json") -> Optional[str]:
+        """
+        메모리 상태에서 리포트 생성
+
+        Returns:
+            str: JSON/Markdown 리포트, 분석할 메트릭이 없으면 None
+        """
+        hosted = await self.get_detector(threshold, window, forecast)
+        async with hosted.lock:
+            if not hosted.states:
+                return None
+            self._recompute(hosted)
+            self.stats["reports"] += 1
+            return hosted.detector.generate_report(output_format)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "detectors": len(self.detectors),
+            "metrics": {
+                f"threshold={key[0]},window={key[1]},forecast={key[2]}": len(hosted.states)
+                for key, hosted in self.detectors.items()
+            }
+        }
+
+
+# 전역 인스턴스
+_anomaly_service: Optional[AnomalyService] = None
+
+
+def get_anomaly_service() -> AnomalyService:
+    """이상탐지 서비스 인스턴스 반환"""
+    global _anomaly_service
+    if _anomaly_service is None:
+        _anomaly_service = AnomalyService()
+    return _anomaly_service
@@ -0,0 +1,430 @@
+import hashlib, json, re
+from pathlib import Path
+
+import duckdb
+import pandas as pd
+import yaml
+
+from .schema import APPLICANT_FIELDS, Criterion, PolicyRule, ScoreRule
+
+DB_CONFIG = Path("config/db.yaml")
+SCHEMA = Path(__file__).resolve().parents[3] / "duckdb" / "schema.sql"
+DEFAULT_DB = "duckdb/policies.db"
+
+# 조건 키 접미사 → 연산 (접미사가 없으면 등호 조건)
+_SUFFIX_OPS = (("_gte", "gte"), ("_lte", "lte"), ("_in", "in"), ("_includes", "includes"))
+# 정책 스키마의 필드명 → 신청자 스키마 필드명
+FIELD_ALIASES = {"employee_count": "employment_count"}
+# 조인 조건 평가 순서: 스칼라 비교를 먼저 해 리스트 연산이 남은 후보에만 돌도록 함
+_OP_COST = {"eq": 0, "gte": 0, "lte": 0, "in": 1, "includes": 2}
+
+SCORE_DEFAULTS = {"base": 50, "bonus_cap": 30, "penalty_cap": 40}
+
+def _as_list(v):
+    if v is None or v == "":
+        return []
+    return list(v) if isinstance(v, (list, tuple, set)) else [v]
+
+# ---------- 자격 조건 컴파일 ----------
+def compile_criteria(program_id, conditions):
+    """정책 한 건의 자격 조건 {키: 값} → Criterion 목록 (지원하지 않는 키는 ValueError)"""
+    out = []
+    for key, value in (conditions or {}).items():
+        if value is None:
+            continue
+        if key == "tax_arrears_allowed":
+            # 체납 불허만 조건이 됨 (허용이면 제약 없음)
+            if value is False:
+                out.append(Criterion("tax_arrears_flag", "eq", False))
+            continue
+        field, op = key, "eq"
+        for suffix, name in _SUFFIX_OPS:
+            if key.endswith(suffix):
+                field, op = key[:-len(suffix)], name
+                break
+        field = FIELD_ALIASES.get(field, field)
+        ftype = APPLICANT_FIELDS.get(field)
+        if ftype is None:
+            raise ValueError(f"{program_id}: 지원하지 않는 자격 조건 '{key}'")
+        is_list = ftype.endswith("[]")
+        if (op == "includes") != is_list:
+            raise ValueError(f"{program_id}: '{key}'는 {field}({ftype})에 쓸 수 없는 조건입니다")
+        if op in ("in", "includes"):
+            value = _as_list(value)
+            if not value:
+                continue
+        out.append(Criterion(field, op, value))
+    return out
+
+def load_policies(normalized, rules=None):
+    """정규화 정책(db/policies_normalized.json)과 매칭 규칙 yaml을 합쳐 PolicyRule 목록 생성.
+    같은 program_id면 규칙 yaml의 when.*이 정규화 eligibility.*를 덮어쓴다."""
+    policies, conditions = {}, {}
+    for p in normalized or []:
+        pid = p.get("program_id")
+        if not pid:
+            continue
+        finance = p.get("finance") or {}
+        regions = [str(r) for r in _as_list(p.get("region"))]
+        industries = [str(c) for c in _as_list(p.get("industry_code"))]
+        cond = dict(p.get("eligibility") or {})
+        if regions and "전국" not in regions:
+            cond.setdefault("region_in", regions)
+        if industries:
+            cond.setdefault("industry_code_in", industries)
+        policies[pid] = PolicyRule(pid, name=p.get("title"), agency=p.get("agency"), region=regions,
+                                   industry_code=industries, limit_max=finance.get("limit_max"),
+                                   interest_rate_max=finance.get("rate_max"), raw=p)
+        conditions[pid] = cond
+
+    for r in (rules or {}).get("rules") or []:
+        pid = r.get("program_id")
+        if not pid:
+            continue
+        if pid not in policies:
+            policies[pid] = PolicyRule(pid, raw=r)
+            conditions[pid] = {}
+        conditions[pid].update(r.get("when") or {})
+        constraints = r.get("constraints") or {}
+        rule = policies[pid]
+        if rule.limit_max is None:
+            rule.limit_max = constraints.get("limit_max")
+        if rule.interest_rate_max is None:
+            rule.interest_rate_max = constraints.get("interest_rate_max")
+
+    for pid, rule in policies.items():
+        rule.criteria = compile_criteria(pid, conditions[pid])
+    return list(policies.values())
+
+def normalize_applicant(a):
+    """신청자 입력 → applicants 테이블 행 (예전 인테이크 필드 id/name/revenue_million/tax_arrears도 수용)"""
+    aid = a.get("applicant_id") or a.get("id")
+    if not aid:
+        return None
+    revenue = a.get("revenue_last12m")
+    if revenue is None and a.get("revenue_million") is not None:
+        revenue = int(float(a["revenue_million"]) * 1_000_000)
+    arrears = a.get("tax_arrears_flag")
+    if arrears is None and a.get("tax_arrears") is not None:
+        arrears = bool(a["tax_arrears"])
+    return {
+        "applicant_id": str(aid),
+        "company_name": a.get("company_name") or a.get("name"),
+        "region": a.get("region"),
+        "industry_code": a.get("industry_code"),
+        "biz_age_months": a.get("biz_age_months"),
+        "revenue_last12m": revenue,
+        "credit_band": a.get("credit_band"),
+        "tax_arrears_flag": arrears,
+        "tax_arrears_amount": a.get("tax_arrears_amount"),
+        "employment_count": a.get("employment_count", a.get("employee_count")),
+        "special_flags": [str(f) for f in _as_list(a.get("special_flags"))],
+    }
+
+# ---------- SQL 생성 ----------
+def _ok_sql(c):
+    col, f = f"p.{c.column}", f"a.{c.field}"
+    expr = {
+        "gte": f"{f} >= {col}",
+        "lte": f"{f} <= {col}",
+        "eq": f"{f} = {col}",
+        "in": f"list_contains({col}, {f})",
+        "includes": f"list_has_any({f}, {col})",
+    }[c.op]
+    return col, expr
+
+def _criteria_columns(policies):
+    cols = {}
+    for rule in policies:
+        for c in rule.criteria:
+            cols.setdefault(c.column, c)
+    return sorted(cols.values(), key=lambda c: (_OP_COST[c.op], c.column))
+
+def _column_type(c):
+    ftype = APPLICANT_FIELDS[c.field]
+    return ftype + "[]" if c.op == "in" else ftype
+
+def _match_select(columns, max_failed, app_scope, pol_scope):
+    """(app_scope 신청자) × (pol_scope 정책) 쌍을 판정하는 SELECT (applicant_id, program_id, eligible, reasons).
+    범위는 조인 전에 양쪽 입력에서 먼저 걸러 증분 실행이 바뀐 쌍만 훑도록 함"""
+    a = f"(SELECT * FROM applicants WHERE {app_scope}) a"
+    p = f"(SELECT * FROM policy_criteria WHERE {pol_scope}) p"
+    if max_failed <= 0:
+        # 통과 쌍만: 모든 조건을 조인 조건 하나로 묶어 DuckDB가 벡터 단위로 거름
+        on = " AND ".join("({0} IS NULL OR {1})".format(*_ok_sql(c)) for c in columns) or "TRUE"
+        return (f"SELECT a.applicant_id, p.program_id, TRUE, p.criteria_json "
+                f"FROM {a} JOIN {p} ON {on}")
+
+    # 근접 탈락(미충족 max_failed개 이하)까지: 조건별 미충족 여부를 계산해 사유 코드로 남김
+    fails = ", ".join("({0} IS NOT NULL AND NOT coalesce({1}, false)) AS f{2}".format(*_ok_sql(c), i)
+                      for i, c in enumerate(columns))
+    n = " + ".join(f"f{i}::INTEGER" for i in range(len(columns))) or "0"
+    codes = ", ".join(f"CASE WHEN f{i} THEN '{c.code}' END" for i, c in enumerate(columns))
+    reasons = f"list_filter([{codes}], x -> x IS NOT NULL)" if columns else "[]::TEXT[]"
+    return (f"SELECT applicant_id, program_id, n = 0, "
+            f"CASE WHEN n = 0 THEN criteria_json ELSE to_json({reasons}) END "
+            f"FROM (SELECT *, {n} AS n FROM (SELECT a.applicant_id, p.program_id, p.criteria_json"
+            f"{', ' + fails if fails else ''} FROM {a}, {p})) "
+            f"WHERE n <= {int(max_failed)}")
+
+# ---------- 저장소 ----------
+def db_path():
+    try:
+        cfg = yaml.safe_load(DB_CONFIG.read_text(encoding="utf-8")) or {}
+        return cfg.get("policy_db_path") or DEFAULT_DB
+    except Exception:
+        return DEFAULT_DB
+
+def connect(path=None):
+    path = Path(path or db_path())
+    path.parent.mkdir(parents=True, exist_ok=True)
+    con = duckdb.connect(str(path))
+    con.execute(SCHEMA.read_text(encoding="utf-8"))
+    return con
+
+_APPLICANT_COLS = ["applicant_id"] + list(APPLICANT_FIELDS)
+_POLICY_COLS = ["program_id", "name", "agency", "region", "industry_code", "limit_max", "interest_rate_max", "raw"]
+_POLICY_TYPES = {"region": "TEXT[]", "industry_code": "TEXT[]", "limit_max": "BIGINT",
+                 "interest_rate_max": "DOUBLE", "raw": "JSON"}
+
+def _stage(con, name, df, types, key):
+    """DataFrame → 임시 스테이징 테이블 (컬럼 타입 고정 + key를 뺀 컬럼의 행 해시)"""
+    con.register(f"{name}_df", df)
+    cols = ", ".join(f"CAST({c} AS {types.get(c, 'TEXT')}) AS {c}" for c in df.columns)
+    hashed = ", ".join(c for c in df.columns if c != key)
+    con.execute(f"CREATE OR REPLACE TEMP TABLE {name} AS "
+                f"SELECT *, hash({hashed}) AS row_hash FROM (SELECT {cols} FROM {name}_df)")
+    con.unregister(f"{name}_df")
+
+def _dirty(con, kind, stage, key):
+    """스테이징과 지난 실행 해시를 비교해 새로 생기거나 바뀌거나 사라진 id 목록 테이블 생성"""
+    con.execute(f"""
+        CREATE OR REPLACE TEMP TABLE dirty_{kind} AS
+        SELECT s.{key} AS id FROM {stage} s
+        LEFT JOIN match_fingerprints f ON f.kind = '{kind}' AND f.id = s.{key}
+        WHERE f.row_hash IS DISTINCT FROM s.row_hash
+        UNION ALL
+        SELECT f.id FROM match_fingerprints f
+        WHERE f.kind = '{kind}' AND f.id NOT IN (SELECT {key} FROM {stage})
+    """)
+    return con.execute(f"SELECT count(*) FROM dirty_{kind}").fetchone()[0]
+
+def _sync(con, table, stage, key, kind, cols):
+    con.execute(f"DELETE FROM {table} WHERE {key} IN (SELECT id FROM dirty_{kind})")
+    con.execute(f"INSERT INTO {table} ({', '.join(cols)}) SELECT {', '.join(cols)} FROM {stage} "
+                f"WHERE {key} IN (SELECT id FROM dirty_{kind})")
+    con.execute(f"DELETE FROM match_fingerprints WHERE kind = '{kind}' AND id IN (SELECT id FROM dirty_{kind})")
+    con.execute(f"INSERT INTO match_fingerprints SELECT '{kind}', {key}, row_hash FROM {stage} "
+                f"WHERE {key} IN (SELECT id FROM dirty_{kind})")
+    con.execute(f"INSERT INTO match_dirty SELECT '{kind}', id FROM dirty_{kind}")
+
+def match(con, applicants, policies, max_failed=0):
+    """신청자 × 정책 자격 판정을 DuckDB 안에서 집합 조인 한 번으로 수행.
+    지난 실행 이후 바뀐(추가/수정/삭제) 신청자·정책이 걸린 쌍만 다시 계산한다.
+    matches에는 통과 쌍(reasons = 충족한 조건 코드)과, max_failed > 0이면
+    미충족 조건이 max_failed개 이하인 근접 탈락 쌍(reasons = 미충족 조건 코드)을 남긴다.
+    max_failed가 지난 실행과 다르면 남길 쌍의 범위가 달라지므로 전체를 다시 조인한다."""
+    max_failed = max(0, int(max_failed))
+    rows = [r for r in (normalize_applicant(a) for a in applicants or []) if r]
+    app_df = pd.DataFrame(rows, columns=_APPLICANT_COLS, dtype=object)
+
+    columns = _criteria_columns(policies)
+    pol_rows, crit_rows = [], []
+    for rule in policies:
+        values = {c.column: c.value for c in rule.criteria}
+        codes = [c.code for c in rule.criteria]
+        pol_rows.append([rule.program_id, rule.name, rule.agency, rule.region, rule.industry_code,
+                         rule.limit_max, rule.interest_rate_max,
+                         json.dumps(rule.raw, ensure_ascii=False, sort_keys=True, default=str),
+                         json.dumps([[c.column, c.value] for c in rule.criteria], ensure_ascii=False)])
+        crit_rows.append([rule.program_id, json.dumps(codes, ensure_ascii=False)]
+                         + [values.get(c.column) for c in columns])
+    # 정책 해시에는 컴파일된 조건(criteria)도 포함해 규칙 yaml만 바뀌어도 재매칭되게 함
+    pol_df = pd.DataFrame(pol_rows, columns=_POLICY_COLS + ["criteria"], dtype=object)
+    crit_df = pd.DataFrame(crit_rows, columns=["program_id", "criteria_json"] + [c.column for c in columns],
+                           dtype=object)
+
+    _stage(con, "applicants_stage", app_df, APPLICANT_FIELDS, "applicant_id")
+    _stage(con, "policies_stage", pol_df, _POLICY_TYPES, "program_id")
+    con.register("criteria_df", crit_df)
+    crit_cols = ", ".join(["program_id", "CAST(criteria_json AS JSON) AS criteria_json"]
+                          + [f"CAST({c.column} AS {_column_type(c)}) AS {c.column}" for c in columns])
+
+    con.execute("BEGIN")
+    try:
+        dirty_a = _dirty(con, "applicant", "applicants_stage", "applicant_id")
+        dirty_p = _dirty(con, "policy", "policies_stage", "program_id")
+        row = con.execute("SELECT row_hash FROM match_fingerprints "
+                          "WHERE kind = 'matching' AND id = 'max_failed'").fetchone()
+        full = row is None or row[0] != max_failed
+        if full:
+            # 매칭 모드 변경: 모든 신청자를 바뀐 것으로 보고 전체 × 전체 재조인
+            con.execute("INSERT INTO dirty_applicant SELECT applicant_id FROM applicants_stage "
+                        "WHERE applicant_id NOT IN (SELECT id FROM dirty_applicant)")
+            dirty_a = con.execute("SELECT count(*) FROM dirty_applicant").fetchone()[0]
+        con.execute(f"CREATE OR REPLACE TABLE policy_criteria AS SELECT {crit_cols} FROM criteria_df")
+        _sync(con, "applicants", "applicants_stage", "applicant_id", "applicant", _APPLICANT_COLS)
+        _sync(con, "policies", "policies_stage", "program_id", "policy", _POLICY_COLS)
+        con.execute("DELETE FROM matches WHERE applicant_id IN (SELECT id FROM dirty_applicant) "
+                    "OR program_id IN (SELECT id FROM dirty_policy)")
+
+        written = 0
+        # 바뀐 신청자 × 전체 정책, 나머지 신청자 × 바뀐 정책 (첫 실행이면 전체 × 전체 한 번)
+        parts = []
+        if dirty_a:
+            parts.append(("applicant_id IN (SELECT id FROM dirty_applicant)", "TRUE"))
+        if dirty_p:
+            parts.append(("applicant_id NOT IN (SELECT id FROM dirty_applicant)",
+                          "program_id IN (SELECT id FROM dirty_policy)"))
+        for app_scope, pol_scope in parts:
+            written += con.execute(
+                "INSERT INTO matches " + _match_select(columns, max_failed, app_scope, pol_scope)).fetchone()[0]
+        con.execute("DELETE FROM match_fingerprints WHERE kind = 'matching'")
+        con.execute("INSERT INTO match_fingerprints VALUES ('matching', 'max_failed', ?)", [max_failed])
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
+    finally:
+        con.unregister("criteria_df")
+
+    return {
+        "applicants": len(app_df),
+        "policies": len(policies),
+        "dirty_applicants": dirty_a,
+        "dirty_policies": dirty_p,
+        "full": full,
+        "matches_written": written,
+    }
+
+# ---------- 스코어링 ----------
+_CMP = re.compile(r"^(\w+)\s*(==|!=|>=|<=|>|<)\s*(.+)$")
+_MEMBER = re.compile(r"^(\w+)\s+(in|includes)\s+(.+)$")
+
+def _literal(v):
+    if v is None:
+        return "NULL"
+    if isinstance(v, bool):
+        return "TRUE" if v else "FALSE"
+    if isinstance(v, (int, float)):
+        return repr(v)
+    if isinstance(v, (list, tuple)):
+        return "[" + ", ".join(_literal(x) for x in v) + "]"
+    return "'" + str(v).replace("'", "''") + "'"
+
+def compile_condition(text):
+    """규칙 조건식 → SQL (신청자 별칭 a).
+    문법: `필드 연산자 값`을 AND/OR로 연결. 연산자 == != < <= > >= in includes, 값은 yaml 리터럴
+    예) tax_arrears_flag == true AND tax_arrears_amount < 300000 / region in ["세종", "전북"]"""
+    tokens = re.split(r"\s+(AND|OR)\s+", (text or "").strip())
+    sql = []
+    for i, tok in enumerate(tokens):
+        if i % 2:
+            sql.append(tok)
+            continue
+        m = _CMP.match(tok) or _MEMBER.match(tok)
+        if not m:
+            raise ValueError(f"조건을 해석할 수 없습니다: {tok!r}")
+        field, op, raw = m.groups()
+        if field not in APPLICANT_FIELDS:
+            raise ValueError(f"알 수 없는 신청자 필드: {field}")
+        value = yaml.safe_load(raw)
+        col = f"a.{field}"
+        if op == "in":
+            sql.append(f"list_contains({_literal(_as_list(value))}, {col})")
+        elif op == "includes":
+            sql.append(f"list_contains({col}, {_literal(value)})")
+        elif value is None:
+            sql.append(f"{col} IS {'NOT ' if op == '!=' else ''}NULL")
+        else:
+            sql.append(f"{col} {'=' if op == '==' else op} {_literal(value)}")
+    return "(" + " ".join(sql) + ")"
+
+def _parse_then(then):
+    if isinstance(then, dict):
+        return then
+    out = {}
+    for part in str(then or "").split(";"):
+        if "=" in part:
+            k, v = part.split("=", 1)
+            out[k.strip()] = yaml.safe_load(v.strip())
+    return out
+
+def load_score_rules(scoring=None, exceptions=None):
+    """스코어링 yaml(기본점/상한 + 가점·감점 규칙)과 예외 yaml → (설정, ScoreRule 목록)"""
+    scoring = scoring or {}
+    settings = {k: scoring.get(k, v) for k, v in SCORE_DEFAULTS.items()}
+    rules = []
+    for source, capped in ((scoring, True), (exceptions or {}, False)):
+        for r in source.get("rules") or []:
+            then = _parse_then(r.get("then"))
+            rules.append(ScoreRule(id=r["id"], condition=compile_condition(r.get("if")),
+                                   delta=int(then.get("score_delta", 0)), note=then.get("note") or "",
+                                   capped=capped))
+    return settings, rules
+
+def _rules_hash(settings, rules):
+    blob = json.dumps([settings, [vars(r) for r in rules]], ensure_ascii=False, sort_keys=True)
+    return int.from_bytes(hashlib.sha1(blob.encode("utf-8")).digest()[:8], "big")
+
+def score(con, settings, rules, full=False):
+    """통과 쌍 점수 = 기본점 + min(가점 합, 상한) - min(감점 합, 상한) + 예외 규칙 가감 (0~100).
+    notes에는 적용된 규칙 id(사유 코드)를 남긴다. 규칙이 그대로면 마지막 매칭 이후 바뀐 범위만 재채점.
+    규칙 조건은 신청자 필드만 보므로 신청자별로 한 번 계산해 통과 쌍에 붙인다."""
+    rules_hash = _rules_hash(settings, rules)
+    row = con.execute("SELECT row_hash FROM match_fingerprints WHERE kind = 'scoring' AND id = 'rules'").fetchone()
+    full = full or row is None or row[0] != rules_hash
+    if not full and not con.execute("SELECT count(*) FROM match_dirty").fetchone()[0]:
+        return {"full": False, "scores_written": 0}
+
+    flags = ", ".join(f"coalesce({r.condition}, false) AS s{i}" for i, r in enumerate(rules))
+    def _sum(pick):
+        return " + ".join(f"CASE WHEN s{i} THEN {abs(r.delta)} ELSE 0 END"
+                          for i, r in enumerate(rules) if pick(r)) or "0"
+    bonus = _sum(lambda r: r.capped and r.delta > 0)
+    penalty = _sum(lambda r: r.capped and r.delta < 0)
+    extra = " + ".join(f"CASE WHEN s{i} THEN {r.delta} ELSE 0 END"
+                       for i, r in enumerate(rules) if not r.capped) or "0"
+    codes = ", ".join(f"CASE WHEN s{i} THEN {_literal(r.id)} END" for i, r in enumerate(rules))
+    notes = f"list_filter([{codes}], x -> x IS NOT NULL)" if rules else "[]::TEXT[]"
+    total = (f"greatest(0, least(100, {int(settings['base'])} + least({bonus}, {int(settings['bonus_cap'])}) "
+             f"- least({penalty}, {int(settings['penalty_cap'])}) + {extra}))::INTEGER")
+
+    scope = "TRUE" if full else ("(m.applicant_id IN (SELECT id FROM match_dirty WHERE kind = 'applicant') "
+                                 "OR m.program_id IN (SELECT id FROM match_dirty WHERE kind = 'policy'))")
+    con.execute("BEGIN")
+    try:
+        if full:
+            con.execute("DELETE FROM scores")
+        else:
+            con.execute("DELETE FROM scores WHERE applicant_id IN (SELECT id FROM match_dirty WHERE kind = 'applicant') "
+                        "OR program_id IN (SELECT id FROM match_dirty WHERE kind = 'policy')")
+        written = con.execute(f"""
+            INSERT INTO scores
+            WITH applicant_scores AS (
+                SELECT applicant_id, {total} AS score, to_json({notes}) AS notes
+                FROM (SELECT a.applicant_id{', ' + flags if flags else ''} FROM applicants a)
+            )
+            SELECT m.applicant_id, m.program_id, s.score, s.notes
+            FROM matches m JOIN applicant_scores s USING (applicant_id)
+            WHERE m.eligible AND {scope}
+        """).fetchone()[0]
+        con.execute("DELETE FROM match_dirty")
+        con.execute("DELETE FROM match_fingerprints WHERE kind = 'scoring'")
+        con.execute("INSERT INTO match_fingerprints VALUES ('scoring', 'rules', ?)", [rules_hash])
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
+    return {"full": full, "scores_written": written}
+
+def export_json(con, sql, path, limit):
+    """결과가 limit행 이하일 때만 JSON으로 내보냄 (대규모 실행은 DB 조회 전용). 내보낸 행 수, 건너뛰면 None"""
+    n = con.execute(f"SELECT count(*) FROM ({sql})").fetchone()[0]
+    if n > limit:
+        return None
+    df = con.execute(sql).df()
+    rows = json.loads(df.to_json(orient="records", force_ascii=False))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(rows, ensure_ascii=False, indent=2), encoding="utf-8")
+    return n
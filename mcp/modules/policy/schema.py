@@ -0,0 +1,52 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+# 매칭/스코어링 조건이 참조할 수 있는 신청자 필드와 DuckDB 타입 (duckdb/schema.sql applicants)
+APPLICANT_FIELDS = {
+    "company_name": "TEXT",
+    "region": "TEXT",
+    "industry_code": "TEXT",
+    "biz_age_months": "INTEGER",
+    "revenue_last12m": "BIGINT",
+    "credit_band": "TEXT",
+    "tax_arrears_flag": "BOOLEAN",
+    "tax_arrears_amount": "BIGINT",
+    "employment_count": "INTEGER",
+    "special_flags": "TEXT[]",
+}
+
+@dataclass
+class Criterion:
+    field: str    # APPLICANT_FIELDS 키
+    op: str       # gte|lte|in|includes|eq
+    value: Any
+
+    @property
+    def code(self) -> str:
+        """사유 코드 (예: revenue_last12m_gte, 등호 조건은 필드명 그대로)"""
+        return self.field if self.op == "eq" else f"{self.field}_{self.op}"
+
+    @property
+    def column(self) -> str:
+        """policy_criteria 테이블에서 이 조건의 기준값을 담는 컬럼"""
+        return f"{self.field}__{self.op}"
+
+@dataclass
+class PolicyRule:
+    program_id: str
+    name: Optional[str] = None
+    agency: Optional[str] = None
+    region: List[str] = field(default_factory=list)
+    industry_code: List[str] = field(default_factory=list)
+    limit_max: Optional[int] = None
+    interest_rate_max: Optional[float] = None
+    raw: Dict[str, Any] = field(default_factory=dict)
+    criteria: List[Criterion] = field(default_factory=list)
+
+@dataclass
+class ScoreRule:
+    id: str         # 사유 코드 (notes에 기록)
+    condition: str  # 컴파일된 SQL 조건 (신청자 별칭 a)
+    delta: int
+    note: str = ""
+    capped: bool = True  # 가점/감점 상한 적용 여부 (예외 규칙은 False)
@@ -1,10 +1,12 @@
 import os
-import json
+import threading
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, List
 from fastapi import APIRouter, HTTPException, Header, Depends
 from pydantic import BaseModel
 
+from .portfolio_store import PortfolioStore, VersionConflict
+
 # Data models
 class Cash(BaseModel):
     krw: float = 0.0
@@ -20,38 +22,31 @@ class Portfolio(BaseModel):
     userId: str
     holdings: List[Holding] = []
     cash: Cash = Cash()
+    version: int = 0
 
 class PortfolioUpdate(BaseModel):
     userId: str
     holdings: Optional[List[Holding]] = None
     cash: Optional[Cash] = None
+    version: Optional[int] = None  # version the client read; stale versions are rejected with 409
 
 # Configuration
-DATA_FILE = Path(__file__).parent.parent / "data" / "portfolio.json"
+DATA_FILE = Path(__file__).parent.parent / "data" / "portfolio.json"  # legacy store, imported once
+DB_FILE = Path(os.getenv("PORTFOLIO_DB_PATH", str(Path(__file__).parent.parent / "data" / "portfolio.db")))
 API_KEY_HEADER = "x-stockpilot-key"
 
 router = APIRouter(prefix="/api/v1")
 
-# File operations
-def read_portfolio_db() -> Dict[str, Any]:
-    """Read portfolio database from JSON file"""
-    try:
-        if not DATA_FILE.exists():
-            return {}
-
-        with open(DATA_FILE, 'r', encoding='utf-8') as f:
-            content = f.read()
-            return json.loads(content) if content.strip() else {}
-    except Exception:
-        return {}
+_store: Optional[PortfolioStore] = None
+_store_lock = threading.Lock()
 
-def write_portfolio_db(data: Dict[str, Any]) -> None:
-    """Write portfolio database to JSON file"""
-    # Ensure data directory exists
-    DATA_FILE.parent.mkdir(parents=True, exist_ok=True)
-
-    with open(DATA_FILE, 'w', encoding='utf-8') as f:
-        f.write(json.dumps(data, indent=2, ensure_ascii=False))
+def get_store() -> PortfolioStore:
+    """Process-wide portfolio store (opened lazily, legacy JSON imported on first open)"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = PortfolioStore(str(DB_FILE), legacy_json=DATA_FILE)
+        return _store
 
 # Authentication
 async def verify_api_key(x_stockpilot_key: Optional[str] = Header(None)):
@@ -78,8 +73,7 @@ async def get_portfolio(
     if not userId.strip():
         raise HTTPException(status_code=400, detail="Missing userId")
 
-    db = read_portfolio_db()
-    user_data = db.get(userId, {})
+    user_data = get_store().get(userId)
 
     # Return default portfolio if user not found
     if not user_data:
@@ -100,36 +94,31 @@ async def update_portfolio(
     if not portfolio_update.userId.strip():
         raise HTTPException(status_code=400, detail="Missing userId")
 
-    db = read_portfolio_db()
-
-    # Get existing user data or create new
-    user_data = db.get(portfolio_update.userId, {
-        "userId": portfolio_update.userId,
-        "holdings": [],
-        "cash": {"krw": 0, "usd": 0}
-    })
-
-    # Update holdings if provided
-    if portfolio_update.holdings is not None:
-        user_data["holdings"] = [holding.dict() for holding in portfolio_update.holdings]
-
-    # Update cash if provided
-    if portfolio_update.cash is not None:
-        user_data["cash"] = portfolio_update.cash.dict()
-
-    # Save updated data
-    db[portfolio_update.userId] = user_data
-    write_portfolio_db(db)
+    try:
+        version = get_store().update(
+            portfolio_update.userId,
+            holdings=[holding.dict() for holding in portfolio_update.holdings]
+            if portfolio_update.holdings is not None else None,
+            cash=portfolio_update.cash.dict() if portfolio_update.cash is not None else None,
+            expected_version=portfolio_update.version
+        )
+    except VersionConflict as e:
+        raise HTTPException(status_code=409, detail=f"Version conflict (current version: {e.actual})")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    return {"ok": True}
+    return {"ok": True, "version": version}
 
 # Health check for portfolio service
 @router.get("/portfolio/health")
 async def portfolio_health():
     """Portfolio service health check"""
+    stats = get_store().stats()
     return {
         "status": "ok",
         "service": "portfolio",
-        "data_file": str(DATA_FILE),
-        "file_exists": DATA_FILE.exists()
+        "db_file": stats["db_path"],
+        "journal_mode": stats["journal_mode"],
+        "portfolios": stats["portfolios"],
+        "ledger_entries": stats["ledger_entries"]
     }
\ No newline at end of file
@@ -0,0 +1,306 @@
+"""
+Transactional portfolio store (SQLite, WAL)
+
+- portfolios: one row per user (cash + version), holdings: one row per (user, symbol)
+- ledger: append-only change log written in the same transaction as the rows it describes
+- Optimistic concurrency: every committed change bumps portfolios.version; writers may pass
+  the version they read and get VersionConflict if someone else committed in between
+- Reads hit an in-memory cache keyed by user; it is invalidated on our own commits and,
+  via PRAGMA data_version, when another connection/process commits
+- Reads never touch the ledger, so their cost does not grow with history
+"""
+
+import copy
+import datetime as dt
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS portfolios (
+    user_id TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    cash_krw REAL NOT NULL DEFAULT 0,
+    cash_usd REAL NOT NULL DEFAULT 0,
+    updated_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS holdings (
+    user_id TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    shares REAL NOT NULL,
+    avg_cost REAL NOT NULL,
+    current_price REAL,
+    PRIMARY KEY (user_id, symbol)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS ledger (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    symbol TEXT,
+    payload TEXT,
+    created_at TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_ledger_user ON ledger (user_id, seq);
+
+CREATE TRIGGER IF NOT EXISTS ledger_no_update BEFORE UPDATE ON ledger
+BEGIN SELECT RAISE(ABORT, 'ledger is append-only'); END;
+
+CREATE TRIGGER IF NOT EXISTS ledger_no_delete BEFORE DELETE ON ledger
+BEGIN SELECT RAISE(ABORT, 'ledger is append-only'); END;
+"""
+
+
+class VersionConflict(Exception):
+    """Raised when an update was based on a version that is no longer current"""
+
+    def __init__(self, user_id: str, expected: int, actual: int):
+        super().__init__(f"portfolio {user_id} is at version {actual}, expected {expected}")
+        self.user_id = user_id
+        self.expected = expected
+        self.actual = actual
+
+
+def _now() -> str:
+    return dt.datetime.now(dt.timezone.utc).isoformat()
+
+
+def _check_unique_symbols(holdings: Optional[List[Dict[str, Any]]]):
+    if holdings is not None:
+        symbols = [holding["symbol"] for holding in holdings]
+        if len(set(symbols)) != len(symbols):
+            raise ValueError("duplicate symbol in holdings")
+
+
+def _empty(user_id: str) -> Dict[str, Any]:
+    return {"userId": user_id, "holdings": [], "cash": {"krw": 0.0, "usd": 0.0}, "version": 0}
+
+
+class PortfolioStore:
+    """Row-level portfolio state with an append-only ledger"""
+
+    def __init__(self, db_path: str, legacy_json: Optional[Path] = None):
+        self.db_path = str(db_path)
+        if self.db_path != ":memory:":
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None, timeout=10.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # WAL + NORMAL: a killed process never leaves a torn commit; only an OS crash may drop the last one
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        self._lock = threading.RLock()
+        self._cache: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._data_version = self._current_data_version()
+        if legacy_json is not None:
+            self.import_legacy_json(legacy_json)
+
+    # ---------- reads ----------
+    def _current_data_version(self) -> int:
+        return self._db.execute("PRAGMA data_version").fetchone()[0]
+
+    def _drop_cache_if_changed_elsewhere(self):
+        data_version = self._current_data_version()
+        if data_version != self._data_version:
+            self._cache.clear()
+            self._data_version = data_version
+
+    def _load(self, user_id: str) -> Optional[Dict[str, Any]]:
+        row = self._db.execute(
+            "SELECT version, cash_krw, cash_usd FROM portfolios WHERE user_id = ?", (user_id,)).fetchone()
+        if row is None:
+            return None
+        holdings = [
+            {"symbol": symbol, "shares": shares, "avg_cost": avg_cost, "current_price": current_price}
+            for symbol, shares, avg_cost, current_price in self._db.execute(
+                "SELECT symbol, shares, avg_cost, current_price FROM holdings WHERE user_id = ? ORDER BY position",
+                (user_id,))
+        ]
+        return {"userId": user_id, "holdings": holdings,
+                "cash": {"krw": row[1], "usd": row[2]}, "version": row[0]}
+
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Current portfolio ({userId, holdings, cash, version}) or None if the user has none"""
+        with self._lock:
+            self._drop_cache_if_changed_elsewhere()
+            if user_id not in self._cache:
+                self._cache[user_id] = self._load(user_id)
+            return copy.deepcopy(self._cache[user_id])
+
+    def history(self, user_id: str, since_version: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        """Ledger entries after since_version, oldest first"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT seq, version, kind, symbol, payload, created_at FROM ledger "
+                "WHERE user_id = ? AND version > ? ORDER BY seq LIMIT ?", (user_id, since_version, limit)).fetchall()
+        return [{"seq": seq, "version": version, "kind": kind, "symbol": symbol,
+                 "payload": json.loads(payload) if payload else None, "created_at": created_at}
+                for seq, version, kind, symbol, payload, created_at in rows]
+
+    def replay(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Rebuild a portfolio from its ledger alone (audit/recovery check, O(ledger))"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT version, kind, symbol, payload FROM ledger WHERE user_id = ? ORDER BY seq",
+                (user_id,)).fetchall()
+        if not rows:
+            return None
+        state = _empty(user_id)
+        positions: Dict[str, Dict[str, Any]] = {}
+        for version, kind, symbol, payload in rows:
+            data = json.loads(payload) if payload else {}
+            if kind == "set_holding":
+                positions[symbol] = data
+            elif kind == "remove_holding":
+                positions.pop(symbol, None)
+            elif kind == "set_cash":
+                state["cash"] = data
+            state["version"] = version
+        state["holdings"] = [
+            {key: value for key, value in holding.items() if key != "position"}
+            for holding in sorted(positions.values(), key=lambda holding: holding["position"])
+        ]
+        return state
+
+    # ---------- writes ----------
+    def update(self, user_id: str, holdings: Optional[List[Dict[str, Any]]] = None,
+               cash: Optional[Dict[str, float]] = None, expected_version: Optional[int] = None) -> int:
+        """Apply holdings (full replacement list) and/or cash atomically and return the new version.
+
+        Only rows that actually change are written, each with a ledger entry in the same transaction.
+        If expected_version is given and the stored version differs, VersionConflict is raised.
+        """
+        _check_unique_symbols(holdings)
+
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                version = self._apply(user_id, holdings, cash, expected_version)
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            finally:
+                self._cache.pop(user_id, None)
+        return version
+
+    def _apply(self, user_id, holdings, cash, expected_version) -> int:
+        row = self._db.execute("SELECT version, cash_krw, cash_usd FROM portfolios WHERE user_id = ?",
+                               (user_id,)).fetchone()
+        current = row[0] if row else 0
+        if expected_version is not None and expected_version != current:
+            raise VersionConflict(user_id, expected_version, current)
+
+        entries = []  # (kind, symbol, payload)
+        if row is None:
+            entries.append(("create", None, None))
+
+        if holdings is not None:
+            existing = {
+                symbol: (position, shares, avg_cost, current_price)
+                for symbol, position, shares, avg_cost, current_price in self._db.execute(
+                    "SELECT symbol, position, shares, avg_cost, current_price FROM holdings WHERE user_id = ?",
+                    (user_id,))
+            }
+            for position, holding in enumerate(holdings):
+                values = (position, float(holding["shares"]), float(holding["avg_cost"]),
+                          None if holding.get("current_price") is None else float(holding["current_price"]))
+                if existing.pop(holding["symbol"], None) != values:
+                    entries.append(("set_holding", holding["symbol"], {
+                        "symbol": holding["symbol"], "position": values[0], "shares": values[1],
+                        "avg_cost": values[2], "current_price": values[3]}))
+            for symbol in existing:
+                entries.append(("remove_holding", symbol, None))
+
+        if cash is not None:
+            new_cash = {"krw": float(cash.get("krw", 0.0)), "usd": float(cash.get("usd", 0.0))}
+            if row is None or (row[1], row[2]) != (new_cash["krw"], new_cash["usd"]):
+                entries.append(("set_cash", None, new_cash))
+
+        if not entries:
+            return current
+
+        new_version = current + 1
+        now = _now()
+        if row is None:
+            self._db.execute("INSERT INTO portfolios (user_id, version, updated_at) VALUES (?, ?, ?)",
+                             (user_id, new_version, now))
+        elif self._db.execute("UPDATE portfolios SET version = ?, updated_at = ? WHERE user_id = ? AND version = ?",
+                              (new_version, now, user_id, current)).rowcount != 1:
+            actual = self._db.execute("SELECT version FROM portfolios WHERE user_id = ?", (user_id,)).fetchone()
+            raise VersionConflict(user_id, current, actual[0] if actual else 0)
+
+        for kind, symbol, payload in entries:
+            if kind == "set_holding":
+                self._db.execute(
+                    "INSERT OR REPLACE INTO holdings (user_id, symbol, position, shares, avg_cost, current_price) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (user_id, symbol, payload["position"], payload["shares"], payload["avg_cost"],
+                     payload["current_price"]))
+            elif kind == "remove_holding":
+                self._db.execute("DELETE FROM holdings WHERE user_id = ? AND symbol = ?", (user_id, symbol))
+            elif kind == "set_cash":
+                self._db.execute("UPDATE portfolios SET cash_krw = ?, cash_usd = ? WHERE user_id = ?",
+                                 (payload["krw"], payload["usd"], user_id))
+        self._db.executemany(
+            "INSERT INTO ledger (user_id, version, kind, symbol, payload, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            [(user_id, new_version, kind, symbol, json.dumps(payload) if payload is not None else None, now)
+             for kind, symbol, payload in entries])
+        return new_version
+
+    def import_legacy_json(self, path: Path) -> int:
+        """One-time import of the old data/portfolio.json ({userId: portfolio}) into an empty store
+
+        All users are written in a single BEGIN IMMEDIATE transaction: the import either lands
+        completely or not at all, and the emptiness check cannot race with another process importing.
+        """
+        path = Path(path)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8") or "{}") if path.exists() else {}
+        except (OSError, ValueError):
+            return 0
+        if not data:
+            return 0
+        for portfolio in data.values():
+            _check_unique_symbols(portfolio.get("holdings") or [])
+
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                if self._db.execute("SELECT 1 FROM portfolios LIMIT 1").fetchone():
+                    self._db.execute("ROLLBACK")
+                    return 0
+                for user_id, portfolio in data.items():
+                    self._apply(user_id, portfolio.get("holdings") or [],
+                                portfolio.get("cash") or {"krw": 0.0, "usd": 0.0}, None)
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            finally:
+                self._cache.clear()
+        return len(data)
+
+    # ---------- maintenance ----------
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "db_path": self.db_path,
+                "journal_mode": self._db.execute("PRAGMA journal_mode").fetchone()[0],
+                "portfolios": self._db.execute("SELECT COUNT(*) FROM portfolios").fetchone()[0],
+                "ledger_entries": self._db.execute("SELECT COALESCE(MAX(seq), 0) FROM ledger").fetchone()[0],
+                "cached_users": len(self._cache),
+            }
+
+    def integrity_check(self) -> str:
+        with self._lock:
+            return self._db.execute("PRAGMA integrity_check").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -1,4 +1,5 @@
 import os
+import sys
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from datetime import datetime
@@ -20,6 +21,14 @@ app.add_middleware(
 # Include portfolio routes
 app.include_router(portfolio_router)
 
+# 종료 시 알림 관리자 정리 (후행 다이제스트 발송, HTTP 세션/SMTP 연결 종료)
+@app.on_event("shutdown")
+async def close_notifications():
+    # 알림을 한 번도 보내지 않았다면 notifier 모듈을 새로 import하지 않음
+    notifier = sys.modules.get("mcp.utils.notifier")
+    if notifier is not None:
+        await notifier.notification_manager.close()
+
 # 헬스체크
 @app.get("/api/v1/health")
 def health():
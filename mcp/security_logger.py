@@ -2,20 +2,338 @@
 """
 보안 이벤트 로거
 - Rate Limiting 위반, 차단된 IP, 화이트리스트 이벤트를 기록
-- logs/security.log 파일에 일별 회전식 로그 저장
+- logs/security.log 파일에 일별 회전식 로그 저장 (SECURITY_LOG_PATH 환경 변수로 변경)
+
+요청 경로에서는 QueueHandler로 레코드를 큐에 넣기만 하고, 백그라운드 QueueListener가
+쌓인 레코드를 묶어 JSON 한 줄씩 한 번에 쓰고 flush 합니다 (디스크 쓰기가 요청 지연에 포함되지 않음).
+IP/이벤트 유형별 카운터는 메모리에 유지하므로 통계 API가 로그 파일을 다시 읽을 필요가 없습니다.
 """
+import atexit
+import json
 import logging
-from logging.handlers import TimedRotatingFileHandler
+import os
+import queue
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime
+from heapq import nlargest
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
+from pathlib import Path
+from typing import Dict, List, Optional
+
+DEFAULT_LOG_PATH = "logs/security.log"
+# 한 번에 기록할 최대 레코드 수
+BATCH_SIZE = 512
+# 큐가 가득 차면 (디스크가 따라가지 못하는 공격 상황) 요청을 막지 않고 레코드를 버림
+MAX_QUEUE_SIZE = 100_000
+BACKUP_COUNT = 30
+
+_IPV4_PATTERN = re.compile(r'\b(?:\d{1,3}\.){3}\d{1,3}\b')
+
+
+def default_log_path() -> str:
+    """현재 기본 보안 로그 경로 (SECURITY_LOG_PATH 우선)"""
+    return os.environ.get("SECURITY_LOG_PATH", DEFAULT_LOG_PATH)
+
+
+class SecurityJSONFormatter(logging.Formatter):
+    """보안 로그 JSON 한 줄 포맷 (timestamp, level, event, message + 구조화 필드)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "timestamp": datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            "level": record.levelname,
+            "event": getattr(record, 'event', 'GENERAL'),
+            "message": record.getMessage(),
+        }
+        fields = getattr(record, 'fields', None)
+        if fields:
+            for key, value in fields.items():
+                data.setdefault(key, value)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exception"] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class BatchRotatingFileHandler(TimedRotatingFileHandler):
+    """여러 줄을 한 번에 쓰는 일별 회전 핸들러
+
+    회전 검사와 write/flush를 레코드마다가 아니라 배치마다 한 번 수행합니다.
+    logrotate나 운영자가 파일을 옮기거나 지우면 다음 배치에서 다시 엽니다.
+    """
+
+    def __init__(self, path: str, when: str = "midnight", backup_count: int = BACKUP_COUNT):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        super().__init__(path, when=when, interval=1, backupCount=backup_count, encoding="utf-8", delay=True)
+        self._file_id = None
+
+    def _file_moved(self) -> bool:
+        try:
+            stat = os.stat(self.baseFilename)
+        except FileNotFoundError:
+            return True
+        return (stat.st_dev, stat.st_ino) != self._file_id
+
+    def write_lines(self, lines: List[str]):
+        self.acquire()
+        try:
+            if self.shouldRollover(None):
+                self.doRollover()
+            if self.stream is not None and self._file_moved():
+                self.stream.close()
+                self.stream = None
+            if self.stream is None:
+                Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+                self.stream = self._open()
+                stat = os.fstat(self.stream.fileno())
+                self._file_id = (stat.st_dev, stat.st_ino)
+            self.stream.write("\n".join(lines) + "\n")
+            self.stream.flush()
+        finally:
+            self.release()
+
+
+class SecurityLogWriter(logging.Handler):
+    """리스너 스레드에서 배치를 포맷해 경로별 회전 파일에 기록"""
+
+    def __init__(self, when: str = "midnight", backup_count: int = BACKUP_COUNT):
+        super().__init__()
+        self.when = when
+        self.backup_count = backup_count
+        self.files: Dict[str, BatchRotatingFileHandler] = {}
+        self.records_written = 0
+        self.batches_written = 0
+        self.setFormatter(SecurityJSONFormatter())
+
+    def _file(self, path: str) -> BatchRotatingFileHandler:
+        key = os.path.abspath(path)
+        handler = self.files.get(key)
+        if handler is None:
+            handler = self.files[key] = BatchRotatingFileHandler(path, self.when, self.backup_count)
+        return handler
+
+    def emit(self, record: logging.LogRecord):
+        self.emit_batch([record])
+
+    def emit_batch(self, records: List[logging.LogRecord]):
+        grouped: Dict[str, List[str]] = {}
+        fallback_path = None
+        for record in records:
+            try:
+                line = self.format(record)
+            except Exception:
+                self.handleError(record)
+                continue
+            path = getattr(record, 'log_path', None)
+            if path is None:
+                path = fallback_path = fallback_path or default_log_path()
+            grouped.setdefault(path, []).append(line)
+
+        for path, lines in grouped.items():
+            try:
+                self._file(path).write_lines(lines)
+            except Exception:
+                self.handleError(records[0])
+                continue
+            self.records_written += len(lines)
+            self.batches_written += 1
+
+    def close(self):
+        for handler in self.files.values():
+            handler.close()
+        self.files.clear()
+        super().close()
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """요청 경로용 QueueHandler: 메시지가 이미 완성된 레코드는 복사 없이 넣고, 큐가 가득 차면 버림"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 인자/예외가 있는 레코드만 기본 동작대로 문자열로 굳힘 (포맷 비용은 리스너 스레드에서 부담)
+        if record.args or record.exc_info:
+            return super().prepare(record)
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class BatchingQueueListener(QueueListener):
+    """큐에 쌓인 레코드를 최대 batch_size개씩 꺼내 한 번에 기록하는 QueueListener"""
+
+    def __init__(self, log_queue: queue.Queue, writer: SecurityLogWriter, batch_size: int = BATCH_SIZE):
+        super().__init__(log_queue, writer)
+        self.writer = writer
+        self.batch_size = batch_size
+
+    def enqueue_sentinel(self):
+        # 종료 시점에는 큐가 가득 차 있어도 센티널이 들어가도록 대기
+        self.queue.put(self._sentinel)
+
+    def _monitor(self):
+        log_queue = self.queue
+        while True:
+            batch = [log_queue.get()]
+            try:
+                while len(batch) < self.batch_size:
+                    batch.append(log_queue.get_nowait())
+            except queue.Empty:
+                pass
+
+            records = [record for record in batch if record is not self._sentinel]
+            if records:
+                try:
+                    self.writer.emit_batch(records)
+                except Exception:
+                    self.writer.handleError(records[0])
+            for _ in batch:
+                log_queue.task_done()
+            if len(records) != len(batch):
+                return
+
+
+class SecurityEventIndex:
+    """IP/이벤트 유형별 보안 이벤트 카운터 (로그 파일을 다시 읽지 않고 통계 제공)
+
+    추적 IP 수가 max_ips를 넘으면 가장 오래 보이지 않은 IP부터 제거합니다.
+    """
+
+    def __init__(self, max_ips: int = 10_000):
+        self.max_ips = max_ips
+        self._lock = threading.Lock()
+        self.total = 0
+        self.by_event: Counter = Counter()
+        # ip -> [전체 건수, 이벤트 유형별 Counter, 마지막 발생 시각]
+        self.by_ip: "OrderedDict[str, list]" = OrderedDict()
+
+    def record(self, event_type: str, client_ip: Optional[str], timestamp: float):
+        with self._lock:
+            self.total += 1
+            self.by_event[event_type] += 1
+            if not client_ip:
+                return
+            entry = self.by_ip.get(client_ip)
+            if entry is None:
+                entry = self.by_ip[client_ip] = [0, Counter(), timestamp]
+                if len(self.by_ip) > self.max_ips:
+                    self.by_ip.popitem(last=False)
+            else:
+                self.by_ip.move_to_end(client_ip)
+            entry[0] += 1
+            entry[1][event_type] += 1
+            entry[2] = timestamp
+
+    def count(self, event_type: Optional[str] = None, client_ip: Optional[str] = None) -> int:
+        """이벤트 유형 및/또는 IP 기준 건수"""
+        with self._lock:
+            if client_ip is None:
+                return self.by_event[event_type] if event_type else self.total
+            entry = self.by_ip.get(client_ip)
+            if entry is None:
+                return 0
+            return entry[1][event_type] if event_type else entry[0]
+
+    def snapshot(self, top: int = 10) -> Dict:
+        """통계 API 응답용 요약 (건수 상위 IP 포함)"""
+        with self._lock:
+            top_ips = nlargest(top, self.by_ip.items(), key=lambda item: item[1][0])
+            return {
+                'total_events': self.total,
+                'events_by_type': dict(self.by_event),
+                'tracked_ips': len(self.by_ip),
+                'top_ips': [
+                    {
+                        'ip': ip,
+                        'events': total,
+                        'events_by_type': dict(events),
+                        'last_seen': datetime.fromtimestamp(last_seen).isoformat(timespec='seconds')
+                    }
+                    for ip, (total, events, last_seen) in top_ips
+                ]
+            }
+
+    def reset(self):
+        with self._lock:
+            self.total = 0
+            self.by_event.clear()
+            self.by_ip.clear()
+
 
 logger = logging.getLogger("security")
 logger.setLevel(logging.INFO)
+# 상위 로거 핸들러(콘솔 등)가 요청 경로에서 동기로 실행되지 않도록 전파하지 않음
+logger.propagate = False
+
+_queue: queue.Queue = queue.Queue(MAX_QUEUE_SIZE)
+queue_handler = NonBlockingQueueHandler(_queue)
+writer = SecurityLogWriter()
+listener = BatchingQueueListener(_queue, writer)
+event_index = SecurityEventIndex()
+
+logger.addHandler(queue_handler)
+listener.start()
+
+
+def log_security_event(event_type: str, detail: str, level: int = logging.INFO,
+                       log_path: Optional[str] = None, **fields):
+    """보안 이벤트 기록 함수 (비차단)
+
+    fields는 JSON 줄에 그대로 들어가며, client_ip가 없으면 detail에서 IPv4 주소를 찾아 IP 카운터에 반영합니다.
+    """
+    client_ip = fields.get('client_ip')
+    if client_ip is None:
+        match = _IPV4_PATTERN.search(detail)
+        client_ip = match.group(0) if match else None
+    event_index.record(event_type, client_ip, time.time())
+    if not logger.isEnabledFor(level):
+        return
+    # logger.log()의 호출 위치 탐색(findCaller)은 JSON 줄에 쓰지 않으므로 건너뛰고 레코드를 직접 생성
+    record = logger.makeRecord(logger.name, level, __file__, 0, detail, None, None, extra={
+        'event': event_type,
+        'fields': fields,
+        'log_path': log_path or default_log_path()
+    })
+    logger.handle(record)
+
+
+def flush_security_log(timeout: float = 5.0) -> bool:
+    """큐에 쌓인 이벤트가 모두 파일에 기록될 때까지 대기 (시간 내 완료 여부 반환)"""
+    deadline = time.monotonic() + timeout
+    with _queue.all_tasks_done:
+        while _queue.unfinished_tasks:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            _queue.all_tasks_done.wait(remaining)
+    return True
+
+
+def get_pipeline_stats() -> Dict:
+    """비동기 기록 파이프라인 상태"""
+    return {
+        'queued': _queue.qsize(),
+        'dropped': queue_handler.dropped,
+        'records_written': writer.records_written,
+        'batches_written': writer.batches_written
+    }
+
 
-handler = TimedRotatingFileHandler("logs/security.log", when="midnight", interval=1, backupCount=30, encoding="utf-8")
-formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
-handler.setFormatter(formatter)
+def shutdown_security_log():
+    """남은 이벤트를 기록하고 리스너 스레드 종료 (프로세스 종료 시 자동 호출)"""
+    if listener._thread is not None:
+        listener.stop()
+    writer.close()
 
-logger.addHandler(handler)
 
-def log_security_event(event_type: str, detail: str):
-    """보안 이벤트 기록 함수"""
-    logger.info(f"[{event_type}] {detail}")
\ No newline at end of file
+atexit.register(shutdown_security_log)
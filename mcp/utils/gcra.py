@@ -0,0 +1,273 @@
+"""
+GCRA (Generic Cell Rate Algorithm) 요청 제한
+- 클라이언트마다 "이론적 도착 시각(TAT)" 숫자 하나만 저장 (요청 타임스탬프 목록 대신 O(1) 상태)
+- 메모리 저장소: 잠금 분할(lock striping) 샤드, 접근할 때마다 만료된 항목을 몇 개씩 정리 (전체 스윕 없음)
+- 공유 저장소: SQLite(단일 UPSERT) 또는 Redis(Lua 스크립트)로 여러 워커가 같은 한도를 공유
+
+한도 limit/period 기준으로 요청 간격 interval = period / limit, 순간 허용 폭 tolerance = period - interval.
+요청은 max(TAT, now) - now <= tolerance 이면 허용되고 TAT를 interval만큼 뒤로 미룹니다.
+"""
+
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+# 부동소수점 누적 오차로 한도 직전 요청이 거절되지 않도록 두는 여유 (초)
+EPSILON = 1e-6
+DEFAULT_SHARDS = 64
+# 접근 한 번에 샤드 앞쪽에서 정리할 최대 만료 항목 수
+EXPIRE_BUDGET = 2
+
+
+class RateLimitDecision(NamedTuple):
+    """요청 한 건의 제한 판정"""
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float  # 다음 요청이 허용되기까지 남은 시간 (초)
+    reset_after: float  # 상태가 완전히 비워지기까지 남은 시간 (초)
+
+    @property
+    def used(self) -> int:
+        return self.limit - self.remaining
+
+
+class ShardedMemoryStore:
+    """프로세스 내 GCRA 상태 저장소 (잠금 분할 샤드)
+
+    각 샤드는 최근 갱신 순서의 OrderedDict라 맨 앞이 가장 오래 갱신되지 않은 클라이언트입니다.
+    접근할 때마다 맨 앞의 만료 항목을 EXPIRE_BUDGET개까지 지우므로 정리 비용이 요청에 분산됩니다.
+    """
+
+    def __init__(self, shards: int = DEFAULT_SHARDS):
+        if shards & (shards - 1):
+            raise ValueError("shards는 2의 거듭제곱이어야 합니다")
+        self._mask = shards - 1
+        self._tats: List["OrderedDict[str, float]"] = [OrderedDict() for _ in range(shards)]
+        self._locks = [threading.Lock() for _ in range(shards)]
+
+    def acquire(self, key: str, now: float, interval: float, tolerance: float) -> Tuple[bool, float]:
+        """요청 한 건을 판정하고 (허용 여부, 판정 후 TAT - now) 반환"""
+        index = hash(key) & self._mask
+        tats = self._tats[index]
+        with self._locks[index]:
+            tat = tats.pop(key, now)  # 다시 넣어 최근 갱신 위치(맨 뒤)로 이동
+            if tat < now:
+                tat = now
+            allowed = tat - now <= tolerance
+            if allowed:
+                tat += interval
+            tats[key] = tat
+            for _ in range(EXPIRE_BUDGET):
+                oldest_key = next(iter(tats))
+                if tats[oldest_key] > now:
+                    break
+                del tats[oldest_key]
+        return allowed, tat - now
+
+    def peek(self, key: str, now: float) -> float:
+        """기록 없이 현재 TAT - now (만료됐거나 없으면 0)"""
+        index = hash(key) & self._mask
+        with self._locks[index]:
+            tat = self._tats[index].get(key, now)
+        return max(tat - now, 0.0)
+
+    def purge_expired(self, now: float) -> int:
+        """모든 샤드에서 만료 항목 정리 (관리용, 요청 경로에서는 호출하지 않음)"""
+        removed = 0
+        for tats, lock in zip(self._tats, self._locks):
+            with lock:
+                expired = [key for key, tat in tats.items() if tat <= now]
+                for key in expired:
+                    del tats[key]
+                removed += len(expired)
+        return removed
+
+    def tracked(self, now: float) -> Optional[int]:
+        """상태를 보관 중인 클라이언트 수 (아직 지연 정리되지 않은 만료 항목 포함)"""
+        return sum(len(tats) for tats in self._tats)
+
+    def clear(self):
+        for tats, lock in zip(self._tats, self._locks):
+            with lock:
+                tats.clear()
+
+
+class SQLiteStore:
+    """여러 워커 프로세스가 공유하는 SQLite GCRA 저장소
+
+    판정과 갱신은 조건부 UPSERT 한 문장으로 원자적으로 처리하고,
+    만료 행은 purge_every번 접근마다 tat 인덱스 범위로만 삭제합니다.
+    """
+
+    def __init__(self, db_path: str, purge_every: int = 1024):
+        self.db_path = db_path
+        self.purge_every = purge_every
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None, timeout=5.0)
+        self._lock = threading.Lock()
+        self._calls = 0
+        if db_path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS gcra_state (
+                key TEXT PRIMARY KEY,
+                tat REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_gcra_state_tat ON gcra_state (tat);
+        """)
+
+    def acquire(self, key: str, now: float, interval: float, tolerance: float) -> Tuple[bool, float]:
+        with self._lock:
+            row = self._db.execute("""
+                INSERT INTO gcra_state (key, tat) VALUES (?1, ?2 + ?3)
+                ON CONFLICT(key) DO UPDATE SET tat = max(gcra_state.tat, ?2) + ?3
+                WHERE max(gcra_state.tat, ?2) - ?2 <= ?4
+                RETURNING tat
+            """, (key, now, interval, tolerance)).fetchone()
+            if row is not None:
+                allowed, tat = True, row[0]
+            else:
+                allowed = False
+                tat = self._db.execute("SELECT tat FROM gcra_state WHERE key = ?", (key,)).fetchone()[0]
+
+            self._calls += 1
+            if self._calls % self.purge_every == 0:
+                self._db.execute("DELETE FROM gcra_state WHERE tat <= ?", (now,))
+        return allowed, tat - now
+
+    def peek(self, key: str, now: float) -> float:
+        with self._lock:
+            row = self._db.execute("SELECT tat FROM gcra_state WHERE key = ?", (key,)).fetchone()
+        return max(row[0] - now, 0.0) if row else 0.0
+
+    def purge_expired(self, now: float) -> int:
+        with self._lock:
+            return self._db.execute("DELETE FROM gcra_state WHERE tat <= ?", (now,)).rowcount
+
+    def tracked(self, now: float) -> Optional[int]:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM gcra_state WHERE tat > ?", (now,)).fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM gcra_state")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+# Redis 서버 시각 기준으로 판정 (워커 간 시계 차이 무관). 반환: {허용 여부, TAT - now (문자열)}
+_REDIS_GCRA_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local interval = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then
+    tat = now
+end
+if tat - now > tolerance then
+    return {0, tostring(tat - now)}
+end
+tat = tat + interval
+redis.call('SET', KEYS[1], tostring(tat), 'PX', math.ceil((tat - now) * 1000))
+return {1, tostring(tat - now)}
+"""
+
+
+class RedisStore:
+    """Redis GCRA 저장소 (키 TTL = TAT까지 남은 시간이므로 만료는 Redis가 지연 처리)"""
+
+    def __init__(self, client, prefix: str = "mcp:ratelimit:"):
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(_REDIS_GCRA_SCRIPT)
+
+    @classmethod
+    def from_url(cls, url: str, prefix: str = "mcp:ratelimit:") -> "RedisStore":
+        import redis  # 선택 의존성: Redis 백엔드를 쓸 때만 필요
+
+        return cls(redis.Redis.from_url(url), prefix)
+
+    def acquire(self, key: str, now: float, interval: float, tolerance: float) -> Tuple[bool, float]:
+        allowed, offset = self._script(keys=[self.prefix + key], args=[interval, tolerance])
+        return bool(allowed), float(offset)
+
+    def peek(self, key: str, now: float) -> float:
+        remaining_ms = self.client.pttl(self.prefix + key)
+        return remaining_ms / 1000 if remaining_ms > 0 else 0.0
+
+    def purge_expired(self, now: float) -> int:
+        return 0
+
+    def tracked(self, now: float) -> Optional[int]:
+        return None  # 접두사별 키 수는 전체 스캔이 필요하므로 제공하지 않음
+
+    def clear(self):
+        for key in self.client.scan_iter(match=self.prefix + "*"):
+            self.client.delete(key)
+
+
+def create_store(url: Optional[str] = None):
+    """저장소 URL로 백엔드 생성: None/"memory", "sqlite:///경로", "redis://호스트:포트/DB" """
+    if not url or url == "memory":
+        return ShardedMemoryStore()
+    if url.startswith("sqlite:///"):
+        return SQLiteStore(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisStore.from_url(url)
+    raise ValueError(f"지원하지 않는 Rate Limit 저장소: {url}")
+
+
+class GCRARateLimiter:
+    """키(IP 등)별 limit/period 요청 제한기"""
+
+    def __init__(self, limit: int, period: float = 60.0, store=None,
+                 clock: Callable[[], float] = time.time):
+        if limit <= 0 or period <= 0:
+            raise ValueError("limit과 period는 양수여야 합니다")
+        self.limit = limit
+        self.period = period
+        self.interval = period / limit
+        self.tolerance = period - self.interval
+        self.store = store if store is not None else ShardedMemoryStore()
+        self.clock = clock
+
+    def _decision(self, allowed: bool, offset: float) -> RateLimitDecision:
+        offset = max(offset, 0.0)
+        used = min(self.limit, max(0, math.ceil(offset / self.interval - EPSILON)))
+        return RateLimitDecision(
+            allowed=allowed,
+            limit=self.limit,
+            remaining=self.limit - used,
+            retry_after=max(offset - self.tolerance, 0.0),
+            reset_after=offset
+        )
+
+    def hit(self, key: str) -> RateLimitDecision:
+        """요청 한 건을 기록하고 판정"""
+        allowed, offset = self.store.acquire(key, self.clock(), self.interval, self.tolerance + EPSILON)
+        return self._decision(allowed, offset)
+
+    def allow(self, key: str) -> bool:
+        """요청 한 건을 기록하고 허용 여부만 반환 (요청 경로용, 판정 상세를 만들지 않음)"""
+        return self.store.acquire(key, self.clock(), self.interval, self.tolerance + EPSILON)[0]
+
+    def peek(self, key: str) -> RateLimitDecision:
+        """기록 없이 현재 상태만 조회"""
+        offset = self.store.peek(key, self.clock())
+        return self._decision(offset <= self.tolerance + EPSILON, offset)
+
+    def tracked_keys(self) -> Optional[int]:
+        return self.store.tracked(self.clock())
+
+    def purge_expired(self) -> int:
+        return self.store.purge_expired(self.clock())
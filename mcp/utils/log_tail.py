@@ -0,0 +1,112 @@
+"""
+로그 파일 끝부분 읽기 (알림 첨부용)
+- 파일 끝에서부터 블록 단위로 거꾸로 읽어 필요한 줄 수만큼만 읽음 (파일 크기와 무관한 비용)
+- TimedRotatingFileHandler로 막 회전되어 현재 파일이 짧으면 직전 회전 파일에서 나머지를 채움
+- (inode, 크기, mtime) 기준 캐시: 알림 폭주 시 같은 파일 발췌는 한 번만 읽음
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+BLOCK_SIZE = 8192
+# 한 파일에서 읽을 최대 바이트 (아주 긴 줄이 있어도 첨부 비용 상한 유지)
+MAX_TAIL_BYTES = 1024 * 1024
+
+
+def _tail_from_file(path: Path, lines: int, block_size: int = BLOCK_SIZE,
+                    max_bytes: int = MAX_TAIL_BYTES) -> Tuple[List[bytes], bool]:
+    """파일 끝에서 거꾸로 블록을 읽어 (마지막 lines줄, 파일 처음까지 읽었는지) 반환"""
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        buffer = b''
+        # 마지막 줄이 개행으로 끝나면 그 개행은 줄 구분으로 세지 않음
+        while position > 0 and buffer.count(b'\n') <= lines and len(buffer) < max_bytes:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            buffer = f.read(read_size) + buffer
+
+    if buffer.endswith(b'\n'):
+        buffer = buffer[:-1]
+    chunks = buffer.split(b'\n')
+    if position > 0:
+        chunks = chunks[1:]  # 블록 경계에서 잘린 첫 줄은 버림
+    return (chunks[-lines:] if lines > 0 else []), position == 0
+
+
+def rotated_files(path: Path) -> List[Path]:
+    """TimedRotatingFileHandler 회전 파일 (app.log.2024-01-01 등), 최신순. 압축 파일 제외"""
+    if not path.parent.is_dir():
+        return []
+    candidates = [
+        candidate for candidate in path.parent.glob(f"{path.name}.*")
+        if candidate.is_file() and candidate.suffix not in ('.gz', '.zip', '.bz2', '.xz')
+    ]
+    return sorted(candidates, key=lambda candidate: candidate.stat().st_mtime, reverse=True)
+
+
+def read_tail(path, lines: int = 50, include_rotated: bool = True) -> str:
+    """마지막 lines줄을 문자열로 반환 (부족하면 직전 회전 파일에서 앞부분을 채움)"""
+    path = Path(path)
+    collected, whole_file = _tail_from_file(path, lines)
+    if include_rotated and whole_file and len(collected) < lines:
+        for previous in rotated_files(path):
+            earlier, whole_file = _tail_from_file(previous, lines - len(collected))
+            collected = earlier + collected
+            if len(collected) >= lines or not whole_file:
+                break
+    return b'\n'.join(collected).decode('utf-8', errors='replace').replace('\r\n', '\n').strip()
+
+
+class LogTailCache:
+    """파일 서명 (inode, 크기, mtime) 기준 발췌 캐시
+
+    파일이 바뀌지 않았으면 연속된 알림은 같은 발췌를 재사용하고,
+    같은 키를 동시에 요청하면 한 스레드만 읽습니다.
+    """
+
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[tuple, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.reads = 0
+        self.hits = 0
+
+    @staticmethod
+    def _signature(path: Path) -> Optional[tuple]:
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def get(self, path, lines: int = 50) -> str:
+        path = Path(path)
+        key = (str(path.resolve()), lines)
+        with self._lock:
+            signature = self._signature(path)
+            cached = self._entries.get(key)
+            if cached is not None and cached[0] == signature:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached[1]
+
+            excerpt = read_tail(path, lines)
+            self.reads += 1
+            self._entries[key] = (signature, excerpt)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return excerpt
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# 알림 모듈 공용 캐시
+tail_cache = LogTailCache()
@@ -0,0 +1,397 @@
+"""
+알림 발송 디스패처
+- 프로세스 수명 동안 유지되는 keep-alive aiohttp 세션 (웹훅 채널 공용)
+- SMTP 연결 풀 (메시지마다 접속/STARTTLS/로그인을 반복하지 않음)
+- 집계 윈도우: 같은/거의 같은 알림(숫자·IP만 다른 알림)은 첫 건을 즉시 보내고,
+  윈도우 안의 후속 중복은 건수·필드·IP를 모은 후행 다이제스트 1건으로 병합 (호출자는 윈도우를 기다리지 않음)
+- 크기 제한 발송 큐 + 워커 (큐가 가득 차면 대기 후 포기, 드롭 건수 집계)
+"""
+
+import re
+import time
+import queue
+import asyncio
+import logging
+import smtplib
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# 한글 조사가 바로 붙는 경우("10.0.0.1에서")도 잡도록 \b 대신 숫자/점 경계 사용
+_IP_PATTERN = re.compile(r'(?<![\d.])\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?(?![\d.])')
+
+# 지문 계산 시 치환할 가변 토큰 (IP, 16진수 ID, 숫자)
+_VARIABLE_TOKENS = [
+    (_IP_PATTERN, '<ip>'),
+    (re.compile(r'\b[0-9a-f]{8,}\b', re.IGNORECASE), '<id>'),
+    (re.compile(r'\d+(?:[.,]\d+)*'), '#'),
+]
+
+
+def alert_fingerprint(level: Any, title: Optional[str], message: str) -> str:
+    """알림 지문: 심각도 + 제목 + 가변 토큰을 치환한 메시지 (같은 지문이면 병합 대상)"""
+    normalized = f"{title or ''}|{message}"
+    for pattern, placeholder in _VARIABLE_TOKENS:
+        normalized = pattern.sub(placeholder, normalized)
+    return f"{getattr(level, 'value', level)}|{' '.join(normalized.split())}"
+
+
+class SharedHTTPSession:
+    """이벤트 루프별로 하나만 유지되는 keep-alive aiohttp 세션"""
+
+    def __init__(self, limit: int = 100, limit_per_host: int = 20,
+                 keepalive_timeout: float = 30.0, timeout: float = 10.0):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.sessions_created = 0
+
+    async def get(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            # 다른 루프(asyncio.run 재호출 등)에서 만든 세션은 재사용할 수 없음
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+            self._loop = loop
+            self.sessions_created += 1
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed and self._loop is asyncio.get_running_loop():
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+
+class SMTPConnectionPool:
+    """스레드 안전 SMTP 연결 풀 (동기 API, run_in_executor에서 호출)"""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        starttls: bool = True,
+        size: int = 2,
+        timeout: float = 10.0,
+        max_idle: float = 60.0,
+        smtp_factory: Callable[..., smtplib.SMTP] = smtplib.SMTP
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.smtp_factory = smtp_factory
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle: "queue.LifoQueue" = queue.LifoQueue()
+        self.connections_opened = 0
+
+    def _connect(self) -> smtplib.SMTP:
+        server = self.smtp_factory(self.host, self.port, timeout=self.timeout)
+        if self.starttls:
+            server.starttls()
+        if self.username and self.password:
+            server.login(self.username, self.password)
+        self.connections_opened += 1
+        return server
+
+    @staticmethod
+    def _quit(server: smtplib.SMTP):
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    def _acquire(self) -> smtplib.SMTP:
+        try:
+            server, last_used = self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+        if time.monotonic() - last_used > self.max_idle:
+            # 오래 쉰 연결은 서버가 끊었을 수 있으므로 NOOP으로 확인
+            try:
+                if server.noop()[0] == 250:
+                    return server
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._quit(server)
+            return self._connect()
+        return server
+
+    def send_message(self, msg) -> None:
+        """풀의 연결로 메시지 전송 (끊긴 연결이면 한 번 재접속 후 재전송)"""
+        with self._slots:
+            server = self._acquire()
+            try:
+                try:
+                    server.send_message(msg)
+                except (smtplib.SMTPServerDisconnected, ConnectionError):
+                    self._quit(server)
+                    server = self._connect()
+                    server.send_message(msg)
+            except Exception:
+                self._quit(server)
+                raise
+            self._idle.put((server, time.monotonic()))
+
+    def close(self):
+        while True:
+            try:
+                server, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._quit(server)
+
+
+@dataclass
+class OutboundAlert:
+    """발송 대기 알림 (digest=True면 윈도우 안의 후속 중복 count건을 모은 후행 다이제스트)"""
+    message: str
+    level: Any
+    title: Optional[str]
+    fields: Dict[str, Any]
+    channels: Optional[List[Any]]
+    attach_logs: bool
+    fingerprint: str
+    future: asyncio.Future
+    count: int = 1
+    digest: bool = False
+    first_seen: float = field(default_factory=time.time)
+    last_seen: float = field(default_factory=time.time)
+    samples: List[str] = field(default_factory=list)
+    submitted_at: List[float] = field(default_factory=list)
+    field_values: Dict[str, List[Any]] = field(default_factory=dict)
+    field_overflow: Dict[str, int] = field(default_factory=dict)
+    ips: Dict[str, None] = field(default_factory=dict)
+
+    def merge(self, message: str, fields: Optional[Dict[str, Any]], now: float, max_samples: int):
+        """중복 알림 1건을 다이제스트에 반영 (필드별 서로 다른 값과 IP를 보존)"""
+        self.count += 1
+        self.last_seen = now
+        if len(self.samples) < max_samples and message not in self.samples:
+            self.samples.append(message)
+        for key, value in (fields or {}).items():
+            values = self.field_values.setdefault(key, [])
+            if value in values:
+                continue
+            if len(values) < max_samples:
+                values.append(value)
+            else:
+                self.field_overflow[key] = self.field_overflow.get(key, 0) + 1
+        for ip in _IP_PATTERN.findall(message):
+            self.ips[ip] = None
+
+    def digest_message(self, window: float) -> str:
+        if not self.digest:
+            return self.message
+        return f"{self.message}\n(최근 {window:g}초 동안 동일 유형 알림 {self.count}건 추가 발생, 병합 전송)"
+
+    def digest_fields(self, max_ips: int = 10) -> Dict[str, Any]:
+        if not self.digest:
+            return dict(self.fields)
+        digest = {}
+        for key, values in self.field_values.items():
+            text = values[0] if len(values) == 1 else " / ".join(str(value) for value in values)
+            if self.field_overflow.get(key):
+                text = f"{text} 외 {self.field_overflow[key]}개"
+            digest[key] = text
+        digest["🔁 병합 건수"] = f"{self.count}건"
+        digest["⏱️ 발생 구간"] = (f"{time.strftime('%H:%M:%S', time.localtime(self.first_seen))} ~ "
+                              f"{time.strftime('%H:%M:%S', time.localtime(self.last_seen))}")
+        if self.ips:
+            ips = list(self.ips)
+            more = f" 외 {len(ips) - max_ips}개" if len(ips) > max_ips else ""
+            digest["🌐 관련 IP"] = ", ".join(ips[:max_ips]) + more
+        if len(self.samples) > 1:
+            digest["📋 병합된 알림 예시"] = " / ".join(self.samples)
+        return digest
+
+
+# 후행 다이제스트로 병합된 호출의 반환값 (채널 전송은 윈도우 종료 시)
+AGGREGATED: Dict[str, bool] = {"aggregated": True}
+
+
+class NotificationDispatcher:
+    """집계 윈도우 + 크기 제한 큐 기반 알림 디스패처
+
+    deliver(alert)는 알림 1건을 모든 채널로 전송하고 채널별 결과를 반환합니다.
+    지문별 첫 알림은 즉시 발송되어 호출자가 그 결과를 받고, 윈도우 안의 후속 중복은
+    기다리지 않고 AGGREGATED를 반환하며 윈도우가 닫힐 때 후행 다이제스트 1건으로 발송됩니다.
+    """
+
+    def __init__(
+        self,
+        deliver: Callable[[OutboundAlert], Awaitable[Dict[str, bool]]],
+        windows: Optional[Dict[Any, float]] = None,
+        default_window: float = 0.0,
+        max_queue: int = 1000,
+        workers: int = 4,
+        enqueue_timeout: float = 5.0,
+        max_samples: int = 5
+    ):
+        self.deliver = deliver
+        self.windows = windows or {}
+        self.default_window = default_window
+        self.max_queue = max_queue
+        self.workers = workers
+        self.enqueue_timeout = enqueue_timeout
+        self.max_samples = max_samples
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: List[asyncio.Task] = []
+        # 열린 윈도우: 지문 → 후행 다이제스트 (중복이 아직 없으면 None)
+        self._pending: Dict[str, Optional[OutboundAlert]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._inflight: set = set()
+        self.latencies: List[float] = []
+        self.stats = {"submitted": 0, "merged": 0, "delivered": 0, "dropped": 0, "queue_peak": 0}
+
+    def window_for(self, level: Any) -> float:
+        return self.windows.get(level, self.default_window)
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        # 새 이벤트 루프: 이전 루프에 묶인 큐/워커/대기 그룹은 버리고 새로 시작
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._pending.clear()
+        self._timers.clear()
+        self._inflight.clear()
+        self._worker_tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def submit(
+        self,
+        message: str,
+        level: Any,
+        title: Optional[str] = None,
+        fields: Optional[Dict[str, Any]] = None,
+        channels: Optional[List[Any]] = None,
+        attach_logs: bool = True,
+        aggregate: bool = True
+    ) -> Dict[str, bool]:
+        """알림 제출. 첫 알림은 채널별 전송 결과, 윈도우 안의 중복은 즉시 AGGREGATED 반환"""
+        self._ensure_started()
+        self.stats["submitted"] += 1
+        now = time.time()
+        fingerprint = alert_fingerprint(level, title, message)
+        window = self.window_for(level) if aggregate else 0.0
+
+        if window > 0 and fingerprint in self._pending:
+            digest = self._pending[fingerprint]
+            if digest is None:
+                digest = OutboundAlert(
+                    message=message, level=level, title=title, fields={}, channels=channels,
+                    attach_logs=attach_logs, fingerprint=fingerprint, future=self._loop.create_future(),
+                    count=0, digest=True, first_seen=now
+                )
+                self._pending[fingerprint] = digest
+            digest.merge(message, fields, now, self.max_samples)
+            self.stats["merged"] += 1
+            return dict(AGGREGATED)
+
+        alert = OutboundAlert(
+            message=message, level=level, title=title, fields=dict(fields or {}),
+            channels=channels, attach_logs=attach_logs, fingerprint=fingerprint,
+            future=self._loop.create_future(), first_seen=now, last_seen=now,
+            samples=[message], submitted_at=[time.perf_counter()]
+        )
+        if window > 0:
+            # 첫 알림은 바로 보내고, 윈도우 동안 같은 지문의 중복만 모음
+            self._pending[fingerprint] = None
+            self._timers[fingerprint] = self._loop.call_later(window, self._close_group, fingerprint)
+        self._spawn_enqueue(alert)
+        return await asyncio.shield(alert.future)
+
+    def _close_group(self, fingerprint: str):
+        self._timers.pop(fingerprint, None)
+        digest = self._pending.pop(fingerprint, None)
+        if digest is not None:
+            self._spawn_enqueue(digest)
+
+    def _spawn_enqueue(self, alert: OutboundAlert):
+        task = self._loop.create_task(self._enqueue(alert))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _enqueue(self, alert: OutboundAlert):
+        try:
+            await asyncio.wait_for(self._queue.put(alert), timeout=self.enqueue_timeout)
+        except asyncio.TimeoutError:
+            self.stats["dropped"] += alert.count
+            logger.error(f"알림 발송 큐 포화로 드롭: {alert.title or alert.message[:50]} ({alert.count}건)")
+            if not alert.future.done():
+                alert.future.set_result({})
+            return
+        self.stats["queue_peak"] = max(self.stats["queue_peak"], self._queue.qsize())
+
+    async def _worker(self):
+        while True:
+            alert = await self._queue.get()
+            try:
+                try:
+                    results = await self.deliver(alert)
+                except Exception as e:
+                    logger.error(f"알림 발송 오류: {e}")
+                    results = {}
+                finished = time.perf_counter()
+                self.latencies.extend(finished - submitted for submitted in alert.submitted_at)
+                self.stats["delivered"] += 1
+                if not alert.future.done():
+                    alert.future.set_result(results)
+            finally:
+                self._queue.task_done()
+
+    async def flush(self):
+        """집계 중인 그룹을 즉시 닫고 큐가 빌 때까지 대기"""
+        if self._loop is not asyncio.get_running_loop():
+            return
+        for fingerprint, timer in list(self._timers.items()):
+            timer.cancel()
+            self._close_group(fingerprint)
+        while self._inflight:
+            await asyncio.gather(*list(self._inflight), return_exceptions=True)
+        await self._queue.join()
+
+    async def close(self):
+        """남은 알림을 발송하고 워커 종료"""
+        if self._loop is not asyncio.get_running_loop():
+            # 이 루프에서 시작한 적 없음 (이전 루프의 워커는 루프와 함께 사라짐)
+            self._worker_tasks = []
+            self._loop = None
+            return
+        await self.flush()
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        self._loop = None
+
+    def latency_percentile(self, percentile: float) -> float:
+        """제출 → 전송 완료 지연 백분위수 (초)"""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(round(percentile / 100 * (len(ordered) - 1))))
+        return ordered[index]
@@ -12,14 +12,17 @@ import json
 import time
 import random
 from datetime import datetime, timedelta
-from email.mime.text import MimeText
-from email.mime.multipart import MimeMultipart
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
 from typing import Optional, Dict, Any, List
 from enum import Enum
 from pathlib import Path
 from jinja2 import Template, Environment, BaseLoader
 from collections import defaultdict
 
+from .notification_dispatcher import NotificationDispatcher, OutboundAlert, SharedHTTPSession, SMTPConnectionPool
+from .log_tail import tail_cache
+
 logger = logging.getLogger(__name__)
 
 # 알림 전송 속도 제한을 위한 글로벌 딕셔너리
@@ -45,6 +48,20 @@ NOTIFICATION_DELAYS = {
     NotificationLevel.INFO: 5         # 5초 지연
 }
 
+# 알림 레벨별 집계 윈도우 (초): 윈도우 안의 같은 유형 알림은 건수를 포함한 다이제스트 1건으로 전송
+NOTIFICATION_AGGREGATION_WINDOWS = {
+    NotificationLevel.CRITICAL: float(os.getenv('NOTIFY_WINDOW_CRITICAL', '1')),
+    NotificationLevel.ERROR: float(os.getenv('NOTIFY_WINDOW_ERROR', '5')),
+    NotificationLevel.WARNING: float(os.getenv('NOTIFY_WINDOW_WARNING', '10')),
+    NotificationLevel.INFO: float(os.getenv('NOTIFY_WINDOW_INFO', '10'))
+}
+
+# 웹훅 채널(Slack/Discord) 공용 keep-alive 세션
+http_session = SharedHTTPSession(
+    limit=int(os.getenv('NOTIFY_HTTP_POOL_SIZE', '100')),
+    keepalive_timeout=float(os.getenv('NOTIFY_HTTP_KEEPALIVE', '30'))
+)
+
 # Jinja2 템플릿 환경
 template_env = Environment(loader=BaseLoader())
 
@@ -401,10 +418,8 @@ def get_recent_logs(log_file_path: str = "logs/app.log", lines: int = 50) -> str
 
         for path in possible_paths:
             if path.exists() and path.is_file():
-                with open(path, 'r', encoding='utf-8') as f:
-                    all_lines = f.readlines()
-                    recent_lines = all_lines[-lines:] if len(all_lines) > lines else all_lines
-                    return ''.join(recent_lines).strip()
+                # 파일 끝에서 필요한 만큼만 읽음 (변경 없으면 캐시된 발췌 재사용)
+                return tail_cache.get(path, lines)
 
         return f"로그 파일을 찾을 수 없습니다. 확인된 경로: {[str(p) for p in possible_paths]}"
 
@@ -415,9 +430,10 @@ def get_recent_logs(log_file_path: str = "logs/app.log", lines: int = 50) -> str
 class SlackNotifier:
     """Slack 웹훅 알림 처리기"""
 
-    def __init__(self, webhook_url: Optional[str] = None):
+    def __init__(self, webhook_url: Optional[str] = None, http: Optional[SharedHTTPSession] = None):
         self.webhook_url = webhook_url or os.getenv('SLACK_WEBHOOK_URL')
         self.enabled = bool(self.webhook_url)
+        self.http = http or http_session
 
     async def send_notification(
         self,
@@ -507,24 +523,24 @@ class SlackNotifier:
             payload_json = template.render(**template_data)
             payload = json.loads(payload_json)
 
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    self.webhook_url,
-                    json=payload,
-                    timeout=aiohttp.ClientTimeout(total=10)
-                ) as response:
-                    if response.status == 200:
-                        logger.info("Slack 알림 전송 성공")
-                        notifier_logger.info(f"Slack 알림 전송 성공: {title or '제목없음'} - {level.value}")
-                        log_notification(level.value, message, "slack", True, title=title, has_logs=bool(recent_logs))
-                        return True
-                    else:
-                        error_msg = f"HTTP {response.status}"
-                        logger.error(f"Slack 알림 전송 실패: {error_msg}")
-                        notifier_logger.error(f"Slack 알림 전송 실패: {error_msg} - {title or '제목없음'}")
-                        log_notification(level.value, message, "slack", False,
-                                       reason=f"http_{response.status}", title=title)
-                        return False
+            session = await self.http.get()
+            async with session.post(
+                self.webhook_url,
+                json=payload,
+                timeout=aiohttp.ClientTimeout(total=10)
+            ) as response:
+                if response.status == 200:
+                    logger.info("Slack 알림 전송 성공")
+                    notifier_logger.info(f"Slack 알림 전송 성공: {title or '제목없음'} - {level.value}")
+                    log_notification(level.value, message, "slack", True, title=title, has_logs=bool(recent_logs))
+                    return True
+                else:
+                    error_msg = f"HTTP {response.status}"
+                    logger.error(f"Slack 알림 전송 실패: {error_msg}")
+                    notifier_logger.error(f"Slack 알림 전송 실패: {error_msg} - {title or '제목없음'}")
+                    log_notification(level.value, message, "slack", False,
+                                   reason=f"http_{response.status}", title=title)
+                    return False
 
         # 재시도 기능을 사용하여 실제 알림 전송
         notifier_logger.info(f"Slack 알림 전송 시작: {title or '제목없음'} - {level.value}")
@@ -540,9 +556,10 @@ class SlackNotifier:
 class DiscordNotifier:
     """Discord 웹훅 알림 처리기"""
 
-    def __init__(self, webhook_url: Optional[str] = None):
+    def __init__(self, webhook_url: Optional[str] = None, http: Optional[SharedHTTPSession] = None):
         self.webhook_url = webhook_url or os.getenv('DISCORD_WEBHOOK_URL')
         self.enabled = bool(self.webhook_url)
+        self.http = http or http_session
 
     async def send_notification(
         self,
@@ -633,24 +650,24 @@ class DiscordNotifier:
             payload_json = template.render(**template_data)
             payload = json.loads(payload_json)
 
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    self.webhook_url,
-                    json=payload,
-                    timeout=aiohttp.ClientTimeout(total=10)
-                ) as response:
-                    if response.status == 204:  # Discord는 성공 시 204 반환
-                        logger.info("Discord 알림 전송 성공")
-                        notifier_logger.info(f"Discord 알림 전송 성공: {title or '제목없음'} - {level.value}")
-                        log_notification(level.value, message, "discord", True, title=title, has_logs=bool(recent_logs))
-                        return True
-                    else:
-                        error_msg = f"HTTP {response.status}"
-                        logger.error(f"Discord 알림 전송 실패: {error_msg}")
-                        notifier_logger.error(f"Discord 알림 전송 실패: {error_msg} - {title or '제목없음'}")
-                        log_notification(level.value, message, "discord", False,
-                                       reason=f"http_{response.status}", title=title)
-                        return False
+            session = await self.http.get()
+            async with session.post(
+                self.webhook_url,
+                json=payload,
+                timeout=aiohttp.ClientTimeout(total=10)
+            ) as response:
+                if response.status == 204:  # Discord는 성공 시 204 반환
+                    logger.info("Discord 알림 전송 성공")
+                    notifier_logger.info(f"Discord 알림 전송 성공: {title or '제목없음'} - {level.value}")
+                    log_notification(level.value, message, "discord", True, title=title, has_logs=bool(recent_logs))
+                    return True
+                else:
+                    error_msg = f"HTTP {response.status}"
+                    logger.error(f"Discord 알림 전송 실패: {error_msg}")
+                    notifier_logger.error(f"Discord 알림 전송 실패: {error_msg} - {title or '제목없음'}")
+                    log_notification(level.value, message, "discord", False,
+                                   reason=f"http_{response.status}", title=title)
+                    return False
 
         # 재시도 기능을 사용하여 실제 알림 전송
         notifier_logger.info(f"Discord 알림 전송 시작: {title or '제목없음'} - {level.value}")
@@ -688,6 +705,16 @@ class EmailNotifier:
 
         self.enabled = bool(self.email and self.password and self.recipients)
 
+        # 메시지마다 접속/STARTTLS/로그인하지 않도록 연결을 풀로 유지
+        self.smtp_pool = SMTPConnectionPool(
+            self.smtp_server,
+            self.smtp_port,
+            username=self.email,
+            password=self.password,
+            starttls=os.getenv('SMTP_STARTTLS', 'true').lower() != 'false',
+            size=int(os.getenv('SMTP_POOL_SIZE', '2'))
+        )
+
     async def send_notification(
         self,
         message: str,
@@ -709,7 +736,7 @@ class EmailNotifier:
             await apply_notification_delay(level, "email")
 
             # 메시지 생성
-            msg = MimeMultipart('alternative')
+            msg = MIMEMultipart('alternative')
             msg['Subject'] = title or f'MCP-MAP {level.value.upper()} 알림'
             msg['From'] = self.email
             msg['To'] = ', '.join(self.recipients)
@@ -740,8 +767,8 @@ class EmailNotifier:
             html_content = html_template.render(**template_data)
             text_content = text_template.render(**template_data)
 
-            html_part = MimeText(html_content, 'html')
-            text_part = MimeText(text_content, 'plain')
+            html_part = MIMEText(html_content, 'html')
+            text_part = MIMEText(text_content, 'plain')
 
             msg.attach(text_part)
             msg.attach(html_part)
@@ -768,12 +795,9 @@ class EmailNotifier:
 
         return result
 
-    def _send_email_sync(self, msg: MimeMultipart):
-        """동기식 이메일 전송"""
-        with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-            server.starttls()
-            server.login(self.email, self.password)
-            server.send_message(msg)
+    def _send_email_sync(self, msg: MIMEMultipart):
+        """동기식 이메일 전송 (풀의 연결 재사용)"""
+        self.smtp_pool.send_message(msg)
 
     def _prepare_template_data(self, message: str, level: NotificationLevel, title: Optional[str] = None,
                               fields: Optional[Dict] = None, recent_logs: Optional[str] = None) -> Dict:
@@ -843,6 +867,14 @@ class NotificationManager:
         if self.email.enabled:
             self.enabled_channels.append(NotificationChannel.EMAIL)
 
+        # 집계 윈도우 + 크기 제한 큐를 거쳐 채널 전송
+        self.dispatcher = NotificationDispatcher(
+            self._deliver,
+            windows=NOTIFICATION_AGGREGATION_WINDOWS,
+            max_queue=int(os.getenv('NOTIFY_QUEUE_SIZE', '1000')),
+            workers=int(os.getenv('NOTIFY_WORKERS', '4'))
+        )
+
         logger.info(f"알림 관리자 초기화 완료. 활성 채널: {[ch.value for ch in self.enabled_channels]}")
 
     async def send_notification(
@@ -852,46 +884,57 @@ class NotificationManager:
         title: Optional[str] = None,
         fields: Optional[Dict[str, Any]] = None,
         channels: Optional[List[NotificationChannel]] = None,
-        attach_logs: bool = True
+        attach_logs: bool = True,
+        aggregate: bool = True
     ) -> Dict[str, bool]:
-        """지정된 채널로 알림 전송"""
+        """지정된 채널로 알림 전송 (aggregate=True면 집계 윈도우 안의 같은 유형 알림과 병합)"""
 
         if not self.enabled_channels:
             logger.warning("활성화된 알림 채널이 없습니다")
             return {}
 
-        # 대상 채널 결정
-        target_channels = channels or self.enabled_channels
-        results = {}
+        return await self.dispatcher.submit(
+            message, level, title=title, fields=fields, channels=channels,
+            attach_logs=attach_logs, aggregate=aggregate
+        )
 
-        # 동시 전송을 위한 태스크 생성
-        tasks = []
+    async def _deliver(self, alert: OutboundAlert) -> Dict[str, bool]:
+        """다이제스트 1건을 대상 채널로 동시 전송"""
+        target_channels = alert.channels or self.enabled_channels
+        message = alert.digest_message(self.dispatcher.window_for(alert.level))
+        senders = {
+            NotificationChannel.SLACK: self.slack,
+            NotificationChannel.DISCORD: self.discord,
+            NotificationChannel.EMAIL: self.email
+        }
 
+        # 채널마다 필드에 로그 링크를 덧붙이므로 필드 사본을 전달
+        tasks = {}
         for channel in target_channels:
-            if channel == NotificationChannel.SLACK and self.slack.enabled:
-                tasks.append(
-                    (channel.value, self.slack.send_notification(message, level, title, fields, attach_logs))
-                )
-            elif channel == NotificationChannel.DISCORD and self.discord.enabled:
-                tasks.append(
-                    (channel.value, self.discord.send_notification(message, level, title, fields, attach_logs))
-                )
-            elif channel == NotificationChannel.EMAIL and self.email.enabled:
-                tasks.append(
-                    (channel.value, self.email.send_notification(message, level, title, fields, attach_logs))
+            sender = senders.get(channel)
+            if sender is not None and sender.enabled:
+                tasks[channel.value] = sender.send_notification(
+                    message, alert.level, alert.title, alert.digest_fields(), alert.attach_logs
                 )
 
-        # 모든 알림 전송 대기
-        if tasks:
-            for channel_name, task in tasks:
-                try:
-                    results[channel_name] = await task
-                except Exception as e:
-                    logger.error(f"{channel_name} 알림 전송 오류: {e}")
-                    results[channel_name] = False
+        results = {}
+        outcomes = await asyncio.gather(*tasks.values(), return_exceptions=True)
+        for channel_name, outcome in zip(tasks, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error(f"{channel_name} 알림 전송 오류: {outcome}")
+                results[channel_name] = False
+            else:
+                results[channel_name] = bool(outcome)
 
         return results
 
+    async def close(self):
+        """대기 중인 알림을 보내고 HTTP 세션/SMTP 연결 정리"""
+        await self.dispatcher.close()
+        await self.slack.http.close()
+        await self.discord.http.close()
+        await asyncio.get_running_loop().run_in_executor(None, self.email.smtp_pool.close)
+
     async def send_critical(self, message: str, **kwargs):
         """긴급 알림 전송 (로그 50줄 자동 첨부)"""
         return await self.send_notification(
@@ -930,6 +973,17 @@ class NotificationManager:
 # 전역 알림 관리자 인스턴스
 notification_manager = NotificationManager()
 
+async def _run_and_close(coro):
+    try:
+        return await coro
+    finally:
+        # 후행 다이제스트를 보내고 이 루프의 HTTP 세션/SMTP 연결 정리
+        await notification_manager.close()
+
+def run_notifications(coro):
+    """스크립트용 asyncio.run 대체: 알림 코루틴 실행 후 관리자 정리까지 같은 루프에서 수행"""
+    return asyncio.run(_run_and_close(coro))
+
 # 편의 함수들
 async def send_critical(message: str, **kwargs):
     """긴급 알림 전송"""
@@ -973,10 +1027,7 @@ def get_security_logs(log_file_path: str = "logs/security.log", lines: int = 50)
 
         for path in possible_paths:
             if path.exists() and path.is_file():
-                with open(path, 'r', encoding='utf-8') as f:
-                    all_lines = f.readlines()
-                    recent_lines = all_lines[-lines:] if len(all_lines) > lines else all_lines
-                    return ''.join(recent_lines).strip()
+                return tail_cache.get(path, lines)
 
         return f"보안 로그 파일을 찾을 수 없습니다. 확인된 경로: {[str(p) for p in possible_paths]}"
 
@@ -3326,7 +3377,7 @@ async def send_yearly_ops_report(
                         <div style="background-color: #fff3cd; border: 1px solid #ffeaa7; border-radius: 8px; padding: 15px; margin-top: 20px;">
                             <h3 style="color: #856404; margin-top: 0;">💡 주요 권장사항</h3>
                             <div style="color: #856404;">
-                                {recommendations_msg.replace('•', '<li>').replace('\n', '</li>')}
+                                {recommendations_msg.replace('•', '<li>').replace(chr(10), '</li>')}
                             </div>
                         </div>
                         <div style="text-align: center; margin-top: 30px; padding-top: 20px; border-top: 1px solid #ecf0f1; color: #7f8c8d; font-size: 12px;">
@@ -3733,12 +3784,12 @@ def send_ci_error_alert_sync(
             return {}  # 비동기 실행으로 즉시 반환
         else:
             # 새 루프에서 실행
-            return asyncio.run(send_ci_error_alert(
+            return run_notifications(send_ci_error_alert(
                 failure_rate, total_errors, top_errors, period_days
             ))
     except RuntimeError:
         # 이벤트 루프가 없는 경우 새로 생성
-        return asyncio.run(send_ci_error_alert(
+        return run_notifications(send_ci_error_alert(
             failure_rate, total_errors, top_errors, period_days
         ))
     except Exception as e:
@@ -3750,12 +3801,12 @@ if __name__ == "__main__":
     import sys
     if len(sys.argv) > 1:
         if sys.argv[1] == "ops":
-            asyncio.run(test_ops_integration())
+            run_notifications(test_ops_integration())
         elif sys.argv[1] == "weekly":
-            asyncio.run(test_weekly_report_notification())
+            run_notifications(test_weekly_report_notification())
         elif sys.argv[1] == "ci":
-            asyncio.run(test_ci_notifications())
+            run_notifications(test_ci_notifications())
         else:
-            asyncio.run(test_notifications())
+            run_notifications(test_notifications())
     else:
-        asyncio.run(test_notifications())
\ No newline at end of file
+        run_notifications(test_notifications())
\ No newline at end of file
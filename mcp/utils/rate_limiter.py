@@ -1,20 +1,22 @@
 #!/usr/bin/env python3
 """
 Rate Limiting 미들웨어
-IP별 분당 요청 수 제한 및 보안 로깅
+IP별 분당 요청 수 제한 (GCRA, IP당 O(1) 상태) 및 보안 로깅
 """
 
 import os
+import math
 import time
 import logging
 import asyncio
-from collections import defaultdict, deque
-from datetime import datetime, timedelta
-from typing import Dict, Set
+from typing import Dict, Optional, Set
 from fastapi import Request, HTTPException
 from fastapi.responses import JSONResponse
 import json
 
+from ..security_logger import event_index, get_pipeline_stats, log_security_event
+from .gcra import GCRARateLimiter, create_store
+
 
 class RateLimiter:
     """IP별 Rate Limiting 및 보안 로깅 클래스"""
@@ -23,45 +25,41 @@ class RateLimiter:
         self,
         requests_per_minute: int = 100,
         cleanup_interval: int = 300,  # 5분마다 정리
-        log_file: str = "logs/security.log"
+        log_file: str = "logs/security.log",
+        storage_url: Optional[str] = None
     ):
         self.requests_per_minute = requests_per_minute
         self.cleanup_interval = cleanup_interval
         self.log_file = log_file
 
-        # IP별 요청 시간 기록 (deque로 효율적 관리)
-        self.ip_requests: Dict[str, deque] = defaultdict(deque)
+        # IP별 GCRA 상태 (TAT 하나). 저장소 미지정 시 MCP_RATE_LIMIT_STORAGE 환경 변수 → 프로세스 메모리
+        # 예: sqlite:///data/rate_limit.db, redis://localhost:6379/0 (여러 워커가 같은 한도 공유)
+        self.limiter = GCRARateLimiter(
+            requests_per_minute, 60.0,
+            store=create_store(storage_url or os.getenv("MCP_RATE_LIMIT_STORAGE"))
+        )
 
         # 차단된 IP 목록 (메모리 내 관리)
         self.blocked_ips: Set[str] = set()
 
+        # 로거 설정 (화이트리스트 로드 실패도 기록하므로 먼저 설정)
+        self._setup_logger()
+
         # 화이트리스트 (설정 파일에서 로드)
         self.whitelist_ips: Set[str] = self._load_whitelist()
 
         # 마지막 정리 시간
         self.last_cleanup = time.time()
 
-        # 로거 설정
-        self._setup_logger()
-
     def _setup_logger(self):
-        """보안 로그 설정"""
-        # logs 디렉토리 생성
-        os.makedirs(os.path.dirname(self.log_file), exist_ok=True)
-
-        # 보안 로거 생성
-        self.security_logger = logging.getLogger('security')
-        self.security_logger.setLevel(logging.INFO)
-
-        # 파일 핸들러 (중복 방지)
-        if not self.security_logger.handlers:
-            file_handler = logging.FileHandler(self.log_file, encoding='utf-8')
-            formatter = logging.Formatter(
-                '%(asctime)s - %(levelname)s - %(message)s',
-                datefmt='%Y-%m-%d %H:%M:%S'
-            )
-            file_handler.setFormatter(formatter)
-            self.security_logger.addHandler(file_handler)
+        """보안 로그 설정
+
+        'security' 로거는 mcp.security_logger의 비동기 배치 파이프라인에 연결되어 있으며,
+        이 인스턴스의 기록은 log_file로 보냅니다.
+        """
+        self.security_logger = logging.LoggerAdapter(
+            logging.getLogger('security'), {'log_path': self.log_file}
+        )
 
     def _load_whitelist(self) -> Set[str]:
         """화이트리스트 IP 로드"""
@@ -79,28 +77,34 @@ class RateLimiter:
         return default_whitelist
 
     def _cleanup_old_requests(self):
-        """오래된 요청 기록 정리"""
+        """만료된 IP 상태 일괄 정리 (관리용)
+
+        요청 경로에서는 저장소가 접근 시마다 만료 항목을 조금씩 지우므로 호출하지 않습니다.
+        """
         current_time = time.time()
 
         # 정리 주기 확인
         if current_time - self.last_cleanup < self.cleanup_interval:
             return
 
-        cutoff_time = current_time - 60  # 1분 전
+        self.limiter.purge_expired()
+        self.last_cleanup = current_time
 
-        # 각 IP별로 오래된 요청 제거
-        for ip in list(self.ip_requests.keys()):
-            requests = self.ip_requests[ip]
+    def current_requests(self, client_ip: str) -> int:
+        """최근 1분 한도 중 사용한 요청 수"""
+        return self.limiter.peek(client_ip).used
 
-            # 1분 이전 요청들 제거
-            while requests and requests[0] < cutoff_time:
-                requests.popleft()
+    def remaining_requests(self, client_ip: str) -> int:
+        """지금 추가로 허용되는 요청 수"""
+        return self.limiter.peek(client_ip).remaining
 
-            # 빈 큐는 삭제
-            if not requests:
-                del self.ip_requests[ip]
+    def retry_after(self, client_ip: str) -> float:
+        """다음 요청이 허용되기까지 남은 시간 (초)"""
+        return self.limiter.peek(client_ip).retry_after
 
-        self.last_cleanup = current_time
+    def tracked_clients(self) -> Optional[int]:
+        """상태를 보관 중인 IP 수 (Redis 저장소는 None)"""
+        return self.limiter.tracked_keys()
 
     def _get_client_ip(self, request: Request) -> str:
         """클라이언트 IP 추출"""
@@ -119,33 +123,18 @@ class RateLimiter:
     def is_rate_limited(self, request: Request) -> bool:
         """Rate Limit 확인"""
         client_ip = self._get_client_ip(request)
-        current_time = time.time()
 
         # 화이트리스트 확인
         if client_ip in self.whitelist_ips:
             return False
 
-        # 정리 작업 수행
-        self._cleanup_old_requests()
-
-        # 현재 IP의 요청 기록
-        requests = self.ip_requests[client_ip]
-
-        # 1분 이전 요청들 제거
-        cutoff_time = current_time - 60
-        while requests and requests[0] < cutoff_time:
-            requests.popleft()
-
-        # 현재 요청 추가
-        requests.append(current_time)
-
-        # Rate Limit 확인
-        if len(requests) > self.requests_per_minute:
+        # Rate Limit 확인 (거절된 요청은 한도를 소모하지 않음)
+        if not self.limiter.allow(client_ip):
             # 차단된 IP에 추가
             self.blocked_ips.add(client_ip)
 
-            # 보안 로그 기록
-            self._log_rate_limit_violation(client_ip, len(requests), request)
+            # 보안 로그 기록 (한도를 넘긴 이번 요청까지 포함한 건수)
+            self._log_rate_limit_violation(client_ip, self.current_requests(client_ip) + 1, request)
 
             return True
 
@@ -156,22 +145,20 @@ class RateLimiter:
         user_agent = request.headers.get('User-Agent', 'Unknown')
         endpoint = f"{request.method} {request.url.path}"
 
-        log_data = {
-            'event': 'RATE_LIMIT_EXCEEDED',
-            'client_ip': client_ip,
-            'request_count': request_count,
-            'limit': self.requests_per_minute,
-            'endpoint': endpoint,
-            'user_agent': user_agent,
-            'timestamp': datetime.now().isoformat()
-        }
-
-        # 보안 로그 기록
-        self.security_logger.warning(
+        # 보안 로그 기록 (큐에 넣기만 하므로 요청 경로에서 디스크를 기다리지 않음)
+        log_security_event(
+            'RATE_LIMIT_EXCEEDED',
             f"Rate limit exceeded - IP: {client_ip}, "
             f"Requests: {request_count}/{self.requests_per_minute}, "
             f"Endpoint: {endpoint}, "
-            f"User-Agent: {user_agent}"
+            f"User-Agent: {user_agent}",
+            level=logging.WARNING,
+            log_path=self.log_file,
+            client_ip=client_ip,
+            request_count=request_count,
+            limit=self.requests_per_minute,
+            endpoint=endpoint,
+            user_agent=user_agent
         )
 
         # 비동기 알림 전송 (백그라운드에서 실행)
@@ -200,13 +187,16 @@ class RateLimiter:
             self.security_logger.error(f"Failed to send IP blocked alert: {e}")
 
     def get_blocked_ips_summary(self) -> Dict:
-        """차단된 IP 요약 정보"""
+        """차단된 IP 요약 정보 (IP별 위반 건수는 메모리 카운터에서 조회, 로그 파일을 읽지 않음)"""
         return {
             'blocked_count': len(self.blocked_ips),
             'blocked_ips': list(self.blocked_ips),
+            'violations_by_ip': {
+                ip: event_index.count('RATE_LIMIT_EXCEEDED', ip) for ip in self.blocked_ips
+            },
             'whitelist_count': len(self.whitelist_ips),
             'requests_per_minute_limit': self.requests_per_minute,
-            'current_monitored_ips': len(self.ip_requests)
+            'current_monitored_ips': self.tracked_clients()
         }
 
     def add_to_whitelist(self, ip: str) -> bool:
@@ -252,15 +242,16 @@ async def rate_limit_middleware(request: Request, call_next):
 
     # Rate Limit 확인
     if rate_limiter.is_rate_limited(request):
+        retry_after = max(1, math.ceil(rate_limiter.retry_after(rate_limiter._get_client_ip(request))))
         return JSONResponse(
             status_code=429,
             content={
                 "error": "Too Many Requests",
                 "message": "요청 횟수가 제한을 초과했습니다. 잠시 후 다시 시도해주세요.",
-                "retry_after": 60
+                "retry_after": retry_after
             },
             headers={
-                "Retry-After": "60",
+                "Retry-After": str(retry_after),
                 "X-RateLimit-Limit": str(rate_limiter.requests_per_minute),
                 "X-RateLimit-Remaining": "0"
             }
@@ -272,18 +263,19 @@ async def rate_limit_middleware(request: Request, call_next):
     # Rate Limit 헤더 추가
     client_ip = rate_limiter._get_client_ip(request)
     if client_ip not in rate_limiter.whitelist_ips:
-        current_requests = len(rate_limiter.ip_requests.get(client_ip, []))
-        remaining = max(0, rate_limiter.requests_per_minute - current_requests)
-
         response.headers["X-RateLimit-Limit"] = str(rate_limiter.requests_per_minute)
-        response.headers["X-RateLimit-Remaining"] = str(remaining)
+        response.headers["X-RateLimit-Remaining"] = str(rate_limiter.remaining_requests(client_ip))
 
     return response
 
 
 def get_security_stats() -> Dict:
-    """보안 통계 API용 함수"""
-    return rate_limiter.get_blocked_ips_summary()
+    """보안 통계 API용 함수 (프로세스 전체 보안 이벤트 카운터와 로그 파이프라인 상태 포함)"""
+    return {
+        **rate_limiter.get_blocked_ips_summary(),
+        'security_events': event_index.snapshot(),
+        'log_pipeline': get_pipeline_stats()
+    }
 
 
 def add_ip_to_whitelist(ip: str) -> bool:
@@ -7,6 +7,7 @@
 주요 기능:
 - CSV/JSON 시계열 데이터를 이용한 백테스트 실행
 - Z-score 임계값, EWMA 알파, 윈도우 크기 등 파라미터 그리드 서치
+  (알파별 EWMA를 열로 쌓은 2차원 배열로 임계값 전체를 한 번에 평가, 윈도우 크기별로 프로세스 분산)
 - 재현율(Recall), 정밀도(Precision), F1 점수, 알림량 등 성능 지표 계산
 - 과탐지율, 미탐지율 분석 및 최적 파라미터 추천
 - Markdown/JSON 형식 리포트 생성
@@ -27,6 +28,7 @@ import logging
 import os
 import sys
 import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Any, Tuple, Optional, Union
@@ -34,6 +36,9 @@ from typing import Dict, List, Any, Tuple, Optional, Union
 import numpy as np
 import pandas as pd
 from dataclasses import dataclass, asdict
+from multiprocessing import shared_memory
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
 
 # 프로젝트 루트 경로 추가
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -52,6 +57,11 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 이 포인트 수 이상이면 윈도우 크기별 평가를 프로세스 풀로 분산 (작은 데이터는 프로세스 기동 비용이 더 큼)
+PARALLEL_MIN_POINTS = 100_000
+# 롤링 통계 계산 시 한 번에 처리할 행 수 (중간 배열 메모리 상한)
+CHUNK_ROWS = 1 << 15
+
 @dataclass
 class BacktestConfig:
     """백테스트 설정"""
@@ -62,6 +72,7 @@ class BacktestConfig:
     output_file: Optional[str] = None
     dry_run: bool = False
     verbose: bool = False
+    workers: Optional[int] = None  # None: 데이터 크기에 따라 자동, 1: 단일 프로세스
 
 @dataclass
 class ParameterSet:
@@ -96,6 +107,74 @@ class BacktestSummary:
     recommendation: str
     performance_matrix: List[BacktestResult]
 
+def ewma_matrix(values: np.ndarray, alphas: List[float]) -> np.ndarray:
+    """알파별 EWMA를 열로 쌓은 2차원 배열 (포인트 수 x 알파 수)
+
+    ewma[0] = values[0], ewma[i] = a * values[i] + (1 - a) * ewma[i-1] 점화식을
+    알파마다 lfilter(C 구현) 한 번으로 계산합니다.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    ewma = np.empty((len(values), len(alphas)))
+    if len(values) == 0:
+        return ewma
+    ewma[0] = values[0]
+    for col, alpha in enumerate(alphas):
+        ewma[1:, col], _ = lfilter([alpha], [1.0, alpha - 1.0], values[1:], zi=[(1 - alpha) * values[0]])
+    return ewma
+
+def window_counts(ewma: np.ndarray, truth: np.ndarray, window_size: int,
+                  thresholds: List[float], chunk_rows: int = CHUNK_ROWS) -> Tuple[np.ndarray, np.ndarray]:
+    """한 윈도우 크기에 대해 모든 (임계값, 알파) 조합의 알림 수와 적중 수를 한 번에 계산
+
+    직전 window_size개 EWMA의 평균/표준편차로 현재 EWMA의 Z-score를 구하고
+    (표준편차 0이면 탐지 안 함), 임계값 축으로 브로드캐스트해 비교합니다.
+
+    Returns:
+        (alerts, hits): 각각 (임계값 수 x 알파 수) 정수 배열
+    """
+    n, columns = ewma.shape
+    alerts = np.zeros((len(thresholds), columns), dtype=np.int64)
+    hits = np.zeros_like(alerts)
+    if n <= window_size:
+        return alerts, hits
+
+    threshold_axis = np.asarray(thresholds, dtype=np.float64)[:, None, None]
+    windows = sliding_window_view(ewma, window_size, axis=0)  # windows[j] = ewma[j:j+window_size].T
+
+    for start in range(window_size, n, chunk_rows):
+        stop = min(start + chunk_rows, n)
+        block = np.ascontiguousarray(windows[start - window_size:stop - window_size])
+        mean = block.mean(axis=-1)
+        std = block.std(axis=-1)
+
+        z_scores = np.full_like(mean, -np.inf)
+        np.divide(np.abs(ewma[start:stop] - mean), std, out=z_scores, where=std > 0)
+
+        flagged = z_scores[None] >= threshold_axis  # (임계값, 행, 알파)
+        alerts += flagged.sum(axis=1)
+        hits += (flagged & truth[start:stop, None]).sum(axis=1)
+
+    return alerts, hits
+
+def _attach_shared(spec: Tuple[str, Tuple[int, ...], str]) -> Tuple[shared_memory.SharedMemory, np.ndarray]:
+    name, shape, dtype = spec
+    block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+def _shared_window_counts(ewma_spec: Tuple[str, Tuple[int, ...], str],
+                          truth_spec: Tuple[str, Tuple[int, ...], str],
+                          window_size: int, columns: List[int],
+                          thresholds: List[float]) -> Tuple[np.ndarray, np.ndarray]:
+    """워커 프로세스: 공유 메모리의 EWMA/라벨을 복사 없이 붙여 window_counts 실행"""
+    ewma_block, ewma = _attach_shared(ewma_spec)
+    truth_block, truth = _attach_shared(truth_spec)
+    try:
+        return window_counts(ewma[:, columns], truth, window_size, thresholds)
+    finally:
+        del ewma, truth
+        ewma_block.close()
+        truth_block.close()
+
 class AnomalyBacktester:
     """이상탐지 백테스트 실행기"""
 
@@ -273,17 +352,11 @@ class AnomalyBacktester:
             parameter_grid = self.get_parameter_grid()
             self.logger.info(f"📊 파라미터 조합 {len(parameter_grid)}개로 백테스트 시작")
 
-            results = []
+            results = self._evaluate_grid(parameter_grid)
             best_result = None
             best_f1 = 0.0
 
-            for i, params in enumerate(parameter_grid, 1):
-                if self.config.verbose:
-                    self.logger.info(f"진행상황: {i}/{len(parameter_grid)} - {params}")
-
-                result = self._test_parameters(params)
-                results.append(result)
-
+            for result in results:
                 if result.f1_score > best_f1:
                     best_f1 = result.f1_score
                     best_result = result
@@ -313,78 +386,118 @@ class AnomalyBacktester:
 
     def _test_parameters(self, params: ParameterSet) -> BacktestResult:
         """개별 파라미터 세트 테스트"""
+        return self._evaluate_grid([params])[0]
+
+    def _resolve_workers(self, data_points: int, tasks: int) -> int:
+        """사용할 워커 프로세스 수 (설정값 또는 데이터 크기 기준 자동)"""
+        workers = self.config.workers
+        if workers is None:
+            workers = (os.cpu_count() or 1) if data_points >= PARALLEL_MIN_POINTS else 1
+        return max(1, min(workers, tasks))
+
+    def _evaluate_grid(self, parameter_grid: List[ParameterSet]) -> List[BacktestResult]:
+        """파라미터 그리드 전체 평가
+
+        - 고유 알파마다 EWMA를 한 번만 계산해 (포인트 x 알파) 배열로 묶고
+        - 윈도우 크기별로 모든 임계값 x 알파 조합의 알림/적중 수를 한 패스에 계산
+        - 윈도우(와 알파 열 묶음) 단위 작업은 공유 메모리 입력으로 프로세스 풀에 분산
+        forecast_days는 탐지 결과에 영향이 없으므로 같은 (임계값, 윈도우, 알파) 결과를 공유합니다.
+        """
         start_time = time.time()
+        values = np.asarray(self.data['values'], dtype=np.float64)
+        truth = np.asarray(self.ground_truth, dtype=bool)
+
+        alphas = sorted({params.ewma_alpha for params in parameter_grid})
+        thresholds = sorted({params.threshold for params in parameter_grid})
+        window_sizes = sorted({params.window_size for params in parameter_grid})
+        ewma = ewma_matrix(values, alphas)
+
+        # 병렬이면 (윈도우, 알파 열) 단위, 단일 프로세스면 윈도우당 전체 알파 열을 한 작업으로
+        workers = self._resolve_workers(len(values), len(window_sizes) * len(alphas))
+        if workers == 1:
+            tasks = [(window_size, list(range(len(alphas)))) for window_size in window_sizes]
+        else:
+            tasks = [(window_size, [col]) for window_size in window_sizes for col in range(len(alphas))]
 
+        counts = {}
+        if workers == 1:
+            for window_size, columns in tasks:
+                counts[window_size, tuple(columns)] = window_counts(ewma, truth, window_size, thresholds)
+        else:
+            counts = self._run_shards(ewma, truth, tasks, thresholds, workers)
+
+        alerts = np.zeros((len(window_sizes), len(thresholds), len(alphas)), dtype=np.int64)
+        hits = np.zeros_like(alerts)
+        for (window_size, columns), (task_alerts, task_hits) in counts.items():
+            w_idx = window_sizes.index(window_size)
+            alerts[w_idx][:, list(columns)] = task_alerts
+            hits[w_idx][:, list(columns)] = task_hits
+
+        per_combination = (time.time() - start_time) / max(len(parameter_grid), 1)
+        total_actual = int(truth.sum())
+        results = []
+        for params in parameter_grid:
+            index = (window_sizes.index(params.window_size),
+                     thresholds.index(params.threshold),
+                     alphas.index(params.ewma_alpha))
+            results.append(self._build_result(params, int(alerts[index]), int(hits[index]),
+                                              len(values), total_actual, per_combination))
+
+        if self.config.verbose:
+            self.logger.info(f"그리드 평가: 알파 {len(alphas)}개 x 윈도우 {len(window_sizes)}개 x "
+                             f"임계값 {len(thresholds)}개, 워커 {workers}개, {time.time() - start_time:.2f}초")
+        return results
+
+    def _run_shards(self, ewma: np.ndarray, truth: np.ndarray, tasks: List[Tuple[int, List[int]]],
+                    thresholds: List[float], workers: int) -> Dict[Tuple[int, Tuple[int, ...]], Tuple[np.ndarray, np.ndarray]]:
+        """EWMA 배열과 라벨을 공유 메모리에 한 번 올리고 작업을 워커에 분배"""
+        blocks = []
         try:
-            # 간단한 이상탐지 시뮬레이션
-            values = np.array(self.data['values'])
-            detected_anomalies = []
-
-            # EWMA 적용
-            ewma = np.zeros_like(values)
-            ewma[0] = values[0]
-            for i in range(1, len(values)):
-                ewma[i] = params.ewma_alpha * values[i] + (1 - params.ewma_alpha) * ewma[i-1]
-
-            # 롤링 윈도우로 이상탐지
-            for i in range(params.window_size, len(values)):
-                window_data = ewma[i-params.window_size:i]
-                mean_val = np.mean(window_data)
-                std_val = np.std(window_data)
-
-                if std_val > 0:
-                    z_score = abs((ewma[i] - mean_val) / std_val)
-                    if z_score >= params.threshold:
-                        detected_anomalies.append(i)
-
-            # 성능 지표 계산
-            predicted = [False] * len(values)
-            for idx in detected_anomalies:
-                predicted[idx] = True
-
-            precision, recall, f1_score = self._calculate_metrics(self.ground_truth, predicted)
-
-            # 추가 지표
-            false_positives = sum(1 for i, (true, pred) in enumerate(zip(self.ground_truth, predicted))
-                                if pred and not true)
-            false_negatives = sum(1 for i, (true, pred) in enumerate(zip(self.ground_truth, predicted))
-                                if true and not pred)
-
-            total_predicted = sum(predicted)
-            total_actual = sum(self.ground_truth)
-
-            false_positive_rate = false_positives / (len(values) - total_actual) if (len(values) - total_actual) > 0 else 0
-            false_negative_rate = false_negatives / total_actual if total_actual > 0 else 0
-
-            execution_time = time.time() - start_time
-
-            return BacktestResult(
-                parameters=params,
-                precision=precision,
-                recall=recall,
-                f1_score=f1_score,
-                total_alerts=total_predicted,
-                false_positive_rate=false_positive_rate,
-                false_negative_rate=false_negative_rate,
-                execution_time=execution_time,
-                detected_anomalies=len(detected_anomalies),
-                missed_anomalies=false_negatives
-            )
+            specs = []
+            for array in (ewma, truth):
+                block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                blocks.append(block)
+                np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+                specs.append((block.name, array.shape, array.dtype.str))
+
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    (window_size, tuple(columns)): executor.submit(
+                        _shared_window_counts, specs[0], specs[1], window_size, columns, thresholds
+                    )
+                    for window_size, columns in tasks
+                }
+                return {key: future.result() for key, future in futures.items()}
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+    def _build_result(self, params: ParameterSet, total_predicted: int, true_positives: int,
+                      data_points: int, total_actual: int, execution_time: float) -> BacktestResult:
+        """알림/적중 수로부터 성능 지표 계산"""
+        false_positives = total_predicted - true_positives
+        false_negatives = total_actual - true_positives
+
+        precision = true_positives / total_predicted if total_predicted > 0 else 0
+        recall = true_positives / total_actual if total_actual > 0 else 0
+        f1_score = 2 * (precision * recall) / (precision + recall) if (precision + recall) > 0 else 0
 
-        except Exception as e:
-            self.logger.warning(f"파라미터 테스트 실패 {params}: {e}")
-            return BacktestResult(
-                parameters=params,
-                precision=0.0,
-                recall=0.0,
-                f1_score=0.0,
-                total_alerts=0,
-                false_positive_rate=1.0,
-                false_negative_rate=1.0,
-                execution_time=time.time() - start_time,
-                detected_anomalies=0,
-                missed_anomalies=sum(self.ground_truth)
-            )
+        false_positive_rate = false_positives / (data_points - total_actual) if (data_points - total_actual) > 0 else 0
+        false_negative_rate = false_negatives / total_actual if total_actual > 0 else 0
+
+        return BacktestResult(
+            parameters=params,
+            precision=precision,
+            recall=recall,
+            f1_score=f1_score,
+            total_alerts=total_predicted,
+            false_positive_rate=false_positive_rate,
+            false_negative_rate=false_negative_rate,
+            execution_time=execution_time,
+            detected_anomalies=total_predicted,
+            missed_anomalies=false_negatives
+        )
 
     def _calculate_metrics(self, y_true: List[bool], y_pred: List[bool]) -> Tuple[float, float, float]:
         """정밀도, 재현율, F1 점수 계산"""
@@ -664,6 +777,7 @@ def main():
     parser.add_argument('--both', action='store_true', help='JSON과 Markdown 모두 출력')
     parser.add_argument('--dry-run', action='store_true', help='파일을 생성하지 않고 결과만 출력')
     parser.add_argument('--verbose', '-v', action='store_true', help='상세 출력')
+    parser.add_argument('--workers', type=int, help='그리드 평가 워커 프로세스 수 (기본값: 데이터 크기에 따라 자동)')
     parser.add_argument('--sample', action='store_true', help='샘플 데이터 생성 후 종료')
 
     args = parser.parse_args()
@@ -695,7 +809,8 @@ def main():
         output_format=output_format,
         output_file=args.output_file,
         dry_run=args.dry_run,
-        verbose=args.verbose
+        verbose=args.verbose,
+        workers=args.workers
     )
 
     try:
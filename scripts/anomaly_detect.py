@@ -41,17 +41,29 @@ from sklearn.metrics import mean_squared_error, mean_absolute_error
 warnings.filterwarnings('ignore', category=FutureWarning)
 warnings.filterwarnings('ignore', category=UserWarning)
 
-# 로깅 설정 (한국어 메시지)
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('/tmp/anomaly_detect.log', encoding='utf-8')
-    ]
-)
+# 로깅 (핸들러 설정은 CLI 실행 시에만 - API 프로세스에 상주할 때 전역 로깅을 건드리지 않음)
 logger = logging.getLogger(__name__)
 
+# 이상치 심각도 구간: (|z| 하한, 심각도), 높은 심각도부터 - 미만이면 'low'
+# 단건 분류(_classify_anomaly_severity)와 벡터 채점(score_anomalies)이 함께 사용
+SEVERITY_THRESHOLDS = (
+    (5.0, 'critical'),  # 매우 드문 사건 (0.0001% 확률)
+    (4.0, 'high'),      # 드문 사건 (0.01% 확률)
+    (3.5, 'medium'),    # 일반적이지 않은 사건 (0.05% 확률)
+)
+DEFAULT_SEVERITY = 'low'  # 비교적 흔한 이상치 (0.3% 확률)
+
+def _configure_logging():
+    """CLI 실행용 로깅 설정 (한국어 메시지)"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.StreamHandler(sys.stdout),
+            logging.FileHandler('/tmp/anomaly_detect.log', encoding='utf-8')
+        ]
+    )
+
 class AnomalyDetector:
     """
     이상탐지 및 예측 분석 엔진 (한국어 주석 포함)
@@ -92,7 +104,8 @@ class AnomalyDetector:
     def load_metric_sources(self,
                            metrics_dir: str = "reports/metrics",
                            logs_dir: str = "logs",
-                           ci_reports_dir: str = "reports/ci_reports") -> Dict[str, pd.DataFrame]:
+                           ci_reports_dir: str = "reports/ci_reports",
+                           file_mtimes: Optional[Dict[str, float]] = None) -> Dict[str, pd.DataFrame]:
         """
         다양한 소스에서 메트릭 데이터를 로드하고 통합
 
@@ -100,19 +113,29 @@ class AnomalyDetector:
             metrics_dir: 메트릭 JSON 파일들이 있는 디렉토리
             logs_dir: 로그 파일들이 있는 디렉토리
             ci_reports_dir: CI 리포트 JSON 파일들이 있는 디렉토리
+            file_mtimes: 파일별 마지막 수정 시각 (지정 시 변경된 파일만 로드하고 갱신, 증분 모드)
 
         Returns:
-            Dict[str, pd.DataFrame]: 지표명별 시계열 데이터
+            Dict[str, pd.DataFrame]: 지표명별 시계열 데이터 (증분 모드에서는 변경된 소스만)
         """
         logger.info("📊 메트릭 데이터 소스 로딩 시작")
 
         all_data = {}
 
+        def changed(path: Path) -> bool:
+            if file_mtimes is None:
+                return True
+            mtime = path.stat().st_mtime
+            if file_mtimes.get(str(path)) == mtime:
+                return False
+            file_mtimes[str(path)] = mtime
+            return True
+
         try:
             # 1. 메트릭 JSON 파일들 처리
             metrics_path = Path(metrics_dir)
             if metrics_path.exists():
-                for json_file in metrics_path.glob("*.json"):
+                for json_file in filter(changed, metrics_path.glob("*.json")):
                     try:
                         with open(json_file, 'r', encoding='utf-8') as f:
                             data = json.load(f)
@@ -129,7 +152,7 @@ class AnomalyDetector:
             # 2. 로그 파일들에서 수치 메트릭 추출
             logs_path = Path(logs_dir)
             if logs_path.exists():
-                for log_file in logs_path.glob("*.log"):
+                for log_file in filter(changed, logs_path.glob("*.log")):
                     try:
                         df = self._parse_log_file(log_file)
                         if df is not None and not df.empty:
@@ -142,7 +165,7 @@ class AnomalyDetector:
             # 3. CI 리포트 JSON 파일들 처리
             ci_path = Path(ci_reports_dir)
             if ci_path.exists():
-                for ci_file in ci_path.glob("*.json"):
+                for ci_file in filter(changed, ci_path.glob("*.json")):
                     try:
                         with open(ci_file, 'r', encoding='utf-8') as f:
                             data = json.load(f)
@@ -156,7 +179,10 @@ class AnomalyDetector:
                         logger.warning(f"⚠️ CI 리포트 로드 실패: {ci_file.name} - {str(e)}")
 
             logger.info(f"📊 총 {len(all_data)}개 데이터 소스 로드 완료")
-            self.metrics_data = all_data
+            if file_mtimes is None:
+                self.metrics_data = all_data
+            else:
+                self.metrics_data.update(all_data)
             return all_data
 
         except Exception as e:
@@ -361,7 +387,7 @@ class AnomalyDetector:
 
         return None
 
-    def preprocess_data(self) -> Dict[str, pd.DataFrame]:
+    def preprocess_data(self, metrics_data: Optional[Dict[str, pd.DataFrame]] = None) -> Dict[str, pd.DataFrame]:
         """
         로드된 메트릭 데이터를 전처리
 
@@ -371,6 +397,9 @@ class AnomalyDetector:
         3. EWMA 스무딩 적용
         4. 표준화 (Z-score 계산용)
 
+        Args:
+            metrics_data: 전처리할 소스별 데이터 (기본값: 로드된 전체 데이터)
+
         Returns:
             Dict[str, pd.DataFrame]: 전처리된 메트릭 데이터
         """
@@ -378,14 +407,13 @@ class AnomalyDetector:
 
         processed_data = {}
 
-        for source_name, df in self.metrics_data.items():
+        for source_name, df in (self.metrics_data if metrics_data is None else metrics_data).items():
             try:
                 if df.empty:
                     continue
 
-                # 메트릭별로 그룹화하여 처리
-                for metric_name in df['metric'].unique():
-                    metric_df = df[df['metric'] == metric_name].copy()
+                # 메트릭별로 그룹화하여 처리 (한 번의 groupby로 분할)
+                for metric_name, metric_df in df.groupby('metric', sort=False):
                     metric_df = metric_df.sort_values('timestamp')
 
                     # 1. 누락값 처리 (선형 보간)
@@ -442,22 +470,7 @@ class AnomalyDetector:
 
         for metric_name, df in processed_data.items():
             try:
-                metric_anomalies = []
-
-                # Z-score 기반 이상치 탐지
-                anomaly_mask = np.abs(df['z_score']) > self.threshold
-                anomaly_points = df[anomaly_mask]
-
-                for idx, row in anomaly_points.iterrows():
-                    anomaly = {
-                        'timestamp': row['timestamp'].isoformat(),
-                        'value': float(row['value']),
-                        'ewma': float(row['ewma']),
-                        'z_score': float(row['z_score']),
-                        'severity': self._classify_anomaly_severity(abs(row['z_score'])),
-                        'direction': 'increase' if row['z_score'] > 0 else 'decrease'
-                    }
-                    metric_anomalies.append(anomaly)
+                metric_anomalies = self.score_anomalies(df)
 
                 if metric_anomalies:
                     anomalies[metric_name] = metric_anomalies
@@ -472,6 +485,33 @@ class AnomalyDetector:
 
         return anomalies
 
+    def score_anomalies(self, df: pd.DataFrame) -> List[Dict]:
+        """
+        전처리된 메트릭 프레임 전체를 벡터 연산으로 채점 (백필용)
+
+        Args:
+            df: timestamp, value, ewma, z_score 컬럼을 가진 데이터
+
+        Returns:
+            List[Dict]: |z| > threshold 인 이상치 레코드 (시간순)
+        """
+        points = df.loc[np.abs(df['z_score']) > self.threshold, ['timestamp', 'value', 'ewma', 'z_score']]
+        if points.empty:
+            return []
+
+        z_scores = points['z_score'].to_numpy(dtype=float)
+        abs_z = np.abs(z_scores)
+        scored = pd.DataFrame({
+            'timestamp': pd.to_datetime(points['timestamp']).map(pd.Timestamp.isoformat).to_numpy(),
+            'value': points['value'].to_numpy(dtype=float),
+            'ewma': points['ewma'].to_numpy(dtype=float),
+            'z_score': z_scores,
+            'severity': np.select([abs_z >= bound for bound, _ in SEVERITY_THRESHOLDS],
+                                  [severity for _, severity in SEVERITY_THRESHOLDS], DEFAULT_SEVERITY),
+            'direction': np.where(z_scores > 0, 'increase', 'decrease')
+        })
+        return scored.to_dict('records')
+
     def _classify_anomaly_severity(self, abs_z_score: float) -> str:
         """
         Z-score 절댓값에 따른 이상치 심각도 분류
@@ -482,14 +522,10 @@ class AnomalyDetector:
         Returns:
             str: 심각도 ('low', 'medium', 'high', 'critical')
         """
-        if abs_z_score >= 5.0:
-            return 'critical'  # 매우 드문 사건 (0.0001% 확률)
-        elif abs_z_score >= 4.0:
-            return 'high'      # 드문 사건 (0.01% 확률)
-        elif abs_z_score >= 3.5:
-            return 'medium'    # 일반적이지 않은 사건 (0.05% 확률)
-        else:
-            return 'low'       # 비교적 흔한 이상치 (0.3% 확률)
+        for bound, severity in SEVERITY_THRESHOLDS:
+            if abs_z_score >= bound:
+                return severity
+        return DEFAULT_SEVERITY
 
     def generate_forecasts(self, processed_data: Dict[str, pd.DataFrame]) -> Dict[str, Dict]:
         """
@@ -602,8 +638,8 @@ class AnomalyDetector:
 
             for point in forecast_points:
                 # 신뢰구간 상한/하한이 임계치를 넘을 확률 계산
-                upper_risk = point['upper_bound'] > upper_threshold
-                lower_risk = point['lower_bound'] < lower_threshold
+                upper_risk = bool(point['upper_bound'] > upper_threshold)
+                lower_risk = bool(point['lower_bound'] < lower_threshold)
 
                 if upper_risk or lower_risk:
                     risk_type = []
@@ -615,7 +651,7 @@ class AnomalyDetector:
                     risk_periods.append({
                         'date': point['date'],
                         'risk_type': risk_type,
-                        'risk_probability': min(0.95, abs(point['predicted_value'] - recent_mean) / (recent_std * self.threshold)),
+                        'risk_probability': float(min(0.95, abs(point['predicted_value'] - recent_mean) / (recent_std * self.threshold))),
                         'predicted_value': point['predicted_value'],
                         'threshold_exceeded': upper_risk or lower_risk
                     })
@@ -1003,6 +1039,7 @@ def main():
                        help='출력 파일 경로 (지정하지 않으면 stdout)')
 
     args = parser.parse_args()
+    _configure_logging()
 
     # 로깅 레벨 설정
     if args.verbose:
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+⏱️ 이상탐지 백테스트 그리드 평가 벤치마크 (한국어 주석 포함)
+
+1년치 분 단위 데이터(525,600 포인트)로 다음을 비교합니다:
+- 기존 구현: 조합마다 Python 루프로 EWMA와 롤링 윈도우를 다시 계산하며 그리드를 순차 평가
+- 벡터화 구현: (포인트 x 알파) 2차원 EWMA 배열로 임계값 전체를 한 패스에 평가 (단일 프로세스)
+- 벡터화 + 프로세스 분산: 공유 메모리 입력으로 윈도우/알파 단위 작업을 워커에 분배
+
+기존 구현은 조합당 수 초가 걸리므로 기본적으로 일부 조합만 실행해 조합당 평균으로
+전체 그리드 시간을 추정하고, 같은 조합의 결과가 새 구현과 일치하는지도 확인합니다.
+
+사용법:
+    python scripts/benchmark_anomaly_backtest.py
+    python scripts/benchmark_anomaly_backtest.py --grid comprehensive --legacy-samples 3
+    python scripts/benchmark_anomaly_backtest.py --points 100000 --legacy-samples 0 --json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Tuple
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from scripts.anomaly_backtest import AnomalyBacktester, BacktestConfig, ParameterSet
+
+MINUTES_PER_YEAR = 365 * 24 * 60
+
+
+def generate_minute_series(points: int = MINUTES_PER_YEAR, seed: int = 42) -> Tuple[np.ndarray, np.ndarray]:
+    """일/주 주기 + 노이즈 + 0.5% 스파이크 이상치를 가진 분 단위 시계열"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(points)
+    values = (50 + 20 * np.sin(2 * np.pi * t / 1440) + 5 * np.sin(2 * np.pi * t / 10080)
+              + rng.normal(0, 3, points))
+    labels = np.zeros(points, dtype=bool)
+    anomaly_indices = rng.choice(points, size=points // 200, replace=False)
+    values[anomaly_indices] += rng.choice([-1, 1], len(anomaly_indices)) * rng.uniform(20, 40, len(anomaly_indices))
+    labels[anomaly_indices] = True
+    return values, labels
+
+
+def legacy_counts(values: np.ndarray, labels: np.ndarray, params: ParameterSet) -> Tuple[int, int]:
+    """기존 _test_parameters의 탐지 루프 (비교 기준), (알림 수, 적중 수) 반환"""
+    ewma = np.zeros_like(values)
+    ewma[0] = values[0]
+    for i in range(1, len(values)):
+        ewma[i] = params.ewma_alpha * values[i] + (1 - params.ewma_alpha) * ewma[i-1]
+
+    detected = []
+    for i in range(params.window_size, len(values)):
+        window_data = ewma[i-params.window_size:i]
+        mean_val = np.mean(window_data)
+        std_val = np.std(window_data)
+
+        if std_val > 0:
+            z_score = abs((ewma[i] - mean_val) / std_val)
+            if z_score >= params.threshold:
+                detected.append(i)
+
+    return len(detected), int(labels[detected].sum())
+
+
+def _backtester(values: np.ndarray, labels: np.ndarray, grid: str, workers: int) -> AnomalyBacktester:
+    backtester = AnomalyBacktester(BacktestConfig(input_file="<benchmark>", grid_preset=grid, workers=workers))
+    backtester.data = {'timestamps': list(range(len(values))), 'values': values}
+    backtester.ground_truth = labels
+    return backtester
+
+
+def run_benchmark(points: int, grid: str, workers: int, legacy_samples: int) -> Dict:
+    values, labels = generate_minute_series(points)
+    parameter_grid = _backtester(values, labels, grid, 1).get_parameter_grid()
+
+    timings = {}
+    results = {}
+    for name, worker_count in (("vectorized", 1), ("vectorized_parallel", workers)):
+        backtester = _backtester(values, labels, grid, worker_count)
+        start = time.perf_counter()
+        results[name] = backtester._evaluate_grid(parameter_grid)
+        timings[name] = time.perf_counter() - start
+
+    report = {
+        "points": points,
+        "grid": grid,
+        "combinations": len(parameter_grid),
+        "workers": workers,
+        "vectorized_seconds": round(timings["vectorized"], 3),
+        "vectorized_parallel_seconds": round(timings["vectorized_parallel"], 3),
+        "parallel_matches_single": all(
+            (a.total_alerts, a.detected_anomalies, a.missed_anomalies) ==
+            (b.total_alerts, b.detected_anomalies, b.missed_anomalies)
+            for a, b in zip(results["vectorized"], results["vectorized_parallel"])
+        )
+    }
+
+    if legacy_samples > 0:
+        # 그리드 전체에 고르게 퍼진 조합만 기존 방식으로 실행
+        sample_indices = np.linspace(0, len(parameter_grid) - 1, min(legacy_samples, len(parameter_grid))).astype(int)
+        total_actual = int(labels.sum())
+        mismatches = 0
+        start = time.perf_counter()
+        for index in sample_indices:
+            alerts, hits = legacy_counts(values, labels, parameter_grid[index])
+            expected = results["vectorized"][index]
+            if (alerts, hits) != (expected.total_alerts, total_actual - expected.missed_anomalies):
+                mismatches += 1
+        per_combination = (time.perf_counter() - start) / len(sample_indices)
+        legacy_total = per_combination * len(parameter_grid)
+
+        report.update({
+            "legacy_sampled_combinations": len(sample_indices),
+            "legacy_seconds_per_combination": round(per_combination, 3),
+            "legacy_estimated_seconds": round(legacy_total, 1),
+            "legacy_mismatches": mismatches,
+            "speedup_vectorized": round(legacy_total / timings["vectorized"], 1),
+            "speedup_vectorized_parallel": round(legacy_total / timings["vectorized_parallel"], 1)
+        })
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="⏱️ 이상탐지 백테스트 그리드 평가 벤치마크")
+    parser.add_argument('--points', type=int, default=MINUTES_PER_YEAR, help='데이터 포인트 수 (기본값: 1년치 분 단위)')
+    parser.add_argument('--grid', choices=['basic', 'comprehensive'], default='basic', help='파라미터 그리드 프리셋')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='병렬 평가 워커 수')
+    parser.add_argument('--legacy-samples', type=int, default=2,
+                        help='기존 구현으로 실행할 조합 수 (0이면 생략)')
+    parser.add_argument('--json', action='store_true', help='JSON으로 출력')
+    args = parser.parse_args()
+
+    report = run_benchmark(args.points, args.grid, args.workers, args.legacy_samples)
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return
+
+    print(f"""
+⏱️  이상탐지 백테스트 벤치마크
+   데이터: {report['points']:,}개 포인트, {report['grid']} 그리드 {report['combinations']}개 조합
+   벡터화 (단일 프로세스): {report['vectorized_seconds']:.2f}초
+   벡터화 + 워커 {report['workers']}개: {report['vectorized_parallel_seconds']:.2f}초
+   병렬 결과 일치: {report['parallel_matches_single']}""")
+
+    if 'legacy_estimated_seconds' in report:
+        print(f"""   기존 구현: 조합당 {report['legacy_seconds_per_combination']:.2f}초 x {report['combinations']}개
+              = 약 {report['legacy_estimated_seconds']:.0f}초 ({report['legacy_sampled_combinations']}개 조합 실측 기준)
+   기존 결과와 불일치: {report['legacy_mismatches']}개
+   속도 향상: 단일 {report['speedup_vectorized']}배, 병렬 {report['speedup_vectorized_parallel']}배""")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+⏱️ 뉴스-심볼 연결 벤치마크 (한국어 주석 포함)
+
+미국+한국 전 종목 규모의 합성 별칭 표(기본 심볼 8,000개, 심볼당 별칭 3개)로 기사를 연결하는 비용을 비교합니다:
+- 기존 방식: 기사마다 모든 심볼의 모든 별칭에 대해 re.search (기사 수 × 별칭 수)
+- Aho-Corasick: 별칭 표 전체로 자동자를 한 번 만들고 기사당 한 번만 훑기
+
+기존 방식은 오래 걸리므로 일부 기사(--legacy-sample)만 재고 전체 기사 수로 환산합니다.
+
+사용법:
+    python scripts/benchmark_news_linker.py
+    python scripts/benchmark_news_linker.py --symbols 12000 --articles 10000 --json
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from mcp.agents.news.alias_matcher import AliasMatcher
+
+SYLLABLES = "가나다라마바사아자차카타파하전자화학바이오에너지반도체홀딩스"
+WORDS = ["market", "earnings", "guidance", "shares", "investors", "quarter", "rally", "outlook",
+         "증시", "실적", "전망", "투자자", "상승", "하락", "발표", "공시"]
+
+
+def build_universe(symbols: int, rng: random.Random) -> Dict[str, List[str]]:
+    """절반은 미국식(티커 + 영문 회사명), 절반은 한국식(코드.KS + 한글/영문 회사명)"""
+    aliases: Dict[str, List[str]] = {}
+    for i in range(symbols):
+        if i % 2:
+            name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 5)))
+            aliases[f"{i:06d}.KS"] = [name, f"{name}그룹", f"Korea Corp {i}"]
+        else:
+            ticker = "".join(chr(65 + (i // 26 ** k) % 26) for k in range(4))
+            aliases[f"{ticker}{i}"] = [f"Company{i} Inc", f"Company{i}", f"Brand{i}"]
+    return aliases
+
+
+def build_articles(articles: int, aliases: Dict[str, List[str]], rng: random.Random) -> List[str]:
+    names = [name for terms in aliases.values() for name in terms]
+    texts = []
+    for _ in range(articles):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(30, 60))]
+        for _ in range(rng.randint(1, 3)):
+            words.insert(rng.randrange(len(words)), rng.choice(names) + rng.choice(["", "는", "의", ","]))
+        texts.append(" ".join(words))
+    return texts
+
+
+def legacy_best(text: str, aliases: Dict[str, List[str]]):
+    """기존 linker._hits 루프 (비교 기준용 사본)"""
+    s = text.lower()
+    best, best_hits = None, 0
+    for sym, names in aliases.items():
+        cnt = 0
+        for t in [sym] + names:
+            if re.search(r'\b' + re.escape(t.lower()) + r'\b', s):
+                cnt += 1
+        if cnt > best_hits:
+            best, best_hits = sym, cnt
+    return best, best_hits
+
+
+def run_benchmark(symbols: int, articles: int, legacy_sample: int, seed: int = 7) -> Dict:
+    rng = random.Random(seed)
+    aliases = build_universe(symbols, rng)
+    texts = build_articles(articles, aliases, rng)
+
+    start = time.perf_counter()
+    matcher = AliasMatcher(aliases)
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    linked = sum(1 for text in texts if matcher.best_symbol(text)[0])
+    match_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for text in texts[:legacy_sample]:
+        legacy_best(text, aliases)
+    legacy_per_article = (time.perf_counter() - start) / max(legacy_sample, 1)
+
+    return {
+        "symbols": symbols,
+        "aliases": len(matcher.terms),
+        "articles": articles,
+        "linked": linked,
+        "automaton_build_seconds": round(build_seconds, 3),
+        "automaton_link_seconds": round(match_seconds, 3),
+        "legacy_estimated_seconds": round(legacy_per_article * articles, 1),
+        "speedup": round(legacy_per_article * articles / (build_seconds + match_seconds), 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="⏱️ 뉴스-심볼 연결 벤치마크")
+    parser.add_argument('--symbols', type=int, default=8000, help='심볼 수 (기본값: 8000)')
+    parser.add_argument('--articles', type=int, default=10000, help='기사 수 (기본값: 10000)')
+    parser.add_argument('--legacy-sample', type=int, default=20, help='기존 방식으로 잴 기사 수 (기본값: 20)')
+    parser.add_argument('--json', action='store_true', help='JSON으로 출력')
+    args = parser.parse_args()
+
+    report = run_benchmark(args.symbols, args.articles, args.legacy_sample)
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return
+
+    print(f"""
+⏱️  뉴스-심볼 연결 벤치마크 (심볼 {report['symbols']:,}개, 별칭 {report['aliases']:,}개, 기사 {report['articles']:,}건)
+   Aho-Corasick: 자동자 생성 {report['automaton_build_seconds']}초 + 연결 {report['automaton_link_seconds']}초 (연결됨 {report['linked']:,}건)
+   기존 방식 (환산): {report['legacy_estimated_seconds']:,}초
+   속도 향상: {report['speedup']:,}배""")
+
+
+if __name__ == "__main__":
+    main()
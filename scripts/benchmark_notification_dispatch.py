@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+⏱️ 알림 발송 디스패처 벤치마크 (한국어 주석 포함)
+
+로컬 스텁 웹훅 서버(Slack/Discord 대용)와 스텁 SMTP 서버를 띄우고 다음을 비교합니다:
+- 기존 방식: 알림마다 채널을 순차 전송, 웹훅 호출마다 새 HTTP 세션, 메일마다 새 SMTP 연결
+- 디스패처: 공용 keep-alive 세션 + SMTP 연결 풀 + 채널 동시 전송 + 크기 제한 큐
+- 알림 폭주: 같은 유형의 Rate Limit 알림 N건이 집계 윈도우 안에서 다이제스트 몇 건으로 줄어드는지
+
+지표: 초당 처리 알림 수(alerts/sec), 제출 → 전 채널 전송 완료 p95 지연, 실제 전송 메시지 수
+
+사용법:
+    python scripts/benchmark_notification_dispatch.py
+    python scripts/benchmark_notification_dispatch.py --alerts 1000 --concurrency 50 --json
+"""
+
+import argparse
+import asyncio
+import json
+import smtplib
+import sys
+import time
+from email.mime.text import MIMEText
+from pathlib import Path
+from typing import Dict, List
+
+import aiohttp
+from aiohttp import web
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from mcp.utils.notification_dispatcher import (
+    NotificationDispatcher, OutboundAlert, SharedHTTPSession, SMTPConnectionPool
+)
+
+
+class StubServers:
+    """웹훅(200 응답)과 SMTP(모든 명령 수락) 스텁 서버"""
+
+    def __init__(self, webhook_latency: float = 0.005):
+        self.webhook_latency = webhook_latency
+        self.webhook_hits = 0
+        self.smtp_messages = 0
+        self.smtp_connections = 0
+        self.http_port = 0
+        self.smtp_port = 0
+
+    async def start(self):
+        async def webhook(request: web.Request) -> web.Response:
+            await request.read()
+            await asyncio.sleep(self.webhook_latency)  # 외부 웹훅 응답 시간 흉내
+            self.webhook_hits += 1
+            return web.Response(status=200)
+
+        app = web.Application()
+        app.router.add_post('/hook/{channel}', webhook)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, '127.0.0.1', 0)
+        await site.start()
+        self.http_port = site._server.sockets[0].getsockname()[1]
+
+        self._smtp = await asyncio.start_server(self._handle_smtp, '127.0.0.1', 0)
+        self.smtp_port = self._smtp.sockets[0].getsockname()[1]
+
+    async def _handle_smtp(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.smtp_connections += 1
+        writer.write(b"220 stub ESMTP\r\n")
+        in_data = False
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if in_data:
+                if line == b".\r\n":
+                    in_data = False
+                    self.smtp_messages += 1
+                    writer.write(b"250 OK queued\r\n")
+                continue
+            command = line[:4].upper()
+            if command == b"EHLO":
+                writer.write(b"250-stub\r\n250 AUTH PLAIN LOGIN\r\n")
+            elif command == b"DATA":
+                in_data = True
+                writer.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+            elif command == b"AUTH":
+                writer.write(b"235 Authentication successful\r\n")
+            elif command == b"QUIT":
+                writer.write(b"221 Bye\r\n")
+                await writer.drain()
+                break
+            else:  # HELO, MAIL, RCPT, RSET, NOOP
+                writer.write(b"250 OK\r\n")
+            await writer.drain()
+        writer.close()
+
+    async def stop(self):
+        self._smtp.close()
+        await self._smtp.wait_closed()
+        await self._runner.cleanup()
+
+    def url(self, channel: str) -> str:
+        return f"http://127.0.0.1:{self.http_port}/hook/{channel}"
+
+
+def _email(alert_message: str) -> MIMEText:
+    msg = MIMEText(alert_message, 'plain')
+    msg['Subject'] = 'MCP-MAP ERROR 알림'
+    msg['From'] = 'bench@example.com'
+    msg['To'] = 'ops@example.com'
+    return msg
+
+
+def _percentile(samples: List[float], percentile: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(percentile / 100 * (len(ordered) - 1))))]
+
+
+async def _drive(messages: List[str], concurrency: int, send) -> Dict[str, float]:
+    """concurrency개 생산자가 알림을 나눠 제출하고 완료 지연을 측정"""
+    latencies: List[float] = []
+    pending = iter(messages)
+
+    async def producer():
+        for message in pending:
+            submitted = time.perf_counter()
+            await send(message)
+            latencies.append(time.perf_counter() - submitted)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(producer() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "seconds": round(elapsed, 3),
+        "alerts_per_sec": round(len(messages) / elapsed, 1),
+        "p95_latency_ms": round(_percentile(latencies, 95) * 1000, 1)
+    }
+
+
+async def run_legacy(stubs: StubServers, messages: List[str], concurrency: int) -> Dict[str, float]:
+    """기존 방식: 채널 순차, 호출마다 세션/SMTP 연결 생성"""
+    loop = asyncio.get_running_loop()
+
+    def send_email(message: str):
+        with smtplib.SMTP('127.0.0.1', stubs.smtp_port) as server:
+            server.login('bench', 'secret')
+            server.send_message(_email(message))
+
+    async def send(message: str):
+        for channel in ("slack", "discord"):
+            async with aiohttp.ClientSession() as session:
+                async with session.post(stubs.url(channel), json={"text": message},
+                                        timeout=aiohttp.ClientTimeout(total=10)) as response:
+                    await response.read()
+        await loop.run_in_executor(None, send_email, message)
+
+    return await _drive(messages, concurrency, send)
+
+
+def _dispatcher(stubs: StubServers, window: float, workers: int, max_queue: int):
+    http = SharedHTTPSession()
+    smtp_pool = SMTPConnectionPool('127.0.0.1', stubs.smtp_port, username='bench', password='secret',
+                                   starttls=False, size=4)
+
+    async def post(channel: str, alert: OutboundAlert) -> bool:
+        session = await http.get()
+        async with session.post(stubs.url(channel), json={"text": alert.digest_message(window),
+                                                           "fields": alert.digest_fields()}) as response:
+            await response.read()
+            return response.status == 200
+
+    async def send_email(alert: OutboundAlert) -> bool:
+        await asyncio.get_running_loop().run_in_executor(
+            None, smtp_pool.send_message, _email(alert.digest_message(window))
+        )
+        return True
+
+    async def deliver(alert: OutboundAlert) -> Dict[str, bool]:
+        outcomes = await asyncio.gather(post("slack", alert), post("discord", alert), send_email(alert),
+                                        return_exceptions=True)
+        return {name: outcome is True for name, outcome in zip(("slack", "discord", "email"), outcomes)}
+
+    dispatcher = NotificationDispatcher(deliver, default_window=window, workers=workers, max_queue=max_queue)
+    return dispatcher, http, smtp_pool
+
+
+async def run_dispatcher(stubs: StubServers, messages: List[str], concurrency: int,
+                         window: float, workers: int, max_queue: int) -> Dict[str, float]:
+    dispatcher, http, smtp_pool = _dispatcher(stubs, window, workers, max_queue)
+    smtp_before = stubs.smtp_connections
+    try:
+        report = await _drive(messages, concurrency, lambda message: dispatcher.submit(message, "error"))
+        await dispatcher.close()
+    finally:
+        await http.close()
+        smtp_pool.close()
+    report.update({
+        "deliveries": dispatcher.stats["delivered"],
+        "merged": dispatcher.stats["merged"],
+        "dropped": dispatcher.stats["dropped"],
+        "queue_peak": dispatcher.stats["queue_peak"],
+        "http_sessions": http.sessions_created,
+        "smtp_connections": stubs.smtp_connections - smtp_before
+    })
+    return report
+
+
+async def run_benchmark(alerts: int, concurrency: int, window: float, workers: int, max_queue: int) -> Dict:
+    stubs = StubServers()
+    await stubs.start()
+    try:
+        # 서로 다른 알림 (윈도우 0: 병합 없이 채널 전송 경로만 비교)
+        unique = [f"배치 작업 job-{i} 실패" for i in range(alerts)]
+
+        def counters():
+            return stubs.webhook_hits, stubs.smtp_messages
+
+        before = counters()
+        legacy = await run_legacy(stubs, unique, concurrency)
+        legacy.update({"webhook_posts": stubs.webhook_hits - before[0], "emails": stubs.smtp_messages - before[1]})
+
+        before = counters()
+        dispatched = await run_dispatcher(stubs, unique, concurrency, 0.0, workers, max_queue)
+        dispatched.update({"webhook_posts": stubs.webhook_hits - before[0], "emails": stubs.smtp_messages - before[1]})
+
+        # 같은 유형 Rate Limit 알림 폭주 (IP/요청 수만 다름), 미들웨어처럼 모든 호출이 동시에 들어옴
+        storm = [f"⚠️ IP 주소 10.0.{i // 250}.{i % 250}에서 요청 한도를 초과했습니다. ({100 + i}회)"
+                 for i in range(alerts)]
+        before = counters()
+        storm_report = await run_dispatcher(stubs, storm, len(storm), window, workers, max_queue)
+        storm_report.update({"webhook_posts": stubs.webhook_hits - before[0], "emails": stubs.smtp_messages - before[1]})
+    finally:
+        await stubs.stop()
+
+    return {
+        "alerts": alerts,
+        "concurrency": concurrency,
+        "legacy": legacy,
+        "dispatcher": dispatched,
+        "storm": {"window_seconds": window, **storm_report},
+        "speedup_alerts_per_sec": round(dispatched["alerts_per_sec"] / legacy["alerts_per_sec"], 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="⏱️ 알림 발송 디스패처 벤치마크")
+    parser.add_argument('--alerts', type=int, default=500, help='알림 수 (기본값: 500)')
+    parser.add_argument('--concurrency', type=int, default=20, help='동시 제출자 수')
+    parser.add_argument('--window', type=float, default=0.2, help='폭주 시나리오 집계 윈도우 (초)')
+    parser.add_argument('--workers', type=int, default=20, help='디스패처 워커 수')
+    parser.add_argument('--max-queue', type=int, default=1000, help='발송 큐 크기')
+    parser.add_argument('--json', action='store_true', help='JSON으로 출력')
+    args = parser.parse_args()
+
+    report = asyncio.run(run_benchmark(args.alerts, args.concurrency, args.window, args.workers, args.max_queue))
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return
+
+    legacy, dispatched, storm = report["legacy"], report["dispatcher"], report["storm"]
+    print(f"""
+⏱️  알림 발송 벤치마크 ({report['alerts']}건, 동시 제출 {report['concurrency']})
+   기존 방식: {legacy['alerts_per_sec']} alerts/sec, p95 {legacy['p95_latency_ms']}ms
+   디스패처: {dispatched['alerts_per_sec']} alerts/sec, p95 {dispatched['p95_latency_ms']}ms ({report['speedup_alerts_per_sec']}배)
+             HTTP 세션 {dispatched['http_sessions']}개, SMTP 연결 {dispatched['smtp_connections']}개
+   알림 폭주 (윈도우 {storm['window_seconds']}초): {report['alerts']}건 → 채널 발송 {storm['deliveries']}건 (첫 알림 + 후행 다이제스트)
+             웹훅 {storm['webhook_posts']}회, 메일 {storm['emails']}통, p95 {storm['p95_latency_ms']}ms""")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+⏱️ 정책자금 매칭 엔진 벤치마크 (한국어 주석 포함)
+
+합성 신청자 × 정책으로 policy_match 흐름(매칭 → 스코어링)의 비용을 측정합니다:
+- 전체 실행: 빈 DB에서 신청자 × 정책 전 쌍을 DuckDB 조인 한 번으로 판정 + 통과 쌍 채점
+- 증분 실행: 신청자 1%, 정책 1%를 바꾼 뒤 바뀐 범위만 재매칭/재채점
+- 무변경 실행: 입력이 그대로일 때 (해시 비교만)
+
+사용법:
+    python scripts/benchmark_policy_match.py
+    python scripts/benchmark_policy_match.py --applicants 100000 --policies 5000 --json
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from mcp.modules.policy import match_engine as engine
+
+REGIONS = ["서울", "부산", "대구", "인천", "광주", "대전", "울산", "세종", "경기", "강원",
+           "충북", "충남", "전북", "전남", "경북", "경남", "제주"]
+FLAGS = ["청년", "여성", "수출", "소부장", "사회적", "스마트팩토리"]
+INDUSTRIES = [f"C{n}" for n in range(10, 34)] + ["G47", "J58", "J62", "M70"]
+
+
+def make_applicant(i: int, rng: random.Random) -> Dict:
+    arrears = rng.random() < 0.08
+    return {
+        "applicant_id": f"A{i:07d}",
+        "company_name": f"회사{i}",
+        "region": rng.choice(REGIONS),
+        "industry_code": rng.choice(INDUSTRIES),
+        "biz_age_months": rng.randint(0, 240),
+        "revenue_last12m": rng.randint(0, 5_000_000_000),
+        "credit_band": rng.choice("AABBBCCD"),
+        "tax_arrears_flag": arrears,
+        "tax_arrears_amount": rng.randint(10_000, 2_000_000) if arrears else None,
+        "employment_count": rng.randint(1, 300),
+        "special_flags": rng.sample(FLAGS, rng.randint(0, 2)),
+    }
+
+
+def make_policy(i: int, rng: random.Random) -> Dict:
+    """정규화 정책 스키마(policy_schema.yaml) 형태. 조건 3~6개를 무작위로 조합"""
+    eligibility = {"credit_band_in": rng.choice([["A"], ["A", "B"], ["A", "B", "C"]])}
+    if rng.random() < 0.6:
+        eligibility["biz_age_months_gte"] = rng.choice([6, 12, 24, 36])
+    if rng.random() < 0.4:
+        eligibility["biz_age_months_lte"] = rng.choice([36, 60, 84])
+    if rng.random() < 0.6:
+        eligibility["revenue_last12m_gte"] = rng.choice([50_000_000, 100_000_000, 500_000_000, 1_000_000_000])
+    if rng.random() < 0.5:
+        eligibility["tax_arrears_allowed"] = False
+    if rng.random() < 0.3:
+        eligibility["employee_count_lte"] = rng.choice([10, 50, 100])
+    if rng.random() < 0.2:
+        eligibility["special_flags_includes"] = rng.sample(FLAGS, 1)
+    region = rng.sample(REGIONS, rng.randint(1, 3)) if rng.random() < 0.5 else ["전국"]
+    industry = rng.sample(INDUSTRIES, rng.randint(2, 8)) if rng.random() < 0.3 else []
+    return {
+        "program_id": f"P{i:05d}",
+        "title": f"정책자금 {i}",
+        "agency": rng.choice(["중진공", "신보", "기보", "소진공"]),
+        "region": region,
+        "industry_code": industry,
+        "finance": {"limit_max": rng.choice([100_000_000, 300_000_000]), "rate_max": rng.choice([2.5, 3.5, 5.0])},
+        "eligibility": eligibility,
+    }
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return round(time.perf_counter() - start, 3), result
+
+
+def run_benchmark(applicants: int, policies: int, changed_ratio: float, seed: int = 7) -> Dict:
+    rng = random.Random(seed)
+    app_rows: List[Dict] = [make_applicant(i, rng) for i in range(applicants)]
+    pol_rows: List[Dict] = [make_policy(i, rng) for i in range(policies)]
+    settings, rules = engine.load_score_rules(
+        yaml.safe_load(Path("schemas/policy_scoring_rules.yaml").read_text(encoding="utf-8")),
+        yaml.safe_load(Path("schemas/policy_exception_rules.yaml").read_text(encoding="utf-8")))
+
+    report: Dict = {"applicants": applicants, "policies": policies, "pairs": applicants * policies}
+    with tempfile.TemporaryDirectory() as tmp:
+        con = engine.connect(Path(tmp) / "policies.db")
+
+        def run():
+            compiled = engine.load_policies(pol_rows)
+            match_seconds, stats = _timed(lambda: engine.match(con, app_rows, compiled))
+            score_seconds, scored = _timed(lambda: engine.score(con, settings, rules))
+            return {"match_seconds": match_seconds, "score_seconds": score_seconds,
+                    "dirty_applicants": stats["dirty_applicants"], "dirty_policies": stats["dirty_policies"],
+                    "matches_written": stats["matches_written"], "scores_written": scored["scores_written"]}
+
+        report["full"] = run()
+        report["eligible_pairs"] = con.execute("SELECT count(*) FROM matches WHERE eligible").fetchone()[0]
+        report["unchanged"] = run()
+
+        for i in rng.sample(range(applicants), max(1, int(applicants * changed_ratio))):
+            app_rows[i] = make_applicant(i, rng)
+        for i in rng.sample(range(policies), max(1, int(policies * changed_ratio))):
+            pol_rows[i] = make_policy(i, rng)
+        report["incremental"] = run()
+        con.close()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="⏱️ 정책자금 매칭 엔진 벤치마크")
+    parser.add_argument('--applicants', type=int, default=20000, help='신청자 수 (기본값: 20000)')
+    parser.add_argument('--policies', type=int, default=1000, help='정책 수 (기본값: 1000)')
+    parser.add_argument('--changed', type=float, default=0.01, help='증분 실행에서 바꿀 비율 (기본값: 0.01)')
+    parser.add_argument('--json', action='store_true', help='JSON으로 출력')
+    args = parser.parse_args()
+
+    report = run_benchmark(args.applicants, args.policies, args.changed)
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return
+
+    print(f"\n⏱️  정책자금 매칭 벤치마크 (신청자 {report['applicants']:,} × 정책 {report['policies']:,}"
+          f" = {report['pairs']:,}쌍, 통과 {report['eligible_pairs']:,}쌍)")
+    for name, label in (("full", "전체"), ("unchanged", "무변경"), ("incremental", "증분")):
+        case = report[name]
+        print(f"   [{label}] 매칭 {case['match_seconds']}초 + 채점 {case['score_seconds']}초 "
+              f"(변경 신청자 {case['dirty_applicants']:,}, 정책 {case['dirty_policies']:,}, "
+              f"매칭 {case['matches_written']:,}행, 점수 {case['scores_written']:,}행)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+⏱️ 포트폴리오 저장소 벤치마크 (한국어 주석 포함)
+
+원장(ledger)이 쌓여도 조회 비용이 그대로인지 확인합니다:
+- 쓰기: 사용자별로 종목 하나/현금만 바꾸는 update 반복 (행 단위 기록 + 원장 append)
+- 조회(캐시 미스): 다른 연결이 커밋한 직후의 get
+- 조회(캐시 적중): 변경 없이 반복한 get
+
+사용법:
+    python scripts/benchmark_portfolio_store.py
+    python scripts/benchmark_portfolio_store.py --users 1000 --rounds 3 --json
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from mcp.portfolio_store import PortfolioStore
+
+
+def _holdings(rng: random.Random, count: int):
+    return [{"symbol": f"S{n:04d}", "shares": rng.randint(1, 500), "avg_cost": round(rng.random() * 1000, 2),
+             "current_price": None} for n in range(count)]
+
+
+def _per_call_us(fn, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return round((time.perf_counter() - start) / calls * 1e6, 1)
+
+
+def run_benchmark(users: int, holdings: int, rounds: int, writes_per_round: int, seed: int = 7) -> Dict:
+    rng = random.Random(seed)
+    report: Dict = {"users": users, "holdings_per_user": holdings, "rounds": []}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "portfolio.db")
+        writer, reader = PortfolioStore(path), PortfolioStore(path)
+        state = {f"u{i}": _holdings(rng, holdings) for i in range(users)}
+        for user_id, rows in state.items():
+            writer.update(user_id, holdings=rows, cash={"krw": 0, "usd": 0})
+
+        for _ in range(rounds):
+            start = time.perf_counter()
+            for _ in range(writes_per_round):
+                user_id = f"u{rng.randrange(users)}"
+                rows = state[user_id]
+                rows[rng.randrange(holdings)]["shares"] = rng.randint(1, 500)
+                writer.update(user_id, holdings=rows, cash={"krw": rng.randint(0, 10**8), "usd": 0})
+            write_us = round((time.perf_counter() - start) / writes_per_round * 1e6, 1)
+
+            user_id = "u0"
+            miss_us = _per_call_us(lambda: (writer.update(user_id, cash={"krw": rng.random(), "usd": 0}),
+                                            reader.get(user_id)), 200)
+            hit_us = _per_call_us(lambda: reader.get(user_id), 2000)
+            report["rounds"].append({"ledger_entries": writer.stats()["ledger_entries"], "update_us": write_us,
+                                     "update_plus_read_miss_us": miss_us, "read_hit_us": hit_us})
+        writer.close()
+        reader.close()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="⏱️ 포트폴리오 저장소 벤치마크")
+    parser.add_argument('--users', type=int, default=500, help='사용자 수 (기본값: 500)')
+    parser.add_argument('--holdings', type=int, default=20, help='사용자당 보유 종목 수 (기본값: 20)')
+    parser.add_argument('--rounds', type=int, default=4, help='원장을 늘려가며 측정할 횟수 (기본값: 4)')
+    parser.add_argument('--writes', type=int, default=5000, help='라운드당 쓰기 횟수 (기본값: 5000)')
+    parser.add_argument('--json', action='store_true', help='JSON으로 출력')
+    args = parser.parse_args()
+
+    report = run_benchmark(args.users, args.holdings, args.rounds, args.writes)
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return
+
+    print(f"\n⏱️  포트폴리오 저장소 벤치마크 (사용자 {report['users']:,}, 종목 {report['holdings_per_user']}개씩)")
+    for case in report["rounds"]:
+        print(f"   원장 {case['ledger_entries']:>9,}행 | update {case['update_us']}µs | "
+              f"update+조회(미스) {case['update_plus_read_miss_us']}µs | 조회(적중) {case['read_hit_us']}µs")
+
+
+if __name__ == "__main__":
+    main()
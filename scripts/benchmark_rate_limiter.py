@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+⏱️ Rate Limiter 마이크로벤치마크 (한국어 주석 포함)
+
+서로 다른 IP 수(100 ~ 1,000,000)를 늘려 가며 요청 한 건당 판정 비용을 비교합니다:
+- 기존 방식: IP별 타임스탬프 deque + cleanup_interval마다 전체 IP 스윕
+- GCRA: IP별 TAT 하나, 잠금 분할 샤드, 접근 시 지연 만료 (선택: SQLite 공유 저장소)
+
+가상 시계를 요청마다 조금씩 진행시켜 기존 방식의 주기적 전체 스윕도 측정 구간에 포함되도록 합니다.
+지표: 요청당 평균 ns, 보관 중인 IP 상태 수, IP당 메모리(바이트, tracemalloc 기준)
+
+사용법:
+    python scripts/benchmark_rate_limiter.py
+    python scripts/benchmark_rate_limiter.py --clients 100 10000 1000000 --requests 200000 --json
+    python scripts/benchmark_rate_limiter.py --backends gcra sqlite --clients 100 10000
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from mcp.utils.gcra import GCRARateLimiter, SQLiteStore
+
+LIMIT_PER_MINUTE = 100
+CLEANUP_INTERVAL = 300.0
+# 측정 구간 전체가 가상 시계로 10분이 되도록 진행 (기존 방식 전체 스윕 2회 포함)
+SIMULATED_SECONDS = 600.0
+
+
+class VirtualClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class LegacyDequeLimiter:
+    """기존 RateLimiter.is_rate_limited/_cleanup_old_requests 로직 (비교 기준용 사본)"""
+
+    def __init__(self, requests_per_minute: int, cleanup_interval: float, clock: Callable[[], float]):
+        self.requests_per_minute = requests_per_minute
+        self.cleanup_interval = cleanup_interval
+        self.clock = clock
+        self.ip_requests: Dict[str, deque] = defaultdict(deque)
+        self.last_cleanup = clock()
+
+    def _cleanup_old_requests(self):
+        current_time = self.clock()
+        if current_time - self.last_cleanup < self.cleanup_interval:
+            return
+        cutoff_time = current_time - 60
+        for ip in list(self.ip_requests.keys()):
+            requests = self.ip_requests[ip]
+            while requests and requests[0] < cutoff_time:
+                requests.popleft()
+            if not requests:
+                del self.ip_requests[ip]
+        self.last_cleanup = current_time
+
+    def hit(self, client_ip: str) -> bool:
+        current_time = self.clock()
+        self._cleanup_old_requests()
+        requests = self.ip_requests[client_ip]
+        cutoff_time = current_time - 60
+        while requests and requests[0] < cutoff_time:
+            requests.popleft()
+        requests.append(current_time)
+        return len(requests) <= self.requests_per_minute
+
+    def tracked(self) -> int:
+        return len(self.ip_requests)
+
+
+def _ips(count: int) -> List[str]:
+    return [f"{10 + i // 16_777_216}.{(i // 65536) % 256}.{(i // 256) % 256}.{i % 256}" for i in range(count)]
+
+
+def _build(backend: str, clock: VirtualClock, workdir: Path):
+    """(요청 판정 함수, 보관 상태 수 함수) 반환"""
+    if backend == "legacy":
+        limiter = LegacyDequeLimiter(LIMIT_PER_MINUTE, CLEANUP_INTERVAL, clock)
+        return limiter.hit, limiter.tracked
+    if backend == "gcra":
+        limiter = GCRARateLimiter(LIMIT_PER_MINUTE, 60.0, clock=clock)
+    elif backend == "sqlite":
+        store = SQLiteStore(str(workdir / f"rate_limit_{time.time_ns()}.db"))
+        limiter = GCRARateLimiter(LIMIT_PER_MINUTE, 60.0, store=store, clock=clock)
+    else:
+        raise ValueError(f"알 수 없는 백엔드: {backend}")
+    return limiter.allow, limiter.tracked_keys
+
+
+def bytes_per_client(backend: str, clients: int = 10_000) -> float:
+    """IP당 상태 메모리 (IP 문자열 제외, 각 IP 10회 요청 후)"""
+    ips = _ips(clients)
+    clock = VirtualClock()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    hit, _ = _build(backend, clock, Path(tempfile.gettempdir()))
+    for _ in range(10):
+        for ip in ips:
+            hit(ip)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    return round(allocated / clients, 1)
+
+
+def run_case(backend: str, clients: int, requests: int, workdir: Path, seed: int = 7) -> Dict[str, float]:
+    """clients개 IP로 상태를 채운 뒤 무작위 IP 요청 requests건의 평균 판정 비용 측정"""
+    ips = _ips(clients)
+    clock = VirtualClock()
+    hit, tracked = _build(backend, clock, workdir)
+
+    for ip in ips:  # 모든 IP가 최근 1분 안에 한 번씩 요청한 상태
+        hit(ip)
+        clock.now += 60.0 / clients
+
+    rng = random.Random(seed)
+    sample = [ips[rng.randrange(clients)] for _ in range(requests)]
+    step = SIMULATED_SECONDS / requests
+    start = time.perf_counter_ns()
+    for ip in sample:
+        clock.now += step
+        hit(ip)
+    elapsed = time.perf_counter_ns() - start
+    return {
+        "ns_per_request": round(elapsed / requests),
+        "tracked_clients": tracked()
+    }
+
+
+def run_benchmark(client_counts: List[int], requests: int, backends: List[str]) -> Dict:
+    report: Dict = {"requests": requests, "limit_per_minute": LIMIT_PER_MINUTE, "results": {}, "bytes_per_client": {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in backends:
+            report["results"][backend] = {
+                str(clients): run_case(backend, clients, requests, Path(tmp)) for clients in client_counts
+            }
+    for backend in backends:
+        if backend != "sqlite":
+            report["bytes_per_client"][backend] = bytes_per_client(backend)
+
+    for backend, cases in report["results"].items():
+        costs = [case["ns_per_request"] for case in cases.values()]
+        report.setdefault("flatness", {})[backend] = round(max(costs) / min(costs), 2)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="⏱️ Rate Limiter 마이크로벤치마크")
+    parser.add_argument('--clients', type=int, nargs='+', default=[100, 10_000, 100_000, 1_000_000],
+                        help='서로 다른 IP 수 목록')
+    parser.add_argument('--requests', type=int, default=200_000, help='측정 요청 수 (기본값: 200000)')
+    parser.add_argument('--backends', nargs='+', default=["legacy", "gcra"],
+                        choices=["legacy", "gcra", "sqlite"], help='비교할 구현')
+    parser.add_argument('--json', action='store_true', help='JSON으로 출력')
+    args = parser.parse_args()
+
+    report = run_benchmark(args.clients, args.requests, args.backends)
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return
+
+    print(f"\n⏱️  Rate Limiter 벤치마크 (요청 {report['requests']:,}건, 한도 {report['limit_per_minute']}/분)")
+    for backend, cases in report["results"].items():
+        memory = report["bytes_per_client"].get(backend)
+        memory_note = f", IP당 {memory}B" if memory is not None else ""
+        print(f"   [{backend}] 최대/최소 비용 비 {report['flatness'][backend]}{memory_note}")
+        for clients, case in cases.items():
+            print(f"      IP {int(clients):>9,}개: {case['ns_per_request']:>8,} ns/요청, "
+                  f"보관 상태 {case['tracked_clients']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+⏱️ 보안 이벤트 로깅 벤치마크 (한국어 주석 포함)
+
+Rate Limit 위반 폭주 상황에서 요청 경로가 보안 로그 기록에 쓰는 시간을 비교합니다:
+- 기존 방식: TimedRotatingFileHandler로 요청 스레드에서 바로 포맷/기록/flush
+- 비동기 배치: QueueHandler로 큐에 넣고 QueueListener 스레드가 JSON 줄을 묶어 기록
+
+지표: 이벤트당 호출 시간 p50/p99 (µs), 전체 기록 완료까지 초당 처리 이벤트 수
+
+사용법:
+    python scripts/benchmark_security_logging.py
+    python scripts/benchmark_security_logging.py --events 50000 --json
+"""
+
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import time
+from logging.handlers import TimedRotatingFileHandler
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from mcp.security_logger import flush_security_log, get_pipeline_stats, log_security_event
+
+
+def _percentile(samples: List[int], percentile: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(percentile / 100 * (len(ordered) - 1))))]
+
+
+def _measure(events: int, log_event: Callable[[int], None], drain: Callable[[], None]) -> Dict[str, float]:
+    """이벤트마다 호출 시간을 재고, 마지막에 기록 완료까지의 전체 처리량을 계산"""
+    durations: List[int] = []
+    start = time.perf_counter()
+    for i in range(events):
+        began = time.perf_counter_ns()
+        log_event(i)
+        durations.append(time.perf_counter_ns() - began)
+    drain()
+    elapsed = time.perf_counter() - start
+    return {
+        "p50_us": round(_percentile(durations, 50) / 1000, 2),
+        "p99_us": round(_percentile(durations, 99) / 1000, 2),
+        "mean_us": round(sum(durations) / len(durations) / 1000, 2),
+        "events_per_sec": round(events / elapsed, 1)
+    }
+
+
+def run_legacy(events: int, path: Path) -> Dict[str, float]:
+    """기존 방식: 요청 스레드에서 동기 기록"""
+    legacy_logger = logging.getLogger("security.benchmark.legacy")
+    legacy_logger.propagate = False
+    handler = TimedRotatingFileHandler(str(path), when="midnight", interval=1, backupCount=30, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+    legacy_logger.addHandler(handler)
+
+    def log_event(i: int):
+        legacy_logger.warning(f"[RATE_LIMIT_EXCEEDED] Rate limit exceeded - IP: 203.0.113.{i % 250}, "
+                              f"Requests: {101 + i}/100, Endpoint: GET /api/v1/portfolio")
+
+    try:
+        return _measure(events, log_event, lambda: None)
+    finally:
+        legacy_logger.removeHandler(handler)
+        handler.close()
+
+
+def run_pipeline(events: int, path: Path) -> Dict[str, float]:
+    """비동기 배치 파이프라인"""
+    def log_event(i: int):
+        log_security_event(
+            "RATE_LIMIT_EXCEEDED",
+            f"Rate limit exceeded - IP: 203.0.113.{i % 250}, Requests: {101 + i}/100, Endpoint: GET /api/v1/portfolio",
+            level=logging.WARNING, log_path=str(path),
+            client_ip=f"203.0.113.{i % 250}", request_count=101 + i, limit=100, endpoint="GET /api/v1/portfolio"
+        )
+
+    before = get_pipeline_stats()
+    report = _measure(events, log_event, flush_security_log)
+    after = get_pipeline_stats()
+    report.update({
+        "batches": after["batches_written"] - before["batches_written"],
+        "dropped": after["dropped"] - before["dropped"]
+    })
+    return report
+
+
+def run_benchmark(events: int) -> Dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = run_legacy(events, Path(tmp) / "legacy.log")
+        pipeline = run_pipeline(events, Path(tmp) / "security.log")
+    return {
+        "events": events,
+        "legacy": legacy,
+        "pipeline": pipeline,
+        "request_path_speedup_p50": round(legacy["p50_us"] / pipeline["p50_us"], 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="⏱️ 보안 이벤트 로깅 벤치마크")
+    parser.add_argument('--events', type=int, default=20000, help='이벤트 수 (기본값: 20000)')
+    parser.add_argument('--json', action='store_true', help='JSON으로 출력')
+    args = parser.parse_args()
+
+    report = run_benchmark(args.events)
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return
+
+    legacy, pipeline = report["legacy"], report["pipeline"]
+    print(f"""
+⏱️  보안 이벤트 로깅 벤치마크 ({report['events']}건)
+   기존 방식 (동기 기록): p50 {legacy['p50_us']}µs, p99 {legacy['p99_us']}µs, {legacy['events_per_sec']} events/sec
+   비동기 배치: p50 {pipeline['p50_us']}µs, p99 {pipeline['p99_us']}µs, {pipeline['events_per_sec']} events/sec
+                배치 {pipeline['batches']}회 기록, 드롭 {pipeline['dropped']}건""")
+
+
+if __name__ == "__main__":
+    main()
@@ -195,12 +195,12 @@ log_ci_failures() {
 import sys
 sys.path.append('.')
 try:
-    from mcp.utils.notifier import send_ci_alerts
+    from mcp.utils.notifier import send_ci_alerts, run_notifications
     import asyncio
     import json
 
     failed_data = json.loads('$failed_runs')
-    asyncio.run(send_ci_alerts(failed_data))
+    run_notifications(send_ci_alerts(failed_data))
     print('✅ CI 실패 알림 전송 완료')
 except Exception as e:
     print(f'⚠️ 알림 전송 실패: {e}')
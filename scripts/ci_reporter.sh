@@ -539,7 +539,7 @@ import sys
 import json
 sys.path.append('.')
 try:
-    from mcp.utils.notifier import send_ci_report_alert
+    from mcp.utils.notifier import send_ci_report_alert, run_notifications
     import asyncio
 
     report_summary = {
@@ -553,7 +553,7 @@ try:
         'analysis_days': $DAYS
     }
 
-    asyncio.run(send_ci_report_alert(report_summary))
+    run_notifications(send_ci_report_alert(report_summary))
     print('✅ CI/CD 성능 리포트 알림 전송 완료')
 except Exception as e:
     print(f'⚠️ 알림 전송 실패: {e}')
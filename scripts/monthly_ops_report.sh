@@ -106,6 +106,23 @@ log_message() {
     fi
 }
 
+# 📅 기간 필터 함수 (START_DATE ~ END_DATE)
+# 보안 로그는 JSON 줄이므로 "timestamp" 필드의 날짜를, 일반 로그는 줄 앞의
+# "YYYY-MM-DD" 또는 "[YYYY-MM-DD ...]" 날짜를 기준으로 비교
+filter_log_by_date() {
+    awk -v start="$START_DATE" -v end="$END_DATE" '
+        {
+            day = ""
+            if (match($0, /"timestamp": *"[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]/)) {
+                day = substr($0, RSTART + RLENGTH - 10, 10)
+            } else if (match($0, /^\[?[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]/)) {
+                day = substr($0, RSTART + RLENGTH - 10, 10)
+            }
+        }
+        day != "" && day >= start && day <= end
+    ' "$@"
+}
+
 # 🔍 월간 보안 로그 분석 함수
 analyze_monthly_security_logs() {
     log_message "INFO" "월간 보안 로그 분석 시작 ($START_DATE ~ $END_DATE)"
@@ -149,9 +166,7 @@ analyze_monthly_security_logs() {
 
         # 날짜 필터링 적용
         local filtered_content
-        filtered_content=$(echo "$content" | awk -v start="$START_DATE" -v end="$END_DATE" '
-            $1 >= start && $1 <= end
-        ' 2>/dev/null || echo "")
+        filtered_content=$(echo "$content" | filter_log_by_date 2>/dev/null || echo "")
 
         # 이벤트 타입별 집계
         blocked_ips=$((blocked_ips + $(echo "$filtered_content" | grep -c "BLOCKED_IP" || true)))
@@ -201,9 +216,7 @@ analyze_monthly_backup_logs() {
 
     # 날짜 범위에 해당하는 로그 엔트리 필터링
     local filtered_logs
-    filtered_logs=$(awk -v start="$START_DATE" -v end="$END_DATE" '
-        $1 >= start && $1 <= end
-    ' "$DAILY_OPS_LOG" 2>/dev/null || echo "")
+    filtered_logs=$(filter_log_by_date "$DAILY_OPS_LOG" 2>/dev/null || echo "")
 
     # 백업 관련 이벤트 집계
     backup_success=$(echo "$filtered_logs" | grep -c "백업 검증 완료\|백업.*성공" || true)
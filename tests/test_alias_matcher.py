@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+뉴스-심볼 별칭 매처 테스트 (한국어 주석 포함)
+
+테스트 범위:
+- 영문 별칭의 단어 경계 (부분 단어 불일치, 한글 조사가 붙은 형태 허용)
+- 한글 별칭 뒤 조사 허용과 다른 회사명 일부(삼성물산 등) 불일치
+- 심볼별 서로 다른 별칭 적중 수와 동점 시 별칭 표 순서
+- linker.link가 자동자로 최적 심볼과 검색 힌트 심볼을 고르는지
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from mcp.agents.news import linker
+from mcp.agents.news.alias_matcher import AliasMatcher, get_matcher
+
+ALIASES = {
+    "000660.KS": ["SK하이닉스", "SK hynix", "하이닉스"],
+    "005930.KS": ["삼성전자", "Samsung Electronics", "삼성"],
+    "035420.KS": ["NAVER", "네이버"],
+    "AAPL": ["Apple"],
+}
+
+
+def test_english_aliases_respect_word_boundaries():
+    matcher = AliasMatcher(ALIASES)
+    assert matcher.symbol_hits("Apple unveils new chips") == {"AAPL": 1}
+    assert matcher.symbol_hits("Pineapple prices rise; applesauce too") == {}
+    assert matcher.symbol_hits("SAMSUNG ELECTRONICS (005930.KS) beats estimates") == {"005930.KS": 2}
+    # 한글 조사가 바로 붙은 영문 별칭도 적중
+    assert matcher.symbol_hits("NAVER는 AI 투자를 늘린다") == {"035420.KS": 1}
+
+
+def test_korean_aliases_allow_particles_but_not_other_words():
+    matcher = AliasMatcher(ALIASES)
+    assert matcher.symbol_hits("삼성전자는 오늘 실적을 발표했다") == {"005930.KS": 1}
+    assert matcher.symbol_hits("네이버의 검색 점유율") == {"035420.KS": 1}
+    assert matcher.symbol_hits("삼성물산 주가 급등") == {}
+    assert matcher.symbol_hits("신삼성 전략") == {}
+    # SK하이닉스 안의 하이닉스도 같은 심볼의 별칭이므로 함께 센다
+    assert matcher.symbol_hits("SK하이닉스, HBM 공급 확대") == {"000660.KS": 2}
+
+
+def test_best_symbol_counts_distinct_aliases_and_breaks_ties_by_table_order():
+    matcher = AliasMatcher(ALIASES)
+    text = "삼성전자와 SK하이닉스가 반도체 업황 회복을 이끈다. 삼성전자 HBM"
+    assert matcher.symbol_hits(text) == {"005930.KS": 1, "000660.KS": 2}
+    assert matcher.best_symbol(text) == ("000660.KS", 2)
+    assert matcher.best_symbol("네이버와 Apple 협력") == ("035420.KS", 1)
+    assert matcher.best_symbol("") == (None, 0)
+
+
+def test_get_matcher_rebuilds_only_when_alias_file_changes(tmp_path):
+    path = tmp_path / "aliases.yaml"
+    path.write_text("aliases:\n  AAPL:\n  - Apple\n", encoding="utf-8")
+    first = get_matcher(path)
+    assert get_matcher(path) is first
+    path.write_text("aliases:\n  MSFT:\n  - Microsoft\n", encoding="utf-8")
+    os.utime(path, ns=(1, 1))
+    second = get_matcher(path)
+    assert second is not first and second.best_symbol("Microsoft Azure") == ("MSFT", 1)
+
+
+def test_link_uses_matcher_and_symbol_hint(tmp_path, monkeypatch):
+    aliases = tmp_path / "aliases.yaml"
+    aliases.write_text(
+        "aliases:\n  005930.KS:\n  - 삼성전자\n  - Samsung Electronics\n  035420.KS:\n  - 네이버\n",
+        encoding="utf-8")
+    parsed = tmp_path / "news_parsed.json"
+    parsed.write_text(json.dumps([
+        {"title": "삼성전자, Samsung Electronics 신제품", "desc": None, "url": "u1", "_sym_query": "035420.KS"},
+        {"title": "TSLA deliveries", "desc": "tsla beats", "url": "u2", "_sym_query": "TSLA"},
+        {"title": "날씨 뉴스", "desc": "", "url": "u3", "_sym_query": None},
+    ], ensure_ascii=False), encoding="utf-8")
+    linked = tmp_path / "news_by_symbol.json"
+    monkeypatch.setattr(linker, "ALIA", aliases)
+    monkeypatch.setattr(linker, "PARSED", parsed)
+    monkeypatch.setattr(linker, "LINKED", linked)
+
+    linker.link()
+    out = json.loads(linked.read_text(encoding="utf-8"))
+    assert [(a["symbol"], a["hits"]) for a in out] == [("005930.KS", 2), ("TSLA", 1), (None, 0)]
@@ -249,6 +249,23 @@ class TestAnomalyDetectorCore:
             severity = anomaly_detector._classify_anomaly_severity(z_score)
             assert severity == expected_severity, f"Z-score {z_score}의 심각도 분류가 잘못됨: {severity} (예상: {expected_severity})"
 
+    def test_vector_scoring_matches_severity_classification(self, anomaly_detector):
+        """백필 벡터 채점의 심각도가 단건 분류와 같은 구간을 쓰는지 테스트 (경계값 포함)"""
+        z_scores = [-6.0, 5.0, -4.999, 4.0, 3.999, -3.5, 3.2, 1.0]
+        df = pd.DataFrame({
+            'timestamp': pd.date_range('2024-01-01', periods=len(z_scores), freq='D'),
+            'value': np.arange(len(z_scores), dtype=float),
+            'ewma': np.zeros(len(z_scores)),
+            'z_score': z_scores
+        })
+
+        scored = anomaly_detector.score_anomalies(df)
+
+        expected = [z for z in z_scores if abs(z) > anomaly_detector.threshold]
+        assert [record['z_score'] for record in scored] == expected
+        for record in scored:
+            assert record['severity'] == anomaly_detector._classify_anomaly_severity(abs(record['z_score']))
+
     def test_forecast_generation(self, anomaly_detector, sample_timeseries_data):
         """예측 생성 기능 테스트"""
         # 테스트 데이터 설정 및 전처리
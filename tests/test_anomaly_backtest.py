@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+🔎 이상탐지 백테스트 그리드 평가 테스트 (한국어 주석 포함)
+
+테스트 범위:
+- 벡터화 EWMA가 기존 점화식 루프와 같은 값을 내는지
+- 벡터화 그리드 평가가 조합별 기존 탐지 루프와 같은 알림/적중 수를 내는지
+- 공유 메모리 프로세스 분산 결과가 단일 프로세스 결과와 같은지
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from scripts.anomaly_backtest import AnomalyBacktester, BacktestConfig, ParameterSet, ewma_matrix
+from scripts.benchmark_anomaly_backtest import generate_minute_series, legacy_counts
+
+
+def _backtester(values, labels, workers=1, grid="basic"):
+    backtester = AnomalyBacktester(BacktestConfig(input_file="<test>", grid_preset=grid, workers=workers))
+    backtester.data = {'timestamps': list(range(len(values))), 'values': values.tolist()}
+    backtester.ground_truth = labels.tolist()
+    return backtester
+
+
+@pytest.fixture
+def series():
+    return generate_minute_series(3000, seed=7)
+
+
+def test_ewma_matrix_matches_recurrence(series):
+    """알파별 열이 기존 Python 루프 EWMA와 정확히 같은지 테스트"""
+    values, _ = series
+    alphas = [0.1, 0.3, 0.7]
+    matrix = ewma_matrix(values, alphas)
+
+    for col, alpha in enumerate(alphas):
+        expected = np.zeros_like(values)
+        expected[0] = values[0]
+        for i in range(1, len(values)):
+            expected[i] = alpha * values[i] + (1 - alpha) * expected[i-1]
+        np.testing.assert_array_equal(matrix[:, col], expected)
+
+
+def test_grid_matches_legacy_loop(series):
+    """모든 조합의 알림/적중 수와 지표가 기존 조합별 루프와 같은지 테스트"""
+    values, labels = series
+    backtester = _backtester(values, labels)
+    grid = backtester.get_parameter_grid() + [ParameterSet(threshold=1.5, window_size=3, ewma_alpha=0.9)]
+    results = backtester._evaluate_grid(grid)
+    total_actual = int(labels.sum())
+
+    for params, result in zip(grid, results):
+        alerts, hits = legacy_counts(values, labels, params)
+        assert result.parameters is params
+        assert (result.total_alerts, result.missed_anomalies) == (alerts, total_actual - hits)
+        assert result.precision == pytest.approx(hits / alerts if alerts else 0)
+        assert result.recall == pytest.approx(hits / total_actual)
+
+
+def test_parallel_shards_match_single_process(series):
+    """공유 메모리 워커 분산 결과가 단일 프로세스와 같은지 테스트"""
+    values, labels = series
+    single = _backtester(values, labels, workers=1)._evaluate_grid(_backtester(values, labels).get_parameter_grid())
+    parallel_backtester = _backtester(values, labels, workers=2)
+    parallel = parallel_backtester._evaluate_grid(parallel_backtester.get_parameter_grid())
+
+    assert [(r.total_alerts, r.missed_anomalies, r.f1_score) for r in parallel] == \
+           [(r.total_alerts, r.missed_anomalies, r.f1_score) for r in single]
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+🔎 이상탐지 상주 서비스 테스트 (한국어 주석 포함)
+
+테스트 범위:
+- 증분 EWMA/Z-score 상태가 배치 전처리(pandas ewm/rolling)와 같은 값을 내는지
+- 배치 상태에서 이어서 갱신해도 전체 재계산과 같은지
+- 상주 서비스의 최초 로드, 변경 파일 증분 반영, 포인트 푸시 (scikit-learn 필요)
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from mcp.anomaly_service import AnomalyService, MetricState
+
+ALPHA = 0.3
+WINDOW = 7
+
+
+def _batch_frame(values: np.ndarray) -> pd.DataFrame:
+    """배치 전처리와 같은 방식의 EWMA/Z-score 계산"""
+    df = pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=len(values), freq='h'),
+        'value': values
+    })
+    df['ewma'] = df['value'].ewm(alpha=ALPHA).mean()
+    rolling = df['ewma'].rolling(window=WINDOW, min_periods=1)
+    df['z_score'] = (df['ewma'] - rolling.mean()) / (rolling.std() + 1e-8)
+    return df
+
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(42)
+    values = 100 + rng.normal(0, 5, 400)
+    values[[120, 250, 330]] += 60  # 인위적 이상치
+    return values
+
+
+class TestMetricState:
+    """증분 상태 정확성 테스트"""
+
+    def test_incremental_matches_batch(self, series):
+        """포인트를 하나씩 넣어도 배치 계산과 같은 EWMA/Z-score인지 테스트"""
+        expected = _batch_frame(series)
+        state = MetricState(ALPHA, WINDOW)
+
+        results = np.array([state.update(t, v) for t, v in zip(expected['timestamp'], series)])
+
+        np.testing.assert_allclose(results[:, 0], expected['ewma'], rtol=1e-9)
+        np.testing.assert_allclose(results[1:, 1], expected['z_score'][1:], atol=1e-9)
+        assert np.isnan(results[0, 1])
+
+    def test_resume_from_batch_frame(self, series):
+        """배치 결과의 마지막 상태에서 이어서 갱신해도 전체 재계산과 같은지 테스트"""
+        expected = _batch_frame(series)
+        state = MetricState.from_frame(expected.iloc[:300], ALPHA, WINDOW, history_size=50)
+
+        z_scores = [state.update(t, v)[1] for t, v in zip(expected['timestamp'][300:], series[300:])]
+
+        np.testing.assert_allclose(z_scores, expected['z_score'][300:], atol=1e-9)
+        assert state.count == len(series)
+        assert len(state.to_frame()) == 50
+        assert state.last_timestamp == expected['timestamp'].iloc[-1]
+
+
+class TestAnomalyService:
+    """상주 서비스 테스트 (scikit-learn 필요)"""
+
+    @pytest.fixture
+    def base_dir(self, tmp_path, series):
+        pytest.importorskip("sklearn")
+        (tmp_path / "reports" / "metrics").mkdir(parents=True)
+        self._write(tmp_path, series[:300])
+        return tmp_path
+
+    @staticmethod
+    def _write(base_dir: Path, values: np.ndarray):
+        path = base_dir / "reports" / "metrics" / "host.json"
+        timestamps = pd.date_range('2024-01-01', periods=len(values), freq='h')
+        path.write_text(json.dumps([
+            {"timestamp": t.isoformat(), "cpu": float(v)} for t, v in zip(timestamps, values)
+        ]))
+        later = time.time() + len(values)  # 같은 초 안의 재기록도 변경으로 인식되도록
+        os.utime(path, (later, later))
+
+    def test_serves_from_memory_and_applies_new_points(self, base_dir, series):
+        """최초 1회만 전체 로드하고, 변경 파일의 새 포인트와 푸시 포인트만 반영하는지 테스트"""
+        async def scenario():
+            service = AnomalyService(base_dir=base_dir, refresh_interval=3600)
+            report = json.loads(await service.get_report(threshold=2.0))
+            assert report['metadata']['total_metrics_analyzed'] == 1
+            assert service.stats['builds'] == 1
+
+            await service.get_report(threshold=2.0)
+            assert service.stats['builds'] == 1 and service.stats['refreshes'] == 0
+
+            self._write(base_dir, series)
+            hosted = await service.get_detector(threshold=2.0)
+            await service.refresh(hosted)
+            assert service.stats['points_ingested'] == len(series) - 300
+
+            new_anomalies = await service.ingest("host_cpu", [("2030-01-01T00:00:00", 1000.0)])
+            assert list(new_anomalies.values()) == [1]
+            report = json.loads(await service.get_report(threshold=2.0))
+            assert report['top_anomalies'][0]['timestamp'].startswith("2030-01-01")
+
+        asyncio.run(scenario())
@@ -1,18 +1,19 @@
 import os
 import subprocess
 import pytest
-from mcp.security_logger import log_security_event
+from mcp.security_logger import flush_security_log, log_security_event
 
 # 🧪 백업 검증 + 보안 로그 통합 테스트
 # 1. 보안 이벤트 기록 후 로그 파일 생성 확인
 # 2. backup_verifier.sh 스크립트 실행 결과 확인
 # 3. cleanup_old_backups.sh 시뮬레이션 모드 검증
 
-def test_security_log_creation(tmp_path):
+def test_security_log_creation(tmp_path, monkeypatch):
     log_path = tmp_path / "security.log"
-    os.environ["SECURITY_LOG_PATH"] = str(log_path)
+    monkeypatch.setenv("SECURITY_LOG_PATH", str(log_path))
 
     log_security_event("BLOCKED_IP", "127.0.0.1 차단")
+    flush_security_log()
     assert log_path.exists()
     with open(log_path) as f:
         data = f.read()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+GCRA 요청 제한 테스트 (한국어 주석 포함)
+
+테스트 범위:
+- 한도만큼 순간 허용 후 거절, 시간 경과에 따른 회복과 Retry-After
+- 한도가 회복된 클라이언트 상태가 접근 시 지연 정리되어 메모리가 활성 클라이언트 수에 비례하는지
+- 여러 스레드가 동시에 요청해도 한도를 넘겨 허용하지 않는지
+- SQLite 저장소를 쓰는 두 제한기(워커)가 같은 한도를 공유하는지
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from mcp.utils.gcra import GCRARateLimiter, ShardedMemoryStore, SQLiteStore, create_store
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.parametrize("limit", [5, 100, 1000])
+def test_burst_then_recovery(limit):
+    """limit건까지 허용하고 다음 건은 거절, interval 경과 후 한 건씩 회복되는지 테스트"""
+    clock = FakeClock()
+    limiter = GCRARateLimiter(limit, 60.0, clock=clock)
+
+    decisions = [limiter.hit("203.0.113.1") for _ in range(limit + 3)]
+    assert [d.allowed for d in decisions] == [True] * limit + [False] * 3
+    assert decisions[limit - 1].remaining == 0
+    assert decisions[-1].retry_after == pytest.approx(60.0 / limit)
+
+    clock.now += 60.0 / limit
+    assert limiter.hit("203.0.113.1").allowed
+    assert not limiter.hit("203.0.113.1").allowed
+
+    clock.now += 60.0
+    assert limiter.peek("203.0.113.1").remaining == limit
+    assert limiter.hit("203.0.113.2").remaining == limit - 1  # 다른 IP는 독립
+
+
+def test_idle_clients_expire_lazily():
+    """회복이 끝난 IP는 이후 요청 처리 중에 조금씩 지워져 상태 수가 활성 IP 수 수준으로 유지되는지 테스트"""
+    clock = FakeClock()
+    store = ShardedMemoryStore(shards=4)
+    limiter = GCRARateLimiter(60, 60.0, store=store, clock=clock)
+
+    for i in range(20_000):
+        limiter.hit(f"10.{i // 65536}.{(i // 256) % 256}.{i % 256}")
+        clock.now += 0.01  # 각 IP 상태는 1초 뒤 만료
+
+    assert limiter.tracked_keys() < 500
+    assert limiter.purge_expired() < 500
+    assert limiter.tracked_keys() <= 101
+
+
+def test_concurrent_hits_never_exceed_limit():
+    """여러 스레드가 같은 IP로 동시에 요청해도 허용 건수가 한도와 같은지 테스트"""
+    limiter = GCRARateLimiter(50, 3600.0)
+    allowed = []
+
+    def worker():
+        allowed.append(sum(limiter.hit("198.51.100.9").allowed for _ in range(100)))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(allowed) == 50
+
+
+def test_sqlite_store_shared_between_workers(tmp_path):
+    """같은 SQLite 파일을 쓰는 두 제한기가 한도를 합산해 적용하는지 테스트"""
+    clock = FakeClock()
+    url = f"sqlite:///{tmp_path / 'rate_limit.db'}"
+    worker_a = GCRARateLimiter(10, 60.0, store=create_store(url), clock=clock)
+    worker_b = GCRARateLimiter(10, 60.0, store=create_store(url), clock=clock)
+
+    results = [(worker_a if i % 2 else worker_b).hit("192.0.2.10").allowed for i in range(12)]
+    assert results == [True] * 10 + [False] * 2
+    assert worker_a.peek("192.0.2.10").remaining == 0
+    assert worker_b.tracked_keys() == 1
+
+    clock.now += 61.0
+    assert worker_a.purge_expired() == 1
+    assert worker_b.hit("192.0.2.10").allowed
+    assert isinstance(worker_a.store, SQLiteStore)
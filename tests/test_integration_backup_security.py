@@ -64,8 +64,9 @@ class TestIntegrationBackupSecurity:
         """🔐 보안 이벤트 발생 → security.log 기록 검증"""
         # Mock 보안 로거가 없는 경우를 대비한 간단한 로깅
         try:
-            from mcp.security_logger import log_security_event
+            from mcp.security_logger import flush_security_log, log_security_event
             log_security_event("BLOCKED_IP", "192.168.1.100 - Rate Limit 초과로 차단")
+            flush_security_log()
         except ImportError:
             # Mock 로깅 구현
             with open(self.security_log, "a", encoding="utf-8") as f:
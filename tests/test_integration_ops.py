@@ -2,7 +2,7 @@ import os
 import subprocess
 import tempfile
 import pytest
-from mcp.security_logger import log_security_event
+from mcp.security_logger import flush_security_log, log_security_event
 
 # 🔄 통합 운영 테스트 (한국어 주석 포함)
 # 목적: 보안 로그 기록, 백업 검증, 정리 스크립트의 전체 워크플로우 검증
@@ -28,6 +28,7 @@ class TestIntegrationOps:
         log_security_event("BLOCKED_IP", "203.0.113.1 - 테스트 차단")
         log_security_event("WHITELIST_ADD", "192.168.1.100 - 테스트 화이트리스트")
         log_security_event("MONITOR", "통합 테스트 모니터링 이벤트")
+        flush_security_log()
 
         # 로그 파일 생성 확인
         log_path = "logs/security.log"
@@ -103,6 +104,7 @@ class TestIntegrationOps:
         """전체 워크플로우 통합 테스트"""
         # 1단계: 보안 이벤트 발생 시뮬레이션
         log_security_event("INTEGRATION_TEST", "전체 워크플로우 테스트 시작")
+        flush_security_log()
 
         # 2단계: 로그 파일 확인
         log_path = "logs/security.log"
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+로그 끝부분 읽기 테스트 (한국어 주석 포함)
+
+테스트 범위:
+- 블록 경계/개행 유무와 관계없이 readlines()[-n:] 방식과 같은 결과인지
+- 읽는 바이트 수가 파일 크기와 무관한지
+- 회전 직후 짧은 현재 파일을 직전 회전 파일로 채우는지
+- 파일이 바뀌지 않으면 캐시를 재사용하고, 바뀌거나 회전되면 다시 읽는지
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from mcp.utils import log_tail
+from mcp.utils.log_tail import LogTailCache, _tail_from_file, read_tail
+
+
+def _expected(path: Path, lines: int) -> str:
+    """기존 구현 (전체 readlines 후 마지막 n줄)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return ''.join(f.readlines()[-lines:]).strip()
+
+
+@pytest.mark.parametrize("trailing_newline", [True, False])
+@pytest.mark.parametrize("lines", [1, 7, 50, 500])
+def test_matches_readlines(tmp_path, lines, trailing_newline):
+    """작은 블록으로 경계를 여러 번 넘겨도 기존 방식과 같은 발췌인지 테스트"""
+    path = tmp_path / "app.log"
+    content = "\n".join(f"2024-01-01 00:00:{i:02d} - INFO - 요청 처리 {i} " + "x" * (i % 37) for i in range(300))
+    path.write_text(content + ("\n" if trailing_newline else ""), encoding='utf-8')
+
+    assert read_tail(path, lines) == _expected(path, lines)
+    chunks, _ = _tail_from_file(path, lines, block_size=64)
+    assert b"\n".join(chunks).decode('utf-8').strip() == _expected(path, lines)
+
+
+def test_read_cost_independent_of_size(tmp_path, monkeypatch):
+    """수십 MB 로그에서도 끝부분 몇 블록만 읽는지 테스트"""
+    path = tmp_path / "app.log"
+    line = "2024-01-01 00:00:00 - ERROR - 외부 API 타임아웃 발생\n"
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(line * 400_000)  # 약 25MB
+
+    bytes_read = []
+    real_open = open
+
+    class CountingFile:
+        def __init__(self, *args, **kwargs):
+            self._file = real_open(*args, **kwargs)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            self._file.close()
+
+        def read(self, size=-1):
+            data = self._file.read(size)
+            bytes_read.append(len(data))
+            return data
+
+        def __getattr__(self, name):
+            return getattr(self._file, name)
+
+    monkeypatch.setattr(log_tail, "open", CountingFile, raising=False)
+    excerpt = read_tail(path, 50)
+
+    assert excerpt.count("\n") == 49
+    assert sum(bytes_read) <= 4 * log_tail.BLOCK_SIZE
+
+
+def test_fills_from_rotated_file(tmp_path):
+    """회전 직후 현재 파일이 짧으면 최신 회전 파일에서 앞부분을 채우는지 테스트"""
+    path = tmp_path / "security.log"
+    older = tmp_path / "security.log.2024-01-01"
+    newest = tmp_path / "security.log.2024-01-02"
+    older.write_text("\n".join(f"old-{i}" for i in range(10)) + "\n")
+    newest.write_text("\n".join(f"prev-{i}" for i in range(10)) + "\n")
+    (tmp_path / "security.log.2023-12-31.gz").write_bytes(b"\x1f\x8b")
+    path.write_text("cur-0\ncur-1\n")
+    now = time.time()
+    os.utime(older, (now - 200, now - 200))
+    os.utime(newest, (now - 100, now - 100))
+
+    assert read_tail(path, 5).split("\n") == ["prev-7", "prev-8", "prev-9", "cur-0", "cur-1"]
+    assert read_tail(path, 20).split("\n")[:2] == ["old-2", "old-3"]
+    assert read_tail(path, 5, include_rotated=False) == "cur-0\ncur-1"
+
+
+def test_cache_reuses_until_file_changes(tmp_path):
+    """변경 없는 동안은 한 번만 읽고, 추가 기록/회전 시 다시 읽는지 테스트"""
+    path = tmp_path / "app.log"
+    path.write_text("a\nb\n")
+    cache = LogTailCache()
+
+    assert [cache.get(path, 1) for _ in range(100)] == ["b"] * 100
+    assert (cache.reads, cache.hits) == (1, 99)
+
+    with open(path, 'a') as f:
+        f.write("c\n")
+    assert cache.get(path, 1) == "c"
+
+    path.rename(tmp_path / "app.log.2024-01-01")  # 회전
+    path.write_text("d\n")
+    assert cache.get(path, 2) == "c\nd"
+    assert cache.reads == 3
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+알림 발송 디스패처 테스트 (한국어 주석 포함)
+
+테스트 범위:
+- 숫자/IP만 다른 알림이 같은 지문으로 묶이는지
+- 알림 폭주 시 첫 건은 즉시, 나머지는 필드·IP를 보존한 후행 다이제스트 1건으로 병합되는지
+- NotificationManager.send_notification 경로와 close()의 세션/SMTP 정리
+- 발송 큐가 가득 차면 대기 후 드롭하는지
+- SMTP 연결 풀이 메시지마다 새 연결을 만들지 않는지
+"""
+
+import asyncio
+import smtplib
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from mcp.utils.notification_dispatcher import (
+    AGGREGATED, NotificationDispatcher, SMTPConnectionPool, alert_fingerprint
+)
+
+
+def test_fingerprint_ignores_variable_tokens():
+    """IP·숫자만 다른 알림은 같은 지문, 유형/심각도가 다르면 다른 지문인지 테스트"""
+    first = alert_fingerprint("error", "🔒 보안 알림", "⚠️ IP 주소 10.0.0.1에서 요청 한도를 초과했습니다. (120회)")
+    second = alert_fingerprint("error", "🔒 보안 알림", "⚠️ IP 주소 192.168.3.44에서 요청 한도를 초과했습니다. (9999회)")
+
+    assert first == second
+    assert first != alert_fingerprint("critical", "🔒 보안 알림", "⚠️ IP 주소 10.0.0.1에서 요청 한도를 초과했습니다. (120회)")
+    assert first != alert_fingerprint("error", "🔒 보안 알림", "🚫 IP 주소 10.0.0.1가 차단되었습니다.")
+
+
+def test_storm_sends_first_alert_immediately_and_merges_rest():
+    """첫 알림은 윈도우를 기다리지 않고 전송, 나머지 499건은 즉시 반환 후 후행 다이제스트 1건으로 전송되는지 테스트"""
+    delivered = []
+
+    async def deliver(alert):
+        delivered.append((alert.digest_message(0.2), alert.digest_fields(), time.perf_counter()))
+        return {"slack": True}
+
+    async def scenario():
+        dispatcher = NotificationDispatcher(deliver, windows={"error": 0.2})
+        started = time.perf_counter()
+        first = await dispatcher.submit("IP 주소 10.0.0.0에서 요청 한도를 초과했습니다.", "error",
+                                        fields={"엔드포인트": "/api"})
+        first_elapsed = time.perf_counter() - started
+        rest = await asyncio.gather(*(
+            dispatcher.submit(f"IP 주소 10.0.{i // 250}.{i % 250}에서 요청 한도를 초과했습니다.", "error",
+                              fields={"엔드포인트": f"/api/v{i % 3}"})
+            for i in range(1, 500)
+        ))
+        rest_elapsed = time.perf_counter() - started
+        unique = await dispatcher.submit("디스크 사용량 경고", "error", aggregate=False)
+        await asyncio.sleep(0.3)
+        await dispatcher.close()
+        return dispatcher, first, first_elapsed, rest, rest_elapsed, unique
+
+    dispatcher, first, first_elapsed, rest, rest_elapsed, unique = asyncio.run(scenario())
+
+    assert first == {"slack": True} and unique == {"slack": True}
+    assert rest == [AGGREGATED] * 499
+    # 호출자는 집계 윈도우(0.2초)를 기다리지 않음
+    assert first_elapsed < 0.1 and rest_elapsed < 0.15
+    assert len(delivered) == 3
+
+    message, fields, _ = delivered[2]
+    assert "499건 추가 발생" in message
+    assert fields["🔁 병합 건수"] == "499건"
+    # 후속 중복의 서로 다른 필드 값과 IP가 보존됨
+    assert fields["엔드포인트"] == "/api/v1 / /api/v2 / /api/v0"
+    assert fields["🌐 관련 IP"].startswith("10.0.0.1, 10.0.0.2") and "외 489개" in fields["🌐 관련 IP"]
+    assert dispatcher.stats["merged"] == 499
+    # 대기한 호출자(첫 알림, 병합 안 한 알림)만 지연 측정
+    assert len(dispatcher.latencies) == 2
+
+
+def test_notification_manager_send_notification_path(monkeypatch):
+    """NotificationManager.send_notification → 디스패처 → 채널 전송, close()로 세션/SMTP 정리까지 테스트"""
+    from mcp.utils import notifier
+
+    monkeypatch.setenv("SLACK_WEBHOOK_URL", "https://hooks.slack.invalid/test")
+    manager = notifier.NotificationManager()
+    manager.dispatcher.windows = {notifier.NotificationLevel.ERROR: 0.2}
+    sent = []
+
+    async def fake_slack(message, level, title=None, fields=None, attach_logs=False):
+        sent.append((message, dict(fields or {})))
+        return True
+
+    monkeypatch.setattr(manager.slack, "send_notification", fake_slack)
+    smtp_closed = []
+    monkeypatch.setattr(manager.email.smtp_pool, "close", lambda: smtp_closed.append(True))
+
+    async def scenario():
+        session = await manager.slack.http.get()
+        first = await manager.send_error("IP 주소 10.1.1.1 차단", fields={"사유": "rate"})
+        duplicate = await manager.send_error("IP 주소 10.1.1.2 차단", fields={"사유": "scan"})
+        assert len(sent) == 1
+        await manager.close()
+        return first, duplicate, session
+
+    first, duplicate, session = asyncio.run(scenario())
+
+    assert first == {"slack": True} and duplicate == AGGREGATED
+    # close()가 윈도우를 기다리지 않고 후행 다이제스트를 바로 보냄
+    assert len(sent) == 2
+    assert "1건 추가 발생" in sent[1][0]
+    assert sent[1][1]["사유"] == "scan" and sent[1][1]["🌐 관련 IP"] == "10.1.1.2"
+    assert session.closed and smtp_closed == [True]
+
+
+def test_bounded_queue_drops_when_full():
+    """워커가 막혀 큐가 가득 차면 제한 시간 후 드롭되는지 테스트"""
+    async def scenario():
+        gate = asyncio.Event()
+
+        async def deliver(alert):
+            await gate.wait()
+            return {"email": True}
+
+        dispatcher = NotificationDispatcher(deliver, workers=1, max_queue=1, enqueue_timeout=0.05)
+        first = asyncio.create_task(dispatcher.submit("알림 1", "info"))   # 워커가 처리 중
+        await asyncio.sleep(0.01)
+        second = asyncio.create_task(dispatcher.submit("알림 2", "info"))  # 큐 대기
+        await asyncio.sleep(0.01)
+        dropped = await dispatcher.submit("알림 3", "info")                # 큐 포화
+        gate.set()
+        return dispatcher, await first, await second, dropped
+
+    dispatcher, first, second, dropped = asyncio.run(scenario())
+
+    assert first == second == {"email": True}
+    assert dropped == {}
+    assert dispatcher.stats["dropped"] == 1
+
+
+def test_smtp_pool_reuses_connections():
+    """풀 크기만큼만 연결하고 끊긴 연결은 재접속 후 재전송하는지 테스트"""
+    created = []
+
+    class FakeSMTP:
+        def __init__(self, host, port, timeout=None):
+            self.sent = []
+            self.fail_next = False
+            created.append(self)
+
+        def starttls(self):
+            pass
+
+        def login(self, user, password):
+            pass
+
+        def send_message(self, msg):
+            if self.fail_next:
+                raise smtplib.SMTPServerDisconnected("closed")
+            self.sent.append(msg)
+
+        def quit(self):
+            pass
+
+    pool = SMTPConnectionPool("smtp.local", 25, "bot", "secret", size=2, smtp_factory=FakeSMTP)
+    for i in range(10):
+        pool.send_message(f"msg-{i}")
+    assert len(created) == 1 and len(created[0].sent) == 10
+
+    created[0].fail_next = True
+    pool.send_message("after-disconnect")
+    assert len(created) == 2 and created[1].sent == ["after-disconnect"]
+    assert pool.connections_opened == 2
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+정책자금 매칭 엔진 테스트 (한국어 주석 포함)
+
+테스트 범위:
+- 자격 조건 키 → Criterion 컴파일과 지원하지 않는 조건 거부
+- DuckDB 집합 조인 판정 결과와 사유 코드 (통과/근접 탈락)
+- 바뀐 신청자·정책만 재매칭하는 증분 실행, 근접 탈락 허용 개수 변경 시 전체 재매칭
+- 스코어링 규칙 조건식 컴파일, 가점 상한, 예외 규칙, 증분 재채점
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from mcp.modules.policy import match_engine as engine
+from mcp.modules.policy.schema import Criterion
+
+RULES = {
+    "rules": [
+        {"program_id": "working_capital",
+         "when": {"biz_age_months_gte": 12, "revenue_last12m_gte": 100_000_000,
+                  "credit_band_in": ["A", "B", "C"], "tax_arrears_flag": False}},
+        {"program_id": "young_startup",
+         "when": {"biz_age_months_lte": 36, "special_flags_includes": ["청년"], "credit_band_in": ["A", "B"]}},
+    ]
+}
+
+APPLICANTS = [
+    {"applicant_id": "A1", "biz_age_months": 24, "revenue_last12m": 200_000_000, "credit_band": "B",
+     "tax_arrears_flag": False, "special_flags": ["청년"], "region": "세종"},
+    {"applicant_id": "A2", "biz_age_months": 6, "revenue_last12m": 50_000_000, "credit_band": "A",
+     "tax_arrears_flag": True, "tax_arrears_amount": 100_000, "special_flags": [], "region": "서울"},
+    # 예전 인테이크 형식 (id/revenue_million/tax_arrears)
+    {"id": "A3", "name": "김유진", "biz_age_months": 14, "revenue_million": 120, "tax_arrears": 0,
+     "credit_band": "D", "region": "경기"},
+]
+
+
+@pytest.fixture
+def con(tmp_path):
+    con = engine.connect(tmp_path / "policies.db")
+    yield con
+    con.close()
+
+
+def _matches(con):
+    rows = con.execute("SELECT applicant_id, program_id, eligible, reasons FROM matches").fetchall()
+    return {(a, p): (e, json.loads(r)) for a, p, e, r in rows}
+
+
+def test_compile_criteria_maps_keys_and_rejects_unknown_conditions():
+    criteria = engine.compile_criteria("p", {
+        "biz_age_months_gte": 12, "credit_band_in": "A", "tax_arrears_allowed": False,
+        "employee_count_lte": 50, "special_flags_includes": ["청년"], "revenue_last12m_gte": None})
+    assert criteria == [
+        Criterion("biz_age_months", "gte", 12), Criterion("credit_band", "in", ["A"]),
+        Criterion("tax_arrears_flag", "eq", False), Criterion("employment_count", "lte", 50),
+        Criterion("special_flags", "includes", ["청년"])]
+    assert [c.code for c in criteria][2:4] == ["tax_arrears_flag", "employment_count_lte"]
+    assert engine.compile_criteria("p", {"tax_arrears_allowed": True}) == []
+
+    with pytest.raises(ValueError, match="debt_ratio_lte"):
+        engine.compile_criteria("p", {"debt_ratio_lte": 200})
+    with pytest.raises(ValueError):
+        engine.compile_criteria("p", {"region_includes": ["서울"]})
+
+
+def test_load_policies_merges_normalized_eligibility_region_and_rules():
+    normalized = [{"program_id": "working_capital", "title": "운전자금", "region": ["세종", "전북"],
+                   "finance": {"limit_max": 300_000_000, "rate_max": 4.0},
+                   "eligibility": {"biz_age_months_gte": 6, "employee_count_lte": 50}}]
+    policies = {p.program_id: p for p in engine.load_policies(normalized, RULES)}
+    wc = policies["working_capital"]
+    assert wc.name == "운전자금" and wc.limit_max == 300_000_000 and wc.interest_rate_max == 4.0
+    # 규칙 yaml의 when이 정규화 eligibility를 덮어쓰고, 정책 지역은 region_in 조건이 됨
+    values = {c.code: c.value for c in wc.criteria}
+    assert values["biz_age_months_gte"] == 12
+    assert values["employment_count_lte"] == 50
+    assert values["region_in"] == ["세종", "전북"]
+    assert "young_startup" in policies
+
+
+def test_match_evaluates_all_pairs_with_reason_codes(con):
+    policies = engine.load_policies([], RULES)
+    stats = engine.match(con, APPLICANTS, policies, max_failed=1)
+    assert stats["dirty_applicants"] == 3 and stats["dirty_policies"] == 2
+
+    matches = _matches(con)
+    assert matches[("A1", "working_capital")] == (
+        True, ["biz_age_months_gte", "revenue_last12m_gte", "credit_band_in", "tax_arrears_flag"])
+    assert matches[("A1", "young_startup")][0] is True
+    # 근접 탈락: 미충족 조건 하나만 사유로 남음
+    assert matches[("A2", "young_startup")] == (False, ["special_flags_includes"])
+    assert matches[("A3", "working_capital")] == (False, ["credit_band_in"])
+    # 미충족 2개 이상은 저장하지 않음
+    assert ("A2", "working_capital") not in matches
+
+    con.execute("DELETE FROM matches")
+    con.execute("DELETE FROM match_fingerprints")
+    engine.match(con, APPLICANTS, policies)
+    assert set(_matches(con)) == {("A1", "working_capital"), ("A1", "young_startup")}
+
+
+def test_match_recomputes_only_changed_applicants_and_policies(con):
+    applicants = [dict(a) for a in APPLICANTS]
+    engine.match(con, applicants, engine.load_policies([], RULES), max_failed=1)
+    again = engine.match(con, applicants, engine.load_policies([], RULES), max_failed=1)
+    assert (again["dirty_applicants"], again["dirty_policies"], again["matches_written"]) == (0, 0, 0)
+
+    applicants[1]["special_flags"] = ["청년"]
+    del applicants[2]
+    rules = {"rules": [dict(RULES["rules"][0], when=dict(RULES["rules"][0]["when"], revenue_last12m_gte=10)),
+                       RULES["rules"][1]]}
+    stats = engine.match(con, applicants, engine.load_policies([], rules), max_failed=1)
+    # A2 수정 + A3 삭제, working_capital 조건 변경
+    assert (stats["dirty_applicants"], stats["dirty_policies"]) == (2, 1)
+
+    matches = _matches(con)
+    assert set(matches) == {("A1", "working_capital"), ("A1", "young_startup"), ("A2", "young_startup")}
+    assert matches[("A2", "young_startup")][0] is True
+    assert con.execute("SELECT count(*) FROM applicants").fetchone()[0] == 2
+
+
+def test_match_rejoins_everything_when_max_failed_changes(con):
+    policies = engine.load_policies([], RULES)
+    engine.match(con, APPLICANTS, policies)
+    assert ("A3", "working_capital") not in _matches(con)
+
+    stats = engine.match(con, APPLICANTS, policies, max_failed=1)
+    assert stats["full"] and stats["dirty_applicants"] == 3
+    assert _matches(con)[("A3", "working_capital")] == (False, ["credit_band_in"])
+    assert not engine.match(con, APPLICANTS, policies, max_failed=1)["full"]
+
+    # 다시 0으로 돌리면 근접 탈락 행이 남지 않음
+    engine.match(con, APPLICANTS, policies, max_failed=0)
+    assert all(eligible for eligible, _ in _matches(con).values())
+
+
+def test_compile_condition_supports_rule_syntax():
+    assert engine.compile_condition("tax_arrears_flag == true AND tax_arrears_amount < 300000") == \
+        "(a.tax_arrears_flag = TRUE AND a.tax_arrears_amount < 300000)"
+    assert engine.compile_condition('region in ["세종", "전북"]') == "(list_contains(['세종', '전북'], a.region))"
+    assert engine.compile_condition('special_flags includes "청년" OR tax_arrears_amount == null') == \
+        "(list_contains(a.special_flags, '청년') OR a.tax_arrears_amount IS NULL)"
+    with pytest.raises(ValueError):
+        engine.compile_condition("debt_ratio > 200")
+    with pytest.raises(ValueError):
+        engine.compile_condition("region ~ 서울")
+
+
+def test_score_applies_caps_exceptions_and_incremental_rescoring(con):
+    scoring = {
+        "base": 50, "bonus_cap": 15, "penalty_cap": 40,
+        "rules": [
+            {"id": "youth_bonus", "if": 'special_flags includes "청년"', "then": "score_delta = +10 ; note = \"청년\""},
+            {"id": "women_bonus", "if": 'special_flags includes "여성"', "then": {"score_delta": 10}},
+        ],
+    }
+    exceptions = {"rules": [
+        {"id": "minor_tax_arrears", "if": "tax_arrears_flag == true AND tax_arrears_amount < 300000",
+         "then": 'score_delta = -5 ; note = "경미 체납"'},
+        {"id": "regional_bonus", "if": 'region in ["세종", "전북", "강원"]', "then": "score_delta = +3"},
+    ]}
+    settings, rules = engine.load_score_rules(scoring, exceptions)
+    applicants = [
+        {"applicant_id": "A1", "biz_age_months": 24, "credit_band": "A", "special_flags": ["청년", "여성"],
+         "region": "세종"},
+        {"applicant_id": "A2", "biz_age_months": 24, "credit_band": "A", "special_flags": ["청년"],
+         "tax_arrears_flag": True, "tax_arrears_amount": 100_000, "region": "서울"},
+    ]
+    policies = engine.load_policies([], {"rules": [{"program_id": "p1", "when": {"credit_band_in": ["A"]}}]})
+    engine.match(con, applicants, policies)
+    assert engine.score(con, settings, rules)["full"] is True
+
+    scores = {a: (s, json.loads(n)) for a, _, s, n in con.execute("SELECT * FROM scores").fetchall()}
+    # 가점 20 → 상한 15, 예외 +3은 상한 밖에서 더함
+    assert scores["A1"] == (68, ["youth_bonus", "women_bonus", "regional_bonus"])
+    assert scores["A2"] == (55, ["youth_bonus", "minor_tax_arrears"])
+
+    applicants[1]["special_flags"] = []
+    engine.match(con, applicants, policies)
+    stats = engine.score(con, settings, rules)
+    assert stats == {"full": False, "scores_written": 1}
+    assert con.execute("SELECT score FROM scores WHERE applicant_id = 'A2'").fetchall() == [(45,)]
+    assert con.execute("SELECT count(*) FROM match_dirty").fetchone()[0] == 0
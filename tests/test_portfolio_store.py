@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+포트폴리오 저장소(SQLite WAL) 테스트 (한국어 주석 포함)
+
+테스트 범위:
+- 행 단위 보유 종목 저장/조회와 순서 유지, 바뀐 행만 원장에 기록
+- 원장 append-only 보장과 원장 재생(replay) 결과 일치
+- 버전 기반 낙관적 동시성 (VersionConflict / 409)
+- 다른 연결의 커밋 시 캐시 무효화, 조회 시 원장 미접근
+- 레거시 portfolio.json 1회 이관 (단일 트랜잭션, 전부 또는 전무)
+- 쓰기 도중 프로세스 강제 종료 후 일관성
+"""
+
+import json
+import os
+import signal
+import sqlite3
+import subprocess
+import sys
+import textwrap
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from mcp.portfolio_store import PortfolioStore, VersionConflict
+
+AAPL = {"symbol": "AAPL", "shares": 10, "avg_cost": 150.0, "current_price": 175.5}
+MSFT = {"symbol": "MSFT", "shares": 5, "avg_cost": 300.0, "current_price": None}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = PortfolioStore(str(tmp_path / "portfolio.db"))
+    yield store
+    store.close()
+
+
+def test_update_and_get_keep_holdings_order_and_log_only_changes(store):
+    assert store.get("u1") is None
+    assert store.update("u1", holdings=[MSFT, AAPL], cash={"krw": 1000, "usd": 10}) == 1
+
+    portfolio = store.get("u1")
+    assert [h["symbol"] for h in portfolio["holdings"]] == ["MSFT", "AAPL"]
+    assert portfolio["cash"] == {"krw": 1000.0, "usd": 10.0} and portfolio["version"] == 1
+
+    # 동일 내용은 버전이 오르지 않고, 한 종목만 바꾸면 원장도 그 행만 기록
+    assert store.update("u1", holdings=[MSFT, AAPL]) == 1
+    assert store.update("u1", holdings=[MSFT, dict(AAPL, shares=12)]) == 2
+    assert [(e["kind"], e["symbol"]) for e in store.history("u1", since_version=1)] == [("set_holding", "AAPL")]
+
+    assert store.update("u1", holdings=[AAPL]) == 3
+    assert [(e["kind"], e["symbol"]) for e in store.history("u1", since_version=2)] == [
+        ("set_holding", "AAPL"), ("remove_holding", "MSFT")]
+    assert store.get("u1")["holdings"] == [AAPL]
+    assert store.replay("u1") == store.get("u1")
+
+    with pytest.raises(ValueError):
+        store.update("u1", holdings=[AAPL, AAPL])
+
+
+def test_ledger_is_append_only(store):
+    store.update("u1", holdings=[AAPL])
+    with pytest.raises(sqlite3.DatabaseError, match="append-only"):
+        store._db.execute("UPDATE ledger SET kind = 'set_cash'")
+    with pytest.raises(sqlite3.DatabaseError, match="append-only"):
+        store._db.execute("DELETE FROM ledger")
+
+
+def test_stale_version_is_rejected(store):
+    v1 = store.update("u1", cash={"krw": 1, "usd": 0})
+    assert store.update("u1", cash={"krw": 2, "usd": 0}, expected_version=v1) == 2
+    with pytest.raises(VersionConflict) as exc:
+        store.update("u1", cash={"krw": 3, "usd": 0}, expected_version=v1)
+    assert (exc.value.expected, exc.value.actual) == (1, 2)
+    assert store.get("u1")["cash"]["krw"] == 2.0
+    # 새 사용자는 버전 0에서 시작
+    assert store.update("u2", holdings=[AAPL], expected_version=0) == 1
+
+
+def test_cache_is_invalidated_by_other_connections_and_reads_skip_ledger(tmp_path):
+    path = str(tmp_path / "portfolio.db")
+    reader, writer = PortfolioStore(path), PortfolioStore(path)
+    try:
+        writer.update("u1", holdings=[AAPL])
+        assert reader.get("u1")["version"] == 1
+        writer.update("u1", holdings=[MSFT])
+        assert reader.get("u1")["holdings"] == [dict(MSFT, shares=5.0)]
+
+        for i in range(200):
+            writer.update("u1", cash={"krw": i, "usd": 0})
+        statements = []
+        reader._db.set_trace_callback(statements.append)
+        assert reader.get("u1")["version"] == 201  # krw=0 은 변경 없음
+        reader.get("u1")
+        reader._db.set_trace_callback(None)
+        assert statements and not any("ledger" in s for s in statements)
+        # 두 번째 조회는 캐시에서 (data_version 확인만)
+        assert sum("FROM portfolios" in s for s in statements) == 1
+    finally:
+        reader.close()
+        writer.close()
+
+
+def test_legacy_json_is_imported_once(tmp_path):
+    legacy = tmp_path / "portfolio.json"
+    legacy.write_text(json.dumps({"demo": {"userId": "demo", "holdings": [AAPL, MSFT],
+                                           "cash": {"krw": 5000000, "usd": 1000}}}), encoding="utf-8")
+    path = str(tmp_path / "portfolio.db")
+    store = PortfolioStore(path, legacy_json=legacy)
+    assert store.get("demo")["holdings"][0]["symbol"] == "AAPL"
+    store.update("demo", cash={"krw": 0, "usd": 0})
+    store.close()
+
+    store = PortfolioStore(path, legacy_json=legacy)
+    assert store.get("demo")["cash"] == {"krw": 0.0, "usd": 0.0}
+    store.close()
+
+
+def test_legacy_json_import_is_one_transaction(tmp_path):
+    legacy = tmp_path / "portfolio.json"
+    users = {f"u{i}": {"holdings": [AAPL], "cash": {"krw": i, "usd": 0}} for i in range(50)}
+    legacy.write_text(json.dumps(users), encoding="utf-8")
+    store = PortfolioStore(str(tmp_path / "portfolio.db"))
+    statements = []
+    store._db.set_trace_callback(statements.append)
+    assert store.import_legacy_json(legacy) == 50
+    store._db.set_trace_callback(None)
+    assert statements.count("BEGIN IMMEDIATE") == 1 and statements.count("COMMIT") == 1
+    assert store.stats()["ledger_entries"] > 0 and store.get("u49")["cash"]["krw"] == 49.0
+
+    # 마지막 사용자 데이터가 잘못되면 앞서 기록한 사용자까지 모두 롤백
+    legacy.write_text(json.dumps(dict(users, bad={"holdings": [dict(AAPL, shares="many")]})), encoding="utf-8")
+    empty = PortfolioStore(str(tmp_path / "other.db"))
+    with pytest.raises(ValueError):
+        empty.import_legacy_json(legacy)
+    assert empty.get("u0") is None and empty.stats()["ledger_entries"] == 0
+    store.close()
+    empty.close()
+
+
+WRITER = textwrap.dedent("""
+    import random, sys
+    sys.path.insert(0, {root!r})
+    from mcp.portfolio_store import PortfolioStore
+    store = PortfolioStore({path!r})
+    rng = random.Random(1)
+    print("ready", flush=True)
+    while True:
+        user = "u%d" % rng.randrange(5)
+        holdings = [{{"symbol": "S%03d" % n, "shares": rng.randint(1, 100), "avg_cost": rng.random() * 100}}
+                    for n in rng.sample(range(200), rng.randint(0, 40))]
+        store.update(user, holdings=holdings, cash={{"krw": rng.randint(0, 10**9), "usd": 0}})
+""")
+
+
+def test_kill_during_write_leaves_consistent_state(tmp_path):
+    path = str(tmp_path / "portfolio.db")
+    proc = subprocess.Popen([sys.executable, "-c", WRITER.format(root=str(ROOT), path=path)],
+                            stdout=subprocess.PIPE, text=True)
+    try:
+        assert proc.stdout.readline().strip() == "ready"
+        time.sleep(1.0)
+    finally:
+        os.kill(proc.pid, signal.SIGKILL)
+        proc.wait()
+
+    store = PortfolioStore(path)
+    try:
+        assert store.integrity_check() == "ok"
+        assert store.stats()["ledger_entries"] > 0
+        for i in range(5):
+            # 마지막으로 커밋된 상태 = 원장 재생 결과
+            assert store.replay(f"u{i}") == store.get(f"u{i}")
+    finally:
+        store.close()
+
+
+def test_portfolio_api_uses_store_versions(tmp_path, monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from mcp import portfolio
+
+    monkeypatch.setattr(portfolio, "_store", PortfolioStore(str(tmp_path / "portfolio.db")))
+    app = FastAPI()
+    app.include_router(portfolio.router)
+    client = TestClient(app)
+
+    assert client.get("/api/v1/portfolio", params={"userId": "u1"}).json()["version"] == 0
+    body = {"userId": "u1", "holdings": [AAPL], "version": 0}
+    assert client.put("/api/v1/portfolio", json=body).json() == {"ok": True, "version": 1}
+    assert client.put("/api/v1/portfolio", json=dict(body, cash={"krw": 1, "usd": 0})).status_code == 409
+    assert client.get("/api/v1/portfolio", params={"userId": "u1"}).json()["holdings"][0]["symbol"] == "AAPL"
+    assert client.get("/api/v1/portfolio/health").json()["journal_mode"] == "wal"
+    portfolio._store.close()
@@ -14,6 +14,7 @@ from pathlib import Path
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent.parent))
 
+from mcp.security_logger import flush_security_log
 from mcp.utils.rate_limiter import RateLimiter, rate_limiter
 from fastapi.testclient import TestClient
 from fastapi import Request
@@ -118,14 +119,14 @@ class TestRateLimiter:
             self.rate_limiter.is_rate_limited(mock_request)
 
         # 요청이 기록되었는지 확인
-        assert len(self.rate_limiter.ip_requests[test_ip]) == 3
+        assert self.rate_limiter.current_requests(test_ip) == 3
 
         # 시간을 앞당기고 정리 실행
         time.sleep(2)  # cleanup_interval이 1초이므로
         self.rate_limiter._cleanup_old_requests()
 
         # 실제로는 1분 후에 정리되므로 여전히 존재해야 함
-        assert len(self.rate_limiter.ip_requests[test_ip]) == 3
+        assert self.rate_limiter.current_requests(test_ip) == 3
 
     def test_security_logs_created(self):
         """보안 로그 파일이 생성되는지 테스트"""
@@ -142,6 +143,7 @@ class TestRateLimiter:
             mock_request.url.path = '/test'
 
             self.rate_limiter.is_rate_limited(mock_request)
+        flush_security_log()
 
         # 로그 파일 확인
         log_file = Path("tests/test_security.log")
@@ -402,6 +404,7 @@ class TestNotifierIntegration:
             mock_request.url.path = '/api/v1/test-endpoint'
 
             rate_limiter.is_rate_limited(mock_request)
+        flush_security_log()
 
         # 로그 파일이 생성되었는지 확인
         log_path = Path(test_log_file)
@@ -617,6 +620,9 @@ class TestAdvancedSecurityScenarios:
         from unittest.mock import Mock
 
         rate_limiter = RateLimiter(requests_per_minute=1000)  # 높은 제한값
+        # 모든 요청을 같은 시각으로 고정 (한도가 회복된 IP 상태는 지연 정리되므로)
+        frozen_now = time.time()
+        rate_limiter.limiter.clock = lambda: frozen_now
 
         # 1000개 IP에서 각각 10개 요청 (총 10,000 요청)
         start_time = time.time()
@@ -641,9 +647,35 @@ class TestAdvancedSecurityScenarios:
 
         # 모든 IP가 정상적으로 처리되었는지 확인
         assert len(rate_limiter.blocked_ips) == 0
-        assert len(rate_limiter.ip_requests) == 1000
+        assert rate_limiter.tracked_clients() == 1000
+
+
+def test_security_stats_from_event_index():
+    """위반 건수 통계가 로그 파일이 아닌 메모리 카운터에서 나오는지 테스트"""
+    from unittest.mock import Mock
+    from mcp.utils.rate_limiter import get_security_stats
+
+    limiter = RateLimiter(requests_per_minute=2, log_file="tests/test_security_stats.log")
+    test_ip = "198.51.100.77"
+    for _ in range(5):
+        mock_request = Mock()
+        mock_request.client.host = test_ip
+        mock_request.headers = {'User-Agent': 'StatsBot'}
+        mock_request.method = 'GET'
+        mock_request.url.path = '/api/v1/stats'
+        limiter.is_rate_limited(mock_request)
+
+    summary = limiter.get_blocked_ips_summary()
+    assert summary['violations_by_ip'][test_ip] >= 3
+
+    stats = get_security_stats()
+    assert stats['security_events']['events_by_type']['RATE_LIMIT_EXCEEDED'] >= 3
+    assert 'dropped' in stats['log_pipeline']
+
+    flush_security_log()
+    Path("tests/test_security_stats.log").unlink(missing_ok=True)
 
 
 if __name__ == "__main__":
     # 테스트 실행
-    pytest.main([__file__, "-v", "--tb=short"])
\ No newline at end of file
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -1,7 +1,7 @@
 import os
 import json
 import pytest
-from mcp.security_logger import log_security_event
+from mcp.security_logger import flush_security_log, log_security_event
 
 # 🔐 보안 로그 시스템 테스트 (한국어 주석 포함)
 # 주요 검증 항목:
@@ -19,17 +19,72 @@ def setup_function():
 
 def test_log_creation():
     log_security_event("BLOCKED_IP", "192.168.0.15 - Rate Limit 초과로 차단")
+    flush_security_log()  # 기록은 백그라운드 스레드가 배치로 수행
     assert os.path.exists(LOG_PATH), "❌ 로그 파일이 생성되지 않았습니다"
 
 def test_log_content():
     log_security_event("WHITELIST_ADD", "127.0.0.1 - 화이트리스트 추가")
+    flush_security_log()
     with open(LOG_PATH, "r", encoding="utf-8") as f:
         lines = f.readlines()
     assert any("WHITELIST_ADD" in line for line in lines), "❌ 화이트리스트 이벤트 기록 실패"
 
 def test_log_json_format():
     log_security_event("MONITOR", "테스트 모니터링 이벤트")
+    flush_security_log()
     with open(LOG_PATH, "r", encoding="utf-8") as f:
         last_line = f.readlines()[-1]
     data = json.loads(last_line)
-    assert "event" in data and "message" in data, "❌ 로그 JSON 형식이 올바르지 않습니다"
\ No newline at end of file
+    assert "event" in data and "message" in data, "❌ 로그 JSON 형식이 올바르지 않습니다"
+
+def test_batched_structured_lines(tmp_path):
+    """이벤트 폭주가 배치 단위로 기록되고 구조화 필드가 JSON 줄에 남는지 테스트"""
+    from mcp.security_logger import get_pipeline_stats
+
+    log_path = tmp_path / "flood.log"
+    before = get_pipeline_stats()
+    for i in range(2000):
+        log_security_event("RATE_LIMIT_EXCEEDED", f"Rate limit exceeded - IP: 198.51.100.{i % 50}",
+                           log_path=str(log_path), client_ip=f"198.51.100.{i % 50}", request_count=i)
+    assert flush_security_log()
+    after = get_pipeline_stats()
+
+    with open(log_path, "r", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert len(records) == 2000
+    assert records[-1]["event"] == "RATE_LIMIT_EXCEEDED" and records[-1]["request_count"] == 1999
+    assert after["records_written"] - before["records_written"] == 2000
+    assert after["batches_written"] - before["batches_written"] < 2000
+
+
+def test_reopens_moved_log(tmp_path):
+    """logrotate 등으로 파일이 옮겨지면 다음 배치에서 새 파일을 여는지 테스트"""
+    log_path = tmp_path / "security.log"
+    log_security_event("MONITOR", "회전 전", log_path=str(log_path))
+    flush_security_log()
+    log_path.rename(tmp_path / "security.log.1")
+
+    log_security_event("MONITOR", "회전 후", log_path=str(log_path))
+    flush_security_log()
+    with open(log_path, "r", encoding="utf-8") as f:
+        assert [json.loads(line)["message"] for line in f] == ["회전 후"]
+
+
+def test_event_index_counts():
+    """IP/이벤트 유형별 카운터가 로그를 다시 읽지 않고 집계되는지 테스트"""
+    from mcp.security_logger import SecurityEventIndex
+
+    index = SecurityEventIndex(max_ips=2)
+    index.record("RATE_LIMIT_EXCEEDED", "203.0.113.1", 1.0)
+    index.record("RATE_LIMIT_EXCEEDED", "203.0.113.1", 2.0)
+    index.record("BLOCKED_IP", "203.0.113.2", 3.0)
+    index.record("MONITOR", None, 4.0)
+
+    assert index.count() == 4
+    assert index.count("RATE_LIMIT_EXCEEDED", "203.0.113.1") == 2
+    snapshot = index.snapshot(top=1)
+    assert snapshot["events_by_type"] == {"RATE_LIMIT_EXCEEDED": 2, "BLOCKED_IP": 1, "MONITOR": 1}
+    assert snapshot["top_ips"][0]["ip"] == "203.0.113.1"
+
+    index.record("MONITOR", "203.0.113.3", 5.0)  # 가장 오래 보이지 않은 IP 제거
+    assert index.count(client_ip="203.0.113.1") == 0 and index.snapshot()["tracked_ips"] == 2